@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+import argparse
+from time import perf_counter
+
+from fealpy import logger
+logger.setLevel('WARNING')
+
+from fealpy.backend import backend_manager as bm
+
+## 参数解析
+parser = argparse.ArgumentParser(description=
+        """
+        后端分发开销的性能测试: 对小数组调用 bm.xxx, 绑定后端 bm.bind().xxx
+        与直接调用 numpy/torch 函数的单次调用时间对比.
+        """)
+
+parser.add_argument('--size',
+        default=8, type=int,
+        help='测试数组的长度, 默认为 8.')
+
+parser.add_argument('--number',
+        default=100000, type=int,
+        help='每个测试的调用次数, 默认为 1e5.')
+
+parser.add_argument('--repeat',
+        default=3, type=int,
+        help='每个测试的重复次数, 取最短时间.')
+
+parser.add_argument('--backend',
+        default='numpy', type=str,
+        help="默认后端为 numpy. 还可以选择 pytorch")
+
+args = parser.parse_args()
+bm.set_backend(args.backend)
+
+if args.backend == 'numpy':
+    import numpy as raw
+elif args.backend == 'pytorch':
+    import torch as raw
+else:
+    raise ValueError(f"Unsupported backend '{args.backend}' in this benchmark.")
+
+
+def per_call(func, x, number, repeat):
+    t = float('inf')
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            func(x)
+        t = min(t, perf_counter() - start)
+    return t / number * 1e9
+
+
+B = bm.bind()
+x = bm.astype(bm.random.rand(args.size), bm.float64)
+cases = {
+    'abs': (lambda x: bm.abs(x), lambda x: B.abs(x), lambda x: raw.abs(x)),
+    'sum': (lambda x: bm.sum(x), lambda x: B.sum(x), lambda x: raw.sum(x)),
+    'sqrt': (lambda x: bm.sqrt(x), lambda x: B.sqrt(x), lambda x: raw.sqrt(x)),
+    'attribute': (lambda x: bm.abs, lambda x: B.abs, lambda x: raw.abs),
+}
+
+print(f"backend: {args.backend}, size: {args.size}, time per call (ns)")
+print(f"{'function':>10} {'bm':>10} {'bm.bind()':>10} {'raw':>10}")
+
+for name, funcs in cases.items():
+    t = [per_call(f, x, args.number, args.repeat) for f in funcs]
+    print(f"{name:>10} {t[0]:10.0f} {t[1]:10.0f} {t[2]:10.0f}")
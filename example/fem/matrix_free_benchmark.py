@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+import argparse
+from time import perf_counter
+
+from fealpy import logger
+logger.setLevel('WARNING')
+
+from fealpy.backend import backend_manager as bm
+
+## 参数解析
+parser = argparse.ArgumentParser(description=
+        """
+        无组装 (matrix-free) 双线性型与组装 CSR 矩阵的性能对比:
+        内存占用、矩阵向量乘时间以及共轭梯度法的求解时间.
+        """)
+
+parser.add_argument('--degree',
+        default=[1, 2, 3, 4, 5, 6], type=int, nargs='+',
+        help='Lagrange 有限元空间的次数, 默认为 1 到 6 次.')
+
+parser.add_argument('--n',
+        default=32, type=int,
+        help='网格剖分段数, 默认每个方向剖分 32 段.')
+
+parser.add_argument('--splitter',
+        default=None, type=int,
+        help='单元分块组装的块大小, 默认不分块.')
+
+parser.add_argument('--repeat',
+        default=10, type=int,
+        help='矩阵向量乘的重复次数, 取平均时间.')
+
+parser.add_argument('--backend',
+        default='numpy', type=str,
+        help="默认后端为 numpy. 还可以选择 pytorch, jax 等")
+
+args = parser.parse_args()
+bm.set_backend(args.backend)
+
+from fealpy.mesh import TriangleMesh
+from fealpy.functionspace import LagrangeFESpace
+from fealpy.fem import BilinearForm, ScalarDiffusionIntegrator, ScalarMassIntegrator
+from fealpy.solver import cg
+
+
+def nbytes(*tensors):
+    return sum(bm.to_numpy(t).nbytes for t in tensors)
+
+
+def bilinear_form(space):
+    bform = BilinearForm(space)
+    bform.add_integrator(ScalarDiffusionIntegrator(), splitter=args.splitter)
+    bform.add_integrator(ScalarMassIntegrator())
+    return bform
+
+
+def matvec_time(A, x):
+    A @ x
+    start = perf_counter()
+    for _ in range(args.repeat):
+        A @ x
+    return (perf_counter() - start) / args.repeat
+
+
+mesh = TriangleMesh.from_box([0, 1, 0, 1], args.n, args.n)
+
+print(f"backend: {args.backend}, NC: {mesh.number_of_cells()}")
+print(f"{'p':>3} {'gdof':>8} {'csr MB':>9} {'local MB':>9} "
+      f"{'asm(s)':>9} {'csr mv(s)':>10} {'mf mv(s)':>10} "
+      f"{'csr cg(s)':>10} {'mf cg(s)':>10}")
+
+for p in args.degree:
+    space = LagrangeFESpace(mesh, p)
+    gdof = space.number_of_global_dofs()
+    b = bm.astype(bm.random.rand(gdof), mesh.ftype)
+
+    start = perf_counter()
+    A = bilinear_form(space).assembly(format='csr')
+    t_asm = perf_counter() - start
+    mem_csr = nbytes(A.crow, A.col, A.values)
+
+    mf = bilinear_form(space)
+    mf.keep_local(True)
+    mf @ b
+    mem_local = sum(nbytes(*group) for group in mf._local)
+
+    t_csr = matvec_time(A, b)
+    t_mf = matvec_time(mf, b)
+
+    start = perf_counter()
+    cg(A, b, rtol=1e-8)
+    t_csr_cg = perf_counter() - start
+    start = perf_counter()
+    cg(mf, b, rtol=1e-8)
+    t_mf_cg = perf_counter() - start
+
+    print(f"{p:>3d} {gdof:>8d} {mem_csr/2**20:9.2f} {mem_local/2**20:9.2f} "
+          f"{t_asm:9.4f} {t_csr:10.5f} {t_mf:10.5f} "
+          f"{t_csr_cg:10.4f} {t_mf_cg:10.4f}")
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+import argparse
+from time import perf_counter
+
+from fealpy import logger
+logger.setLevel('WARNING')
+
+from fealpy.backend import backend_manager as bm
+from fealpy.mesh.neighbor_search import cell_list_search, VerletList
+
+## 参数解析
+parser = argparse.ArgumentParser(description=
+        """
+        粒子邻居搜索的性能测试: 在周期单位立方体中随机生成粒子, 比较 cell list
+        邻居搜索, Verlet list (带 skin) 的逐步更新, 以及 scipy cKDTree.
+        """)
+
+parser.add_argument('--sizes',
+        default=[100000, 1000000, 10000000], type=int, nargs='+',
+        help='粒子数目, 默认为 1e5 1e6 1e7.')
+
+parser.add_argument('--dim',
+        default=3, type=int,
+        help='空间维数, 默认为 3.')
+
+parser.add_argument('--neighbors',
+        default=30, type=float,
+        help='每个粒子的平均邻居数目, 用于确定搜索半径, 默认为 30.')
+
+parser.add_argument('--skin',
+        default=0.2, type=float,
+        help='Verlet list 的 skin 与搜索半径之比, 默认为 0.2.')
+
+parser.add_argument('--steps',
+        default=5, type=int,
+        help='Verlet list 的更新步数, 默认为 5.')
+
+parser.add_argument('--kdtree',
+        action='store_true',
+        help='同时测试 scipy cKDTree (query_ball_tree 并展平为 CSR).')
+
+parser.add_argument('--backend',
+        default='numpy', type=str,
+        help="默认后端为 numpy. 还可以选择 pytorch")
+
+args = parser.parse_args()
+bm.set_backend(args.backend)
+
+GD = args.dim
+ball = {2: 3.141592653589793, 3: 4.0 / 3.0 * 3.141592653589793}[GD]
+box = [1.0] * GD
+
+print(f"{'N':>10} {'nnz':>12} {'cell list':>10} {'verlet':>10} {'kdtree':>10}")
+for N in args.sizes:
+    r = (args.neighbors / N / ball) ** (1 / GD)
+    x = bm.random.rand(N, GD)
+
+    start = perf_counter()
+    indptr, indices = cell_list_search(x, r, box_size=box, periodic=True)
+    t_cell = perf_counter() - start
+
+    nlist = VerletList(r, skin=args.skin*r, box_size=box, periodic=True)
+    nlist.update(x)
+    dx = args.skin * r / (4 * args.steps)
+    start = perf_counter()
+    for _ in range(args.steps):
+        x = bm.remainder(x + dx * (2 * bm.random.rand(N, GD) - 1) / GD**0.5, 1.0)
+        nlist.update(x)
+    t_verlet = (perf_counter() - start) / args.steps
+
+    t_tree = float('nan')
+    if args.kdtree:
+        import numpy as np
+        from scipy.spatial import cKDTree
+        xn = bm.to_numpy(x)
+        start = perf_counter()
+        tree = cKDTree(xn, boxsize=1.0)
+        neighbors = tree.query_ball_tree(tree, r)
+        num = np.array([len(n) for n in neighbors])
+        indices = np.array([i for n in neighbors for i in n])
+        t_tree = perf_counter() - start
+
+    print(f"{N:>10} {int(indptr[-1]):>12} {t_cell:>10.3f} {t_verlet:>10.3f} {t_tree:>10.3f}")
@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+import argparse
+from time import perf_counter
+
+from fealpy import logger
+logger.setLevel('WARNING')
+
+from fealpy.backend import backend_manager as bm
+
+## 参数解析
+parser = argparse.ArgumentParser(description=
+        """
+        稀疏矩阵乘稀疏矩阵的性能测试: 向量化实现 (spspmm_coo, spspmm_csr)
+        与 scipy 实现 (NumPy 后端的 csr_spspmm) 的对比.
+        """)
+
+parser.add_argument('--nnz',
+        default=[100000, 300000, 1000000], type=int, nargs='+',
+        help='矩阵的非零元个数, 默认为 1e5, 3e5, 1e6.')
+
+parser.add_argument('--nnz-per-row',
+        default=7, type=int,
+        help='每行的平均非零元个数, 默认为 7.')
+
+parser.add_argument('--repeat',
+        default=3, type=int,
+        help='每个测试的重复次数, 取最短时间.')
+
+parser.add_argument('--backend',
+        default='numpy', type=str,
+        help="默认后端为 numpy. 还可以选择 pytorch, jax 等")
+
+args = parser.parse_args()
+bm.set_backend(args.backend)
+
+from fealpy.sparse import COOTensor, CSRTensor
+from fealpy.sparse._spspmm import spspmm_coo, spspmm_csr
+
+
+def random_matrix(n, nnz):
+    row = bm.random.randint(0, n, (nnz,))
+    col = bm.random.randint(0, n, (nnz,))
+    values = bm.random.rand(nnz)
+    indices = bm.stack([row, col], axis=0)
+    return COOTensor(indices, values, (n, n)).coalesce()
+
+
+def best_time(func, repeat):
+    t = float('inf')
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        t = min(t, perf_counter() - start)
+    return t
+
+
+print(f"backend: {args.backend}")
+print(f"{'nnz':>10} {'spspmm_coo':>12} {'spspmm_csr':>12} {'scipy':>12}")
+
+for nnz in args.nnz:
+    n = nnz // args.nnz_per_row
+    A = random_matrix(n, nnz)
+    B = random_matrix(n, nnz)
+    Ac, Bc = A.tocsr(), B.tocsr()
+
+    t_coo = best_time(lambda: COOTensor(*spspmm_coo(
+        A.indices, A.values, A.sparse_shape,
+        B.indices, B.values, B.sparse_shape
+    )).coalesce(), args.repeat)
+    t_csr = best_time(lambda: spspmm_csr(
+        Ac.crow, Ac.col, Ac.values, Ac.sparse_shape,
+        Bc.crow, Bc.col, Bc.values, Bc.sparse_shape
+    ), args.repeat)
+
+    if args.backend == 'numpy':
+        t_ref = best_time(lambda: bm.csr_spspmm(
+            Ac.crow, Ac.col, Ac.values, Ac.sparse_shape,
+            Bc.crow, Bc.col, Bc.values, Bc.sparse_shape
+        ), args.repeat)
+        ref = f"{t_ref:12.4f}"
+    else:
+        ref = f"{'-':>12}"
+
+    print(f"{A.nnz:>10d} {t_coo:12.4f} {t_csr:12.4f} {ref}")
@@ -9,3 +9,6 @@ from .manager import BackendManager
 from .base import TensorLike, Size, Number
 
 backend_manager = BackendManager(default_backend='numpy')
+
+from .scatter import ScatterPlan
+from .einsum_path import EinsumPathCache, einsum_path_cache
@@ -205,7 +205,7 @@ FUNCTION_MAPPING = _make_default_mapping(
     # python array API standard v2023.12
     'argsort', 'sort',
     # non-standard
-    'lexsort',
+    'lexsort', 'argpartition',
 
     ### Statistical Functions ###
     # python array API standard v2023.12
@@ -0,0 +1,106 @@
+
+from typing import Any, Callable, Dict, Hashable
+from collections import OrderedDict
+from threading import Lock
+from time import perf_counter
+
+
+class EinsumPathCache():
+    """LRU cache of einsum contraction paths.
+
+    Finding the contraction path of an einsum with three or more operands
+    costs tens of microseconds in Python, which dominates the contraction on
+    small chunks. The backends look up the path by (backend, subscripts,
+    shapes, dtypes) and only search it on a miss. The cache is shared by all
+    backends and threads.
+
+    Parameters:
+        maxsize (int, optional): Maximum number of cached paths. Defaults to 512.
+    """
+    def __init__(self, maxsize: int=512):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be positive, but got {maxsize}.")
+        self._maxsize = maxsize
+        self._paths: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.search_time = 0.
+
+    def __repr__(self) -> str:
+        return (f"EinsumPathCache(size={len(self._paths)}, maxsize={self._maxsize}, "
+                f"hits={self.hits}, misses={self.misses})")
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: int):
+        if value < 1:
+            raise ValueError(f"maxsize must be positive, but got {value}.")
+        with self._lock:
+            self._maxsize = value
+            while len(self._paths) > value:
+                self._paths.popitem(last=False)
+
+    def get(self, key: Hashable, search: Callable[[], Any], /) -> Any:
+        """Get the path of the key, calling `search()` to find it on a miss."""
+        with self._lock:
+            path = self._paths.get(key, None)
+            if path is not None:
+                self._paths.move_to_end(key)
+                self.hits += 1
+                return path
+
+        start = perf_counter()
+        path = search()
+        elapsed = perf_counter() - start
+
+        with self._lock:
+            self.misses += 1
+            self.search_time += elapsed
+            self._paths[key] = path
+            self._paths.move_to_end(key)
+            if len(self._paths) > self._maxsize:
+                self._paths.popitem(last=False)
+        return path
+
+    def info(self) -> Dict[str, Any]:
+        """Statistics of the cache.
+
+        Returns:
+            dict: with `hits`, `misses`, `hit_rate`, `size`, `maxsize`,
+            `search_time` (seconds spent on searching paths) and `saved_time`
+            (estimated seconds saved by the hits, based on the mean search time).
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            mean = self.search_time / self.misses if self.misses else 0.
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.,
+                'size': len(self._paths),
+                'maxsize': self._maxsize,
+                'search_time': self.search_time,
+                'saved_time': self.hits * mean
+            }
+
+    def clear(self):
+        """Remove all paths and reset the statistics."""
+        with self._lock:
+            self._paths.clear()
+            self.hits = 0
+            self.misses = 0
+            self.search_time = 0.
+
+
+einsum_path_cache = EinsumPathCache()
+
+
+def einsum_key(backend_name: str, subscripts: str, operands, /, *extra) -> Hashable:
+    """Key of the path cache, made of the subscripts, shapes and dtypes."""
+    return (backend_name, subscripts,
+            tuple(tuple(op.shape) for op in operands),
+            tuple(op.dtype for op in operands)) + extra
@@ -20,6 +20,7 @@ except ImportError:
                       'See https://github.com/google/jax for installation.')
 
 from .base import BackendProxy, ATTRIBUTE_MAPPING, FUNCTION_MAPPING, TRANSFORMS_MAPPING
+from .einsum_path import einsum_path_cache, einsum_key
 
 Array = jax.Array
 _device = jax.Device
@@ -77,6 +78,18 @@ class JAXBackend(BackendProxy, backend_name='jax'):
     ### Binary methods ###
     # NOTE: all copied
 
+    @staticmethod
+    def einsum(*args, **kwargs):
+        if ('optimize' in kwargs) or (len(args) < 4) or (not isinstance(args[0], str)):
+            return jnp.einsum(*args, **kwargs)
+        import opt_einsum
+        subscripts, operands = args[0], args[1:]
+        key = einsum_key('jax', subscripts, operands)
+        path = einsum_path_cache.get(
+            key, lambda: opt_einsum.contract_path(subscripts, *operands, optimize='auto')[0]
+        )
+        return jnp.einsum(subscripts, *operands, optimize=path, **kwargs)
+
     @staticmethod
     def set_at(x: Array, indices, val, /):
         return x.at[indices].set(val)
@@ -173,6 +186,27 @@ class JAXBackend(BackendProxy, backend_name='jax'):
 
         return node_self, neighbors
 
+    ### Sparse Functions ###
+    @staticmethod
+    @partial(jit, static_argnums=3)
+    def csr_spmm(crow, col, values, shape, other):
+        # NOTE: row indices are recovered by `searchsorted` instead of `repeat`
+        # to keep all shapes static, so that this can be traced by `jit`.
+        nnz = col.shape[0]
+        row = jnp.searchsorted(crow, jnp.arange(nnz, dtype=crow.dtype), side='right') - 1
+
+        if other.ndim == 1:
+            src = jnp.moveaxis(values * other[col], -1, 0) # (nnz, *batch)
+            result = jax.ops.segment_sum(src, row, num_segments=shape[0],
+                                         indices_are_sorted=True)
+            return jnp.moveaxis(result, 0, -1)
+        else:
+            src = values[..., None] * other[..., col, :] # (*batch, nnz, K)
+            src = jnp.moveaxis(src, -2, 0)
+            result = jax.ops.segment_sum(src, row, num_segments=shape[0],
+                                         indices_are_sorted=True)
+            return jnp.moveaxis(result, 0, -2)
+
     ### FEALPy functionals ###
     @staticmethod
     def multi_index_matrix(p: int, dim: int, *, dtype=None) -> Array:
@@ -60,9 +60,38 @@ class BackendManager():
                         "get backend properties and methods after executing set_backend()")
         return self._THREAD_LOCAL.__dict__['backend']
 
-    def __getattr__(self, item):
-        """Redirct attribute access to the current backend."""
-        return getattr(self.get_current_backend("GET_ATTR: " + item), item)
+    def bind(self) -> BackendProxy:
+        """Get the backend of the current thread as a namespace.
+
+        Accessing functions through the bound namespace skips the dispatch of
+        the backend manager, which is helpful in loops calling a lot of backend
+        functions on small tensors. The namespace does not follow the later
+        `set_backend` calls, so bind again after switching the backend.
+
+        Example:
+        ```
+            B = bm.bind()
+            for i in range(NC):
+                B.einsum(...)
+        ```
+        """
+        return self.get_current_backend("BIND")
+
+    def __getattribute__(self, item):
+        """Redirct attribute access to the current backend.
+
+        Attributes of the manager itself are looked up as usual. Others are
+        fetched from the backend directly, rather than in `__getattr__`, to
+        skip the failed lookup on the manager which costs much more than the
+        redirection itself.
+        """
+        if item in _MANAGER_ATTRIBUTES:
+            return _object_getattribute(self, item)
+        try:
+            backend = _object_getattribute(self, '_THREAD_LOCAL').backend
+        except AttributeError:
+            backend = self.get_current_backend("GET_ATTR: " + item)
+        return getattr(backend, item)
 
     def __setattr__(self, key, value):
         """Redirct attribute access to the current backend."""
@@ -70,3 +99,9 @@ class BackendManager():
             super().__setattr__(key, value)
         else:
             setattr(self.get_current_backend("SET_ATTR: " + key), key, value)
+
+
+_object_getattribute = object.__getattribute__
+_MANAGER_ATTRIBUTES = frozenset(dir(BackendManager)) | {
+    '_backends', '_THREAD_LOCAL', '_default_backend_name'
+}
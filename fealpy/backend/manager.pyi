@@ -64,6 +64,7 @@ class BackendManager():
     def set_backend(self, name: str) -> None: ... # instance method
     def load_backend(self, name: str) -> None: ... # instance method
     def get_current_backend(self) -> BackendProxy: ... # instance method
+    def bind(self) -> BackendProxy: ... # instance method
 
     ### constants ###
 
@@ -292,6 +293,7 @@ class BackendManager():
     def sort(self, x: _DT, /, *, axis: int=-1, descending: bool=False, stable: bool=True) -> _DT: ...
     # non-standard
     def lexsort(self, keys: Tuple[_DT, ...], /, *, axis: int = -1) -> _DT: ...
+    def argpartition(self, x: _DT, kth: int, /, *, axis: int=-1) -> _DT: ...
 
     ### Statistical Functions ###
     # python array API standard v2023.12
@@ -2,7 +2,7 @@
 from typing import Optional, Union, Tuple
 import threading
 from functools import reduce
-from math import factorial
+from math import factorial, prod
 from itertools import combinations_with_replacement
 
 import numpy as np
@@ -15,6 +15,7 @@ from .base import (
     ModuleProxy, BackendProxy,
     ATTRIBUTE_MAPPING, FUNCTION_MAPPING
 )
+from .einsum_path import einsum_path_cache, einsum_key
 
 
 def _remove_device(func):
@@ -25,6 +26,64 @@ def _remove_device(func):
     return wrapper
 
 
+# NOTE: `np.add.at` on multi-dimensional arrays is several times slower than
+# `np.bincount`. Scatter-add is done on the flattened output with a flat key
+# instead, and the bincount is used when the scatter is dense enough.
+_BINCOUNT_DENSITY = 0.25
+
+
+def _normalize_index(index: NDArray, size: int, /) -> NDArray:
+    """Flatten an integer index, wrap the negative ones and check bounds."""
+    index = np.asarray(index, dtype=np.intp).reshape(-1)
+    if index.shape[0] == 0:
+        return index
+    lo, hi = index.min(), index.max()
+    if lo < 0:
+        index = np.where(index < 0, index + size, index)
+        lo = index.min()
+    if lo < 0 or hi >= size:
+        raise IndexError(f"index out of bounds for axis with size {size}")
+    return index
+
+
+def _scatter_key(index: NDArray, lead: int, size: int, trail: int, /) -> NDArray:
+    """Flat key sending the entry (l, j, t) of a source shaped (lead, n, trail)
+    to the entry (l, index[j], t) of an output shaped (lead, size, trail)."""
+    if lead == 1 and trail == 1:
+        return index
+    key = index[None, :, None] * trail + np.arange(trail, dtype=np.intp)[None, None, :]
+    if lead > 1:
+        key = np.arange(lead, dtype=np.intp)[:, None, None] * (size * trail) + key
+    return key.reshape(-1)
+
+
+def _scatter_add_flat(a: NDArray, key: NDArray, src: NDArray, /) -> NDArray:
+    """In-place `a.ravel()[key] += src` for a flat key, accumulating duplicates."""
+    kind = a.dtype.kind
+    if kind in 'fc' and key.shape[0] >= _BINCOUNT_DENSITY * a.size:
+        if kind == 'c':
+            src = src.astype(np.complex128, copy=False)
+            val = np.bincount(key, src.real, minlength=a.size) \
+                + 1j * np.bincount(key, src.imag, minlength=a.size)
+        else:
+            val = np.bincount(key, src, minlength=a.size)
+        a += val.reshape(a.shape)
+    elif a.flags.c_contiguous:
+        np.add.at(a.reshape(-1), key, src)
+    else:
+        np.add.at(a, np.unravel_index(key, a.shape), src)
+    return a
+
+
+def _index_add(a: NDArray, index: NDArray, src: NDArray, axis: int, /) -> NDArray:
+    """Scatter-add src into a along the axis, with a normalized flat index.
+    The src is shaped `a.shape[:axis] + (n, ) + a.shape[axis+1:]`, where the
+    middle dimensions may be any shape of n entries."""
+    shape = a.shape
+    key = _scatter_key(index, prod(shape[:axis]), shape[axis], prod(shape[axis+1:]))
+    return _scatter_add_flat(a, key, np.reshape(src, -1))
+
+
 class NumPyBackend(BackendProxy, backend_name='numpy'):
     DATA_CLASS = np.ndarray
 
@@ -93,7 +152,18 @@ class NumPyBackend(BackendProxy, backend_name='numpy'):
     # non-standard
     @staticmethod
     def einsum(*args, **kwargs):
-        return np.einsum(*args, **kwargs, optimize=True)
+        if ('optimize' in kwargs) or (not isinstance(args[0], str)):
+            kwargs.setdefault('optimize', True)
+            return np.einsum(*args, **kwargs)
+        subscripts, operands = args[0], args[1:]
+        try:
+            key = einsum_key('numpy', subscripts, operands)
+        except AttributeError: # Python scalars or lists
+            return np.einsum(*args, **kwargs, optimize=True)
+        path = einsum_path_cache.get(
+            key, lambda: np.einsum_path(subscripts, *operands, optimize='greedy')[0]
+        )
+        return np.einsum(subscripts, *operands, **kwargs, optimize=path)
 
     ### Manipulation Functions ###
     # python array API standard v2023.12
@@ -124,15 +194,38 @@ class NumPyBackend(BackendProxy, backend_name='numpy'):
 
     @staticmethod
     def add_at(a: NDArray, indices, src, /) -> NDArray:
+        if isinstance(indices, tuple) and 0 < len(indices) <= a.ndim \
+                and all(isinstance(i, np.ndarray) and i.dtype.kind in 'iu' for i in indices):
+            k = len(indices)
+            indices = np.broadcast_arrays(*indices)
+            index = np.zeros(indices[0].shape, dtype=np.intp)
+            for i, n in zip(indices, a.shape[:k]): # row-major flattening of the first k axes
+                index = index * n + _normalize_index(i, n).reshape(index.shape)
+            if a.flags.c_contiguous:
+                view = a.reshape((prod(a.shape[:k]),) + a.shape[k:])
+                NumPyBackend.index_add(view, index, src)
+                return a
+        elif isinstance(indices, np.ndarray) and indices.dtype.kind in 'iu':
+            return NumPyBackend.index_add(a, indices, src)
+
         np.add.at(a, indices, src)
         return a
 
     @staticmethod
     def index_add(a: NDArray, index, src, /, *, axis=0, alpha=1):
-        indexing = [slice(None)] * a.ndim
-        indexing[axis] = index
-        np.add.at(a, tuple(indexing), alpha*src)
-        return a
+        axis = a.ndim + axis if (axis < 0) else axis
+        index = np.asarray(index)
+        if alpha != 1:
+            src = alpha * src
+
+        if index.dtype.kind not in 'iu':
+            indexing = [slice(None)] * a.ndim
+            indexing[axis] = index
+            np.add.at(a, tuple(indexing), src)
+            return a
+
+        src = np.broadcast_to(src, a.shape[:axis] + index.shape + a.shape[axis+1:])
+        return _index_add(a, _normalize_index(index, a.shape[axis]), src, axis)
 
     @staticmethod
     def scatter(x, indices, val, /, *, axis=0):
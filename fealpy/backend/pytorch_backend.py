@@ -1,8 +1,9 @@
 
 from typing import Union, Optional, Tuple, Any
-from itertools import combinations_with_replacement
+from itertools import combinations_with_replacement, chain
 from functools import reduce, partial
 from math import factorial, prod
+from threading import Lock
 from scipy.spatial import KDTree
 
 try:
@@ -21,9 +22,13 @@ from .base import (
     BackendProxy, ModuleProxy,
     ATTRIBUTE_MAPPING, FUNCTION_MAPPING, TRANSFORMS_MAPPING
 )
+from .einsum_path import einsum_path_cache, einsum_key
 
 Tensor = torch.Tensor
 _device = torch.device
+# NOTE: forward-mode AD levels in torch.func are process-global, so nested
+# jacfwd transforms must not run in several threads at the same time.
+_FWD_AD_LOCK = Lock()
 
 def _dim_to_axis(func):
     def wrapper(*args, axis=None, **kwargs):
@@ -166,6 +171,36 @@ class PyTorchBackend(BackendProxy, backend_name='pytorch'):
         data = torch.diagonal(x, offset=offset, dim1=axis1, dim2=axis2)
         return torch.sum(data, dim=-1)
 
+    # NOTE: torch.einsum searches the path by opt_einsum in every call with
+    # three or more operands, and has no public argument taking a path. The
+    # cached path is passed to the kernel behind it, `torch._VF.einsum`,
+    # which is private; torch.einsum is used instead if it is missing or
+    # does not accept the path.
+    _einsum_with_path = getattr(getattr(torch, '_VF', None), 'einsum', None)
+
+    @staticmethod
+    def einsum(*args):
+        opt = torch.backends.opt_einsum
+        kernel = PyTorchBackend._einsum_with_path
+        if (kernel is None) or (len(args) < 4) or (not isinstance(args[0], str)) or \
+                (not opt.enabled) or (not opt.is_available()) or \
+                torch.overrides.has_torch_function(args[1:]):
+            return torch.einsum(*args)
+        equation, operands = args[0], args[1:]
+        strategy = opt.strategy
+        key = einsum_key('pytorch', equation, operands, strategy)
+
+        def search():
+            path = opt.get_opt_einsum().contract_path(equation, *operands, optimize=strategy)[0]
+            return list(chain.from_iterable(path))
+
+        path = einsum_path_cache.get(key, search)
+        try:
+            return kernel(equation, operands, path=path)
+        except TypeError: # the signature of the private kernel changed
+            PyTorchBackend._einsum_with_path = None
+            return torch.einsum(*args)
+
     ### Manipulation Functions ###
     # python array API standard v2023.12
     broadcast_to = staticmethod(_size_to_shape(torch.broadcast_to))
@@ -395,6 +430,16 @@ class PyTorchBackend(BackendProxy, backend_name='pytorch'):
 
         return idx
 
+    @staticmethod
+    def argpartition(x: Tensor, kth: int, /, *, axis: int = -1):
+        if x.ndim != 1:
+            # NOTE: torch has no partition, a full sort also satisfies the contract.
+            return torch.argsort(x, dim=axis)
+        value = torch.kthvalue(x, kth + 1).values
+        return torch.cat([torch.nonzero(x < value).reshape(-1),
+                          torch.nonzero(x == value).reshape(-1),
+                          torch.nonzero(x > value).reshape(-1)])
+
     ### Statistical Functions ###
     # python array API standard v2023.12
     @staticmethod
@@ -758,14 +803,16 @@ class PyTorchBackend(BackendProxy, backend_name='pytorch'):
         fn = vmap(jacfwd(
             partial(cls._simplex_shape_function_kernel, p=p, mi=mi)
         ))
-        return fn(bcs)
+        with _FWD_AD_LOCK:
+            return fn(bcs)
 
     @classmethod
     def simplex_hess_shape_function(cls, bcs: Tensor, p: int, mi=None) -> Tensor:
         fn = vmap(jacfwd(jacfwd(
             partial(cls._simplex_shape_function_kernel, p=p, mi=mi)
         )))
-        return fn(bcs)
+        with _FWD_AD_LOCK:
+            return fn(bcs)
 
     @staticmethod
     def tensor_measure(entity: Tensor, node: Tensor) -> Tensor:
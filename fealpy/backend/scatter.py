@@ -0,0 +1,75 @@
+
+from typing import Dict, Tuple
+from math import prod
+
+from . import backend_manager as bm
+from .base import TensorLike
+
+
+class ScatterPlan():
+    """Reusable scatter-add with a fixed index, e.g. the cell-to-dof map.
+
+    `bm.index_add` analyses the index in every call: flattening, wrapping the
+    negative entries, checking the bounds and (on the NumPy backend) building
+    the flat key of the output. The plan does the analysis once, so repeated
+    scatters into the same map only do the accumulation. Other backends call
+    `bm.index_add` with the stored index.
+
+    Parameters:
+        index (Tensor): Integer index of any shape.
+        size (int): Size of the output along the scatter axis.
+
+    Example:
+    ```
+        plan = ScatterPlan(cell2dof, gdof)
+        F = plan.index_add(bm.zeros((gdof, )), bF) # the same as bm.index_add(F, cell2dof, bF)
+    ```
+    """
+    def __init__(self, index: TensorLike, size: int):
+        self.shape = tuple(index.shape)
+        self.size = size
+        self.backend_name = bm.backend_name
+
+        if self.backend_name == 'numpy':
+            from .numpy_backend import _normalize_index
+            self.index = _normalize_index(index, size)
+            self._keys: Dict[Tuple[int, int], TensorLike] = {}
+        else:
+            self.index = index
+
+    def __repr__(self) -> str:
+        return f"ScatterPlan(shape={self.shape}, size={self.size})"
+
+    def index_add(self, a: TensorLike, src: TensorLike, /, *, axis: int=0, alpha=1) -> TensorLike:
+        """Add src into a along the axis at the index of the plan, in place.
+
+        Parameters:
+            a (Tensor): The output whose `a.shape[axis]` is the size of the plan.
+            src (Tensor): Values shaped (or broadcastable to)
+                `a.shape[:axis] + index.shape + a.shape[axis+1:]`.
+            axis (int, optional): The scatter axis. Defaults to 0.
+            alpha (Number, optional): Scale of the src. Defaults to 1.
+
+        Returns:
+            Tensor: The output a.
+        """
+        axis = a.ndim + axis if (axis < 0) else axis
+        if a.shape[axis] != self.size:
+            raise ValueError(f"a.shape[{axis}] ({a.shape[axis]}) does not match "
+                             f"the size of the plan ({self.size}).")
+
+        if self.backend_name != 'numpy':
+            return bm.index_add(a, self.index, src, axis=axis, alpha=alpha)
+
+        import numpy as np
+        from .numpy_backend import _scatter_key, _scatter_add_flat
+
+        lead, trail = prod(a.shape[:axis]), prod(a.shape[axis+1:])
+        key = self._keys.get((lead, trail), None)
+        if key is None:
+            key = _scatter_key(self.index, lead, self.size, trail)
+            self._keys[(lead, trail)] = key
+        if alpha != 1:
+            src = alpha * src
+        src = np.broadcast_to(src, a.shape[:axis] + self.shape + a.shape[axis+1:])
+        return _scatter_add_flat(a, key, np.reshape(src, -1))
@@ -8,12 +8,95 @@
 	@ref 
 '''  
 import numpy as np
-from scipy.sparse import diags,csr_matrix,hstack
+
+from fealpy.backend import backend_manager as bm
+from fealpy.sparse import CSRTensor
+
+
+class ParticleGridTransfer:
+    """
+    @brief 粒子与均匀网格节点之间的稀疏转移算子 (P2G/G2P)
+
+    每个粒子只与其所在单元的 2^GD 个顶点有双线性 (2D) 或三线性 (3D) 权重,
+    所以权重矩阵 S (NP, NN) 直接以 CSR 格式组装, 每行 2^GD 个非零元,
+    内存为 O(NP) 而不是 O(NP*NN). 粒子位置不变时, 算子可以在多个子步中
+    重复使用.
+
+    @param mesh: UniformMesh2d 或 UniformMesh3d
+    @param position: 粒子位置 (NP, GD), 可以之后由 update 给出
+    """
+    def __init__(self, mesh, position=None):
+        self.mesh = mesh
+        self.S = None
+        self.ST = None
+        if position is not None:
+            self.update(position)
+
+    def weights(self, position):
+        """
+        @brief 计算每个粒子的 2^GD 个顶点编号及其权重
+
+        @return index, weight: 形状都为 (NP, 2^GD)
+        """
+        mesh = self.mesh
+        NP, GD = position.shape
+        shape = (mesh.nx, mesh.ny) if GD == 2 else (mesh.nx, mesh.ny, mesh.nz)
+        location = mesh.cell_location(position)
+        device = bm.get_device(position)
+
+        index = bm.zeros((NP, 1), dtype=bm.int64, device=device)
+        weight = bm.ones((NP, 1), dtype=position.dtype, device=device)
+        for d in range(GD):
+            # 区域外的粒子归到最近的单元, 局部坐标截断到 [0, 1]
+            i = location[d]
+            i = bm.where(i < 0, 0, i)
+            i = bm.where(i > shape[d] - 1, shape[d] - 1, i)
+            xi = (position[:, d] - mesh.origin[d]) / mesh.h[d] - i
+            xi = bm.where(xi < 0., 0., xi)
+            xi = bm.where(xi > 1., 1., xi)
+            # 节点按字典序编号, 即 (i*(ny+1) + j)*(nz+1) + k
+            index = index[:, :, None] * (shape[d] + 1) + bm.stack([i, i + 1], axis=-1)[:, None, :]
+            weight = weight[:, :, None] * bm.stack([1 - xi, xi], axis=-1)[:, None, :]
+            index = index.reshape(NP, -1)
+            weight = weight.reshape(NP, -1)
+
+        return index, weight
+
+    def update(self, position):
+        """
+        @brief 由新的粒子位置重新组装转移算子
+        """
+        NP, GD = position.shape
+        index, weight = self.weights(position)
+        K = index.shape[-1]
+        crow = bm.arange(0, NP*K + 1, K, dtype=bm.int64, device=bm.get_device(position))
+        self.S = CSRTensor(crow, index.reshape(-1), weight.reshape(-1),
+                           spshape=(NP, self.mesh.number_of_nodes()))
+        self.ST = self.S.T
+        return self
+
+    def p2g(self, value):
+        """
+        @brief 粒子到网格节点: sum_p S_pv value_p
+
+        @param value: 粒子上的量, 形状为 (NP, ...)
+        """
+        return self.ST.matmul(value)
+
+    def g2p(self, value):
+        """
+        @brief 网格节点到粒子: sum_v S_pv value_v
+
+        @param value: 网格节点上的量, 形状为 (NN, ...)
+        """
+        return self.S.matmul(value)
+
 
 class NSFlipSolver:
     def __init__(self, particles, mesh):
         self.mesh = mesh
         self.particles = particles
+        self.transfer = ParticleGridTransfer(mesh)
     
     def e(self, position):
         i,j = self.mesh.cell_location(position)
@@ -30,69 +113,38 @@ class NSFlipSolver:
         result =  i * nx + j 
         return result
 
-    def bilinear(self,position):
-        i0,j0 = self.mesh.cell_location(position)
-        e = self.e(position)
-        epsilon = e[:,0]
-        eta = e[:,1]
-        num_p = len(e)
-        num_v = (self.mesh.ds.nx + 1)*(self.mesh.ds.ny + 1)
-        distance0 = np.zeros((num_p,num_v))
-        distance1 = np.zeros((num_p,num_v))
-        for i in range(num_p):
-            distance0[i] = abs(i0-epsilon[i])
-            distance1[i] = abs(j0-eta[i])
-        distance = np.stack((distance0, distance1), axis=-1)
-        result = np.where(np.all(distance < 0.5, axis=-1), 1, 0)
-        result = csr_matrix(result)
-        return result
-
-    def bilinear(self,position,vertex):
-        i0,j0 = self.mesh.cell_location(vertex)
-        e = self.e(position)
-        epsilon = e[:,0]
-        eta = e[:,1]
-        num_p = len(e)
-        num_v = (self.mesh.ds.nx + 1)*(self.mesh.ds.ny + 1)
-        distance0 = np.zeros((num_p,num_v))
-        distance1 = np.zeros((num_p,num_v))
-        for i in range(num_p):
-            distance0[i] = abs(i0-epsilon[i])
-            distance1[i] = abs(j0-eta[i])
-        distance = np.stack((distance0, distance1), axis=-1)
-        result = np.where(np.all(distance <= 1, axis=-1), (1-distance0)*(1-distance1), 0)
-        result = csr_matrix(result)
-        return result
+    def bilinear(self, position):
+        """
+        @brief 粒子与网格顶点之间的双线性插值权重, CSR 格式 (NP, NN)
+        """
+        return self.transfer.update(position).S
     
     def P2G_center(self, particles):
         m_p = particles["mass"]
         e_p = particles["internal_energy"]
-        position = self.particles["position"]
-        cell_center = self.mesh.cell_center()
-        Vc = self.mesh.cell_area()
-        num_p = len(position[:,0])
-        num_c = len(cell_center[:,0])
-        distance = np.zeros_like(position)
-        S_pc = np.zeros((num_p,num_c)) #求插值函数S_pc
-        for i in range(num_p):
-            S_pc[i,index[i]] = 1
-        rho_c = m_p@S_pc/Vc
-        I_c = (e_p@S_pc)/(rho_c*Vc)
-        print(rho_c)
-        print(I_c) #为什么有些会出现nan?
-        return rho_c,I_c
-
-    def P2G_vertex(self,particles):
+        position = particles["position"]
+        Vc = self.mesh.entity_measure('cell')
+        i, j = self.mesh.cell_location(position)
+        index = i * self.mesh.ny + j
+        NC = self.mesh.number_of_cells()
+        rho_c = bm.bincount(index, weights=m_p, minlength=NC)/Vc
+        I_c = bm.bincount(index, weights=e_p, minlength=NC)/(rho_c*Vc)
+        return rho_c, I_c
+
+    def P2G_vertex(self, particles):
         m_p = particles["mass"] #粒子质量
         v_p = particles["velocity"] #粒子速度
-        num_v = (self.mesh.ds.nx + 1)*(self.mesh.ds.ny + 1)
-        vertex = self.mesh.node.reshape(num_v,2)
-        S_pv = self.bilinear(particles["position"],vertex)
-        M_v = m_p@S_pv
-        m_p = m_p[:,np.newaxis]
-        U_v = ((m_p*v_p).T@S_pv/M_v).T 
+        transfer = self.transfer.update(particles["position"])
+        M_v = transfer.p2g(m_p)
+        U_v = transfer.p2g(m_p[:, None]*v_p)/M_v[:, None]
         return M_v, U_v
 
+    def G2P_vertex(self, U_v):
+        """
+        @brief 把网格顶点上的速度插值回粒子, 重用 P2G_vertex 中组装的算子
+        """
+        return self.transfer.g2p(U_v)
+
     def pressure(self,rho_c,I_c,R,Cv):
         return (rho_c*R*I_c)/Cv
 
@@ -1,9 +1,5 @@
 from fealpy.backend import backend_manager as bm
-from scipy.spatial import cKDTree
-
-import jax.numpy as jnp
-from jax_md import space, partition
-from jax import vmap, lax
+from fealpy.mesh.neighbor_search import cell_list_search
 
 class Neighbor:
     def __init__(self, mesh):
@@ -14,6 +10,7 @@ class Neighbor:
 
 
     def find_neighbors_backend(self, state, h):
+        from scipy.spatial import cKDTree
         tree = cKDTree(state["position"])
         neighbors = tree.query_ball_tree(tree, h)
         n_long = bm.array([len(sublist) for sublist in neighbors])
@@ -31,6 +28,9 @@ class Neighbor:
 
         note : Currently using jax's own jax_md, vmap, lax
         '''
+        import jax.numpy as jnp
+        from jax_md import space, partition
+        from jax import vmap, lax
         displacement, shift = space.periodic(box_size)
         neighbor_fn = partition.neighbor_list(displacement, box_size, h)
 
@@ -46,3 +46,13 @@ class Neighbor:
 
         return index, indptr
 
+    def find_neighbors_cell_list(self, h, box_size=None, periodic=False, include_self=True):
+        '''
+        @brief Find neighbor particles within the smoothing radius by a cell list.
+
+        note : Works on all backends, and returns the neighbors in CSR format
+               (indptr, indices), the neighbors of particle i are
+               indices[indptr[i]:indptr[i+1]].
+        '''
+        return cell_list_search(self.mesh.node, h, box_size=box_size,
+                                periodic=periodic, include_self=include_self)
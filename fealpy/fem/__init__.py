@@ -7,6 +7,7 @@ from .linear_form import LinearForm
 from .nonlinear_form import NonlinearForm
 from .block_form import BlockForm
 from .linear_block_form import LinearBlockForm
+from .adaptive import AdaptiveBilinearForm, AdaptiveDriver, RefinementDelta
 
 ### Cell Operator
 from .scalar_diffusion_integrator import ScalarDiffusionIntegrator
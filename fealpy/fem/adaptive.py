@@ -0,0 +1,161 @@
+
+from typing import NamedTuple, Optional, List, Any
+
+from .. import logger
+from ..typing import TensorLike
+from ..backend import backend_manager as bm
+from ..sparse import CSRTensor
+from .bilinear_form import BilinearForm
+from .integrator import Integrator, GroupIntegrator, CellInt
+
+
+class RefinementDelta(NamedTuple):
+    """Changes of a mesh made by a local refinement.
+
+    Attributes:
+        isKeptCell (Tensor): Bool tensor shaped (NC0,) of the old cells. Rows
+            of the kept cells are unchanged, and the other old cells are
+            overwritten by one of their children.
+        HB (Tensor): Index of the parent (old) cell of every new cell, shaped (NC,).
+        IM (CSRTensor): Interpolation matrix of the nodal values, shaped (NN, NN0).
+    """
+    isKeptCell: TensorLike
+    HB: TensorLike
+    IM: CSRTensor
+
+    @property
+    def changed_cells(self) -> TensorLike:
+        """Indices of the changed and the new cells, in ascending order."""
+        NC0 = self.isKeptCell.shape[0]
+        NC = self.HB.shape[0]
+        device = bm.get_device(self.HB)
+        isNewCell = bm.ones((NC - NC0,), dtype=bm.bool, device=device)
+        return bm.nonzero(bm.concat([~self.isKeptCell, isNewCell]))[0]
+
+
+def _clear_integrator(integrator: Integrator):
+    integrator.clear()
+    if isinstance(integrator, GroupIntegrator):
+        for sub in integrator:
+            sub.clear()
+
+
+class AdaptiveBilinearForm(BilinearForm):
+    """Bilinear form keeping the local matrices of all cells, updated only on
+    the changed cells after a local refinement.
+
+    Only cell integrators on the whole mesh are supported, so that the local
+    matrices are indexed by cells.
+    """
+    _cell_local = None
+
+    def _add_integrator_impl(self, I, group=None, splitter=None):
+        if not isinstance(I, CellInt) and not (
+            isinstance(I, GroupIntegrator) and all(isinstance(i, CellInt) for i in I)
+        ):
+            raise TypeError("AdaptiveBilinearForm only supports cell integrators, "
+                            f"but got {I.__class__.__name__}.")
+        if I.get_region() is not None:
+            raise ValueError("Integrators of AdaptiveBilinearForm can not have a region.")
+        if splitter is not None:
+            raise ValueError("AdaptiveBilinearForm does not support splitters.")
+        self._cell_local = None
+        return super()._add_integrator_impl(I, group, splitter)
+
+    def assembly_local_iterative(self):
+        """Yield the kept local matrices, computing them in the first call."""
+        if self._cell_local is None:
+            self._cell_local = {}
+
+        for key, integrator in self.integrators.items():
+            if key in self._cell_local:
+                etg = integrator.to_global_dof(self.space)
+                if not isinstance(etg, (tuple, list)):
+                    etg = (etg, )
+                yield self._cell_local[key], etg
+            else:
+                value, etg = self._assembly_kernel(key)
+                self._cell_local[key] = value
+                yield value, etg
+
+    def update(self, delta: RefinementDelta):
+        """Update the local matrices after the mesh is refined.
+
+        Local matrices of the kept cells are reused, and those of the changed
+        and the new cells are computed again.
+        """
+        self._M = None
+        self._pattern = None
+        self._local = None
+        self.sparse_shape = self._get_sparse_shape()
+        for integrator in self.integrators.values():
+            _clear_integrator(integrator)
+        if self._cell_local is None:
+            return
+
+        changed = delta.changed_cells
+        NC = delta.HB.shape[0]
+        for key, local in self._cell_local.items():
+            value = self.integrators[key](self.space, indices=changed)
+            shape = local.shape[:-3] + (NC - local.shape[-3], ) + local.shape[-2:]
+            local = bm.concat([local, bm.zeros(shape, dtype=local.dtype,
+                                               device=bm.get_device(local))], axis=-3)
+            self._cell_local[key] = bm.set_at(local, (..., changed, slice(None), slice(None)), value)
+        logger.info(f"Local matrices of {changed.shape[0]} cells updated.")
+
+
+class AdaptiveDriver():
+    """Local refinement of a mesh, with the changes propagated to the
+    dependent objects instead of setting them up again.
+
+    The topology of the mesh is patched around the refined cells, so the
+    faces and edges of the kept cells keep their numbers. Dependent objects
+    are notified by their `update(delta)` method with a `RefinementDelta`,
+    e.g. `AdaptiveBilinearForm`.
+
+    Parameters:
+        mesh (Mesh): The mesh, supporting `bisect` with the `construct` option.
+        *dependents: Objects to be updated after every refinement.
+
+    Examples:
+        >>> driver = AdaptiveDriver(mesh, bform)
+        >>> isMarkedCell = driver.mark(eta, theta=0.3)
+        >>> delta = driver.refine(isMarkedCell)
+        >>> uh = delta.IM @ uh # for linear Lagrange functions
+    """
+    def __init__(self, mesh, *dependents) -> None:
+        self.mesh = mesh
+        self.dependents: List[Any] = list(dependents)
+
+    def add(self, *dependents):
+        """Add objects to be updated after every refinement."""
+        self.dependents.extend(dependents)
+        return self
+
+    def mark(self, eta: TensorLike, theta: float, method: str='L2') -> TensorLike:
+        """Mark cells by the error indicators. See `Mesh.mark`."""
+        return self.mesh.mark(eta, theta, method=method)
+
+    def refine(self, isMarkedCell: Optional[TensorLike]=None) -> RefinementDelta:
+        """Bisect the marked cells and update the dependent objects.
+
+        Parameters:
+            isMarkedCell (Tensor | None, optional): Bool tensor of the cells to
+                refine. Refine all cells if None. Defaults to None.
+
+        Returns:
+            RefinementDelta: The changes of the mesh.
+        """
+        mesh = self.mesh
+        NC = mesh.number_of_cells()
+        options = mesh.bisect_options(HB=True, IM=True, disp=False, construct=False)
+        mesh.bisect(isMarkedCell, options=options)
+
+        HB = options['HB']
+        isKeptCell = bm.bincount(HB, minlength=NC)[:NC] == 1
+        mesh.construct(isKeptCell)
+        delta = RefinementDelta(isKeptCell, HB, options['IM'])
+
+        for obj in self.dependents:
+            obj.update(delta)
+        return delta
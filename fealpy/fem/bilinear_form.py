@@ -4,13 +4,17 @@ from typing import Optional, Literal, overload
 from .. import logger
 from ..typing import TensorLike
 from ..backend import backend_manager as bm
-from ..sparse import COOTensor, CSRTensor
+from ..sparse import COOTensor, CSRTensor, COOBuilder, SparsityPattern
 from .form import Form
 from .integrator import LinearInt
 
 
 class BilinearForm(Form[LinearInt]):
     _M = None
+    _keep_pattern = False
+    _pattern: Optional[SparsityPattern] = None
+    _keep_local = False
+    _local = None
 
     def _get_sparse_shape(self):
         spaces = self._spaces
@@ -43,36 +47,80 @@ class BilinearForm(Form[LinearInt]):
                 raise ValueError("Spaces should have the same dtype, "
                                 f"but got {s0.ftype} and {s1.ftype}.")
 
+    def keep_pattern(self, status_on=True, /):
+        """Set whether to keep the sparsity pattern of the global matrix.
+
+        When on, the CSR pattern and the map from local entries to CSR slots
+        are built in the first CSR assembly. Later assemblies only scatter-add
+        the new local tensors into the CSR values, without building indices
+        and sorting them again. The pattern is rebuilt if the number of local
+        entries, the shape of the form or the local-to-global dof maps change,
+        e.g. after a remeshing or a renumbering keeping the sizes.
+        """
+        self._keep_pattern = status_on
+        if not status_on:
+            self._pattern = None
+        return self
+
+    @staticmethod
+    def _local_indices(ue2dof: TensorLike, ve2dof: TensorLike, local_shape):
+        I = bm.broadcast_to(ve2dof[:, :, None], local_shape)
+        J = bm.broadcast_to(ue2dof[:, None, :], local_shape)
+        return bm.stack([I.ravel(), J.ravel()], axis=0)
+
+    def _local_values(self, group_tensor: TensorLike):
+        if (self.batch_size > 0) and (group_tensor.ndim == 3): # Case: no batch dimension
+            group_tensor = bm.stack([group_tensor]*self.batch_size, axis=0)
+        return bm.reshape(group_tensor, self._values_ravel_shape)
+
     def _scalar_assembly(self):
         self.check_space()
         space = self._spaces
         batch_size = self.batch_size
         ugdof = space[0].number_of_global_dofs()
         vgdof = space[1].number_of_global_dofs() if (len(space) > 1) else ugdof
-        init_value_shape = (0,) if (batch_size == 0) else (batch_size, 0)
+        dense_shape = () if (batch_size == 0) else (batch_size,)
         sparse_shape = (vgdof, ugdof)
 
-        M = COOTensor(
-            indices = bm.empty((2, 0), dtype=space[0].itype, device=bm.get_device(space[0])),
-            values = bm.empty(init_value_shape, dtype=space[0].ftype, device=bm.get_device(space[0])),
-            spshape = sparse_shape
-        )
-        # for group in self.integrators.keys():
-            # group_tensor, e2dofs = self._assembly_group(group, retain_ints)
+        builder = COOBuilder(sparse_shape, dense_shape, itype=space[0].itype,
+                             ftype=space[0].ftype, device=bm.get_device(space[0]))
+
         for group_tensor, e2dofs_tuple in self.assembly_local_iterative():
             ue2dof = e2dofs_tuple[0]
             ve2dof = e2dofs_tuple[1] if (len(e2dofs_tuple) > 1) else ue2dof
             local_shape = group_tensor.shape[-3:] # (NC, vldof, uldof)
+            indices = self._local_indices(ue2dof, ve2dof, local_shape)
+            builder.append(indices, self._local_values(group_tensor))
+
+        return builder.build()
+
+    def _pattern_assembly(self, transposed=False) -> CSRTensor:
+        """Assemble the CSR matrix through the kept sparsity pattern."""
+        self.check_space()
+        sparse_shape = self._get_sparse_shape()
+        if transposed:
+            sparse_shape = tuple(reversed(sparse_shape))
+        values_list = []
+        e2dofs_list = []
+
+        for group_tensor, e2dofs_tuple in self.assembly_local_iterative():
+            ue2dof = e2dofs_tuple[0]
+            ve2dof = e2dofs_tuple[1] if (len(e2dofs_tuple) > 1) else ue2dof
+            e2dofs_list.append((ue2dof, ve2dof, group_tensor.shape[-3:]))
+            values_list.append(self._local_values(group_tensor))
 
-            if (batch_size > 0) and (group_tensor.ndim == 3): # Case: no batch dimension
-                group_tensor = bm.stack([group_tensor]*batch_size, axis=0)
-            I = bm.broadcast_to(ve2dof[:, :, None], local_shape)
-            J = bm.broadcast_to(ue2dof[:, None, :], local_shape)
-            indices = bm.stack([I.ravel(), J.ravel()], axis=0)
-            group_tensor = bm.reshape(group_tensor, self._values_ravel_shape)
-            M = M.add(COOTensor(indices, group_tensor, sparse_shape))
+        values = bm.concat(values_list, axis=-1)
+        sources = [e2dof for args in e2dofs_list for e2dof in args[:2]]
 
-        return M
+        if (self._pattern is None) or \
+                (not self._pattern.match(values.shape[-1], sparse_shape, sources)):
+            logger.info("Building the sparsity pattern of the bilinear form.")
+            indices = bm.concat([self._local_indices(*args) for args in e2dofs_list], axis=1)
+            if transposed:
+                indices = bm.flip(indices, axis=0)
+            self._pattern = SparsityPattern(indices, sparse_shape, sources=sources)
+
+        return self._pattern.tocsr(values)
 
     @overload
     def assembly(self) -> CSRTensor: ...
@@ -90,8 +138,15 @@ class BilinearForm(Form[LinearInt]):
         Returns:
             global_matrix (CSRTensor | COOTensor): Global sparse matrix shaped ([batch, ]gdof, gdof).
         """
+        transposed = getattr(self, '_transposed', False)
+
+        if self._keep_pattern and (format == 'csr'):
+            self._M = self._pattern_assembly(transposed)
+            logger.info(f"Bilinear form matrix constructed, with shape {list(self._M.shape)}.")
+            return self._M
+
         M = self._scalar_assembly()
-        if getattr(self, '_transposed', False):
+        if transposed:
             M = M.T
 
         if format == 'csr':
@@ -104,58 +159,93 @@ class BilinearForm(Form[LinearInt]):
 
         return self._M
 
+    def keep_local(self, status_on=True, /):
+        """Set whether to keep the local tensors for the matrix-free product.
+
+        When on, local tensors of all groups and chunks are computed in the
+        first matrix-free product and reused afterwards. When off, they are
+        recomputed chunk by chunk (see `splitter` in `add_integrator`) in
+        every product, so that only one chunk lives in memory at a time.
+        """
+        self._keep_local = status_on
+        if not status_on:
+            self._local = None
+        return self
+
+    def _local_iterative(self):
+        """Yield local tensors and (ue2dof, ve2dof) pairs, from the kept
+        local tensors if available."""
+        if self._local is not None:
+            yield from self._local
+            return
+
+        kept = [] if self._keep_local else None
+
+        for group_tensor, e2dofs_tuple in self.assembly_local_iterative():
+            ue2dof = e2dofs_tuple[0]
+            ve2dof = e2dofs_tuple[1] if (len(e2dofs_tuple) > 1) else ue2dof
+            if kept is not None:
+                kept.append((group_tensor, ue2dof, ve2dof))
+            yield group_tensor, ue2dof, ve2dof
+
+        if kept is not None:
+            self._local = kept
+
     def mult(self, x: TensorLike, out: Optional[TensorLike]=None) -> TensorLike:
-        """Maxtrix vector multiplication.
+        """Maxtrix vector multiplication without assembling the global matrix.
+        This gathers `x` to entities, applies the local tensors and scatters
+        the results back to global DoFs.
 
         Parameters:
-            x (TensorLike): Vector, accepts batch on the first dimension.\n
-            out (TensorLike, optional): Output vector. Defaults to None.
+            x (TensorLike): Vector shaped (N,), or matrix shaped (..., N, K).\n
+            out (TensorLike, optional): Output to accumulate the result in. Defaults to None.
 
         Returns:
-            TensorLike: self @ x
+            TensorLike: self @ x, shaped ([batch, ]M) or ([batch, ]..., M, K).
         """
-        raise NotImplementedError
+        transposed = getattr(self, '_transposed', False)
+        sparse_shape = self._get_sparse_shape()
+        nrow = sparse_shape[1] if transposed else sparse_shape[0]
+
+        # NOTE: i for the test space and j for the trial space;
+        # the roles exchange when transposed.
+        in_subs, out_subs = ('ci', 'cj') if transposed else ('cj', 'ci')
+
+        if x.ndim == 1:
+            subs = f'...cij, {in_subs} -> ...{out_subs}'
+        else:
+            subs = f'...cij, ...{in_subs}k -> ...{out_subs}k'
+
+        v = out
+
+        for group_tensor, ue2dof, ve2dof in self._local_iterative():
+            in_e2dof, out_e2dof = (ve2dof, ue2dof) if transposed else (ue2dof, ve2dof)
+
+            if x.ndim == 1:
+                gv = bm.einsum(subs, group_tensor, x[in_e2dof]) # (..., NC, ldof)
+                gv = bm.reshape(gv, gv.shape[:-2] + (-1,))
+                shape = gv.shape[:-1] + (nrow,)
+                axis = -1
+            else:
+                gv = bm.einsum(subs, group_tensor, x[..., in_e2dof, :]) # (..., NC, ldof, K)
+                gv = bm.reshape(gv, gv.shape[:-3] + (-1, gv.shape[-1]))
+                shape = gv.shape[:-2] + (nrow, gv.shape[-1])
+                axis = -2
+
+            if v is None:
+                v = bm.zeros(shape, **bm.context(gv))
+            v = bm.index_add(v, out_e2dof.reshape(-1), gv, axis=axis)
+
+        return v
 
     @property
     def T(self):
         transposed = self.copy()
         transposed._transposed = True
-        transposed._M = self._M
+        transposed._M = None if (self._M is None) else self._M.T
         return transposed
 
     def __matmul__(self, u: TensorLike):
         if self._M is not None:
             return self._M @ u
-
-        nrow = self.shape[-2]
-        kwargs = bm.context(u)
-
-        if self.batch_size > 0:
-            shape = (self.batch_size, nrow)
-            out_subs = 'bci'
-            gv_reshape = (self.batch_size, -1)
-        else:
-            if u.ndim >= 2:
-                shape = (u.shape[0], nrow)
-                out_subs = 'bci'
-                gv_reshape = (u.shape[0], -1)
-            else:
-                shape = (nrow,)
-                out_subs = 'ci'
-                gv_reshape = (-1,)
-
-        v = bm.zeros(shape, **kwargs)
-        gt_subs = 'bcij' if (self.batch_size > 0) else 'cij'
-        gu_subs = 'bcj' if (u.ndim >= 2) else 'cj'
-
-        for group in self.integrators.keys():
-            group_tensor, e2dofs = self._assembly_group(group, True)
-            ue2dof = e2dofs[0]
-            ve2dof = e2dofs[1] if (len(e2dofs) > 1) else ue2dof
-            gu = u[..., ue2dof] # (..., NC, uldof)
-            gv = bm.einsum(f'{gt_subs}, {gu_subs} -> {out_subs}', group_tensor, gu)
-            v = bm.index_add(v, ve2dof.reshape(-1), gv.reshape(gv_reshape))
-
-        return v
-
-
+        return self.mult(u)
@@ -3,9 +3,8 @@ from typing import List
 from .. import logger
 from ..typing import Size, TensorLike
 from ..backend import backend_manager as bm
-from ..sparse import COOTensor, CSRTensor
+from ..sparse import COOTensor, CSRTensor, COOBuilder
 from .form import Form
-from ..sparse import COOTensor, CSRTensor
 
 class BlockForm(Form):
     _M = None
@@ -30,31 +29,28 @@ class BlockForm(Form):
         return self.sparse_shape
 
     def assembly(self, format='csr'):
-        a = bm.max(self.block_shape[...,0], axis=1)
-        row_offset = bm.cumsum(bm.max(self.block_shape[...,0],axis = 1), axis=0)
-        col_offset = bm.cumsum(bm.max(self.block_shape[...,1],axis = 0), axis=0)
-        row_offset = bm.concatenate((bm.array([0]),row_offset))
-        col_offset = bm.concatenate((bm.array([0]),col_offset))
-         
-        for j in range(self.ncols):
-            block = self.blocks[0][j]
-            if block is not None:
-                indices = bm.empty((2, 0), dtype=block.space.mesh.itype)
-                values = bm.empty((0,), dtype=block.space.mesh.ftype)
-                break
-        sparse_shape = self.shape
-        
+        row_offset, col_offset = self._offsets()
+        builder = None
+
         for i in range(self.nrows):
             for j in range(self.ncols):
                 block = self.blocks[i][j]
                 if block is None:
                     continue
                 block_matrix = block.assembly(format='coo')
-                block_indices = block_matrix.indices + bm.array([[row_offset[i]], [col_offset[j]]])
-                block_values = block_matrix.values 
-                indices = bm.concatenate((indices, block_indices), axis=1)
-                values = bm.concatenate((values, block_values))
-        M = COOTensor(indices, values, sparse_shape) 
+                block_indices = block_matrix.indices
+                if builder is None:
+                    builder = COOBuilder((row_offset[-1], col_offset[-1]),
+                                         block_matrix.dense_shape,
+                                         itype=block_matrix.itype,
+                                         ftype=block_matrix.ftype,
+                                         device=bm.get_device(block_indices))
+                offset = bm.tensor([[row_offset[i]], [col_offset[j]]], **bm.context(block_indices))
+                builder.append(block_indices + offset, block_matrix.values)
+
+        if builder is None:
+            raise ValueError("All blocks of the block form are None.")
+        M = builder.build()
         if format == 'csr':
             self._M = M.coalesce().tocsr()
         elif format == 'coo':
@@ -65,27 +61,40 @@ class BlockForm(Form):
         return self._M
     
     
+    def _offsets(self):
+        """Return the row and column offsets of blocks as lists of int."""
+        row_size = bm.tolist(bm.max(self.block_shape[..., 0], axis=1))
+        col_size = bm.tolist(bm.max(self.block_shape[..., 1], axis=0))
+        row_offset, col_offset = [0], [0]
+        for size in row_size:
+            row_offset.append(row_offset[-1] + size)
+        for size in col_size:
+            col_offset.append(col_offset[-1] + size)
+        return row_offset, col_offset
+
     def __matmul__(self, u: TensorLike):
         if self._M is not None:
             return self._M @ u
-        
-        # u的不同ndim情况
-        kwargs = bm.context(u)
-        v = bm.zeros_like(u, **kwargs)
 
-        row_offset = bm.cumsum(bm.max(self.block_shape[...,0],axis = 1), axis=0)
-        col_offset = bm.cumsum(bm.max(self.block_shape[...,1],axis = 0), axis=0)
-        row_offset = bm.concatenate((bm.array([0]),row_offset))
-        col_offset = bm.concatenate((bm.array([0]),col_offset))
+        # NOTE: Blocks without assembled matrices use their matrix-free products.
+        row_offset, col_offset = self._offsets()
+        v_list = []
+
         for i in range(self.nrows):
+            vi = None
             for j in range(self.ncols):
                 block = self.blocks[i][j]
                 if block is None:
                     continue
-                v = bm.index_add(v, bm.arange(row_offset[i],row_offset[i+1]), 
-                                 block @ u[row_offset[j]:row_offset[j+1]] )
-                #v[row_offset[i]:row_offset[i+1]] += block @ u[row_offset[j]:row_offset[j+1]] 
-        return v
+                r = block @ u[col_offset[j]:col_offset[j+1]]
+                vi = r if (vi is None) else vi + r
+
+            if vi is None:
+                shape = (row_offset[i+1] - row_offset[i],) + tuple(u.shape[1:])
+                vi = bm.zeros(shape, **bm.context(u))
+            v_list.append(vi)
+
+        return bm.concat(v_list, axis=0)
 
 
 Form.register(BlockForm)
@@ -1,6 +1,7 @@
 
 from typing import Optional, Tuple, Callable, Union, TypeVar
 
+from .. import logger
 from ..backend import backend_manager as bm
 from ..typing import TensorLike
 from ..sparse import SparseTensor, COOTensor, CSRTensor, spdiags
@@ -120,9 +121,42 @@ class DirichletBC():
         A = self.apply_matrix(A, check=check)
         return A, f
 
+    @property
+    def interior_dof_index(self) -> TensorLike:
+        """Indices of DoFs not on the Dirichlet boundary."""
+        if getattr(self, '_interior_dof_index', None) is None:
+            self._interior_dof_index = bm.nonzero(bm.logical_not(self.is_boundary_dof))[0]
+        return self._interior_dof_index
+
+    @staticmethod
+    def _matrix_row_col(matrix: SparseTensor):
+        if isinstance(matrix, COOTensor):
+            return matrix.indices[0], matrix.indices[1]
+        return matrix.row, matrix.col
+
+    def _pattern_cache(self, name: str, matrix: SparseTensor, func: Callable):
+        # NOTE: Data derived from the sparsity pattern is kept for the last
+        # pattern seen, which is identified by its index tensor. Matrices
+        # assembled again with a kept pattern reuse it.
+        key = matrix.indices if isinstance(matrix, COOTensor) else matrix.col
+        cache = self.__dict__.setdefault('_pattern_data', {})
+
+        if (name in cache) and (cache[name][0] is key):
+            return cache[name][1]
+
+        data = func(*self._matrix_row_col(matrix))
+        cache[name] = (key, data)
+        return data
+
     def apply_matrix(self, matrix: _ST, *, check=True) -> _ST:
         """Apply Dirichlet boundary condition to left-hand-size matrix only.
 
+        Values in rows and columns of boundary DoFs are set to zero and the
+        diagonal of them is set to one, keeping the sparsity pattern of the
+        matrix. The masks over non-zero elements are computed once for each
+        sparsity pattern. If any diagonal entry of a boundary DoF is missing
+        in the pattern, the matrix is built by sparse products instead.
+
         Parameters:
             matrix (SparseTensor): The original left-hand-size sparse matrix\
                 of the linear system.
@@ -132,15 +166,124 @@ class DirichletBC():
             SparseTensor: New adjusted left-hand-size matrix.
         """
         A = self.check_matrix(matrix) if check else matrix
+        if isinstance(A, COOTensor):
+            A = A.coalesce()
+        isDDof = self.is_boundary_dof
+
+        def masks(row, col):
+            bd_row = isDDof[row]
+            zero_mask = bd_row | isDDof[col]
+            diag_index = bm.nonzero(bd_row & (row == col))[0]
+            return zero_mask, diag_index
+
+        zero_mask, diag_index = self._pattern_cache('apply', A, masks)
+
+        if diag_index.shape[0] != self.boundary_dof_index.shape[0]:
+            logger.info("Diagonal entries of some boundary DoFs are not in the "
+                        "sparsity pattern, fall back to sparse products.")
+            return self._apply_matrix_spmm(A)
+
+        values = bm.where(zero_mask, bm.zeros_like(A.values), A.values)
+        values = bm.set_at(values, (..., diag_index), 1.)
+
+        if isinstance(A, COOTensor):
+            return COOTensor(A.indices, values, A.sparse_shape, is_coalesced=True)
+        return CSRTensor(A.crow, A.col, values, A.sparse_shape)
+
+    def _apply_matrix_spmm(self, A: _ST) -> _ST:
+        if isinstance(A, COOTensor): # spdiags gives CSR matrices
+            return self._apply_matrix_spmm(A.tocsr()).tocoo()
         isDDof = self.is_boundary_dof
         kwargs = A.values_context()
         bdIdx = bm.zeros(A.shape[0], **kwargs)
-        bdIdx[isDDof.reshape(-1)] = 1
+        bdIdx = bm.set_at(bdIdx, isDDof.reshape(-1), 1)
         D0 = spdiags(1-bdIdx, 0, A.shape[0], A.shape[0])
         D1 = spdiags(bdIdx, 0, A.shape[0], A.shape[0])
         A = D0@A@D0 + D1
         return A
 
+    def reduce_matrix(self, matrix: _ST, *, check=True) -> _ST:
+        """Remove rows and columns of boundary DoFs from the matrix.
+
+        Parameters:
+            matrix (SparseTensor): The original left-hand-size sparse matrix.
+            check (bool, optional): Whether to check the matrix. Defaults to True.
+
+        Returns:
+            SparseTensor: The interior block of the matrix, in the same format\
+                and shaped (NI, NI) where NI is the number of interior DoFs.
+        """
+        A = self.check_matrix(matrix) if check else matrix
+        interior = self.interior_dof_index
+        NI = interior.shape[0]
+        isIDof = bm.logical_not(self.is_boundary_dof)
+
+        def structure(row, col):
+            kwargs = bm.context(col)
+            g2i = bm.zeros((A.shape[0],), **kwargs)
+            g2i = bm.set_at(g2i, interior, bm.arange(NI, **kwargs))
+            keep = bm.nonzero(isIDof[row] & isIDof[col])[0]
+            new_row = g2i[row[keep]]
+            new_col = g2i[col[keep]]
+            if isinstance(A, COOTensor):
+                return keep, bm.stack([new_row, new_col], axis=0)
+            count = bm.bincount(new_row, minlength=NI)
+            crow = bm.concat([bm.zeros((1,), **kwargs),
+                              bm.astype(bm.cumsum(count, axis=0), col.dtype)], axis=0)
+            return keep, (crow, new_col)
+
+        keep, new_structure = self._pattern_cache('reduce', A, structure)
+        values = A.values[..., keep]
+
+        if isinstance(A, COOTensor):
+            return COOTensor(new_structure, values, (NI, NI), is_coalesced=A.is_coalesced)
+        return CSRTensor(*new_structure, values, (NI, NI))
+
+    def restrict(self, vector: TensorLike, /) -> TensorLike:
+        """Restrict a global vector to the interior DoFs."""
+        return vector[self.interior_dof_index]
+
+    def lift(self, vector: TensorLike, /, uh: Optional[TensorLike]=None) -> TensorLike:
+        """Extend a vector on interior DoFs to all DoFs.
+
+        Parameters:
+            vector (Tensor): Values on the interior DoFs, shaped (NI, ...).
+            uh (Tensor | None, optional): Global tensor holding the boundary values,\
+                which is filled **in-place**. Use zeros on the boundary if None.\
+                Defaults to None.
+
+        Returns:
+            Tensor: The global tensor shaped (gdof, ...).
+        """
+        if uh is None:
+            shape = (self.is_boundary_dof.shape[0],) + tuple(vector.shape[1:])
+            uh = bm.zeros(shape, **bm.context(vector))
+        return bm.set_at(uh, self.interior_dof_index, vector)
+
+    def apply_reduced(self, A: SparseTensor, f: TensorLike, uh: Optional[TensorLike]=None,
+                      gd: Optional[CoefLike]=None, *,
+                      check=True) -> Tuple[SparseTensor, TensorLike, TensorLike]:
+        """Eliminate the Dirichlet boundary DoFs from the linear system.
+
+        Parameters:
+            A (SparseTensor): Left-hand-size sparse matrix.
+            f (Tensor): Right-hand-size vector.
+            uh (Tensor | None, optional): See `DirichletBC.apply()`.
+            gd (CoefLike | None, optional): See `DirichletBC.apply()`.
+            check (bool, optional): Whether to check the inputs. Defaults to True.
+
+        Returns:
+            out (SparseTensor, Tensor, Tensor): The interior system `A_II` and\
+                `f_I - A_IB g_B`, and the global `uh` with the boundary values.\
+                Use `lift(x, uh)` to get the global solution from the solution\
+                `x` of the interior system.
+        """
+        A = self.check_matrix(A) if check else A
+        f = self.check_vector(f) if check else f
+        uh = self._boundary_interpolate(f, uh, gd)
+        f = f - A.matmul(uh[:])
+        return self.reduce_matrix(A, check=False), self.restrict(f), uh
+
     def apply_vector(self, vector: TensorLike, matrix: SparseTensor,
                      uh: Optional[TensorLike]=None,
                      gd: Optional[CoefLike]=None, *, check=True) -> TensorLike:
@@ -163,6 +306,14 @@ class DirichletBC():
         """
         A = self.check_matrix(matrix) if check else matrix
         f = self.check_vector(vector) if check else vector
+        uh = self._boundary_interpolate(f, uh, gd)
+        bd_idx = self.boundary_dof_index
+        f = f - A.matmul(uh[:])
+        f = bm.set_at(f, bd_idx, uh[bd_idx])
+        return f
+
+    def _boundary_interpolate(self, f: TensorLike, uh: Optional[TensorLike]=None,
+                              gd: Optional[CoefLike]=None) -> TensorLike:
         gd = self.gd if gd is None else gd
         
 
@@ -187,10 +338,7 @@ class DirichletBC():
                 uh = bm.zeros_like(f)
             uh, _ = self.space.boundary_interpolate(gd=gd,uh=uh,
                                                 threshold=self.threshold, method=self.method)
-        bd_idx = self.boundary_dof_index
-        f = f - A.matmul(uh[:])
-        f = bm.set_at(f, bd_idx, uh[bd_idx])
-        return f
+        return uh
 
 
     # def apply_for_vspace_with_scalar_basis(self, A, f, uh, dflag=None):
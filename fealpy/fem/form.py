@@ -1,4 +1,7 @@
 
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Sequence, overload, Iterable, Dict, Tuple, Optional, Union, TypeVar, Generic,
     Callable
@@ -46,6 +49,7 @@ class Form(Generic[_I], ABC):
         self.splitters = {}
         # self.chunk_sizes = {}
         self._cursor = 0
+        self._num_workers = 0
         self.batch_size = batch_size
 
         self._values_ravel_shape = (-1,) if self.batch_size == 0 else (self.batch_size, -1)
@@ -56,6 +60,7 @@ class Form(Generic[_I], ABC):
         new_obj.integrators.update(self.integrators)
         # new_obj.chunk_sizes.update(self.chunk_sizes)
         new_obj.splitters.update(self.splitters)
+        new_obj._num_workers = self._num_workers
         new_obj._values_ravel_shape = self._values_ravel_shape
         new_obj.sparse_shape = tuple(reversed(self.sparse_shape))
         return new_obj
@@ -155,18 +160,80 @@ class Form(Generic[_I], ABC):
             etg = (etg, )
         return value, etg
 
-    def assembly_local_iterative(self):
-        """Assembly local matrix considering chunk size.
-        Yields local matrix and to_global_dof tuple."""
+    def parallel(self, num_workers: Optional[int]=None, /):
+        """Set the number of threads evaluating the local tensors.
+
+        Chunks given by the splitters, and groups of integrators, are then
+        evaluated concurrently by a thread pool. The local tensors are still
+        yielded in the same order as the sequential assembly, so the assembled
+        results are deterministic. This helps when the kernels release the GIL
+        (e.g. einsum in NumPy and PyTorch).
+
+        The chunk results are not written into preallocated slices of the
+        global arrays; each chunk is an independent tensor, and the consumers
+        (e.g. `BilinearForm.assembly`) collect or concatenate them as in the
+        sequential assembly, so the peak memory is that of the sequential
+        assembly plus the pending chunks.
+
+        Thread safety: the caches shared by the workers are guarded by locks,
+        namely the interpolation point cache of the mesh, the `IntegratorCache`
+        of the integrators (`enable_cache` methods) and the global reference
+        basis cache. Built-in integrators compute their local tensors from
+        these caches and their read-only settings, so they are safe to run in
+        parallel. Integrators changing their own attributes, or data of the
+        space or the mesh built lazily outside the caches above, during the
+        assembly are not thread-safe; assemble them sequentially.
+
+        Parameters:
+            num_workers (int | None, optional): Number of threads. Use the number
+                of CPUs if None. Values 0 and 1 turn off the parallel assembly.
+                Defaults to None.
+
+        Returns:
+            Self: The form itself.
+        """
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        if num_workers < 0:
+            raise ValueError(f"num_workers must be non-negative, but got {num_workers}.")
+        self._num_workers = num_workers
+        return self
+
+    def _assembly_tasks(self):
         for key, int_ in self.integrators.items():
             splitter = self.splitters[key]
             if splitter is None:
                 logger.debug(f"(ASSEMBLY LOCAL FULL) {key}")
-                yield self._assembly_kernel(key)
+                yield key, None
             else:
                 logger.debug(f"(ASSEMBLY LOCAL ITER) {key}")
                 for indices in splitter(self.space, int_):
-                    yield self._assembly_kernel(key, indices)
+                    yield key, indices
+
+    def assembly_local_iterative(self):
+        """Assembly local matrix considering chunk size.
+        Yields local matrix and to_global_dof tuple."""
+        if self._num_workers <= 1:
+            for key, indices in self._assembly_tasks():
+                yield self._assembly_kernel(key, indices)
+            return
+
+        # Keep a bounded window of pending chunks, so that the memory is still
+        # limited by the chunk size, and yield them in the submission order.
+        window = 2 * self._num_workers
+        pending = deque()
+
+        # NOTE: the backend is thread-local, so workers inherit the current one.
+        with ThreadPoolExecutor(max_workers=self._num_workers,
+                                initializer=bm.set_backend,
+                                initargs=(bm.backend_name,)) as executor:
+            for key, indices in self._assembly_tasks():
+                pending.append(executor.submit(self._assembly_kernel, key, indices))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
 
 
 class UniformSplitter():
@@ -1,7 +1,10 @@
 
-from typing import Union, Optional, Any, TypeVar, Tuple, List, Dict, Callable
+from typing import Union, Optional, Any, TypeVar, Tuple, List, Dict, Callable, Hashable
 from typing import Generic
 import logging
+import weakref
+from collections import OrderedDict
+from threading import RLock
 
 from .. import logger
 from ..typing import TensorLike, Index, CoefLike
@@ -12,6 +15,7 @@ from ..utils import ftype_memory_size
 
 __all__ = [
     'Integrator',
+    'IntegratorCache',
     'NonlinearInt',
     'LinearInt',
     'OpInt',
@@ -26,6 +30,7 @@ Self = TypeVar('Self')
 _SpaceGroup = Union[_FS, Tuple[_FS, ...]]
 _OpIndex = Optional[Index]
 _Region = Union[Callable[[Mesh], TensorLike], TensorLike, None]
+_KEEP = object() # keep the current memory budget in `keep_data`
 
 
 class IntegratorMeta(type):
@@ -79,32 +84,155 @@ def assemblymethod(call_name: Optional[str]=None):
     return decorator
 
 
+class IntegratorCache():
+    """LRU cache of the integral materials of an integrator.
+
+    Entries are keyed by (method name, spaces, chunk), where the spaces are
+    held by weak references, so that a new space allocated at the address of
+    a collected one never hits the stale data. Entries of a space are dropped
+    once the space is garbage collected. The chunk is None for the whole
+    region, or the (start, stop, step) of a slice given by the splitters.
+
+    Parameters:
+        max_bytes (int | None, optional): Memory budget of the cached tensors
+            in bytes. The least recently used entries are evicted when the
+            budget is exceeded. Unlimited if None. Defaults to None.
+    """
+    def __init__(self, max_bytes: Optional[int] = None):
+        self._data: OrderedDict[Hashable, Tuple[Any, int]] = OrderedDict()
+        self._lock = RLock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.max_bytes = max_bytes
+
+    def __repr__(self) -> str:
+        return (f"IntegratorCache(size={len(self._data)}, nbytes={self.nbytes}, "
+                f"max_bytes={self.max_bytes}, hits={self.hits}, misses={self.misses})")
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: Optional[int]):
+        if (value is not None) and (value < 0):
+            raise ValueError(f"max_bytes must be non-negative, but got {value}.")
+        with self._lock:
+            self._max_bytes = value
+            self._evict()
+
+    def key(self, name: str, space: _SpaceGroup, indices: _OpIndex = None, /) -> Optional[Hashable]:
+        """Key of the entry, or None if the space or chunk can not be keyed."""
+        if (indices is None) or isinstance(indices, int):
+            chunk = indices
+        elif isinstance(indices, slice):
+            chunk = (indices.start, indices.stop, indices.step)
+        else:
+            return None
+        spaces = space if isinstance(space, (tuple, list)) else (space,)
+        try:
+            refs = tuple(weakref.ref(s, self._discard) for s in spaces)
+        except TypeError:
+            return None
+        return (name, refs, chunk)
+
+    def get(self, key: Hashable, compute: Callable[[], Any], /) -> Any:
+        """Get the data of the key, calling `compute()` to make it on a miss."""
+        with self._lock:
+            entry = self._data.get(key, None)
+            if entry is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        data = compute()
+        nbytes = _nbytes(data)
+
+        with self._lock:
+            self.misses += 1
+            if key in self._data: # made by another thread
+                self.nbytes -= self._data.pop(key)[1]
+            if (self._max_bytes is None) or (nbytes <= self._max_bytes):
+                self._data[key] = (data, nbytes)
+                self.nbytes += nbytes
+                self._evict()
+        return data
+
+    def info(self) -> Dict[str, Any]:
+        """Statistics of the cache, with `hits`, `misses`, `size`, `nbytes`
+        and `max_bytes`."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'nbytes': self.nbytes,
+                'max_bytes': self._max_bytes
+            }
+
+    def clear(self) -> None:
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def _evict(self):
+        if self._max_bytes is None:
+            return
+        while self.nbytes > self._max_bytes:
+            _, (_, nbytes) = self._data.popitem(last=False)
+            self.nbytes -= nbytes
+
+    def _discard(self, ref: weakref.ref):
+        # Called when a space is collected. Dead references only equal to
+        # themselves, so the entries can never be hit again.
+        with self._lock:
+            for key in [k for k in self._data if ref in k[1]]:
+                self.nbytes -= self._data.pop(key)[1]
+
+
+def _nbytes(data: Any) -> int:
+    if isinstance(data, (tuple, list)):
+        return sum(_nbytes(d) for d in data)
+    if isinstance(data, dict):
+        return sum(_nbytes(d) for d in data.values())
+    return getattr(data, 'nbytes', 0)
+
+
 def enable_cache(func: Self) -> Self:
-    """A decorator indicating that the method should be cached by its `space` arg.
+    """A decorator indicating that the method should be cached by its `space`
+    and `indices` args.
 
     This is useful for assembly methods supporting coefficient and source to
     fetch the data like the basis of space and the measurement of mesh entities.
     Redundant computation can be avoided after coef or source are changed.
+    Chunks given as slices by the splitters of forms are cached separately,
+    while other indices (e.g. index tensors) are not cached.
 
     Use `Integrator.keep_data(True)` to enable the cache.
     """
     def wrapper(integrator_obj, space, /, indices=None) -> TensorLike:
-        if (indices is None) and (integrator_obj._keep_data):
-            assert hasattr(integrator_obj, '_cache')
-            _cache = integrator_obj._cache
-            key = (func.__name__, id(space))
-
-            if key in _cache:
-                return _cache[key]
+        if integrator_obj._keep_data:
+            _cache: IntegratorCache = integrator_obj._cache
+            key = _cache.key(func.__name__, space, indices)
 
-            data = func(integrator_obj, space)
-            _cache[key] = data
+            if key is not None:
+                if indices is None:
+                    return _cache.get(key, lambda: func(integrator_obj, space))
+                return _cache.get(key, lambda: func(integrator_obj, space, indices))
 
-            return data
-        else:
-            if indices is None:
-                return func(integrator_obj, space)
-            return func(integrator_obj, space, indices)
+        if indices is None:
+            return func(integrator_obj, space)
+        return func(integrator_obj, space, indices)
 
     return wrapper
 
@@ -155,6 +283,8 @@ class Integrator(metaclass=IntegratorMeta):
 
     The `enable_cache` decorator is a simple tool provided to cache some integral materials.
     This may be useful for unchanged integrators in an iteration algorithm.
+    The materials are kept per space and per chunk in an LRU `IntegratorCache`,
+    optionally limited by a memory budget, see `Integrator.keep_data`.
     See `integrator.enable_cache` for details.
     """
     _assembly_name_map: Dict[str, str] = {}
@@ -168,17 +298,30 @@ class Integrator(metaclass=IntegratorMeta):
                              f"{', '.join(self._assembly_name_map.keys())}.")
 
         self._method = method
-        self._cache: Dict[Tuple[str, int], Any] = {}
+        self._cache = IntegratorCache()
         self.keep_data(keep_data)
 
     ### START: Cache System ###
-    def keep_data(self, status_on=True, /):
-        """Set whether to keep the integral material decorated by @enable_cache."""
+    def keep_data(self, status_on=True, /, *, max_bytes: Optional[int] = _KEEP):
+        """Set whether to keep the integral material decorated by @enable_cache.
+
+        Parameters:
+            status_on (bool, optional): Turn on the cache. Defaults to True.
+            max_bytes (int | None, optional): Memory budget of the cache in bytes,
+                with the least recently used materials evicted. Unlimited if None.
+                The current budget (unlimited at first) is kept if not given.
+        """
         self._keep_data = status_on
+        if max_bytes is not _KEEP:
+            self._cache.max_bytes = max_bytes
         if not status_on:
             self._cache.clear()
         return self
 
+    def cache_info(self) -> Dict[str, Any]:
+        """Statistics of the cache. See `IntegratorCache.info`."""
+        return self._cache.info()
+
     def clear(self) -> None:
         """Clear the cache of integrator."""
         self._cache.clear()
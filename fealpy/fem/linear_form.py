@@ -4,7 +4,7 @@ from typing import overload, Literal, Optional
 from .. import logger
 from ..typing import TensorLike
 from ..backend import backend_manager as bm 
-from ..sparse import COOTensor
+from ..sparse import COOTensor, COOBuilder
 from .form import Form
 from .integrator import LinearInt
 
@@ -38,14 +38,11 @@ class LinearForm(Form[LinearInt]):
         space = self._spaces[0]
         batch_size = self.batch_size
         gdof = space.number_of_global_dofs()
-        init_value_shape = (0,) if (batch_size == 0) else (batch_size, 0)
+        dense_shape = () if (batch_size == 0) else (batch_size,)
         sparse_shape = (gdof, )
 
-        M = COOTensor(
-            indices = bm.empty((1, 0), dtype=space.itype, device=bm.get_device(space)),
-            values = bm.empty(init_value_shape, dtype=space.ftype, device=bm.get_device(space)),
-            spshape = sparse_shape
-        )
+        builder = COOBuilder(sparse_shape, dense_shape, itype=space.itype,
+                             ftype=space.ftype, device=bm.get_device(space))
 
         for group_tensor, e2dofs_tuple in self.assembly_local_iterative():
             if (batch_size > 0) and (group_tensor.ndim == 2):
@@ -53,9 +50,9 @@ class LinearForm(Form[LinearInt]):
 
             indices = e2dofs_tuple[0].reshape(1, -1)
             group_tensor = bm.reshape(group_tensor, self._values_ravel_shape)
-            M = M.add(COOTensor(indices, group_tensor, sparse_shape))
+            builder.append(indices, group_tensor)
 
-        return M
+        return builder.build()
 
     @overload
     def assembly(self) -> TensorLike: ...
@@ -3,7 +3,7 @@ from typing import Optional
 from .. import logger
 from ..typing import TensorLike
 from ..backend import backend_manager as bm
-from ..sparse import COOTensor
+from ..sparse import COOTensor, COOBuilder
 from .form import Form
 from .integrator import NonlinearInt, OpInt, SrcInt
 from .nonlinear_wrapper import NonlinearWrapperInt
@@ -79,14 +79,11 @@ class NonlinearForm(Form[NonlinearInt]):
         space = self._spaces
         ugdof = space[0].number_of_global_dofs()
         vgdof = space[1].number_of_global_dofs() if (len(space) > 1) else ugdof
-        init_value_shape = (0,) if (batch_size == 0) else (batch_size, 0)
+        dense_shape = () if (batch_size == 0) else (batch_size,)
         sparse_shape = (vgdof, ugdof)
 
-        M = COOTensor(
-            indices = bm.empty((2, 0), dtype=space[0].itype),
-            values = bm.empty(init_value_shape, dtype=space[0].ftype),
-            spshape = sparse_shape
-        )
+        builder = COOBuilder(sparse_shape, dense_shape, itype=space[0].itype,
+                             ftype=space[0].ftype)
 
         for group in self.integrators.keys():
             if isinstance(self.integrators[group][0], OpInt):
@@ -101,21 +98,18 @@ class NonlinearForm(Form[NonlinearInt]):
                 I = bm.broadcast_to(ve2dof[:, :, None], local_shape)
                 indices = bm.stack([I.ravel(), J.ravel()], axis=0)
                 group_tensor = bm.reshape(group_tensor, self._values_ravel_shape)
-                M = M.add(COOTensor(indices, group_tensor, sparse_shape))
-        return M
+                builder.append(indices, group_tensor)
+        return builder.build()
 
     def _scalar_assembly_F(self, retain_ints: bool, batch_size: int):
 
         space = self._spaces[0]
         gdof = space.number_of_global_dofs()
-        init_value_shape = (0,) if (batch_size == 0) else (batch_size, 0)
+        dense_shape = () if (batch_size == 0) else (batch_size,)
         sparse_shape = (gdof, )
 
-        M = COOTensor(
-            indices = bm.empty((1, 0), dtype=space.itype),
-            values = bm.empty(init_value_shape, dtype=space.ftype),
-            spshape = sparse_shape
-        )
+        builder = COOBuilder(sparse_shape, dense_shape, itype=space.itype,
+                             ftype=space.ftype)
 
         for group in self.integrators.keys():
             if isinstance(self.integrators[group][0], SrcInt):
@@ -128,9 +122,9 @@ class NonlinearForm(Form[NonlinearInt]):
 
             indices = e2dofs[0].reshape(1, -1)
             group_tensor = bm.reshape(group_tensor, self._values_ravel_shape)
-            M = M.add(COOTensor(indices, group_tensor, sparse_shape))
+            builder.append(indices, group_tensor)
 
-        return M
+        return builder.build()
 
     def assembly(self, *, return_dense=True, coalesce=True, format='csr',retain_ints: bool=False) -> COOTensor:
 
@@ -50,19 +50,10 @@ class PoissonLFEMSolver:
         """
         """
         from ..solver import GAMGSolver
-        solver = GAMGSolver() 
-
-        solver.A = [self.A]
-        solver.P = P
-        solver.R = []
-        for m in P:
-            s = m.sum(axis=1)
-            # m.T/s[None, :]
-            solver.R.append(m.T.div(s))
-            print("R.shape", solver.R[-1].shape)
-            print("A.shape", solver.A[-1].shape)
-            a = solver.R[-1].matmul(solver.A[-1])
-            solver.A.append(a.matmul(m))
-
-
+        solver = GAMGSolver()
+        solver.setup(self.A, P=P)
+        self.uh[:] = solver.solve(self.b)
+        if self.timer is not None:
+            self.timer.send(f"多重网格求解 Poisson 方程线性系统")
 
+        return self.uh
@@ -2,6 +2,7 @@ from typing import Optional
 import numpy as np
 
 from ..backend import backend_manager as bm
+from ..backend import ScatterPlan
 from ..typing import TensorLike, Index, _S
 from ..functionspace import TensorFunctionSpace
 
@@ -43,20 +44,21 @@ class RecoveryAlg:
         rguh = tensor_space.function()
         gval = bm.zeros((gdof, GD), dtype=space.ftype)
         deg = bm.zeros(gdof, dtype=space.ftype)
+        plan = ScatterPlan(cell2dof, gdof)
 
         if method == 'simple':
-            bm.index_add(deg, cell2dof, bm.tensor(1, **bm.context(deg)))
-            bm.index_add(gval, cell2dof, guh)
+            plan.index_add(deg, bm.tensor(1, **bm.context(deg)))
+            plan.index_add(gval, guh)
         elif method == 'area_harmonic':
             val = 1.0/space.mesh.entity_measure('cell')
-            bm.index_add(deg, cell2dof, val[:, None])
+            plan.index_add(deg, val[:, None])
             guh *= val[:, None, None] 
-            bm.index_add(gval, cell2dof, guh)
+            plan.index_add(gval, guh)
         elif method == 'area':
             val = space.mesh.entity_measure('cell')
-            bm.index_add(deg, cell2dof, val[:, None])
+            plan.index_add(deg, val[:, None])
             guh *= val[:, None, None] 
-            bm.index_add(gval, cell2dof, guh)
+            plan.index_add(gval, guh)
         elif method == 'distance':
             ipoints = space.interpolation_points()
             bp = space.mesh.entity_barycenter('cell')
@@ -64,8 +66,8 @@ class RecoveryAlg:
             d = bm.sqrt(bm.sum(v**2, axis=-1))
             guh = bm.einsum('ij...,ij->ij...', guh, d)
 
-            bm.index_add(deg, cell2dof, d)
-            bm.index_add(gval, cell2dof, guh)
+            plan.index_add(deg, d)
+            plan.index_add(gval, guh)
         elif method == 'distance_harmonic':
             ipoints = space.interpolation_points()
             bp = space.mesh.entity_barycenter('cell')
@@ -73,8 +75,8 @@ class RecoveryAlg:
             d = 1/bm.sqrt(bm.sum(v**2, axis=-1))
             guh = bm.einsum('ij...,ij->ij...', guh, d)
 
-            bm.index_add(deg, cell2dof, d)
-            bm.index_add(gval, cell2dof, guh)
+            plan.index_add(deg, d)
+            plan.index_add(gval, guh)
         else:
             raise ValueError('Unsupported method: %s' % method)
 
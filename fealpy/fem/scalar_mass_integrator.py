@@ -17,6 +17,7 @@ from .integrator import (
 
 class ScalarMassIntegrator(LinearInt, OpInt, CellInt):
     def __init__(self, coef: Optional[CoefLike]=None, q: Optional[int]=None, *,
+                 region: Optional[TensorLike]=None,
                  index: Index=_S,
                  batched: bool=False,
                  method: Optional[str]=None) -> None:
@@ -25,16 +26,20 @@ class ScalarMassIntegrator(LinearInt, OpInt, CellInt):
         self.coef = coef
         self.q = q
         self.index = index
+        # NOTE: `index` is the old name of the region.
+        if (region is None) and (index is not _S):
+            region = index
+        self.set_region(region)
         self.batched = batched
 
     @enable_cache
-    def to_global_dof(self, space: _FS) -> TensorLike:
-        return space.cell_to_dof()[self.index]
+    def to_global_dof(self, space: _FS, /, indices=None) -> TensorLike:
+        return space.cell_to_dof()[self.entity_selection(indices)]
 
     @enable_cache
-    def fetch(self, space: _FS):
+    def fetch(self, space: _FS, /, indices=None):
         q = self.q
-        index = self.index
+        index = self.entity_selection(indices)
         mesh = getattr(space, 'mesh', None)
 
         if not isinstance(mesh, HomogeneousMesh):
@@ -49,22 +54,22 @@ class ScalarMassIntegrator(LinearInt, OpInt, CellInt):
         phi = space.basis(bcs, index=index)
         return bcs, ws, phi, cm, index
 
-    def assembly(self, space: _FS) -> TensorLike:
+    def assembly(self, space: _FS, /, indices=None) -> TensorLike:
         coef = self.coef
         mesh = getattr(space, 'mesh', None)
-        bcs, ws, phi, cm, index = self.fetch(space)
+        bcs, ws, phi, cm, index = self.fetch(space, indices)
         val = process_coef_func(coef, bcs=bcs, mesh=mesh, etype='cell', index=index)
 
         return bilinear_integral(phi, phi, ws, cm, val, batched=self.batched)
 
     @assemblymethod('semilinear')
-    def semilinear_assembly(self, space: _FS) -> TensorLike:
+    def semilinear_assembly(self, space: _FS, /, indices=None) -> TensorLike:
         uh = self.uh
         coef = self.coef
         mesh = getattr(space, 'mesh', None)
-        bcs, ws, phi, cm, index = self.fetch(space)
-        val_A = coef.grad_func(uh(bcs))  #(C, Q)
-        val_F = -coef.func(uh(bcs))      #(C, Q)
+        bcs, ws, phi, cm, index = self.fetch(space, indices)
+        val_A = coef.grad_func(uh(bcs, index))  #(C, Q)
+        val_F = -coef.func(uh(bcs, index))      #(C, Q)
         coef = process_coef_func(coef, bcs=bcs, mesh=mesh, etype='cell', index=index)
         coef_A = get_semilinear_coef(val_A, coef)
         coef_F = get_semilinear_coef(val_F, coef)
@@ -1,4 +1,8 @@
 from typing import Union, TypeVar, Generic, Callable, Optional
+from functools import lru_cache
+
+import numpy as np
+
 from ..backend import backend_manager as bm
 from ..backend import TensorLike
 from ..mesh.mesh_base import Mesh
@@ -15,25 +19,168 @@ Index = Union[int, slice, TensorLike]
 Number = Union[int, float]
 _S = slice(None)
 
+
+@lru_cache(maxsize=None)
+def _reference_tables(p: int, m: int):
+    """
+    @brief 与单元无关的参考索引表, 只依赖于 (p, m), 用 NumPy 计算一次
+
+    局部自由度按顶点 (nV 个), 边 (nE 个), 内部排序. 顶点自由度对应的行与单元
+    无关, 边自由度对应的行为 evalue * prod(N[:, eedge]**epower) 放在
+    (erow, ecol) 处.
+    """
+    multi_index = lambda r: bm.to_numpy(bm.multi_index_matrix(r, 2)).astype(np.int64)
+    midx2num = lambda a: (a[..., 1]+a[..., 2])*(1+a[..., 1]+a[..., 2])//2 + a[..., 2]
+
+    # 多重指标
+    multiIndex = multi_index(p)
+    S02m0 = multiIndex[multiIndex[:, 0]>=p-2*m]
+    S02m1 = S02m0[:, [1, 0, 2]]
+    S02m2 = S02m0[:, [1, 2, 0]]
+    S1m0 = multiIndex[(multiIndex[:, 0]<=m) & np.all(multiIndex[:, 1:]<p-2*m, axis=1)]
+    S1m0 = np.flip(S1m0[:, [0, 2, 1]], axis=0)
+    S1m1 = S1m0[:, [2, 0, 1]]
+    S1m2 = S1m0[:, [1, 2, 0]]
+    S2 = multiIndex[np.all(multiIndex>m, axis=1)]
+    dof2midx = np.concatenate([S02m0, S02m1, S02m2, S1m0, S1m1, S1m2, S2])
+    perm = midx2num(dof2midx) # 局部自由度 -> Bernstein 基的编号
+    dof2num = np.argsort(perm)
+    ldof = len(multiIndex)
+    nV = 3*len(S02m0)
+    nE = 3*len(S1m0)
+
+    # 顶点
+    S02m = [S02m0, S02m1, S02m2]
+    C = np.eye(ldof)
+    for v in range(3):
+        flag = np.ones(3, dtype=np.bool_)
+        flag[v] = False
+        for alpha in S02m[v]:
+            i = dof2num[midx2num(alpha)]
+            dalpha = alpha[flag]
+            r = int(np.sum(dalpha))
+            for beta in multi_index(r):
+                if np.all(alpha-beta[v]<=0):
+                    continue
+                sign = (-1)**(beta[v])
+                beta[v] = beta[v] + alpha[v]
+                j = dof2num[midx2num(beta)]
+                C[i, j] = sign*comb(np.sum(beta), r)*np.prod(comb(dalpha, beta[flag]))*factorial(r)
+    assert np.all(C[:nV, nV:] == 0)
+
+    # 边
+    S1m = [S1m0, S1m1, S1m2]
+    erow, ecol, eedge, epower, evalue = [], [], [], [], []
+    for de in range(3):
+        e = np.ones(3, dtype=np.bool_)
+        e[de] = False
+        for alpha in S1m[de]:
+            i = dof2num[midx2num(alpha)]
+            dalpha = int(alpha[de])
+            for beta in multi_index(dalpha):
+                erow.append(i - nV)
+                eedge.append(de)
+                epower.append(beta.copy())
+                c = 1/np.prod(factorial(beta))
+                beta[e] = beta[e] + alpha[e]
+                ecol.append(dof2num[midx2num(beta)])
+                evalue.append(comb(np.sum(beta), dalpha)*factorial(dalpha)**2*c)
+    ecol = np.array(ecol)
+    assert np.all(ecol < nV + nE)
+
+    return {
+        'nV': nV, 'nE': nE, 'perm': perm, 'dof2num': dof2num, 'S02m': S02m,
+        'VinvT': np.linalg.inv(C[:nV, :nV]).T,
+        'erow': np.array(erow), 'ecol': ecol, 'eedge': np.array(eedge),
+        'epower': np.array(epower), 'evalue': np.array(evalue)
+    }
+
+
+class CmCoefficientMatrix():
+    """
+    @brief Cm 协调元基函数在 Bernstein 基下的系数矩阵, 按块存储
+
+    局部自由度按顶点 (V), 边 (E), 内部 (I) 排序, Bernstein 基按 perm 重排为
+    b = (b_V, b_E, b_I) 后, 基函数为
+
+        phi_V = Q (VT b_V + XT b_E),  phi_E = ET b_E,  phi_I = b_I,
+
+    其中 VT 与单元无关, Q (NC, nV, nV), XT (NC, nV, nE), ET (NC, nE, nE) 为
+    每个单元上的几何因子. 这避免了存储 (NC, ldof, ldof) 的稠密矩阵.
+    """
+    def __init__(self, perm, VT, Q, XT, ET):
+        self.perm = perm
+        self.VT = VT
+        self.Q = Q
+        self.XT = XT
+        self.ET = ET
+        self.nV = VT.shape[0]
+        self.nE = ET.shape[-1]
+
+    @property
+    def shape(self):
+        ldof = self.perm.shape[0]
+        return (self.Q.shape[0], ldof, ldof)
+
+    def apply(self, bphi):
+        """
+        @brief 计算 sum_l coeff[c, i, l] bphi[c, ..., l]
+
+        @param bphi: 形状为 (NC, ..., ldof) 或 (1, ..., ldof)
+        @return 形状为 (NC, ..., ldof)
+        """
+        nV, nE = self.nV, self.nE
+        NC = self.Q.shape[0]
+        shape = bphi.shape
+        x = bphi[..., self.perm].reshape(shape[0], -1, shape[-1])
+        xV, xE, xI = x[..., :nV], x[..., nV:nV+nE], x[..., nV+nE:]
+        if shape[0] == 1: # 与单元无关的 Bernstein 基函数
+            yV = bm.einsum('ij, kj->ki', self.VT, xV[0])[None, ...]
+            yV = yV + bm.einsum('cij, kj->cki', self.XT, xE[0])
+            yE = bm.einsum('cij, kj->cki', self.ET, xE[0])
+            xI = bm.broadcast_to(xI, (NC, ) + xI.shape[1:])
+        else:
+            yV = bm.einsum('ij, ckj->cki', self.VT, xV)
+            yV = yV + bm.einsum('cij, ckj->cki', self.XT, xE)
+            yE = bm.einsum('cij, ckj->cki', self.ET, xE)
+        yV = bm.einsum('cij, ckj->cki', self.Q, yV)
+        y = bm.concatenate([yV, yE, xI], axis=-1)
+        return y.reshape((NC, ) + shape[1:])
+
+    def to_dense(self):
+        """
+        @brief 组装 (NC, ldof, ldof) 的稠密系数矩阵
+        """
+        nV, nE = self.nV, self.nE
+        NC, ldof, _ = self.shape
+        kwargs = bm.context(self.Q)
+        coeff = bm.zeros((NC, ldof, ldof), **kwargs)
+        coeff[:, :nV, :nV] = bm.einsum('cij, jk->cik', self.Q, self.VT)
+        coeff[:, :nV, nV:nV+nE] = bm.einsum('cij, cjk->cik', self.Q, self.XT)
+        coeff[:, nV:nV+nE, nV:nV+nE] = self.ET
+        coeff[:, nV+nE:, nV+nE:] = bm.eye(ldof-nV-nE, **kwargs)
+        return coeff[:, :, bm.argsort(self.perm)]
+
+
 class CmConformingFESpace2d(FunctionSpace, Generic[_MT]):
     def __init__(self, mesh: _MT, p: int, m: int, device=None):
         assert(p>4*m)
         self.mesh = mesh
         self.p = p
         self.m = m
-        self.isCornerNode = self.isCornerNode()
         self.bspace = BernsteinFESpace(mesh, p)
 
         self.ftype = mesh.ftype
         self.itype = mesh.itype
         self.device = mesh.device
-        self.ikwargs = bm.context(cell)
-        self.fkwargs = bm.context(node)
+        self.ikwargs = bm.context(mesh.cell)
+        self.fkwargs = bm.context(mesh.node)
+        self.isCornerNode = self.isCornerNode()
 
         self.TD = mesh.top_dimension()
         self.GD = mesh.geo_dimension()
 
-        self.coeff = self.coefficient_matrix()
+        self.cmcoeff = self.coefficient_matrix()
     def isCornerNode(self):
         mesh = self.mesh
         edge = mesh.entity('edge')
@@ -42,12 +189,12 @@ class CmConformingFESpace2d(FunctionSpace, Generic[_MT]):
         edge = edge[boundary_edge]
         en = mesh.edge_unit_normal()[boundary_edge]
 
-        nnn = bm.zeros((NN,2,2))
+        nnn = bm.zeros((NN,2,2), **self.fkwargs)
         isCornerNode = bm.zeros(NN, dtype=bm.bool, device=self.device)
         nnn[edge[:, 0],0] = en
         nnn[edge[:, 1],1] = en
         
-        flag = bm.abs(bm.cross(nnn[:,0,:],nnn[:,1,:],axis=1))>1e-10
+        flag = bm.abs(nnn[:,0,0]*nnn[:,1,1]-nnn[:,0,1]*nnn[:,1,0])>1e-10
         return flag
 
 
@@ -173,106 +320,46 @@ class CmConformingFESpace2d(FunctionSpace, Generic[_MT]):
         return isBdDof
 
     def coefficient_matrix(self):
+        """
+        @brief 计算 Cm 基函数在 Bernstein 基下的系数, 以分块的形式存储
+
+        @return CmCoefficientMatrix, 用 to_dense() 得到 (NC, ldof, ldof) 的稠密矩阵
+        """
         p = self.p
         m = self.m
         mesh = self.mesh
-        device = bm.get_device(mesh.cell)
+        device = self.device
         isCornerNode = self.isCornerNode
 
         NC = mesh.number_of_cells()
-        ldof = self.number_of_local_dofs('cell')
-        tem = bm.eye(ldof, dtype=self.ftype, device=self.device)
-        coeff = bm.tile(tem, (NC, 1, 1))
-
-        # 多重指标
-        multiIndex = mesh.multi_index_matrix(p, 2)
-        S02m0 = multiIndex[multiIndex[:, 0]>=p-2*m]
-        S02m1 = S02m0[:, [1, 0, 2]]
-        S02m2 = S02m0[:, [1, 2, 0]]
-        S1m0 = multiIndex[(multiIndex[:, 0]<=m) & (bm.all(multiIndex[:, 1:]<p-2*m,
-                axis=1))]
-        S1m0 = bm.flip(S1m0[:, [0,2,1]], axis=0)
-        S1m1 = S1m0[:, [2, 0, 1]]
-        S1m2 = S1m0[:, [1, 2, 0]]
-        S2 = multiIndex[bm.all(multiIndex>m, axis=1)]
-        dof2midx = bm.concatenate([S02m0, S02m1, S02m2, S1m0, S1m1, S1m2, S2])  
-        midx2num = lambda a: (a[:, 1]+a[:, 2])*(1+a[:, 1]+ a[:, 2])//2 + a[:, 2]
-        dof2num = midx2num(dof2midx)
-        dof2num = bm.argsort(dof2num, axis=0)
+        ndof = self.number_of_internal_dofs('node')
+        table = _reference_tables(p, m)
+        nV, nE = table['nV'], table['nE']
+        ikw = {'dtype': self.itype, 'device': device}
+        fkw = {'dtype': self.ftype, 'device': device}
 
-        # 局部自由度 顶点
-        S02m = [S02m0, S02m1, S02m2]
-        for v in range(3):
-            flag = bm.ones(3, dtype=bm.bool, device=self.device)
-            flag[v] = False
-            for alpha in S02m[v]:
-                i = midx2num(alpha[None, :])
-                i = dof2num[i]
-                dalpha = alpha[flag]
-                r = int(bm.sum(dalpha))
-                betas = mesh.multi_index_matrix(r, 2)
-                for beta in betas:
-                    if bm.all(alpha-beta[v]<=0):
-                        continue
-                    sign = (-1)**(beta[v])
-                    beta[v] = beta[v] + alpha[v]
-                    j = midx2num(beta[None, :])
-                    j = dof2num[j]
-                    dbeta = beta[flag]
-                    beta_cpu = bm.to_numpy(bm.sum(beta))
-                    dalpha_cpu = bm.to_numpy(dalpha)
-                    dbeta_cpu = bm.to_numpy(dbeta)
-                    coeff[:, i, j] = sign*comb(beta_cpu,r)*bm.prod(bm.array(
-                        comb(dalpha_cpu, dbeta_cpu),device=device),axis=0)*factorial(r)
-                    #coeff[:, i, j] = sign*comb(bm.sum(beta),r)*bm.prod(bm.array(comb(dalpha, dbeta),**ikwargs),
-                    #                                                   axis=0)*factorial(r)
-
-        #import numpy as np
-        #for i  in range(NC-1):
-        #    np.testing.assert_allclose(coeff[i],coeff[i+1], atol=1e-15)
-        #    print(i)
-
-
-        # 局部自由度 边
+        # 边自由度对应的行 [C_EV, C_EE], 只依赖于 N = grad lambda . n
         glambda = mesh.grad_lambda()
         c2e = mesh.cell_to_edge()
         n = mesh.edge_normal()[c2e]
         N = bm.einsum('cfd, ced->cef', glambda, n)
-        S1m = [S1m0, S1m1, S1m2]
-        for de in range(3):
-            e = bm.ones(3, dtype=bm.bool, device=self.device)
-            e[de] = False # e
-            for alpha in S1m[de]:
-                i = midx2num(alpha[None, :])
-                i = dof2num[i]
-                dalpha = alpha[de] 
-                betas = mesh.multi_index_matrix(int(dalpha), 2)
-                for beta in betas:
-                    beta_cpu = bm.to_numpy(beta)
-                    val = bm.prod(N[:, de]**beta,axis=1)/bm.prod(bm.array(factorial(beta_cpu), device=device), axis=0)
-                    beta[e] = beta[e] +alpha[e]
-                    beta_sum_cpu = bm.to_numpy(bm.sum(beta))
-                    j = midx2num(beta[None, :])
-                    j = dof2num[j]
-                    coeff[:, i, j] = comb(beta_sum_cpu,
-                                          int(dalpha))*(factorial(int(dalpha)))**2*val[:, None]
-        
-        ## 测试每个单元顶点的系数矩阵是一样的,与单元无关
-        #import numpy as np
-        #for i  in range(NC-1):
-        #    np.testing.assert_allclose(coeff[i,:18,:18],coeff[i+1,:18,:18], atol=1e-15)
-        #    print(i)
-        #print(coeff[:, :18, :18])
-        #import numpy as np
-        #np.savetxt('c.csv', coeff[0], delimiter=',')
-        
-
-        #for i in range(NC):
-        
-        #    coeff[i] = solve_triangular(coeff[i], bm.eye(ldof), lower=True)
-        coeff = bm.linalg.inv(coeff)
+        erow, ecol, eedge = (bm.tensor(table[k], **ikw) for k in ('erow', 'ecol', 'eedge'))
+        epower = bm.tensor(table['epower'], **ikw)
+        evalue = bm.tensor(table['evalue'], **fkw)
+        val = evalue*bm.prod(N[:, eedge]**epower, axis=-1) # (NC, nnz)
+        CE = bm.zeros((NC, nE, nV+nE), **fkw)
+        CE = bm.set_at(CE, (slice(None), erow, ecol), val)
+
+        # C = [[C_VV, 0, 0], [C_EV, C_EE, 0], [0, 0, I]] 是分块下三角矩阵
+        # 且 C_VV 与单元无关, 所以只需对每个单元求 C_EE 的逆
+        VinvT = bm.tensor(table['VinvT'], **fkw)
+        EinvT = bm.swapaxes(bm.linalg.inv(CE[:, :, nV:]), 1, 2)
+        XT = -bm.einsum('ik, cak, cal->cil', VinvT, CE[:, :, :nV], EinvT)
 
         # 全局自由度
+        S02m = [bm.tensor(S, **ikw) for S in table['S02m']]
+        dof2num = bm.tensor(table['dof2num'], **ikw)
+        midx2num = lambda a: (a[:, 1]+a[:, 2])*(1+a[:, 1]+ a[:, 2])//2 + a[:, 2]
         node = mesh.entity('node')
         cell = mesh.entity('cell')
         Ndelat = bm.zeros((NC, 3, 2, 2), dtype=self.ftype, device=self.device)
@@ -285,7 +372,6 @@ class CmConformingFESpace2d(FunctionSpace, Generic[_MT]):
         Ndelat[:, 1, 1] = t0
         Ndelat[:, 2, 0] = t1
         Ndelat[:, 2, 1] = -t0
-        ndof = self.number_of_internal_dofs('node')
         coeff1 = bm.zeros((NC, 3*ndof, 3*ndof), dtype=self.ftype, device=self.device)
         symidx = [symmetry_index(2, r, device=device) for r in range(1, 2*m+1)]
         # 边界自由度
@@ -310,8 +396,7 @@ class CmConformingFESpace2d(FunctionSpace, Generic[_MT]):
             cidx = isBdNode[cell[:, v]] & ~isCornerNode[cell[:, v]] 
             for gamma in S02m[v][1:]:
                 i = midx2num(gamma[None, :])
-                i = dof2num[i]
-                i = int(i)
+                i = int(dof2num[i][0])
                 gamma = gamma[flag]
                 Ndelta_sym = symmetry_span_array(Ndelat[:, v],
                                                  gamma).reshape(NC, -1)
@@ -324,20 +409,22 @@ class CmConformingFESpace2d(FunctionSpace, Generic[_MT]):
                     coeff2[cidx, i, j-r-1+kk:j+kk] = tn_sym[:, symidx[r-1][0]]*c[None, :]
             kk = kk+ndof
 
-        coeff1 = bm.einsum('cik,cjk->cij', coeff1, coeff2)
-        coeff = bm.transpose(coeff, (0, 2, 1))
-        coeff[:, :3*ndof] = bm.einsum('cji,cjk->cik', coeff1, coeff[:, :3*ndof])
-        return coeff[:, :, dof2num]
+        Q = bm.einsum('cij,ckj->cik', coeff2, coeff1)
+        perm = bm.tensor(table['perm'], **ikw)
+        return CmCoefficientMatrix(perm, VinvT, Q, XT, EinvT)
+
+    @property
+    def coeff(self):
+        """(NC, ldof, ldof) 的稠密系数矩阵, 第 i 个基函数为 sum_l coeff[c, i, l] b_l"""
+        return self.cmcoeff.to_dense()
 
     def basis(self, bcs, index=_S):#TODO:这个index没实现
-        coeff = self.coeff
         bphi = self.bspace.basis(bcs)
-        return bm.einsum('cil, cql->cqi', coeff, bphi)
+        return self.cmcoeff.apply(bphi)
 
     def grad_m_basis(self, bcs, m):
-        coeff = self.coeff
         bgmphi = self.bspace.grad_m_basis(bcs, m)
-        return bm.einsum('cil, cqlg->cqig', coeff, bgmphi)
+        return bm.swapaxes(self.cmcoeff.apply(bm.swapaxes(bgmphi, 2, -1)), 2, -1)
 
 
     def boundary_interpolate(self, gd, uh, threshold=None, method="interp"):
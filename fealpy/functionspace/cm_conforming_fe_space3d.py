@@ -848,28 +848,31 @@ class CmConformingFESpace3d(FunctionSpace, Generic[_MT]):
             e = locEdge[i]
             es = dualEdge[i]
             Se2m = bm.concatenate([a for b in S12m[i] for a in b])
+            fval = {} # r 阶导数在边上的 Bernstein 插值系数, 只依赖于 r
             for alpha in self.multiIndex[Se2m]:
                 alphae = alpha[e]
                 alphaes = alpha[es]
                 r = int(bm.sum(alphaes))
 
-                bcs = mesh.multi_index_matrix(p-r, 1, **self.fkwargs)/(p-r) # (NQ, 2)
-                b2l = self.bspace.bernstein_to_lagrange(p-r, 1) #(p-r+1, p-r+1)
-
-                point = bm.einsum("qi, cid-> qcd", bcs, node[cell[:, e]])
-
-                ffval = bm.array(flist[r](point)) # (NQ, NC, l) :l 是分量个数 
-
+                if r not in fval:
+                    bcs = mesh.multi_index_matrix(p-r, 1, **self.fkwargs)/(p-r) # (NQ, 2)
+                    b2l = self.bspace.bernstein_to_lagrange(p-r, 1) #(p-r+1, p-r+1)
+                    point = bm.einsum("qi, cid-> qcd", bcs, node[cell[:, e]])
+                    ffval = bm.array(flist[r](point)) # (NQ, NC, l) :l 是分量个数 
+                    if r==0:
+                        fval[r] = bm.einsum("qc, iq-> ci", ffval, b2l)
+                    else:
+                        fval[r] = bm.einsum("qcl, iq-> cil", ffval, b2l)
+
+                Ralpha = midx1d2num(alphae)
                 if r==0:
-                    bcoeff = bm.einsum("qc, iq-> ci", ffval, b2l)
+                    bcoeff = fval[r][:, Ralpha]
                 else:
                     symidx, num = symmetry_index(3, r)
                     nnn = symmetry_span_array(en[c2ei], alphaes).reshape(NC, -1)[:, symidx]
-                    bcoeff = bm.einsum("cl, qcl, l, iq-> ci", nnn, ffval, num, b2l) #(NC, l)
+                    bcoeff = bm.einsum("cl, cl, l-> c", nnn, fval[r][:, Ralpha], num) #(NC, )
 
-                for ccc in range(NC):
-                    Ralpha = midx1d2num(alphae)
-                    fI[c2d[ccc, N]] = bcoeff[ccc, Ralpha] # 这里为什么不需要反过来
+                fI[c2d[:, N]] = bcoeff # 这里为什么不需要反过来
                 N += 1
 
         # face
@@ -889,28 +892,31 @@ class CmConformingFESpace3d(FunctionSpace, Generic[_MT]):
             f = locFace[i]
             fs = dualFace[i]
             Sfm = bm.concatenate(S2m[i])
+            fval = {} # r 阶法向导数在面上的 Bernstein 插值系数, 只依赖于 r
             for alpha in self.multiIndex[Sfm]:
                 alphaf = alpha[f]
                 alphafs = alpha[fs]
-                r = int(alphafs)
-
-                bcs = mesh.multi_index_matrix(p-r, 2, **self.fkwargs)/(p-r) # (NQ, 3)
-                b2l = self.bspace.bernstein_to_lagrange(p-r, 2) # (NQ, NQ)
-
-                point = bm.einsum("qi, cid-> qcd", bcs, node[cell[:, f]]) # (NQ, NC, 3)
-                
-                ffval = bm.array(flist[r](point)) # (NQ, NC, l) :l 是分量个数
+                r = int(bm.sum(alphafs))
+
+                if r not in fval:
+                    bcs = mesh.multi_index_matrix(p-r, 2, **self.fkwargs)/(p-r) # (NQ, 3)
+                    b2l = self.bspace.bernstein_to_lagrange(p-r, 2) # (NQ, NQ)
+                    point = bm.einsum("qi, cid-> qcd", bcs, node[cell[:, f]]) # (NQ, NC, 3)
+                    ffval = bm.array(flist[r](point)) # (NQ, NC, l) :l 是分量个数
+                    if r==0:
+                        fval[r] = bm.einsum("qc, iq-> ci", ffval, b2l)
+                    else:
+                        fval[r] = bm.einsum("qcl, iq-> cil", ffval, b2l)
+
+                Ralpha = midx2d2num(alphaf)
                 if r==0:
-                    bcoeff = bm.einsum("qc, iq-> ci", ffval, b2l)
+                    bcoeff = fval[r][:, Ralpha]
                 else:
                     symidx, num = symmetry_index(3, r)
                     nnn = symmetry_span_array(fn[c2fi, None], alphafs).reshape(-1, 3**r)[:, symidx]
-                    bcoeff = bm.einsum("cl, qcl, l, iq-> ci", nnn, ffval, num,
-                                       b2l) #(NC, l)
+                    bcoeff = bm.einsum("cl, cl, l-> c", nnn, fval[r][:, Ralpha], num) #(NC, )
 
-                for ccc in range(NC):
-                    Ralpha = midx2d2num(alphaf)
-                    fI[c2d[ccc, N]] = bcoeff[ccc, Ralpha]
+                fI[c2d[:, N]] = bcoeff
                 N += 1
 
         bcs = mesh.multi_index_matrix(p, 3, **self.fkwargs)/p
@@ -92,3 +92,22 @@ class Function(Generic[_FS]):
 
     def __rmatmul__(self, other: TensorLike) -> TensorLike:
         return other @ self.array
+
+    def save(self, path: str, *, format: Optional[str]=None, compress: bool=False) -> None:
+        """Save the array and the coordtype of the function to a checkpoint.
+        Use `mesh.save(path, data={...})` to save functions with their mesh.
+
+        See `Mesh.save` for the formats."""
+        from ..mesh.checkpoint import save_checkpoint
+        meta = {'coordtype': self.coordtype, 'shape': list(self.array.shape)}
+        save_checkpoint(path, {'array': self.array}, meta, format=format, compress=compress)
+
+    @classmethod
+    def load(cls, space: _FS, path: str, *, mmap: bool=False, format: Optional[str]=None):
+        """Load a function saved by `Function.save` into the space."""
+        from ..mesh.checkpoint import load_checkpoint
+        arrays, meta = load_checkpoint(path, mmap=mmap, format=format)
+        array = arrays['array']
+        if bm.backend_name != 'numpy':
+            array = bm.device_put(bm.from_numpy(array), bm.get_device(space.mesh.node))
+        return cls(space, array, meta['coordtype'])
@@ -50,6 +50,8 @@ class LagrangeFESpace(FunctionSpace, Generic[_MT]):
     def interpolation_points(self) -> TensorLike:
         return self.dof.interpolation_points()
 
+    # NOTE: the dof maps come from the interpolation point cache of the mesh,
+    # and are read-only NumPy arrays with the NumPy backend.
     def cell_to_dof(self, index: Index=_S) -> TensorLike:
         return self.dof.cell_to_dof(index=index)
 
@@ -0,0 +1,300 @@
+"""
+Notes
+-----
+    网格与有限元函数的检查点 (checkpoint) 存储, 用于长时间计算的断点续算。
+    支持三种格式:
+    - 目录: 每个数组一个 .npy 文件, 可以内存映射 (memory-map) 延迟加载;
+    - .npz: 单个压缩包文件;
+    - .h5/.hdf5: HDF5 文件, 需要 h5py。
+"""
+import os
+import json
+import importlib
+from typing import Any, Dict, Literal, Optional, Tuple
+
+import numpy as np
+
+from ..backend import backend_manager as bm
+
+__all__ = ['save_checkpoint', 'load_checkpoint', 'checkpoint_format']
+
+_Format = Literal['npy', 'npz', 'hdf5']
+_META = 'meta.json'
+
+
+def checkpoint_format(path: str, format: Optional[_Format]=None) -> _Format:
+    """Format of the checkpoint, given by the suffix of the path if None."""
+    if format is None:
+        ext = os.path.splitext(path)[1].lower()
+        if ext == '.npz':
+            return 'npz'
+        if ext in {'.h5', '.hdf5'}:
+            return 'hdf5'
+        return 'npy'
+    if format not in {'npy', 'npz', 'hdf5'}:
+        raise ValueError(f"Unknown checkpoint format '{format}'.")
+    return format
+
+
+def _import_h5py():
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("h5py is required for the HDF5 checkpoints. "
+                          "Use a .npz file or a directory instead.")
+    return h5py
+
+
+def save_checkpoint(path: str, arrays: Dict[str, Any], meta: Dict[str, Any], *,
+                    format: Optional[_Format]=None, compress: bool=False) -> None:
+    """Save arrays and JSON metadata to a checkpoint.
+
+    Parameters:
+        path (str): A directory, a .npz file or a .h5/.hdf5 file.
+        arrays (Dict[str, Tensor]): The arrays. Names can be nested by '/'.
+        meta (Dict[str, Any]): JSON serializable metadata.
+        format ('npy' | 'npz' | 'hdf5' | None, optional): The format. Given by
+            the suffix of the path if None. Defaults to None.
+        compress (bool, optional): Compress the arrays. Not available for the
+            directory format. Defaults to False.
+    """
+    format = checkpoint_format(path, format)
+    arrays = {name: np.ascontiguousarray(bm.to_numpy(val)) for name, val in arrays.items()}
+    text = json.dumps(meta)
+
+    if format == 'npy':
+        os.makedirs(path, exist_ok=True)
+        # Remove an older checkpoint in the directory, metadata first, so that
+        # its arrays are never mixed with the new ones.
+        meta_file = os.path.join(path, _META)
+        if os.path.exists(meta_file):
+            os.remove(meta_file)
+        for root, _, files in os.walk(path):
+            for fname in files:
+                if fname.endswith('.npy'):
+                    os.remove(os.path.join(root, fname))
+        for name, val in arrays.items():
+            fname = os.path.join(path, *name.split('/')) + '.npy'
+            os.makedirs(os.path.dirname(fname), exist_ok=True)
+            np.save(fname, val, allow_pickle=False)
+        # Write the metadata last, so an interrupted save is not loadable.
+        with open(os.path.join(path, _META), 'w') as f:
+            f.write(text)
+
+    elif format == 'npz':
+        arrays['__meta__'] = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+        savez = np.savez_compressed if compress else np.savez
+        tmp = path + '.tmp.npz'
+        savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    else:
+        h5py = _import_h5py()
+        options = {'compression': 'gzip'} if compress else {}
+        with h5py.File(path, 'w') as f:
+            for name, val in arrays.items():
+                chunks = True if val.ndim > 0 and val.size > 0 else None
+                f.create_dataset(name, data=val, chunks=chunks, **options)
+            f.attrs['meta'] = text
+
+
+def load_checkpoint(path: str, *, mmap: bool=False,
+                    format: Optional[_Format]=None) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Load the arrays and the metadata of a checkpoint.
+
+    Parameters:
+        path (str): The checkpoint.
+        mmap (bool, optional): Memory-map the arrays of the directory format
+            in copy-on-write mode, so they are read from the disk only when
+            they are accessed. The other formats read the arrays in memory.
+            Defaults to False.
+        format ('npy' | 'npz' | 'hdf5' | None, optional): The format. Given by
+            the suffix of the path if None. Defaults to None.
+
+    Returns:
+        Tuple[Dict[str, ndarray], Dict[str, Any]]: NumPy arrays and the metadata.
+    """
+    format = checkpoint_format(path, format)
+    arrays: Dict[str, np.ndarray] = {}
+
+    if format == 'npy':
+        with open(os.path.join(path, _META), 'r') as f:
+            meta = json.load(f)
+        mode = 'c' if mmap else None
+        for root, _, files in os.walk(path):
+            for fname in files:
+                if not fname.endswith('.npy'):
+                    continue
+                full = os.path.join(root, fname)
+                name = os.path.relpath(full, path)[:-4].replace(os.sep, '/')
+                arrays[name] = np.load(full, mmap_mode=mode, allow_pickle=False)
+
+    elif format == 'npz':
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(data['__meta__'].tobytes().decode('utf-8'))
+            for name in data.files:
+                if name != '__meta__':
+                    arrays[name] = data[name]
+
+    else:
+        h5py = _import_h5py()
+        with h5py.File(path, 'r') as f:
+            meta = json.loads(f.attrs['meta'])
+            def visit(name, obj):
+                if isinstance(obj, h5py.Dataset):
+                    arrays[name] = obj[()]
+            f.visititems(visit)
+
+    return arrays, meta
+
+
+##################################################
+### State encoding
+##################################################
+# NOTE: Objects are stored as JSON trees where the tensors are replaced by
+# references to the arrays, so that the arrays can be memory-mapped.
+
+def _dtype_name(value) -> Optional[str]:
+    if isinstance(value, np.dtype):
+        return value.name
+    if isinstance(value, type) and issubclass(value, np.generic):
+        return np.dtype(value).name
+    if type(value).__name__ == 'dtype' and type(value).__module__ == 'torch':
+        return str(value).split('.')[-1]
+    return None
+
+
+class StateEncoder():
+    """Encode the attributes of an object as JSON trees and arrays."""
+    def __init__(self, owner: Any, prefix: str):
+        self.owner = owner
+        self.prefix = prefix
+        self.arrays: Dict[str, Any] = {}
+        self._seen: Dict[int, str] = {}
+
+    def encode(self, value: Any, path: str):
+        if (value is None) or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, (np.integer, np.floating, np.bool_)):
+            return value.item()
+        if bm.is_tensor(value) or isinstance(value, np.ndarray):
+            if id(value) in self._seen: # shared tensors, e.g. edge2cell and face2cell
+                return {'__alias__': self._seen[id(value)]}
+            key = f'{self.prefix}/{path}'
+            self._seen[id(value)] = key
+            self.arrays[key] = value
+            return {'__array__': key}
+        name = _dtype_name(value)
+        if name is not None:
+            return {'__dtype__': name}
+        if isinstance(value, (list, tuple)):
+            items = [self.encode(v, f'{path}/{i}') for i, v in enumerate(value)]
+            return items if isinstance(value, list) else {'__tuple__': items}
+        if isinstance(value, dict):
+            if id(value) in self._seen: # e.g. facedata is edgedata in 2-d meshes
+                return {'__alias__': self._seen[id(value)]}
+            key = f'{self.prefix}/{path}'
+            self._seen[id(value)] = key
+            return {'__dict__': [[self.encode(k, f'{path}/key{i}'), self.encode(v, f'{path}/{k}')]
+                                 for i, (k, v) in enumerate(value.items())],
+                    '__id__': key}
+        if getattr(value, '__self__', None) is self.owner and hasattr(value, '__func__'):
+            return {'__method__': value.__func__.__name__}
+        if type(value).__name__ == 'device':
+            return {'__device__': str(value)}
+        raise TypeError(f"Can not save '{path}' of type {type(value).__name__}.")
+
+
+class StateDecoder():
+    """Decode the JSON trees made by `StateEncoder`."""
+    def __init__(self, owner: Any, arrays: Dict[str, np.ndarray], device=None):
+        self.owner = owner
+        self.arrays = arrays
+        self.device = device
+        self._loaded: Dict[str, Any] = {}
+
+    def tensor(self, key: str):
+        if key not in self._loaded:
+            array = self.arrays[key]
+            if bm.backend_name == 'numpy':
+                self._loaded[key] = array
+            else:
+                self._loaded[key] = bm.from_numpy(np.asarray(array))
+                if self.device is not None:
+                    self._loaded[key] = bm.device_put(self._loaded[key], self.device)
+        return self._loaded[key]
+
+    def decode(self, value: Any):
+        if isinstance(value, list):
+            return [self.decode(v) for v in value]
+        if not isinstance(value, dict):
+            return value
+        if '__array__' in value:
+            return self.tensor(value['__array__'])
+        if '__alias__' in value:
+            key = value['__alias__']
+            return self.tensor(key) if key in self.arrays else self._loaded[key]
+        if '__dtype__' in value:
+            return getattr(bm, value['__dtype__'])
+        if '__tuple__' in value:
+            return tuple(self.decode(v) for v in value['__tuple__'])
+        if '__dict__' in value:
+            result = {}
+            self._loaded[value['__id__']] = result
+            for k, v in value['__dict__']:
+                result[self.decode(k)] = self.decode(v)
+            return result
+        if '__method__' in value:
+            return getattr(self.owner, value['__method__'])
+        if '__device__' in value:
+            return self.device
+        raise ValueError(f"Unknown state entry {value}.")
+
+
+def class_path(cls: type) -> str:
+    return f'{cls.__module__}:{cls.__qualname__}'
+
+
+# NOTE: Class paths come from the metadata of the checkpoint, which may be
+# untrusted, so only subclasses of the expected base are accepted, and only
+# modules of this package are imported.
+_IMPORTABLE = 'fealpy.mesh'
+
+
+def _subclasses(base: type):
+    yield base
+    for sub in base.__subclasses__():
+        yield from _subclasses(sub)
+
+
+def import_class(path: str, base: type) -> type:
+    """Get the class of the path saved by `class_path`, which must be a
+    subclass of `base`.
+
+    Loaded subclasses of `base` are searched first, so classes defined
+    outside fealpy work once their module is imported. Otherwise only modules
+    under `fealpy.mesh` are imported.
+
+    Raises:
+        ValueError: If the path is malformed, or the class is neither loaded
+            nor under `fealpy.mesh`.
+        TypeError: If the class is not a subclass of `base`.
+    """
+    if (not isinstance(path, str)) or (path.count(':') != 1):
+        raise ValueError(f"Invalid class path {path!r} in the checkpoint.")
+    for cls in _subclasses(base):
+        if class_path(cls) == path:
+            return cls
+
+    module, qualname = path.split(':')
+    if (module != _IMPORTABLE) and (not module.startswith(_IMPORTABLE + '.')):
+        raise ValueError(f"Class '{path}' of the checkpoint is not a loaded "
+                         f"{base.__name__}, and only modules under '{_IMPORTABLE}' "
+                         "are imported by loading. Import its module first.")
+    obj = importlib.import_module(module)
+    for name in qualname.split('.'):
+        obj = getattr(obj, name)
+    if not (isinstance(obj, type) and issubclass(obj, base)):
+        raise TypeError(f"The checkpoint contains '{path}', "
+                        f"which is not a {base.__name__}.")
+    return obj
@@ -1,4 +1,6 @@
 import numpy as np
+
+from ..backend import backend_manager as bm
 from ..common.Tools import angle
 
 class DartMesh3d():
@@ -25,25 +27,25 @@ class DartMesh3d():
         """!
         @brief 输入一个四面体或六面体网格，将其转化为 dart 数据结构。
         """
-        NE = mesh.number_of_edges()
         NF = mesh.number_of_faces()
         NC = mesh.number_of_cells()
 
-        node = mesh.entity('node')
-        face = mesh.entity('face')
-        cell = mesh.entity('cell')
+        ds = getattr(mesh, 'ds', mesh) # 旧版网格的拓扑关系在 mesh.ds 中
+        to_numpy = lambda a: np.asarray(bm.to_numpy(a))
+        node = to_numpy(mesh.entity('node'))
+        cell = to_numpy(mesh.entity('cell'))
 
-        locF2E = mesh.ds.localFace2edge
-        locE2F = mesh.ds.localEdge2face
-        locEdge = mesh.ds.localEdge
-        cell2edge = mesh.ds.cell_to_edge()
-        cell2face = mesh.ds.cell_to_face()
-        face2edge = mesh.ds.face_to_edge()
-        face2cell = mesh.ds.face_to_cell()
+        locF2E = to_numpy(ds.localFace2edge)
+        locE2F = to_numpy(ds.localEdge2face)
+        locEdge = to_numpy(ds.localEdge)
+        cell2edge = to_numpy(ds.cell_to_edge())
+        cell2face = to_numpy(ds.cell_to_face())
+        face2edge = to_numpy(ds.face_to_edge())
+        face2cell = to_numpy(ds.face_to_cell())
 
-        NEC = mesh.ds.NEC
-        NFC = mesh.ds.NFC
-        NVF = mesh.ds.NVF
+        NEC = locEdge.shape[0]
+        NFC = locF2E.shape[0]
+        NVF = locF2E.shape[1]
 
         ND = 2*NEC*NC
         dart = -np.ones([ND, 7], dtype=np.int_)
@@ -117,7 +119,7 @@ class DartMesh3d():
         NC = self.number_of_cells()
 
         ######## 生成对偶网格的节点##########
-        newnode = np.zeros([NC+NBN+NBE+NBF, 3], dtype=np.float_)
+        newnode = np.zeros([NC+NBN+NBE+NBF, 3], dtype=np.float64)
         newnode[NC:NC+NBN] = node[bnode]
         if dual_point=='barycenter':
             newnode[:NC] = self.entity_barycenter('cell')
@@ -354,29 +356,14 @@ class DartMesh3d():
         elif entityType=='face':
             face, faceLoc = self.ds.face_to_node(index=index)
             NV = (faceLoc[1:] - faceLoc[:-1]).reshape(-1, 1)
-            NF = len(NV)
-
-            bary = np.zeros([NF, 3], dtype=np.float_)
-            isNotOK = np.ones(NF, dtype=np.bool_)
-            start = faceLoc[:-1].copy()
-            while np.any(isNotOK):
-                bary[isNotOK] = bary[isNotOK] + node[face[start[isNotOK]]]/NV[isNotOK]
-                start[isNotOK] = start[isNotOK] + 1
-                isNotOK = start < faceLoc[1:]
+            bary = np.add.reduceat(node[face], faceLoc[:-1], axis=0)/NV
             return bary
         elif entityType=='cell':
             cell, cellLoc = self.ds.cell_to_node()
             NV = (cellLoc[1:] - cellLoc[:-1]).reshape(-1, 1)
-            NC = self.number_of_cells()
-
-            bary = np.zeros([NC, 3], dtype=np.float_)
-            isNotOK = np.ones(NC, dtype=np.bool_)
-            start = cellLoc[:-1].copy()
-            while np.any(isNotOK):
-                bary[isNotOK] = bary[isNotOK] + node[cell[start[isNotOK]]]/NV[isNotOK]
-                start[isNotOK] = start[isNotOK] + 1
-                isNotOK = start < cellLoc[1:]
+            bary = np.add.reduceat(node[cell], cellLoc[:-1], axis=0)/NV
             return bary[index]
+
     def entity_circumcenter(self, entityType='cell', index=np.s_[:]):
         '''!
         @brief 计算四面体, 三角形的外接球球心
@@ -403,12 +390,12 @@ class DartMesh3d():
 
             l = np.sum(node**2, axis=1)/2
             NC = self.number_of_cells()
-            A = np.zeros([NC, 3, 3], dtype=np.float_)
+            A = np.zeros([NC, 3, 3], dtype=np.float64)
             A[:, :, 0] = node[cell[1::4]]-node[cell[::4]]
             A[:, :, 1] = node[cell[2::4]]-node[cell[::4]]
             A[:, :, 2] = node[cell[3::4]]-node[cell[::4]]
             A = np.linalg.inv(A)
-            B = np.zeros([NC, 3], dtype=np.float_)
+            B = np.zeros([NC, 3], dtype=np.float64)
             B[:, 0] = l[cell[1::4]] - l[cell[::4]]
             B[:, 1] = l[cell[2::4]] - l[cell[::4]]
             B[:, 2] = l[cell[3::4]] - l[cell[::4]]
@@ -430,86 +417,56 @@ class DartMesh3d():
     def number_of_cells(self):
         return len(self.ds.hcell)
 
-    def to_vtk(self, fname):
-        import vtk
-        import vtk.util.numpy_support as vnp
+    def polyhedron_faces(self):
+        """!
+        @brief 生成 VTK 多面体单元 (VTK_POLYHEDRON) 的 faces 与 faceoffsets 数组
 
+        @return faces, faceoffsets. 第 i 个单元的数据为
+                faces[faceoffsets[i-1]:faceoffsets[i]] = [NF, NV0, v0, v1, ..., NV1, ...],
+                其中 NF 为单元的面数, NVj 为第 j 个面的顶点数, 之后为它的顶点.
+        """
         NC = self.number_of_cells()
-
-        node = self.node
-        cell, cellLoc = self.ds.cell_to_node()
         face, faceLoc = self.ds.face_to_node()
         cell2face, cell2faceLoc = self.ds.cell_to_face()
+        NFC = cell2faceLoc[1:] - cell2faceLoc[:-1]
+        NVF = (faceLoc[1:] - faceLoc[:-1])[cell2face]
+
+        # 依次排列的数据段: 每个单元一个长为 1 的段 (面数), 随后是每个面一个长为
+        # 1 + NVF 的段 (顶点数与顶点)
+        c = np.repeat(np.arange(NC), NFC)
+        fseg = np.arange(len(cell2face)) + c + 1 # 面所在的段
+        cseg = cell2faceLoc[:-1] + np.arange(NC) # 单元所在的段
+        length = np.ones(NC+len(cell2face), dtype=np.int_)
+        length[fseg] = NVF + 1
+        start = np.zeros(len(length)+1, dtype=np.int_)
+        start[1:] = np.cumsum(length)
+
+        faces = np.zeros(start[-1], dtype=np.int_)
+        faces[start[cseg]] = NFC
+        faces[start[fseg]] = NVF
+
+        # 面的顶点, 第 k 个 (单元, 面) 对的顶点放在 start[fseg[k]]+1 之后
+        k = np.repeat(np.arange(len(cell2face)), NVF)
+        j = np.arange(len(k)) - np.repeat(np.cumsum(NVF) - NVF, NVF)
+        faces[start[fseg][k] + 1 + j] = face[faceLoc[cell2face][k] + j]
+
+        faceoffsets = start[cseg + NFC + 1]
+        return faces, faceoffsets
+
+    def to_vtk(self, fname, compress=False):
+        """!
+        @brief 把网格写为 .vtu 文件, 单元为 VTK 多面体, 不依赖 vtk 包
+        """
+        from .vtu_writer import write_vtu
+        from .vtkCellTypes import VTK_POLYHEDRON
 
-        points = vtk.vtkPoints()
-        points.SetData(vnp.numpy_to_vtk(node))
-
-        uGrid = vtk.vtkUnstructuredGrid()
-        uGrid.SetPoints(points)
-        for i in range(NC):
-            FacesIdList = vtk.vtkIdList()
-
-            F = cell2faceLoc[i+1]-cell2faceLoc[i]
-            FacesIdList.InsertNextId(F)
-
-            fl = cell2faceLoc[i]
-            for j in range(F):
-                f = face[faceLoc[cell2face[fl+j]]:faceLoc[cell2face[fl+j]+1]]
-                FacesIdList.InsertNextId(len(f))
-                [FacesIdList.InsertNextId(k) for k in f]
-
-            uGrid.InsertNextCell(vtk.VTK_POLYHEDRON, FacesIdList)
-
-        pdata = uGrid.GetPointData()
-        if self.nodedata:
-            nodedata = self.nodedata
-            for key, val in nodedata.items():
-                if val is not None:
-                    if len(val.shape) == 2 and val.shape[1] == 2:
-                        shape = (val.shape[0], 3)
-                        val1 = np.zeros(shape, dtype=val.dtype)
-                        val1[:, 0:2] = val
-                    else:
-                        val1 = val
-
-                    if val1.dtype == np.bool_:
-                        d = vnp.numpy_to_vtk(val1.astype(np.int_))
-                    else:
-                        d = vnp.numpy_to_vtk(val1[:])
-                    d.SetName(key)
-                    pdata.AddArray(d)
-
-        if self.celldata:
-            celldata = self.celldata
-            cdata = uGrid.GetCellData()
-            for key, val in celldata.items():
-                if val is not None:
-                    if len(val.shape) == 2 and val.shape[1] == 2:
-                        shape = (val.shape[0], 3)
-                        val1 = np.zeros(shape, dtype=val.dtype)
-                        val1[:, 0:2] = val
-                    else:
-                        val1 = val
-
-                    if val1.dtype == np.bool_:
-                        d = vnp.numpy_to_vtk(val1.astype(np.int_))
-                    else:
-                        d = vnp.numpy_to_vtk(val1[:])
-
-                    d.SetName(key)
-                    cdata.AddArray(d)
-
-        writer = vtk.vtkXMLUnstructuredGridWriter()
-        writer.SetFileName(fname)
-        writer.SetInputData(uGrid)
-        writer.Write()
+        cell, cellLoc = self.ds.cell_to_node()
+        faces = self.polyhedron_faces()
+        write_vtu(fname, self.node, (cell, cellLoc[1:]), VTK_POLYHEDRON,
+                  nodedata=self.nodedata, celldata=self.celldata,
+                  compress=compress, faces=faces)
 
     def print(self):
-        NN = self.number_of_nodes()
-        NE = self.number_of_edges()
-        NF = self.number_of_faces()
-        NC = self.number_of_cells()
-
         print("hcell:")
         for i, val in enumerate(self.ds.hcell):
             print(i, ':', val)
@@ -527,35 +484,52 @@ class DartMesh3d():
         for i, val in enumerate(edge):
             print(i, ":", val)
 
-        print("face:")
-        face, faceLoc = self.ds.face_to_node()
-        for i in range(NF):
-            print(i, ":", face[faceLoc[i]:faceLoc[i+1]])
-
-        print("face2edge:")
-        face2edge, face2edgeLoc = self.ds.face_to_edge()
-        for i in range(NF):
-            print(i, ":", face2edge[face2edgeLoc[i]:face2edgeLoc[i+1]])
+        csr = [("face", self.ds.face_to_node()),
+               ("face2edge", self.ds.face_to_edge())]
+        for name, (val, loc) in csr:
+            print(name+":")
+            for i, v in enumerate(np.split(val, loc[1:-1])):
+                print(i, ":", v)
 
         print("face2cell:")
         face2cell = self.ds.face_to_cell()
         for i, val in enumerate(face2cell):
             print(i, ":", val)
 
-        print("cell:")
-        cell, cellLoc = self.ds.cell_to_node()
-        for i in range(NC):
-            print(i, ":", cell[cellLoc[i]:cellLoc[i+1]])
-
-        print("cell2edge:")
-        cell2edge, cell2edgeLoc = self.ds.cell_to_edge()
-        for i in range(NC):
-            print(i, ":", cell2edge[cell2edgeLoc[i]:cell2edgeLoc[i+1]])
+        csr = [("cell", self.ds.cell_to_node()),
+               ("cell2edge", self.ds.cell_to_edge()),
+               ("cell2face", self.ds.cell_to_face())]
+        for name, (val, loc) in csr:
+            print(name+":")
+            for i, v in enumerate(np.split(val, loc[1:-1])):
+                print(i, ":", v)
+
+def pairs_to_csr(row, col, nrow: int, ncol: int, return_index=False):
+    """!
+    @brief 对 (row, col) 关系对去重, 并按 row 分组为 CSR 格式
+
+    @return col, location, 第 i 行为 col[location[i]:location[i+1]], 按升序排列.
+            若 return_index 为真, 还返回每一对第一次出现的位置.
+    """
+    key = row.astype(np.int64)*ncol + col
+    # 直接排序去重, 比 np.unique 快
+    if return_index:
+        index = np.argsort(key, kind='stable')
+        key = key[index]
+    else:
+        key = np.sort(key)
+    flag = np.ones(len(key), dtype=np.bool_)
+    flag[1:] = key[1:] != key[:-1]
+    key = key[flag]
+    if return_index:
+        index = index[flag]
+    location = np.zeros(nrow+1, dtype=np.int_)
+    location[1:] = np.cumsum(np.bincount(key//ncol, minlength=nrow))
+    col = (key % ncol).astype(np.int_)
+    if return_index:
+        return col, location, index
+    return col, location
 
-        print("cell2face:")
-        cell2face, cell2faceLoc = self.ds.cell_to_face()
-        for i in range(NC):
-            print(i, ":", cell2face[cell2faceLoc[i]:cell2faceLoc[i+1]])
 
 class DartMeshDataStructure():
     def __init__(self, dart):
@@ -576,106 +550,69 @@ class DartMeshDataStructure():
         self.hface[dart[:, 2]] = np.arange(ND)  
         self.hcell[dart[:, 3]] = np.arange(ND) 
 
-    def cell_to_face(self, index=np.s_[:]):
-        cf = self.dart[:, [3, 2]]
-        NC = len(self.hcell)
-
-        cell2face = np.unique(cf, axis=0)
-        cell2faceLocation = np.zeros(NC+1, dtype=np.int_)
-        np.add.at(cell2faceLocation[1:], cell2face[:, 0], 1)
+    def _to_csr(self, i, j, return_index=False):
+        """!
+        @brief 由 dart 的第 i, j 列得到 CSR 格式的拓扑关系
+        """
+        NEntity = [len(self.hnode), len(self.hedge), len(self.hface), len(self.hcell)]
+        return pairs_to_csr(self.dart[:, i], self.dart[:, j], NEntity[i],
+                            NEntity[j], return_index=return_index)
 
-        cell2faceLocation[:] = np.cumsum(cell2faceLocation)
-        return cell2face[:, 1], cell2faceLocation
+    def cell_to_face(self, index=np.s_[:]):
+        return self._to_csr(3, 2)
 
     def cell_to_edge(self):
-        ce = self.dart[:, [3, 1]]
-        NC = len(self.hcell)
-
-        cell2edge = np.unique(ce, axis=0)
-        cell2edgeLocation = np.zeros(NC+1, dtype=np.int_)
-        np.add.at(cell2edgeLocation[1:], cell2edge[:, 0], 1)
-
-        cell2edgeLocation[:] = np.cumsum(cell2edgeLocation)
-        return cell2edge[:, 1], cell2edgeLocation
+        return self._to_csr(3, 1)
 
     def cell_to_node(self):
-        cv = self.dart[:, [3, 0]]
-        NC = len(self.hcell)
-
-        cell2node = np.unique(cv, axis=0)
-        cell2nodeLocation = np.zeros(NC+1, dtype=np.int_)
-        np.add.at(cell2nodeLocation[1:], cell2node[:, 0], 1)
-
-        cell2nodeLocation[:] = np.cumsum(cell2nodeLocation)
-        return cell2node[:, 1], cell2nodeLocation
+        return self._to_csr(3, 0)
 
     def cell_to_cell(self):
         dart = self.dart
-        cf = dart[:, [3, 2]]
-        NC = len(self.hcell)
-
-        cell2face, dartIdx = np.unique(cf, axis=0, return_index=True)
+        _, cell2cellLocation, dartIdx = self._to_csr(3, 2, return_index=True)
         cell2cell = dart[dart[dartIdx, 6], 3] 
-
-        cell2cellLocation = np.zeros(NC+1, dtype=np.int_)
-        np.add.at(cell2cellLocation[1:], cell2face[:, 0], 1)
-
-        cell2cellLocation[:] = np.cumsum(cell2cellLocation)
         return cell2cell, cell2cellLocation
 
-    def face_to_edge(self):
-        NF = len(self.hface)
+    def number_of_vertices_of_faces(self):
+        """!
+        @brief 每个面的顶点个数, 即面在 hface 所在单元中的 dart 个数
+        """
         dart = self.dart
+        NF = len(self.hface)
+        flag = dart[:, 3] == dart[self.hface[dart[:, 2]], 3]
+        return np.bincount(dart[flag, 2], minlength=NF)
 
-        # get the number of edge of face
-        NEF = np.zeros(NF, dtype=np.int_) 
-        fe = dart[:, [2, 1]]
-        f2e = np.unique(fe, axis=0) #没有定向的 face2edge
-        np.add.at(NEF, f2e[:, 0], 1)
+    def _face_loop(self, i, index=np.s_[:]):
+        """!
+        @brief 沿着 b1 遍历每个面的 dart, 按面的定向收集 dart 的第 i 列
+        """
+        dart = self.dart
+        hface = self.hface[index]
+        N = len(hface)
 
-        f2e = f2e[:, 1]
-        f2eLocation = np.zeros(NF+1, dtype=np.int_)
-        f2eLocation[1:] = np.cumsum(NEF)
+        location = np.zeros(N+1, dtype=np.int_)
+        location[1:] = np.cumsum(self.number_of_vertices_of_faces()[index])
 
-        f2e[:] = 0 
-        current = self.hface.copy() #循环的dart
-        idx = f2eLocation[:-1].copy() #循环的 f2e 索引
-        isNotOK = np.ones(NF, dtype=np.bool_)
+        # 每一步处理所有面上的一个 dart, 循环次数为面的最大顶点数
+        val = np.zeros(location[-1], dtype=np.int_) 
+        current = hface.copy() #循环的dart
+        idx = location[:-1].copy() #循环的索引
+        isNotOK = idx < location[1:]
         while np.any(isNotOK):
-            f2e[idx[isNotOK]] = dart[current[isNotOK], 1]
+            val[idx[isNotOK]] = dart[current[isNotOK], i]
             current[isNotOK] = dart[current[isNotOK], 4]
             idx[isNotOK] += 1
-            isNotOK = idx < f2eLocation[1:]
-        return f2e, f2eLocation
+            isNotOK = idx < location[1:]
+        return val, location
+
+    def face_to_edge(self):
+        return self._face_loop(1)
 
     def face_to_node(self, index=np.s_[:]):
         """!
         @brief 获得每个面的顶点，顶点按照面的定向逆时针排列.
         """
-        NF = len(self.hface)
-        dart = self.dart
-
-        # get the number of vertex of face
-        NVF = np.zeros(NF, dtype=np.int_) 
-        fn = dart[:, [2, 0]]
-        f2n = np.unique(fn, axis=0) #没有定向的 face2node
-        np.add.at(NVF, f2n[:, 0], 1)
-
-        N = len(self.hface[index])
-        f2nLocation = np.zeros(N+1, dtype=np.int_)
-        f2nLocation[1:] = np.cumsum(NVF[index])
-
-        f2n = np.zeros(f2nLocation[-1], dtype=np.int_) 
-
-        current = self.hface[index].copy() #循环的dart
-        idx = f2nLocation[:-1].copy() #循环的 f2n 索引
-        isNotOK = np.ones(N, dtype=np.bool_)
-        while np.any(isNotOK):
-            f2n[idx[isNotOK]] = dart[current[isNotOK], 0]
-            current[isNotOK] = dart[current[isNotOK], 4]
-            idx[isNotOK] += 1
-            isNotOK = idx < f2nLocation[1:]
-        return f2n, f2nLocation
+        return self._face_loop(0, index=index)
 
     def face_to_cell(self):
         """!
@@ -691,20 +628,11 @@ class DartMeshDataStructure():
         f2c[:, 1] = dart[dart[hface, 6], 3]
 
         cell2face, cell2faceLoc = self.cell_to_face()
-
-        i = 0
-        c = np.arange(NC)
-        isNotOK = np.ones(NC, dtype=np.bool_)
-        idx = cell2faceLoc[:-1].copy()
-        while np.any(isNotOK):
-            f = cell2face[idx[isNotOK]]
-            flag = f2c[f, 0]==c[isNotOK]
-            f2c[f[flag], 2] = i
-            f2c[f[~flag], 3] = i
-
-            idx[isNotOK] = idx[isNotOK]+1
-            isNotOK = idx < cell2faceLoc[1:]
-            i += 1
+        c = np.repeat(np.arange(NC), cell2faceLoc[1:] - cell2faceLoc[:-1])
+        i = np.arange(len(cell2face)) - cell2faceLoc[c] # 面在单元中的局部编号
+        flag = f2c[cell2face, 0] == c
+        f2c[cell2face[flag], 2] = i[flag]
+        f2c[cell2face[~flag], 3] = i[~flag]
 
         flag = f2c[:, 3]<0
         f2c[flag, 3] = f2c[flag, 2]
@@ -721,22 +649,24 @@ class DartMeshDataStructure():
         return e2n
 
     def edge_to_face(self):
-        pass
+        return self._to_csr(1, 2)
 
     def edge_to_cell(self):
-        pass
+        return self._to_csr(1, 3)
 
     def node_to_node(self):
-        pass
+        NN = len(self.hnode)
+        edge = self.edge_to_node()
+        return pairs_to_csr(edge.reshape(-1), edge[:, ::-1].reshape(-1), NN, NN)
 
     def node_to_edge(self):
-        pass
+        return self._to_csr(0, 1)
 
     def node_to_face(self):
-        pass
+        return self._to_csr(0, 2)
 
     def node_to_cell(self):
-        pass
+        return self._to_csr(0, 3)
 
     def boundary_dart_flag(self):
         ND = len(self.dart)
@@ -37,7 +37,7 @@ class EdgeMesh(SimplexMesh, Plotable):
         @brief 返回第 k 个高斯积分公式。
         """
         from ..quadrature import GaussLegendreQuadrature
-        return GaussLegendreQuadrature(q, dtype=self.ftype, device=self.device)
+        return GaussLegendreQuadrature.shared(q, dtype=self.ftype, device=self.device)
 
     def edge_tangent(self,index = None):
         edge = self.entity('edge', index=index)
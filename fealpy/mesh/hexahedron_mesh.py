@@ -3,6 +3,7 @@ from typing import Union, Optional
 from math import sqrt
 from ..backend import backend_manager as bm
 from .mesh_base import TensorMesh
+from .utils import ipoint_cache
 from ..typing import TensorLike, Index, _S
 from .plot import Plotable
 
@@ -55,13 +56,13 @@ class HexahedronMesh(TensorMesh, Plotable):
         @brief 获取不同维度网格实体上的积分公式
         """
         from ..quadrature import GaussLegendreQuadrature, TensorProductQuadrature
-        qf = GaussLegendreQuadrature(q, dtype=self.ftype, device=self.device)
+        qf = GaussLegendreQuadrature.shared(q, dtype=self.ftype, device=self.device)
         if etype in {'cell', 3}:
-            return TensorProductQuadrature((qf, qf, qf))
+            return TensorProductQuadrature.shared((qf, qf, qf))
         elif etype in {'face', 2}:
-            return TensorProductQuadrature((qf, qf))
+            return TensorProductQuadrature.shared((qf, qf))
         elif etype in {'edge', 1}:
-            return TensorProductQuadrature((qf,))
+            return TensorProductQuadrature.shared((qf,))
         else:
             raise ValueError(f"entity type: {etype} is wrong!")
 
@@ -139,6 +140,7 @@ class HexahedronMesh(TensorMesh, Plotable):
         G = bm.concatenate(data, axis=-1).reshape(shape)
         return G
 
+    @ipoint_cache
     def interpolation_points(self, p, index=_S):
         """
         @brief Generate interpolation points for the entire mesh
@@ -159,12 +161,14 @@ class HexahedronMesh(TensorMesh, Plotable):
 
         return ipoint
 
+    @ipoint_cache
     def face_to_ipoint(self, p, index=_S):
         """
         @brief 生成每个面上的插值点全局编号
         """
         return self.quad_to_ipoint(p, index)
 
+    @ipoint_cache
     def cell_to_ipoint(self, p, index=_S):
         """!
         @brief Generate global indices for interpolation points in each cell
@@ -696,7 +700,7 @@ class HexahedronMesh(TensorMesh, Plotable):
         return cls(node, cell)
 
     def to_vtk(self, fname=None, etype='cell', index:Index=_S):
-        from .vtk_extent import  write_to_vtu
+        from .vtu_writer import write_vtu
 
         node = self.entity('node')
         GD = self.geo_dimension()
@@ -722,7 +726,7 @@ class HexahedronMesh(TensorMesh, Plotable):
             return node, cell.flatten(), cellType, NC
         else:
             print("Writting to vtk...")
-            write_to_vtu(fname, node, NC, cellType, cell.flatten(),
+            write_vtu(fname, node, cell.flatten(), cellType,
                     nodedata=self.nodedata,
                     celldata=celldata)
 
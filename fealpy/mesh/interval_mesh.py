@@ -4,7 +4,7 @@ from ..typing import TensorLike , Index, _S,_int_func
 from .. import logger
 from scipy.sparse import coo_matrix
 from .mesh_data_structure import MeshDS
-from .utils import estr2dim
+from .utils import estr2dim, simplex_basis_table
 from .plot import Plotable
 from .mesh_base import SimplexMesh
 
@@ -82,7 +82,7 @@ class IntervalMesh(SimplexMesh,Plotable):
             etype = estr2dim(self, etype)
         kwargs = {'dtype': self.ftype, 'device': self.device}
         if etype == 1:
-            quad = GaussLegendreQuadrature(q, **kwargs)
+            quad = GaussLegendreQuadrature.shared(q, **kwargs)
         else:
             raise ValueError(f"Unsupported entity or top-dimension: {etype}")
 
@@ -281,7 +281,7 @@ class IntervalMesh(SimplexMesh,Plotable):
         -----
         把网格转化为 VTK 的格式
         """
-        from fealpy.mesh.vtk_extent import  write_to_vtu
+        from .vtu_writer import write_vtu
 
         node = self.entity('node')
         GD = self.geo_dimension()
@@ -300,7 +300,7 @@ class IntervalMesh(SimplexMesh,Plotable):
             return node, cell.flatten(), cellType, NC
         else:
             print("Writting to vtk...")
-            write_to_vtu(fname, node, NC, cellType, cell.flatten(),
+            write_vtu(fname, node, cell.flatten(), cellType,
                     nodedata=self.nodedata,
                     celldata=self.celldata)
     
@@ -418,10 +418,7 @@ class IntervalMesh(SimplexMesh,Plotable):
     # shape function
     def shape_function(self, bcs: TensorLike, p: int=1, *, index: Index=_S,
                        variables: str='u', mi: Optional[TensorLike]=None) -> TensorLike:
-        TD = bcs.shape[-1] - 1
-        if mi is None:
-            mi = bm.multi_index_matrix(p, TD, dtype=self.itype)
-        phi = bm.simplex_shape_function(bcs, p, mi)
+        phi = simplex_basis_table(bcs, p, mi)
         if variables == 'u':
             return phi
         elif variables == 'x':
@@ -432,10 +429,7 @@ class IntervalMesh(SimplexMesh,Plotable):
 
     def grad_shape_function(self, bcs: TensorLike, p: int=1, *, index: Index=_S,
                             variables: str='u', mi: Optional[TensorLike]=None) -> TensorLike:
-        TD = bcs.shape[-1] - 1
-        if mi is None:
-            mi = bm.multi_index_matrix(p, TD, dtype=self.itype)
-        R = bm.simplex_grad_shape_function(bcs, p, mi) # (NQ, ldof, bc)
+        R = simplex_basis_table(bcs, p, mi, order=1) # (NQ, ldof, bc)
         if variables == 'u':
             return R
         elif variables == 'x':
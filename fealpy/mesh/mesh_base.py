@@ -1,5 +1,5 @@
 
-from typing import Union, Optional, Sequence, Tuple, Any
+from typing import Union, Optional, Sequence, Tuple, Any, Dict
 
 from ..backend import backend_manager as bm
 from ..typing import TensorLike, Index, _S
@@ -7,7 +7,8 @@ from .. import logger
 from ..quadrature import Quadrature
 from .mesh_data_structure import MeshDS
 from .utils import (
-    estr2dim, simplex_gdof, simplex_ldof, tensor_gdof, tensor_ldof
+    estr2dim, simplex_gdof, simplex_ldof, tensor_gdof, tensor_ldof, ipoint_cache,
+    reference_basis_cache, simplex_basis_table
 )
 
 
@@ -129,6 +130,7 @@ class Mesh(MeshDS):
         return self.quadrature_formula(q, etype, qtype)
 
     # ipoints
+    @ipoint_cache
     def edge_to_ipoint(self, p: int, index: Index=_S) -> TensorLike:
         """Get the relationship between edges and integration points."""
         NN = self.number_of_nodes()
@@ -182,6 +184,99 @@ class Mesh(MeshDS):
                             variables: str='u', mi: Optional[TensorLike]=None) -> TensorLike:
         raise NotImplementedError(f"hess shape function is not supported by {self.__class__.__name__}")
 
+    # checkpoint
+    _CHECKPOINT_SKIP = ('_entity_factory', '_ipoint_cache')
+
+    def save(self, path: str, *, data: Optional[Dict[str, Any]]=None,
+             format: Optional[str]=None, compress: bool=False) -> None:
+        """Save the mesh with the constructed topology to a checkpoint.
+
+        All attributes of the mesh are saved, including the entities, the
+        topological relations like `face2cell` and `cell2edge`, and the data
+        like `nodedata` and `celldata`. Loading does not call `construct()`.
+
+        Parameters:
+            path (str): A directory of .npy files, which can be memory-mapped
+                on loading, a .npz file, or a .h5/.hdf5 file (requires h5py).
+            data (Dict[str, Any], optional): Extra tensors and `Function`s to
+                save, e.g. solutions and the time step. Defaults to None.
+            format ('npy' | 'npz' | 'hdf5' | None, optional): The format. Given
+                by the suffix of the path if None. Defaults to None.
+            compress (bool, optional): Compress the arrays of .npz and HDF5
+                files. Defaults to False.
+        """
+        from .checkpoint import StateEncoder, save_checkpoint, class_path
+
+        encoder = StateEncoder(self, 'mesh')
+        state = {k: encoder.encode(v, k) for k, v in self.__dict__.items()
+                 if k not in self._CHECKPOINT_SKIP}
+        meta = {'class': class_path(self.__class__), 'backend': bm.backend_name,
+                'state': state, 'data': {}}
+
+        data_encoder = StateEncoder(None, 'data')
+        for name, value in ({} if data is None else data).items():
+            if hasattr(value, 'space') and hasattr(value, 'array'): # Function
+                meta['data'][name] = {'function': data_encoder.encode(value.array, name),
+                                      'coordtype': value.coordtype}
+            else:
+                meta['data'][name] = data_encoder.encode(value, name)
+
+        save_checkpoint(path, {**encoder.arrays, **data_encoder.arrays}, meta,
+                        format=format, compress=compress)
+
+    @classmethod
+    def load(cls, path: str, *, mmap: bool=False, device=None, format: Optional[str]=None,
+             return_data: bool=False):
+        """Load a mesh saved by `Mesh.save`.
+
+        The class of the checkpoint must be a subclass of `cls`. For safety,
+        only modules under `fealpy.mesh` are imported by loading; import the
+        module of a mesh class defined elsewhere before loading.
+
+        Parameters:
+            path (str): The checkpoint.
+            mmap (bool, optional): Memory-map the arrays of a directory
+                checkpoint, so they are read lazily from the disk. They are
+                copy-on-write, so the files are never modified. Defaults to False.
+            device (Any, optional): Device of the tensors. Defaults to None.
+            format ('npy' | 'npz' | 'hdf5' | None, optional): The format. Given
+                by the suffix of the path if None. Defaults to None.
+            return_data (bool, optional): Also return the extra data. Functions
+                are returned as dicts with `array` and `coordtype`, to be rebuilt
+                by `space.function(array=...)`. Defaults to False.
+
+        Returns:
+            Mesh | Tuple[Mesh, Dict[str, Any]]: The mesh, and the extra data
+                if return_data is True.
+        """
+        from .checkpoint import StateDecoder, load_checkpoint, import_class
+
+        arrays, meta = load_checkpoint(path, mmap=mmap, format=format)
+        mesh_class = import_class(meta['class'], cls)
+
+        mesh = mesh_class.__new__(mesh_class)
+        decoder = StateDecoder(mesh, arrays, device)
+        state = meta['state']
+        MeshDS.__init__(mesh, TD=state['TD'], itype=decoder.decode(state['itype']),
+                        ftype=decoder.decode(state['ftype']))
+        factory = mesh._entity_factory
+        for key, value in state.items():
+            mesh.__dict__[key] = decoder.decode(value)
+        mesh._entity_factory = factory
+
+        if not return_data:
+            return mesh
+
+        data_decoder = StateDecoder(None, arrays, device)
+        data = {}
+        for name, value in meta['data'].items():
+            if isinstance(value, dict) and 'function' in value:
+                data[name] = {'array': data_decoder.decode(value['function']),
+                              'coordtype': value['coordtype']}
+            else:
+                data[name] = data_decoder.decode(value)
+        return mesh, data
+
     # tools
     def paraview(self, file_name = "temp.vtu",
             background_color='1.0, 1.0, 1.0',
@@ -313,6 +408,7 @@ class Mesh(MeshDS):
         renderWindowInteractor.Start()
         
         #自适应标记工具 
+    @staticmethod
     def mark(eta, theta, method='L2'):
         isMarked = bm.zeros(len(eta), dtype=bm.bool)
         if method == 'MAX':
@@ -322,21 +418,44 @@ class Mesh(MeshDS):
             # isMarked[eta < theta*bm.max(eta)] = True
             isMarked = bm.set_at(isMarked,(eta < theta*bm.max(eta)),True)
         elif method == 'L2':
-            eta = eta**2
-            
-            idx = bm.flip(bm.argsort(eta))
-            # idx = bm.argsort(eta)[-1::-1]
-        
-            x = bm.cumsum(eta[idx], axis=0)
-            # isMarked[idx[x < theta*x[-1]]] = True
-            # isMarked[idx[0]] = True
-            isMarked = bm.set_at(isMarked,(idx[x < theta*x[-1]]),True)
-            isMarked = bm.set_at(isMarked,(idx[0]),True)
-
+            isMarked = bm.set_at(isMarked, Mesh._dorfler_index(eta**2, theta), True)
         else:
             raise ValueError("I have not code the method")
         return isMarked 
 
+    @staticmethod
+    def _dorfler_index(eta2, theta, nsort=1024):
+        """
+        @brief Dörfler 标记, 返回 eta2 降序排列后前缀和小于 theta*sum(eta2)
+        的单元编号, 且至少包含 eta2 最大的单元
+
+        @note 用 argpartition 按和做快速选择, 平均复杂度为 O(NC), 只有最后
+        不超过 nsort 个候选单元才做排序.
+        """
+        idx = bm.arange(len(eta2))
+        bound = theta*bm.sum(eta2)
+        acc = 0.0
+        selected = []
+        while len(idx) > nsort:
+            k = len(idx)//2
+            # 把候选中最大的 k 个换到后面
+            part = bm.argpartition(eta2[idx], len(idx) - k)
+            upper = idx[part[-k:]]
+            s = acc + bm.sum(eta2[upper])
+            if s < bound: # 这 k 个单元都被标记, 在剩下的单元中继续
+                selected.append(upper)
+                acc = s
+                idx = idx[part[:-k]]
+            else:
+                idx = upper
+        idx = idx[bm.flip(bm.argsort(eta2[idx]))]
+        x = acc + bm.cumsum(eta2[idx], axis=0)
+        selected.append(idx[x < bound])
+        selected = bm.concatenate(selected)
+        if len(selected) == 0:
+            selected = bm.argmax(eta2)[None]
+        return selected
+
 class HomogeneousMesh(Mesh):
     # entity
     def entity_barycenter(self, etype: Union[int, str], index: Optional[Index]=None) -> TensorLike:
@@ -346,6 +465,28 @@ class HomogeneousMesh(Mesh):
         entity = self.entity(etype, index)
         return bm.barycenter(entity, node)
 
+    def location(self, points: TensorLike, start: Optional[TensorLike]=None) -> Tuple[TensorLike, TensorLike]:
+        """Find the cells containing the points, and the local coordinates.
+
+        The point locator is built in the first call and kept until the node
+        or the cell is modified. See `PointLocator`.
+
+        Parameters:
+            points (Tensor): Cartesian points shaped (M, GD).
+            start (Tensor | None, optional): Cells to start walking from, e.g.
+                the cells of moving points in the last step. Defaults to None.
+
+        Returns:
+            Tuple[Tensor, Tensor]: Cell indices shaped (M,), -1 for points out
+                of the mesh, and the barycentric coordinates.
+        """
+        locator = self.__dict__.get('_point_locator', None)
+        if locator is None:
+            from .point_location import PointLocator
+            locator = PointLocator(self)
+            self.__dict__['_point_locator'] = locator
+        return locator.locate(points, start)
+
     def bc_to_point(self, bcs: Union[TensorLike, Sequence[TensorLike]], index: Index=_S) -> TensorLike:
         """Convert barycenter coordinate points to cartesian coordinate points
         on mesh entities.
@@ -473,11 +614,7 @@ class SimplexMesh(HomogeneousMesh):
 
     def shape_function(self, bcs: TensorLike, p: int=1, *, index: Index=_S,
                        mi: Optional[TensorLike]=None) -> TensorLike:
-        TD = bcs.shape[-1] - 1
-        if mi is None:
-            mi = bm.multi_index_matrix(p, TD, dtype=self.itype)
-        phi = bm.simplex_shape_function(bcs, p, mi)
-        return phi
+        return simplex_basis_table(bcs, p, mi)
     
     face_shape_function = shape_function
     edge_shape_function = shape_function
@@ -485,10 +622,8 @@ class SimplexMesh(HomogeneousMesh):
     def grad_shape_function(self, bcs: TensorLike, p: int=1, *, index: Index=_S,
                             variables: str='u', mi: Optional[TensorLike]=None) -> TensorLike:
         TD = bcs.shape[-1] - 1
-        if mi is None:
-            mi = bm.multi_index_matrix(p, TD, dtype=self.itype)
-        R = bm.simplex_grad_shape_function(bcs, p, mi) # (NQ, ldof, bc)
-        
+        R = simplex_basis_table(bcs, p, mi, order=1) # (NQ, ldof, bc)
+
         if variables == 'u':
             return R
         elif variables == 'x':
@@ -505,9 +640,7 @@ class SimplexMesh(HomogeneousMesh):
         """
         """
         TD = bcs.shape[1] - 1
-        if mi is None:
-            mi = bm.multi_index_matrix(p, TD, dtype=self.itype)
-        H = bm.simplex_hess_shape_function(bcs, p, mi)
+        H = simplex_basis_table(bcs, p, mi, order=2)
         if variables == 'x':
             Dlambda = self.grad_lambda(index=index, TD=TD) # (NC, NQ, ldof, dim) 
             Hphi = bm.einsum('...inm, knj, kml  -> k...ijl', H, Dlambda, Dlambda)
@@ -565,9 +698,11 @@ class TensorMesh(HomogeneousMesh):
     def shape_function(self, bcs: Tuple[TensorLike], p: int=1, *, index: Index=_S,
                        variables: str='u', mi: Optional[TensorLike]=None) -> TensorLike:
         if mi is None:
-            mi = bm.multi_index_matrix(p, 1, dtype=self.itype)
-        raw_phi = [bm.simplex_shape_function(bc, p, mi) for bc in bcs]
-        phi = bm.tensorprod(*raw_phi)
+            phi = reference_basis_cache.get(('tensor', 0, p), bcs, lambda: bm.tensorprod(
+                *[bm.simplex_shape_function(bc, p) for bc in bcs]
+            ))
+        else:
+            phi = bm.tensorprod(*[bm.simplex_shape_function(bc, p, mi) for bc in bcs])
         if variables == 'u':
             return phi
         elif variables == 'x':
@@ -582,6 +717,30 @@ class TensorMesh(HomogeneousMesh):
     def grad_shape_function(self, bcs: Tuple[TensorLike], p: int=1, *, index: Index=_S,
                             variables: str='u', mi: Optional[TensorLike]=None) -> TensorLike:
         assert isinstance(bcs, tuple)
+        TD = len(bcs)
+        gphi = reference_basis_cache.get(
+            ('tensor', 1, p), bcs, lambda: self._reference_grad_shape_function(bcs, p)
+        ) # (NQ, ldof, TD)
+
+        if TD == 3:
+            if variables == 'x':
+                J = self.jacobi_matrix(bcs, index=index)
+                J = bm.linalg.inv(J)
+                gphi = bm.einsum('cqmn, qlm -> cqln', J, gphi)
+
+                return gphi
+        elif TD == 2:
+            if variables == 'x':
+                J = self.jacobi_matrix(bcs, index=index)                # (NC, NQ, GD, GD)
+                G = self.first_fundamental_form(J)                      # (NC, NQ, GD, GD)
+                G = bm.linalg.inv(G)
+                gphi = bm.einsum('cqkm, cqmn, qln -> cqlk', J, G, gphi) # (NC, NQ, ldof, GD)
+
+                return gphi
+
+        return gphi
+
+    def _reference_grad_shape_function(self, bcs: Tuple[TensorLike], p: int) -> TensorLike:
         TD = len(bcs)
         Dlambda = bm.array([-1, 1], dtype=self.ftype, device=bm.get_device(bcs[0]))
         phi = bm.simplex_shape_function(bcs[0], p=p)
@@ -591,35 +750,21 @@ class TensorMesh(HomogeneousMesh):
         n = phi.shape[0]**TD
         ldof = phi.shape[-1]**TD
         shape = (n, ldof, TD)
-        gphi = bm.zeros(shape, dtype=self.ftype, device=bm.get_device(bcs[0]))
 
         if TD == 3:
-            gphi0 = bm.einsum('im, jn, ko->ijkmno', dphi, 
+            gphi0 = bm.einsum('im, jn, ko->ijkmno', dphi,
                               phi, phi).reshape(-1, ldof, 1)
             gphi1 = bm.einsum('im, jn, ko->ijkmno', phi, dphi,
                               phi).reshape(-1, ldof, 1)
             gphi2 = bm.einsum('im, jn, ko->ijkmno', phi, phi,
                                      dphi).reshape(-1, ldof, 1)
-            gphi = bm.concatenate((gphi0, gphi1, gphi2), axis=-1)
-            if variables == 'x':
-                J = self.jacobi_matrix(bcs, index=index)
-                J = bm.linalg.inv(J)
-                gphi = bm.einsum('cqmn, qlm -> cqln', J, gphi)
-
-                return gphi
+            return bm.concatenate((gphi0, gphi1, gphi2), axis=-1)
         elif TD == 2:
             gphi0 = bm.einsum('im, jn -> ijmn', dphi, phi).reshape(-1, ldof, 1)
             gphi1 = bm.einsum('im, jn -> ijmn', phi, dphi).reshape(-1, ldof, 1)
-            gphi = bm.concatenate((gphi0, gphi1), axis=-1)              # (NQ, ldof, GD)
-            if variables == 'x':
-                J = self.jacobi_matrix(bcs, index=index)                # (NC, NQ, GD, GD)
-                G = self.first_fundamental_form(J)                      # (NC, NQ, GD, GD)
-                G = bm.linalg.inv(G)
-                gphi = bm.einsum('cqkm, cqmn, qln -> cqlk', J, G, gphi) # (NC, NQ, ldof, GD)
+            return bm.concatenate((gphi0, gphi1), axis=-1)              # (NQ, ldof, GD)
 
-                return gphi
-            
-        return gphi
+        return bm.zeros(shape, dtype=self.ftype, device=bm.get_device(bcs[0]))
 
     def quad_to_ipoint(self, p, index=None):
         """
@@ -15,6 +15,8 @@ from .utils import estr2dim, edim2entity, MeshMeta, flocc
 
 class MeshDS(metaclass=MeshMeta):
     _STORAGE_ATTR = ['cell', 'face', 'edge', 'node']
+    # NOTE: Reassigning these attributes clears the cache of interpolation points.
+    _TOPOLOGY_ATTR = ['cell2edge', 'cell2face', 'face2cell', 'edge2cell']
     cell: TensorLike
     face: TensorLike
     edge: TensorLike
@@ -51,18 +53,30 @@ class MeshDS(metaclass=MeshMeta):
                 raise RuntimeError('please call super().__init__() before setting attributes.')
             etype_dim = estr2dim(self, name)
             self._entity_storage[etype_dim] = value
+            self.clear_ipoint_cache()
         else:
+            if name in self._TOPOLOGY_ATTR:
+                self.clear_ipoint_cache()
             super().__setattr__(name, value)
 
     def __delattr__(self, name: str) -> None:
         if name in self._STORAGE_ATTR:
             del self._entity_storage[estr2dim(self, name)]
+            self.clear_ipoint_cache()
         else:
             super().__delattr__(name)
 
     def clear(self) -> None:
         """Remove all entities from the storage."""
         self._entity_storage.clear()
+        self.clear_ipoint_cache()
+
+    def clear_ipoint_cache(self) -> None:
+        """Clear the cached interpolation points, entity-to-ipoint maps and
+        the point locator. Call this after modifying the node or cell tensors
+        in place."""
+        self.__dict__.pop('_ipoint_cache', None)
+        self.__dict__.pop('_point_locator', None)
 
     ### properties
     def top_dimension(self) -> int: return self.TD
@@ -302,10 +316,25 @@ class MeshDS(metaclass=MeshMeta):
         total_edge = cell[..., local_edge].reshape(-1, NVE)
         return total_edge
 
-    def construct(self):
+    def construct(self, isKeptCell: Optional[TensorLike]=None):
+        """Construct the faces, the edges and the topology relations.
+
+        Parameters:
+            isKeptCell (Tensor | None, optional): Bool tensor of the old number
+                of cells. If given, the present face, edge and topology tensors
+                are regarded as those of the mesh before some cells changed,
+                and are patched only around the changed cells. The rows of the
+                kept cells must be unchanged, and the new cells are appended;
+                the changed and the new cells must cover the region of the
+                old changed cells, as in a local refinement. Faces and edges of
+                the kept cells keep their numbers. Defaults to None.
+        """
         if not self.is_homogeneous():
             raise RuntimeError('Can not construct for a non-homogeneous mesh.')
 
+        if (isKeptCell is not None) and self._construct_local(isKeptCell):
+            return
+
         totalFace = self.total_face()
         i0, i1, j = flocc(bm.sort(totalFace, axis=1))
 
@@ -338,3 +367,130 @@ class MeshDS(metaclass=MeshMeta):
         logger.info(f"Mesh toplogy relation constructed, with {NC} cells, {NF} "
                     f"faces, {NN} nodes "
                     f"on device ?")
+
+    def _construct_local(self, isKeptCell: TensorLike) -> bool:
+        """Patch the topology around the changed cells. Return False if the
+        local patch is not applicable, e.g. the number of faces decreases."""
+        cell = self.cell
+        NC = self.number_of_cells()
+        NC0 = isKeptCell.shape[0]
+        NFC = self.number_of_faces_of_cells()
+        device = bm.get_device(cell)
+        kwargs = {'dtype': self.itype, 'device': device}
+
+        isNewCell = bm.ones((NC - NC0,), dtype=bm.bool, device=device)
+        changed = bm.nonzero(bm.concat([~isKeptCell, isNewCell]))[0]
+        changed = bm.astype(changed, self.itype)
+        local_face = self.localFace
+        totalFace = cell[changed][:, local_face].reshape(-1, local_face.shape[-1])
+        patch = _patch_entity(self.face, self.cell2face[~isKeptCell], totalFace)
+        if patch is None:
+            return False
+        face, g2f, j, alive = patch
+        if self.TD == 3:
+            local_edge = self.localEdge
+            totalEdge = cell[changed][:, local_edge].reshape(-1, local_edge.shape[-1])
+            epatch = _patch_entity(self.edge, self.cell2edge[~isKeptCell], totalEdge)
+            if epatch is None:
+                return False
+
+        # Faces touched by the changed cells, and their (cell, local face)
+        # pairs encoded as `cell*NFC + local face`, including the pairs from
+        # the kept cells on the other side of the old faces.
+        fidx = (changed[:, None]*NFC + bm.arange(NFC, **kwargs)[None, :]).reshape(-1)
+        groups = [j, ]
+        pairs = [fidx, ]
+        old_face2cell = self.face2cell
+        for s in range(2):
+            c = old_face2cell[alive[1], s]
+            flag = isKeptCell[c]
+            groups.append(alive[0][flag])
+            pairs.append(c[flag]*NFC + old_face2cell[alive[1][flag], s+2])
+        groups = bm.concat(groups)
+        pairs = bm.concat(pairs)
+        order = bm.lexsort((pairs, groups))
+        groups = groups[order]
+        pairs = pairs[order]
+        TRUE = bm.ones((1,), dtype=bm.bool, device=device)
+        diff = bm.concat([TRUE, groups[1:] != groups[:-1], TRUE])
+        touched = g2f[groups[diff[:-1]]]
+        p0 = pairs[diff[:-1]]
+        p1 = pairs[diff[1:]]
+
+        NF = face.shape[0]
+        face2cell = bm.concat([old_face2cell, bm.zeros((NF - old_face2cell.shape[0], 4), **kwargs)])
+        face2cell = bm.set_at(face2cell, touched,
+                              bm.stack([p0//NFC, p1//NFC, p0%NFC, p1%NFC], axis=-1))
+        # Orientation of the faces follows the first cell, as in `construct`.
+        face = bm.set_at(face, touched, cell[p0//NFC][bm.arange(p0.shape[0], **kwargs)[:, None],
+                                                      local_face[p0%NFC]])
+        cell2face = bm.concat([self.cell2face, bm.zeros((NC - NC0, NFC), **kwargs)])
+        cell2face = bm.set_at(cell2face, changed, g2f[j].reshape(-1, NFC))
+
+        self.face = face
+        self.cell2face = cell2face
+        self.face2cell = face2cell
+
+        if self.TD == 3:
+            edge, g2e, j, _ = epatch
+            NEC = self.number_of_edges_of_cells()
+            cell2edge = bm.concat([self.cell2edge, bm.zeros((NC - NC0, NEC), **kwargs)])
+            self.cell2edge = bm.set_at(cell2edge, changed, g2e[j].reshape(-1, NEC))
+            self.edge = edge
+
+        elif self.TD == 2:
+            self.edge2cell = self.face2cell
+            self.cell2edge = self.cell2face
+
+        logger.info(f"Mesh toplogy relation patched around {changed.shape[0]} "
+                    f"cells, with {NC} cells and {NF} faces.")
+        return True
+
+
+def _patch_entity(entity: TensorLike, cell2entity: TensorLike, total: TensorLike):
+    """Number the entities of the changed cells.
+
+    Parameters:
+        entity (Tensor): The old entities.
+        cell2entity (Tensor): Old cell-to-entity relation of the changed cells.
+        total (Tensor): Entities of the changed cells, by cells.
+
+    Returns:
+        None if there are less new entities than the removed ones. Otherwise
+        - The new entity tensor, with the new entities filled in the slots
+          of the removed ones first;
+        - The entity numbers of the unique rows of `total`;
+        - The indices of the unique rows that result in `total`;
+        - The unique rows and the numbers of the old entities that are still
+          present.
+    """
+    NE0 = entity.shape[0]
+    device = bm.get_device(entity)
+    dtype = cell2entity.dtype
+    cand = bm.sort(cell2entity.reshape(-1))
+    if cand.shape[0] > 0:
+        flag = bm.concat([bm.ones((1,), dtype=bm.bool, device=device), cand[1:] != cand[:-1]])
+        cand = cand[flag]
+    ncand = cand.shape[0]
+
+    keys = bm.concat([entity[cand], total], axis=0)
+    i0, i1, j = flocc(bm.sort(keys, axis=1))
+    isOld = i0 < ncand
+    isDead = i1 < ncand # old entities only on the old side
+    isAlive = isOld & ~isDead
+    isNew = ~isOld
+    dead = bm.sort(cand[i0[isDead]])
+    nnew = int(bm.sum(isNew))
+    ndead = dead.shape[0]
+    if nnew < ndead:
+        return None
+
+    newid = bm.concat([dead, bm.arange(NE0, NE0 + nnew - ndead, dtype=dtype, device=device)])
+    g2e = bm.zeros((i0.shape[0],), dtype=dtype, device=device)
+    g2e = bm.set_at(g2e, isOld, cand[i0[isOld]])
+    g2e = bm.set_at(g2e, isNew, newid)
+
+    entity = bm.concat([entity, bm.zeros((nnew - ndead, entity.shape[1]), dtype=entity.dtype, device=device)])
+    entity = bm.set_at(entity, newid, total[i0[isNew] - ncand])
+    alive = bm.nonzero(isAlive)[0]
+    return entity, g2e, j[ncand:], (alive, g2e[alive])
@@ -0,0 +1,309 @@
+from typing import Optional, Tuple
+
+from ..backend import backend_manager as bm
+from ..typing import TensorLike
+
+__all__ = ['PointLocator']
+
+
+def _edge_inverse(E: TensorLike) -> TensorLike:
+    """Inverse of the matrices whose columns are the edge vectors E[:, i, :],
+    for 2 and 3 dimensions."""
+    if E.shape[-1] == 2:
+        det = E[:, 0, 0]*E[:, 1, 1] - E[:, 0, 1]*E[:, 1, 0]
+        rows = [bm.stack([E[:, 1, 1], -E[:, 1, 0]], axis=-1),
+                bm.stack([-E[:, 0, 1], E[:, 0, 0]], axis=-1)]
+    else:
+        rows = [bm.cross(E[:, 1], E[:, 2], axis=-1),
+                bm.cross(E[:, 2], E[:, 0], axis=-1),
+                bm.cross(E[:, 0], E[:, 1], axis=-1)]
+        det = bm.sum(E[:, 0] * rows[0], axis=-1)
+    return bm.stack(rows, axis=1) / det[:, None, None]
+
+
+class PointLocator():
+    """Batched point location in triangle, tetrahedron and quadrangle meshes.
+
+    Bounding boxes of the cells are put into a uniform bucket grid, whose
+    buckets are about the size of the cells. A point is tested against the
+    cells of its bucket only, by the barycentric coordinates for simplices
+    and by the bilinear inverse map for quadrangles, with tensor operations.
+    For moving points, `walk` starts from the cells found last time and
+    steps to the neighbors, and falls back to the bucket grid when it fails.
+
+    Parameters:
+        mesh (TriangleMesh | TetrahedronMesh | QuadrangleMesh): The mesh, with
+            the geometric dimension equal to the topological dimension.
+        tol (float, optional): Relative tolerance of the containment test.
+            Defaults to 1e-10.
+        chunk_size (int, optional): Number of points handled at once.
+            Defaults to 2^16.
+
+    Example:
+    ```
+        locator = PointLocator(mesh)
+        cell, bc = locator.locate(points)
+        for step in range(nsteps):
+            points = move(points)
+            cell, bc = locator.locate(points, start=cell)
+    ```
+    """
+    def __init__(self, mesh, *, tol: float=1e-10, chunk_size: int=1 << 16):
+        TD = mesh.top_dimension()
+        GD = mesh.geo_dimension()
+        if GD != TD:
+            raise ValueError("PointLocator only supports meshes with the same "
+                             f"geometric and topological dimensions, but got GD={GD} "
+                             f"and TD={TD}.")
+        NVC = mesh.number_of_vertices_of_cells()
+        NVC = int(NVC[0]) if bm.is_tensor(NVC) else int(NVC)
+        if NVC == TD + 1:
+            self.simplex = True
+        elif (TD == 2) and (NVC == 4):
+            self.simplex = False
+        else:
+            raise ValueError(f"PointLocator does not support {mesh.__class__.__name__}.")
+
+        self.mesh = mesh
+        self.tol = tol
+        self.chunk_size = chunk_size
+        node = mesh.entity('node')
+        cell = mesh.entity('cell')
+        self.vertex = node[cell] # (NC, NVC, GD)
+        if self.simplex:
+            # lambda_{1:} = inv(A) @ (x - x0), stored with the offset as (NC, TD, GD+1).
+            inv = _edge_inverse(self.vertex[:, 1:, :] - self.vertex[:, 0:1, :])
+            offset = -bm.einsum('cij, cj -> ci', inv, self.vertex[:, 0, :])
+            self.affine = bm.concat([inv, offset[..., None]], axis=-1)
+        self._cell2cell = None
+        self._build_grid()
+
+    def __repr__(self) -> str:
+        return (f"PointLocator({self.mesh.__class__.__name__}, "
+                f"grid={self.shape})")
+
+    ### bucket grid
+    def _build_grid(self):
+        vertex = self.vertex
+        NC, _, GD = vertex.shape
+        device = bm.get_device(vertex)
+        ikw = {'dtype': bm.int64, 'device': device}
+        lower, upper = vertex[:, 0, :], vertex[:, 0, :]
+        for i in range(1, vertex.shape[1]):
+            lower = bm.minimum(lower, vertex[:, i, :])
+            upper = bm.maximum(upper, vertex[:, i, :])
+        origin = bm.min(lower, axis=0)
+        extent = bm.max(upper, axis=0) - origin
+        # Buckets are about the mean size of the cells.
+        h = float(bm.mean(bm.max(upper - lower, axis=-1)))
+        shape = tuple(max(int(e / h), 1) for e in bm.to_numpy(extent))
+        size = extent / bm.tensor(shape, dtype=vertex.dtype, device=device)
+        self.origin, self.extent, self.size, self.shape = origin, extent, size, shape
+        strides = [1] * GD
+        for d in range(GD-2, -1, -1):
+            strides[d] = strides[d+1] * shape[d+1]
+        self.strides = bm.tensor(strides, **ikw)
+
+        # Put every cell into all the buckets its bounding box overlaps.
+        lo = self._bucket_coord(lower)
+        hi = self._bucket_coord(upper)
+        n = hi - lo + 1
+        num = bm.prod(n, axis=-1)
+        total = int(bm.sum(num))
+        cid = bm.repeat(bm.arange(NC, **ikw), num)
+        k = bm.arange(total, **ikw) - bm.repeat(bm.cumsum(num, axis=0) - num, num)
+        bucket = bm.zeros((total, ), **ikw)
+        for d in range(GD-1, -1, -1):
+            nd = n[cid, d]
+            bucket = bucket + (lo[cid, d] + k % nd) * strides[d]
+            k = k // nd
+        order = bm.argsort(bucket, stable=True)
+        NB = strides[0] * shape[0]
+        self.bucket_cell = cid[order]
+        self.bucket_ptr = bm.concat([bm.zeros((1, ), **ikw),
+                                     bm.cumsum(bm.bincount(bucket, minlength=NB), axis=0)])
+
+    def _bucket_coord(self, points: TensorLike) -> TensorLike:
+        coord = bm.astype(bm.floor((points - self.origin) / self.size), bm.int64)
+        upper = bm.tensor(self.shape, dtype=bm.int64, device=bm.get_device(points)) - 1
+        coord = bm.where(coord < 0, 0, coord)
+        return bm.where(coord > upper, upper, coord)
+
+    ### containment test
+    def local_coordinates(self, points: TensorLike, cell: TensorLike) -> TensorLike:
+        """Local coordinates of the points in the given cells.
+
+        Parameters:
+            points (Tensor): Points shaped (M, GD).
+            cell (Tensor): Cell indices shaped (M,).
+
+        Returns:
+            Tensor: Barycentric coordinates shaped (M, TD+1) for simplices, or
+                the barycentric coordinates of each axis shaped (M, 2, 2) for
+                quadrangles, i.e. [[1-xi, xi], [1-eta, eta]].
+        """
+        if self.simplex:
+            T = self.affine[cell]
+            # NOTE: loops over the short axes are faster than reductions.
+            lam = T[..., -1]
+            for d in range(points.shape[-1]):
+                lam = lam + T[..., d] * points[:, d:d+1]
+            lam0 = 1.
+            for i in range(lam.shape[-1]):
+                lam0 = lam0 - lam[:, i]
+            return bm.concat([lam0[:, None], lam], axis=-1)
+
+        vertex = self.vertex[cell]
+
+        # Newton iteration for the bilinear map
+        # x = x0 + xi*a + eta*b + xi*eta*c.
+        x0 = vertex[:, 0, :]
+        a = vertex[:, 1, :] - x0
+        b = vertex[:, 3, :] - x0
+        c = vertex[:, 2, :] - vertex[:, 1, :] - vertex[:, 3, :] + x0
+        r = points - x0
+        xi = bm.full((points.shape[0], ), 0.5, dtype=points.dtype, device=bm.get_device(points))
+        eta = bm.copy(xi)
+        for _ in range(8):
+            f = xi[:, None]*a + eta[:, None]*b + (xi*eta)[:, None]*c - r
+            j0 = a + eta[:, None]*c # dx/dxi
+            j1 = b + xi[:, None]*c  # dx/deta
+            det = j0[:, 0]*j1[:, 1] - j0[:, 1]*j1[:, 0]
+            xi = xi - (j1[:, 1]*f[:, 0] - j1[:, 0]*f[:, 1]) / det
+            eta = eta - (j0[:, 0]*f[:, 1] - j0[:, 1]*f[:, 0]) / det
+        return bm.stack([bm.stack([1 - xi, xi], axis=-1),
+                         bm.stack([1 - eta, eta], axis=-1)], axis=1)
+
+    @staticmethod
+    def _score(bc: TensorLike) -> TensorLike:
+        """Minimum of the local coordinates, non-negative inside the cell."""
+        bc = bc.reshape(bc.shape[0], -1)
+        score = bc[:, 0]
+        for i in range(1, bc.shape[-1]):
+            score = bm.minimum(score, bc[:, i])
+        return score
+
+    ### searches
+    def bucket_search(self, points: TensorLike) -> Tuple[TensorLike, TensorLike]:
+        """Locate the points by the bucket grid.
+
+        Parameters:
+            points (Tensor): Points shaped (M, GD).
+
+        Returns:
+            Tuple[Tensor, Tensor]: Cell indices shaped (M,), -1 for points out
+                of the mesh, and the local coordinates (see `local_coordinates`).
+        """
+        M = points.shape[0]
+        device = bm.get_device(points)
+        ikw = {'dtype': bm.int64, 'device': device}
+        cell = bm.full((M, ), -1, **ikw)
+        bc = self._empty_bc(M, points.dtype, device)
+        # Sort the points by buckets for the locality of the gathering.
+        bucket = bm.sum(self._bucket_coord(points) * self.strides, axis=-1)
+        order = bm.argsort(bucket)
+
+        for s in range(0, M, self.chunk_size):
+            e = min(s + self.chunk_size, M)
+            p = points[order[s:e]]
+            bid = bucket[order[s:e]]
+            first = self.bucket_ptr[bid]
+            num = self.bucket_ptr[bid + 1] - first
+            total = int(bm.sum(num))
+            if total == 0:
+                continue
+            # Candidate (point, cell) pairs.
+            row = bm.repeat(bm.arange(e - s, **ikw), num)
+            col = bm.arange(total, **ikw) - bm.repeat(bm.cumsum(num, axis=0) - num - first, num)
+            col = self.bucket_cell[col]
+            lbc = self.local_coordinates(p[row], col)
+            # The first cell containing the point. Points on the shared faces
+            # take the cell of the smallest index in the bucket.
+            inside = bm.nonzero(self._score(lbc) >= -self.tol)[0]
+            if inside.shape[0] == 0:
+                continue
+            row = row[inside]
+            isFirst = bm.concat([bm.ones((1, ), dtype=bm.bool, device=device),
+                                 row[1:] != row[:-1]])
+            inside = inside[isFirst]
+            idx = order[row[isFirst] + s]
+            cell = bm.set_at(cell, idx, col[inside])
+            bc = bm.set_at(bc, idx, lbc[inside])
+        return cell, bc
+
+    def walk(self, points: TensorLike, start: TensorLike, *,
+             max_steps: int=32) -> Tuple[TensorLike, TensorLike]:
+        """Locate the points by walking to the neighbors from the start cells.
+
+        Parameters:
+            points (Tensor): Points shaped (M, GD).
+            start (Tensor): Start cells shaped (M,), e.g. the cells of the
+                points in the last time step. Negative values are not walked.
+            max_steps (int, optional): Maximum number of steps. Defaults to 32.
+
+        Returns:
+            Tuple[Tensor, Tensor]: Cell indices shaped (M,), -1 for points not
+                found, and the local coordinates.
+        """
+        M = points.shape[0]
+        device = bm.get_device(points)
+        cell2cell = self.cell_to_cell()
+        cell = bm.full((M, ), -1, dtype=bm.int64, device=device)
+        bc = self._empty_bc(M, points.dtype, device)
+        current = bm.astype(start, bm.int64)
+        active = bm.nonzero(current >= 0)[0]
+        current = current[active]
+
+        for _ in range(max_steps + 1):
+            if active.shape[0] == 0:
+                break
+            lbc = self.local_coordinates(points[active], current)
+            found = self._score(lbc) >= -self.tol
+            cell = bm.set_at(cell, active[found], current[found])
+            bc = bm.set_at(bc, active[found], lbc[found])
+            # Step across the face of the most negative coordinate.
+            active, current, lbc = active[~found], current[~found], lbc[~found]
+            nxt = cell2cell[current, self._exit_face(lbc)]
+            moved = nxt != current # not on the boundary
+            active, current = active[moved], nxt[moved]
+
+        return cell, bc
+
+    def locate(self, points: TensorLike, start: Optional[TensorLike]=None, *,
+               max_steps: int=32) -> Tuple[TensorLike, TensorLike]:
+        """Locate the points, by walking from `start` if given, and by the
+        bucket grid for the others.
+
+        Returns:
+            Tuple[Tensor, Tensor]: Cell indices shaped (M,), -1 for points out
+                of the mesh, and the local coordinates.
+        """
+        if start is None:
+            return self.bucket_search(points)
+        cell, bc = self.walk(points, start, max_steps=max_steps)
+        lost = bm.nonzero(cell < 0)[0]
+        if lost.shape[0] > 0:
+            lcell, lbc = self.bucket_search(points[lost])
+            cell = bm.set_at(cell, lost, lcell)
+            bc = bm.set_at(bc, lost, lbc)
+        return cell, bc
+
+    __call__ = locate
+
+    ### helpers
+    def cell_to_cell(self) -> TensorLike:
+        """Neighbors of the cells across the local faces, the cell itself on
+        the boundary."""
+        if self._cell2cell is None:
+            self._cell2cell = bm.astype(self.mesh.cell_to_cell(), bm.int64)
+        return self._cell2cell
+
+    def _exit_face(self, bc: TensorLike) -> TensorLike:
+        if self.simplex: # the local face i is opposite to the vertex i
+            return bm.argmin(bc, axis=-1)
+        # The local edges are eta = 0, xi = 1, eta = 1 and xi = 0.
+        return bm.argmin(bm.stack([bc[:, 1, 1], bc[:, 0, 0], bc[:, 1, 0], bc[:, 0, 1]], axis=-1), axis=-1)
+
+    def _empty_bc(self, M: int, dtype, device) -> TensorLike:
+        shape = (M, self.mesh.top_dimension() + 1) if self.simplex else (M, 2, 2)
+        return bm.zeros(shape, dtype=dtype, device=device)
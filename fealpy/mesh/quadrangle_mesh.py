@@ -3,7 +3,7 @@ from typing import Union, Optional, List, Tuple, Any, Callable
 from ..backend import backend_manager as bm
 from ..typing import TensorLike, Index, _S
 from .. import logger
-from .utils import estr2dim
+from .utils import estr2dim, ipoint_cache
 
 from .mesh_base import TensorMesh
 from .plot import Plotable
@@ -107,11 +107,11 @@ class QuadrangleMesh(TensorMesh, Plotable):
         from ..quadrature import GaussLegendreQuadrature, TensorProductQuadrature
         if isinstance(etype, str):
             etype = estr2dim(self, etype)
-        qf = GaussLegendreQuadrature(q, dtype=self.ftype, device=self.device)
+        qf = GaussLegendreQuadrature.shared(q, dtype=self.ftype, device=self.device)
         if etype == 2:
-            return TensorProductQuadrature((qf, qf))
+            return TensorProductQuadrature.shared((qf, qf))
         elif etype == 1:
-            return TensorProductQuadrature((qf,))
+            return TensorProductQuadrature.shared((qf,))
         else:
             raise ValueError(f"entity type: {etype} is wrong!")
 
@@ -164,6 +164,7 @@ class QuadrangleMesh(TensorMesh, Plotable):
         n = t @ w
         return n, t
 
+    @ipoint_cache
     def interpolation_points(self, p: int, index: Index = _S):
         """
         @brief Get all p-th order interpolation points on the quadrilateral mesh
@@ -191,6 +192,7 @@ class QuadrangleMesh(TensorMesh, Plotable):
     def number_of_corner_nodes(self):
         return self.number_of_nodes()
 
+    @ipoint_cache
     def cell_to_ipoint(self, p: int, index: Index = _S):
         """
         @brief 获取单元上的双 p 次插值点
@@ -441,7 +443,7 @@ class QuadrangleMesh(TensorMesh, Plotable):
 
     def to_vtk(self, fname=None, etype='cell', index: Index = _S):
 
-        from fealpy.mesh.vtk_extent import write_to_vtu
+        from .vtu_writer import write_vtu
 
         node = self.entity('node')
         GD = self.GD
@@ -460,7 +462,7 @@ class QuadrangleMesh(TensorMesh, Plotable):
             return node, cell.flatten(), cellType, NC
         else:
             print("Writting to vtk...")
-            write_to_vtu(fname, node, NC, cellType, cell.flatten(),
+            write_vtu(fname, node, cell.flatten(), cellType,
                          nodedata=self.nodedata,
                          celldata=self.celldata)
 
@@ -3,6 +3,7 @@ from math import sqrt
 from ..backend import backend_manager as bm
 from ..typing import TensorLike, Index, _S
 from .mesh_base import SimplexMesh
+from .utils import ipoint_cache
 from .plot import Plotable
 from fealpy.sparse import coo_matrix,csr_matrix
 
@@ -152,13 +153,13 @@ class TetrahedronMesh(SimplexMesh, Plotable):
                 return StroudQuadrature(3, q)
             else:
                 from ..quadrature import TetrahedronQuadrature
-                return TetrahedronQuadrature(q, **kwargs)
+                return TetrahedronQuadrature.shared(q, **kwargs)
         elif etype in {'face', 2}:
             from ..quadrature import TriangleQuadrature
-            return TriangleQuadrature(q, **kwargs)
+            return TriangleQuadrature.shared(q, **kwargs)
         elif etype in {'edge', 1}:
             from ..quadrature import GaussLegendreQuadrature
-            return GaussLegendreQuadrature(q, **kwargs)
+            return GaussLegendreQuadrature.shared(q, **kwargs)
 
     def cell_volume(self, index=_S):
         """
@@ -292,6 +293,7 @@ class TetrahedronMesh(SimplexMesh, Plotable):
         NC = self.number_of_cells()
         return NN + NE*(p-1) + NF*(p-2)*(p-1)//2 + NC*(p-3)*(p-2)*(p-1)//6
 
+    @ipoint_cache
     def interpolation_points(self, p, index=_S):
         """
         @brief 获取整个四面体网格上的全部插值点
@@ -338,6 +340,7 @@ class TetrahedronMesh(SimplexMesh, Plotable):
                     node[cell,:]).reshape(-1, GD)
         return ipoints[index]
 
+    @ipoint_cache
     def face_to_ipoint(self, p, index=_S):
         """
         @brief 获取网格中每个三角形面与插值点的对应关系
@@ -377,6 +380,7 @@ class TetrahedronMesh(SimplexMesh, Plotable):
 
         return face2ipoint[index]
 
+    @ipoint_cache
     def cell_to_ipoint(self, p, index=_S):
         """
         @brief 获取单元与插值点的对应关系
@@ -1133,7 +1137,7 @@ class TetrahedronMesh(SimplexMesh, Plotable):
         return mesh
 
     def to_vtk(self, fname=None, etype='cell', index:Index=_S):
-        from .vtk_extent import  write_to_vtu
+        from .vtu_writer import write_vtu
 
         node = self.entity('node')
         GD = self.geo_dimension()
@@ -1159,7 +1163,7 @@ class TetrahedronMesh(SimplexMesh, Plotable):
             return node, cell.flatten(), cellType, NC
         else:
             print("Writting to vtk...")
-            write_to_vtu(fname, node, NC, cellType, cell.flatten(),
+            write_vtu(fname, node, cell.flatten(), cellType,
                     nodedata=self.nodedata,
                     celldata=celldata)
 
@@ -3,7 +3,7 @@ from ..backend import backend_manager as bm
 from ..typing import TensorLike, Index, _S
 from .. import logger
 
-from .utils import simplex_gdof, simplex_ldof
+from .utils import simplex_gdof, simplex_ldof, ipoint_cache, simplex_basis_table
 from .mesh_base import SimplexMesh, estr2dim
 from .plot import Plotable
 from fealpy.sparse import csr_matrix
@@ -80,10 +80,10 @@ class TriangleMesh(SimplexMesh, Plotable):
             if q > 9:
                 quad = StroudQuadrature(2, q)
             else:
-                quad = TriangleQuadrature(q, **kwargs)
+                quad = TriangleQuadrature.shared(q, **kwargs)
         elif etype == 1:
             from ..quadrature import GaussLegendreQuadrature
-            quad = GaussLegendreQuadrature(q, **kwargs)
+            quad = GaussLegendreQuadrature.shared(q, **kwargs)
         else:
             raise ValueError(f"Unsupported entity or top-dimension: {etype}")
         return quad
@@ -135,7 +135,7 @@ class TriangleMesh(SimplexMesh, Plotable):
         @berif 这里调用的是网格空间基函数的梯度
         """
         TD = bc.shape[-1] - 1
-        R = bm.simplex_grad_shape_function(bc, p)
+        R = simplex_basis_table(bc, p, order=1)
         if variables == 'x':
             Dlambda = self.grad_lambda(index=index, TD=TD)
             gphi = bm.einsum('...ij, kjm -> k...im', R, Dlambda)
@@ -169,6 +169,7 @@ class TriangleMesh(SimplexMesh, Plotable):
         num = (NN, NE, NC)
         return simplex_gdof(p, num)
     
+    @ipoint_cache
     def interpolation_points(self, p: int, index: Index=_S):
         """Fetch all p-order interpolation points on the triangle mesh."""
         node = self.entity('node')
@@ -206,6 +207,7 @@ class TriangleMesh(SimplexMesh, Plotable):
 
         return bm.concatenate(ipoint_list, axis=0)[index]  # (gdof, GD)
 
+    @ipoint_cache
     def cell_to_ipoint(self, p: int, index: Index=_S):
         """
         Get the map from local index to global index for interpolation points.
@@ -260,6 +262,7 @@ class TriangleMesh(SimplexMesh, Plotable):
         c2p = bm.set_at(c2p, (..., flag), val)
         return c2p[index]
 
+    @ipoint_cache
     def face_to_ipoint(self, p: int, index: Index=_S):
         return self.edge_to_ipoint(p, index)
 
@@ -354,18 +357,6 @@ class TriangleMesh(SimplexMesh, Plotable):
         性
         """
         pass
-    
-    def location(self, points):
-        """
-        @breif  给定一组点 p , 找到这些点所在的单元
-
-        这里假设：
-
-        1. 所有点在网格内部，
-        2. 网格中没有洞
-        3. 区域还要是凸的
-        """
-        pass
 
     def circumcenter(self, index: Index=_S, returnradius=False):
         """
@@ -443,13 +434,15 @@ class TriangleMesh(SimplexMesh, Plotable):
             IM=None,
             data=None,
             disp=True,
+            construct=True,
     ):
 
         options = {
             'HB': HB,
             'IM': IM,
             'data': data,
-            'disp': disp
+            'disp': disp,
+            'construct': construct
         }
         return options
 
@@ -502,34 +495,14 @@ class TriangleMesh(SimplexMesh, Plotable):
 
         if 'IM' in options:
             nn = len(newNode)
-            IM = COOTensor( indices=bm.stack((bm.arange(NN), bm.arange(NN)), axis=0),
-                            values=bm.ones(NN), 
-                            shape=(NN + nn, NN))
-            # IM = coo_matrix((bm.ones(NN), (bm.arange(NN), bm.arange(NN))),
-            #                 shape=(NN + nn, NN))
-            val = bm.full((nn,), 0.5)
-            IM += COOTensor(indices=bm.stack((NN + bm.arange(nn), edge[isCutEdge, 0]), axis=0),
-                            values=val,
-                            shape=(NN + nn, NN))
-            # IM += coo_matrix(
-            #     (
-            #         val,
-            #         (
-            #             NN + bm.arange(nn),
-            #             edge[isCutEdge, 0]
-            #         )
-            #     ), shape=(NN + nn, NN))
-            IM += COOTensor(indices=bm.stack((NN + bm.arange(nn), edge[isCutEdge, 1]), axis=0),
-                            values=val,
-                            shape=(NN + nn, NN))
-            # IM += coo_matrix(
-            #     (
-            #         val,
-            #         (
-            #             NN + bm.arange(nn),
-            #             edge[isCutEdge, 1]
-            #         )
-            #     ), shape=(NN + nn, NN))
+            kwargs = {'dtype': self.itype, 'device': self.device}
+            I = bm.concatenate((bm.arange(NN, **kwargs),
+                                bm.arange(NN, NN + nn, **kwargs),
+                                bm.arange(NN, NN + nn, **kwargs)))
+            J = bm.concatenate((bm.arange(NN, **kwargs), edge[isCutEdge, 0], edge[isCutEdge, 1]))
+            val = bm.concatenate((bm.ones((NN,), dtype=self.ftype, device=self.device),
+                                  bm.full((2*nn,), 0.5, dtype=self.ftype, device=self.device)))
+            IM = COOTensor(bm.stack((I, J), axis=0), val, spshape=(NN + nn, NN))
             options['IM'] = IM.tocsr()
 
         if 'HB' in options:
@@ -606,7 +579,8 @@ class TriangleMesh(SimplexMesh, Plotable):
 
         self.NN = self.node.shape[0]
         self.cell = cell
-        self.construct()
+        if options.get('construct', True):
+            self.construct()
 
     def coarsen(self, isMarkedCell=None, options={}):
         """
@@ -1066,8 +1040,10 @@ class TriangleMesh(SimplexMesh, Plotable):
     def point_to_bc(self, point):
         """
         @brief 找到定点 point 所在的单元，并计算其重心坐标 
+
+        @return 单元编号 (网格外的点为 -1) 和重心坐标, 见 `location`
         """
-        pass
+        return self.location(point)
 
     def mark_interface_cell(self, phi):
         """
@@ -1521,7 +1497,7 @@ class TriangleMesh(SimplexMesh, Plotable):
         """
         @brief 把网格转化为 vtk 的数据格式
         """
-        from .vtk_extent import  write_to_vtu
+        from .vtu_writer import write_vtu
 
         node = self.entity('node')
         GD = self.geo_dimension()
@@ -1540,7 +1516,7 @@ class TriangleMesh(SimplexMesh, Plotable):
             return node, cell.flatten(), cellType, NC
         else:
             print("Writting to vtk...")
-            write_to_vtu(fname, node, NC, cellType, cell.flatten(),
+            write_vtu(fname, node, cell.flatten(), cellType,
                          nodedata=self.nodedata,
                          celldata=self.celldata)
     @classmethod        
@@ -515,10 +515,10 @@ class UniformMesh2d(StructuredMesh, TensorMesh, Plotable):
         hx = self.h[0]
         hy = self.h[1]
         v = bm.real(points - bm.array(self.origin, dtype=points.dtype))
-        n0 = v[..., 0] // hx
-        n1 = v[..., 1] // hy
+        n0 = bm.floor(v[..., 0] / hx)
+        n1 = bm.floor(v[..., 1] / hy)
 
-        return n0.astype('int64'), n1.astype('int64')
+        return bm.astype(n0, bm.int64), bm.astype(n1, bm.int64)
     
     def point_to_bc(self, points):
 
@@ -836,9 +836,9 @@ class UniformMesh2d(StructuredMesh, TensorMesh, Plotable):
         from ..quadrature import GaussLegendreQuadrature, TensorProductQuadrature
         if isinstance(etype, str):
             etype = estr2dim(self, etype)
-        qf = GaussLegendreQuadrature(q, dtype=self.ftype, device=self.device)
+        qf = GaussLegendreQuadrature.shared(q, dtype=self.ftype, device=self.device)
         if etype == 2:
-            return TensorProductQuadrature((qf, qf))
+            return TensorProductQuadrature.shared((qf, qf))
         elif etype == 1:
             return qf
         else:
@@ -958,6 +958,17 @@ class UniformMesh3d(StructuredMesh, TensorMesh, Plotable):
         """
         return self.face_normal(index=index, unit=True, out=out)
 
+    def cell_location(self, points) -> Tuple[TensorLike, TensorLike, TensorLike]:
+        """
+        @brief 给定一组点，确定所有点所在的单元
+        """
+        v = points - bm.tensor(self.origin, dtype=points.dtype, device=bm.get_device(points))
+        n0 = bm.floor(v[..., 0] / self.h[0])
+        n1 = bm.floor(v[..., 1] / self.h[1])
+        n2 = bm.floor(v[..., 2] / self.h[2])
+
+        return bm.astype(n0, bm.int64), bm.astype(n1, bm.int64), bm.astype(n2, bm.int64)
+
 
 #################################### 插值点 #############################################
     def interpolation_points(self, p: int, index: Index=_S) -> TensorLike:
@@ -1270,11 +1281,11 @@ class UniformMesh3d(StructuredMesh, TensorMesh, Plotable):
         from ..quadrature import GaussLegendreQuadrature, TensorProductQuadrature
         if isinstance(etype, str):
             etype = estr2dim(self, etype)
-        qf = GaussLegendreQuadrature(q, dtype=self.ftype, device=self.device)
+        qf = GaussLegendreQuadrature.shared(q, dtype=self.ftype, device=self.device)
         if etype == 3:
-            return TensorProductQuadrature((qf, qf, qf))
+            return TensorProductQuadrature.shared((qf, qf, qf))
         elif etype == 2:
-            return TensorProductQuadrature((qf, qf))
+            return TensorProductQuadrature.shared((qf, qf))
         elif etype == 1:
             return qf
         else:
@@ -1,9 +1,16 @@
 
-from typing import Dict, Callable, TypeVar, Tuple, Any
+from typing import Dict, Callable, TypeVar, Tuple, Any, Hashable, Optional
+from collections import OrderedDict
+from functools import wraps
 from math import comb
+from threading import Lock
+
+import numpy as np
 
 from ..backend import backend_manager as bm
 from ..backend import TensorLike
+from ..typing import _S
+from ..quadrature import quadrature_registry
 from .. import logger
 
 _Meth = TypeVar('_Meth', bound=Callable)
@@ -155,6 +162,166 @@ def entitymethod(top_dim: int):
     return decorator
 
 
+def ipoint_cache(meth: _Meth) -> _Meth:
+    """A decorator caching the interpolation point method by its `p` arg.
+
+    The result for all entities is computed once for each `p`, and `index` is
+    applied to the cached result. The cache is cleared by MeshDS when entities
+    like node and cell are reassigned, e.g. in refinement.
+    Cached tensors are shared among callers and should not be modified in
+    place. NumPy arrays are cached as read-only views, so that the in-place
+    changes raise errors instead of corrupting the later calls.
+
+    Note:
+        This changes the public methods decorated here (`interpolation_points`
+        and `*_to_ipoint` of the meshes) and the dof maps built on them, e.g.
+        `LagrangeFESpace.cell_to_dof()`: with the NumPy backend they return
+        read-only arrays, and callers editing the result in place get
+        `ValueError: assignment destination is read-only`. Copy the result
+        first, e.g. `bm.copy(mesh.cell_to_ipoint(p))`. A note is appended to
+        the docstring of each decorated method.
+    """
+    name = meth.__name__
+
+    @wraps(meth)
+    def wrapper(mesh, p: int, index=_S):
+        cache = mesh.__dict__.setdefault('_ipoint_cache', {})
+        key = (name, p)
+
+        if key not in cache:
+            value = meth(mesh, p)
+            if isinstance(value, np.ndarray):
+                # NOTE: a view, as `value` may be an entity of the mesh for p = 1.
+                value = value.view()
+                value.flags.writeable = False
+            # NOTE: threads of the parallel assembly may compute the same
+            # entry, and all of them get the first one stored.
+            with _IPOINT_CACHE_LOCK:
+                cache.setdefault(key, value)
+
+        if index is _S:
+            return cache[key]
+        return cache[key][index]
+
+    wrapper.__doc__ = (wrapper.__doc__ or '').rstrip() + _IPOINT_CACHE_NOTE
+    return wrapper
+
+
+_IPOINT_CACHE_LOCK = Lock()
+
+_IPOINT_CACHE_NOTE = """
+
+        Note:
+            The result is cached on the mesh and shared by all calls. With the
+            NumPy backend it is read-only; copy it before modifying in place.
+        """
+
+
+class ReferenceBasisCache():
+    """LRU cache of basis tables on the reference element.
+
+    Values of the shape functions and their derivatives on the reference
+    element depend only on the element type, the order p and the quadrature
+    points, but computing them rebuilds the multi-index and the product
+    tables each time (through vmap and jacfwd on the PyTorch backend). The
+    tables are cached here by (kind, p, points), where the points are
+    identified by the key of the shared quadrature rule they belong to.
+    Tables on any other points are computed directly and not cached, so
+    that arbitrary evaluation points are neither hashed by values nor held
+    in memory.
+
+    Cached tensors are shared among callers and should not be modified in
+    place; NumPy arrays are returned read-only.
+
+    Parameters:
+        maxsize (int, optional): Maximum number of cached tables. Defaults to 256.
+    """
+    def __init__(self, maxsize: int=256):
+        self.maxsize = maxsize
+        self._tables: OrderedDict[Hashable, TensorLike] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return (f"ReferenceBasisCache(size={len(self._tables)}, maxsize={self.maxsize}, "
+                f"hits={self.hits}, misses={self.misses})")
+
+    @staticmethod
+    def points_key(bcs) -> Optional[Hashable]:
+        """Key of the points from the quadrature registry, or None if they
+        (or any of them for tensor-product points) are not registered."""
+        if isinstance(bcs, (tuple, list)):
+            keys = tuple(quadrature_registry.points_key(bc) for bc in bcs)
+            return None if any(k is None for k in keys) else keys
+        return quadrature_registry.points_key(bcs)
+
+    def get(self, kind: Tuple, bcs, compute: Callable[[], TensorLike], /) -> TensorLike:
+        """Get the table of the kind on the points, calling `compute()` on a miss.
+
+        Parameters:
+            kind (tuple): Hashable description of the table, e.g. ('simplex', 1, p)
+                for the gradient of the p-th order simplex shape functions.
+            bcs (Tensor | tuple[Tensor, ...]): The quadrature points.
+            compute (Callable): Function computing the table.
+        """
+        points_key = self.points_key(bcs)
+        if points_key is None: # not quadrature points of a shared rule
+            return compute()
+        key = (bm.backend_name,) + tuple(kind) + (points_key,)
+
+        with self._lock:
+            table = self._tables.get(key, None)
+            if table is not None:
+                self._tables.move_to_end(key)
+                self.hits += 1
+                return table
+
+        table = compute()
+        if table is bcs: # p = 1 on the NumPy backend
+            table = bm.copy(table)
+        if isinstance(table, np.ndarray):
+            table.flags.writeable = False
+
+        with self._lock:
+            self.misses += 1
+            self._tables[key] = table
+            while len(self._tables) > self.maxsize:
+                self._tables.popitem(last=False)
+        return table
+
+    def info(self) -> Dict[str, int]:
+        """Statistics of the cache, with `hits`, `misses`, `size` and `maxsize`."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._tables), 'maxsize': self.maxsize}
+
+    def clear(self):
+        """Remove all tables and reset the statistics."""
+        with self._lock:
+            self._tables.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+reference_basis_cache = ReferenceBasisCache()
+
+_SIMPLEX_TABLES = (
+    'simplex_shape_function',
+    'simplex_grad_shape_function',
+    'simplex_hess_shape_function'
+)
+
+
+def simplex_basis_table(bcs: TensorLike, p: int, mi=None, *, order: int=0) -> TensorLike:
+    """Values (order 0), gradients (order 1) or Hessians (order 2) of the
+    p-th order simplex shape functions with respect to the barycentric
+    coordinates, cached by `reference_basis_cache` unless `mi` is given."""
+    func = getattr(bm, _SIMPLEX_TABLES[order])
+    if mi is not None:
+        return func(bcs, p, mi)
+    return reference_basis_cache.get(('simplex', order, p), bcs, lambda: func(bcs, p))
+
+
 def simplex_ldof(p: int, iptype: int) -> int:
     """Number of local dofs in a simplex entity."""
     if iptype == 0:
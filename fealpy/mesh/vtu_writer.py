@@ -0,0 +1,388 @@
+"""
+Notes
+-----
+    VTK XML 非结构网格 (.vtu) 与时间序列索引 (.pvd) 的纯 NumPy 写出工具,
+    不依赖 vtk 包。数据以 raw 二进制追加 (appended) 格式写出, 可选 zlib 压缩。
+"""
+import os
+import zlib
+import threading
+from queue import Queue
+from typing import Any, Dict, List, Optional, Tuple, Union
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+
+from ..backend import backend_manager as bm
+
+__all__ = ['write_vtu', 'write_pvd', 'VTUSeriesWriter']
+
+_VTK_TYPES = {
+    np.dtype(np.int8): 'Int8',
+    np.dtype(np.uint8): 'UInt8',
+    np.dtype(np.int16): 'Int16',
+    np.dtype(np.uint16): 'UInt16',
+    np.dtype(np.int32): 'Int32',
+    np.dtype(np.uint32): 'UInt32',
+    np.dtype(np.int64): 'Int64',
+    np.dtype(np.uint64): 'UInt64',
+    np.dtype(np.float32): 'Float32',
+    np.dtype(np.float64): 'Float64',
+}
+_HEADER = np.dtype('<u8')
+_BLOCK_SIZE = 1 << 20
+
+_Cells = Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]
+
+
+def _as_numpy(val) -> np.ndarray:
+    val = bm.to_numpy(val) if bm.is_tensor(val) else np.asarray(val)
+    if val.dtype == np.bool_:
+        val = val.astype(np.uint8)
+    val = val.astype(val.dtype.newbyteorder('<'), copy=False)
+    return np.ascontiguousarray(val)
+
+
+def _as_field(val) -> np.ndarray:
+    """Data array of nodes or cells, with 2-component vectors padded to 3."""
+    val = _as_numpy(val)
+    if val.ndim == 2 and val.shape[1] == 2:
+        val = np.concatenate([val, np.zeros((val.shape[0], 1), dtype=val.dtype)], axis=1)
+    return val
+
+
+def _encode(array: np.ndarray, compress: Union[bool, int]) -> bytes:
+    """Encode the array as a block of the appended data."""
+    raw = array.tobytes()
+    if not compress:
+        return np.array([len(raw)], dtype=_HEADER).tobytes() + raw
+
+    level = -1 if compress is True else int(compress)
+    nblocks = max((len(raw) + _BLOCK_SIZE - 1) // _BLOCK_SIZE, 1)
+    last = len(raw) - (nblocks - 1) * _BLOCK_SIZE
+    blocks = [zlib.compress(raw[i*_BLOCK_SIZE:(i+1)*_BLOCK_SIZE], level)
+              for i in range(nblocks)]
+    header = [nblocks, _BLOCK_SIZE, last] + [len(b) for b in blocks]
+    return np.array(header, dtype=_HEADER).tobytes() + b''.join(blocks)
+
+
+def _cells(cell: _Cells, celltype) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Connectivity, offsets and types of the cells.
+
+    The cells can be given as an (NC, NV) array, as a tuple of connectivity
+    and offsets, or as the flat legacy array [NV, v0, ..., NV, v0, ...]
+    returned by the `to_vtk` methods of meshes.
+    """
+    if isinstance(cell, tuple):
+        conn, offsets = _as_numpy(cell[0]).reshape(-1), _as_numpy(cell[1]).reshape(-1)
+    else:
+        cell = _as_numpy(cell)
+        if cell.ndim == 2:
+            NC, NV = cell.shape
+            conn = cell.reshape(-1)
+            offsets = np.arange(1, NC+1, dtype=np.int64) * NV
+        else:
+            conn, offsets = _parse_legacy_cells(cell)
+
+    NC = offsets.shape[0]
+    types = np.broadcast_to(_as_numpy(celltype).astype(np.uint8), (NC, ))
+    return conn.astype(np.int64), offsets.astype(np.int64), np.ascontiguousarray(types)
+
+
+def _parse_legacy_cells(cell: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    if cell.shape[0] == 0:
+        return cell.astype(np.int64), np.zeros((0, ), dtype=np.int64)
+    NV = int(cell[0])
+    if (cell.shape[0] % (NV + 1) == 0) and np.all(cell[::NV+1] == NV):
+        cell = cell.reshape(-1, NV+1)
+        NC = cell.shape[0]
+        return cell[:, 1:].reshape(-1), np.arange(1, NC+1, dtype=np.int64) * NV
+
+    # Mixed cells: walk through the counts.
+    starts, i = [], 0
+    while i < cell.shape[0]:
+        starts.append(i)
+        i += int(cell[i]) + 1
+    starts = np.array(starts, dtype=np.int64)
+    counts = cell[starts].astype(np.int64)
+    mask = np.ones(cell.shape[0], dtype=np.bool_)
+    mask[starts] = False
+    return cell[mask], np.cumsum(counts)
+
+
+def _pad_node(node) -> np.ndarray:
+    node = _as_numpy(node)
+    if node.ndim == 1:
+        node = node[:, None]
+    if node.shape[1] < 3:
+        pad = np.zeros((node.shape[0], 3 - node.shape[1]), dtype=node.dtype)
+        node = np.concatenate([node, pad], axis=1)
+    return node
+
+
+def _array_xml(name: str, array: np.ndarray, offset: int) -> str:
+    if array.dtype not in _VTK_TYPES:
+        raise TypeError(f"dtype {array.dtype} of '{name}' is not supported by VTK.")
+    ncomp = 1 if array.ndim == 1 else int(np.prod(array.shape[1:]))
+    return (f'<DataArray type="{_VTK_TYPES[array.dtype]}" Name={quoteattr(name)} '
+            f'NumberOfComponents="{ncomp}" format="appended" offset="{offset}"/>\n')
+
+
+class _Piece():
+    """Encoded cells of a piece. They are encoded only once and reused by
+    all frames of a time series, while the nodes and data are encoded in
+    each `write`."""
+    def __init__(self, cell: _Cells, celltype, compress: Union[bool, int]=False,
+                 faces: Optional[Tuple[Any, Any]]=None):
+        conn, offsets, types = _cells(cell, celltype)
+        self.compress = compress
+        self.NC = offsets.shape[0]
+        self.blocks: List[bytes] = []
+        arrays = [('connectivity', conn), ('offsets', offsets), ('types', types)]
+        if faces is not None:
+            faceoffsets = _as_numpy(faces[1]).reshape(-1).astype(np.int64)
+            if faceoffsets.shape[0] != self.NC:
+                raise ValueError(f"faceoffsets has {faceoffsets.shape[0]} entries, "
+                                 f"but {self.NC} are expected.")
+            arrays += [('faces', _as_numpy(faces[0]).reshape(-1).astype(np.int64)),
+                       ('faceoffsets', faceoffsets)]
+        xml, offset = [], 0
+        for name, array in arrays:
+            xml.append(_array_xml(name, array, offset))
+            self.blocks.append(_encode(array, compress))
+            offset += len(self.blocks[-1])
+        self.cells_xml = '<Cells>\n' + ''.join(xml) + '</Cells>\n'
+        self.nbytes = offset
+
+    def write(self, fname: str, node: np.ndarray, nodedata: Dict[str, np.ndarray],
+              celldata: Dict[str, np.ndarray]):
+        """Write the piece with the nodes and data to a .vtu file."""
+        NN = node.shape[0]
+        offset = self.nbytes
+        blocks = [_encode(node, self.compress)]
+        points_xml = '<Points>\n' + _array_xml('Points', node, offset) + '</Points>\n'
+        offset += len(blocks[-1])
+
+        data_xml = []
+        for tag, data, size in [('PointData', nodedata, NN), ('CellData', celldata, self.NC)]:
+            xml = []
+            for name, val in data.items():
+                if val.shape[0] != size:
+                    raise ValueError(f"{tag} '{name}' has {val.shape[0]} entries, "
+                                     f"but {size} are expected.")
+                xml.append(_array_xml(name, val, offset))
+                blocks.append(_encode(val, self.compress))
+                offset += len(blocks[-1])
+            data_xml.append(f'<{tag}>\n' + ''.join(xml) + f'</{tag}>\n')
+
+        compressor = ' compressor="vtkZLibDataCompressor"' if self.compress else ''
+        head = (
+            '<?xml version="1.0"?>\n'
+            '<VTKFile type="UnstructuredGrid" version="1.0" '
+            f'byte_order="LittleEndian" header_type="UInt64"{compressor}>\n'
+            '<UnstructuredGrid>\n'
+            f'<Piece NumberOfPoints="{NN}" NumberOfCells="{self.NC}">\n'
+            + ''.join(data_xml) + points_xml + self.cells_xml +
+            '</Piece>\n</UnstructuredGrid>\n'
+            '<AppendedData encoding="raw">\n_'
+        )
+        with open(fname, 'wb') as f:
+            f.write(head.encode('utf-8'))
+            for block in self.blocks:
+                f.write(block)
+            for block in blocks:
+                f.write(block)
+            f.write(b'\n</AppendedData>\n</VTKFile>\n')
+
+
+def _fields(data: Optional[Dict[str, Any]], copy: bool=False) -> Dict[str, np.ndarray]:
+    if data is None:
+        return {}
+    fields = {name: _as_field(val) for name, val in data.items() if val is not None}
+    if copy: # NumPy arrays and CPU tensors may share the memory of the inputs
+        fields = {name: val.copy() for name, val in fields.items()}
+    return fields
+
+
+def write_vtu(fname: str, node, cell: _Cells, celltype, nodedata=None, celldata=None, *,
+              compress: Union[bool, int]=False, faces: Optional[Tuple[Any, Any]]=None) -> None:
+    """Write an unstructured grid to a binary .vtu file, without the vtk package.
+
+    Parameters:
+        fname (str): The file name.
+        node (Tensor): Coordinates of nodes, shaped (NN, GD). Padded to 3D.
+        cell (Tensor | Tuple[Tensor, Tensor]): Cells as an (NC, NV) array,
+            a tuple of connectivity and offsets, or the flat array
+            [NV, v0, ..., NV, v0, ...] returned by `mesh.to_vtk()`.
+        celltype (int | Tensor): VTK cell type(s), see `vtkCellTypes`.
+        nodedata (Dict[str, Tensor], optional): Data on nodes. Defaults to None.
+        celldata (Dict[str, Tensor], optional): Data on cells. Defaults to None.
+        compress (bool | int, optional): Compress the arrays by zlib, or the
+            zlib compression level. Defaults to False.
+        faces (Tuple[Tensor, Tensor], optional): The `faces` and `faceoffsets`
+            arrays of polyhedral cells (VTK_POLYHEDRON = 42). For each cell,
+            `faces` holds [NF, NV0, v0, v1, ..., NV1, ...] and `faceoffsets`
+            the end of it in `faces`, or -1 for cells that are not polyhedra.
+            Defaults to None.
+    """
+    piece = _Piece(cell, celltype, compress, faces)
+    piece.write(fname, _pad_node(node), _fields(nodedata), _fields(celldata))
+
+
+def write_pvd(fname: str, datasets: List[Tuple[float, str]]) -> None:
+    """Write a .pvd index of a time series.
+
+    Parameters:
+        fname (str): The file name.
+        datasets (List[Tuple[float, str]]): The time and the file name (relative
+            to the .pvd file) of each frame.
+    """
+    lines = ['<?xml version="1.0"?>',
+             '<VTKFile type="Collection" version="0.1" byte_order="LittleEndian">',
+             '<Collection>']
+    for t, name in datasets:
+        lines.append(f'<DataSet timestep="{t!r}" group="" part="0" file={quoteattr(name)}/>')
+    lines += ['</Collection>', '</VTKFile>', '']
+    tmp = fname + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write('\n'.join(lines))
+    os.replace(tmp, fname)
+
+
+class VTUSeriesWriter():
+    """Writer of a time series of .vtu files with a .pvd index.
+
+    The cells are encoded once when the writer is created. Each frame encodes
+    only the nodes and the data. Frames are written by a background thread
+    by default, so the solver is not blocked by compression and disk I/O.
+    Arrays are copied to NumPy in the calling thread, so they can be modified
+    right after `write` returns.
+
+    Parameters:
+        fname (str): The .pvd file name. Frames are written to the directory
+            of it as `<stem>_<step>.vtu`.
+        mesh (Mesh | None, optional): The mesh. `mesh.to_vtk()` provides the
+            nodes and cells if given. Defaults to None.
+        node (Tensor, optional): Nodes, required if mesh is None.
+        cell (Tensor | Tuple[Tensor, Tensor], optional): Cells, required if mesh
+            is None. See `write_vtu`.
+        celltype (int | Tensor, optional): VTK cell type(s), required if mesh is None.
+        faces (Tuple[Tensor, Tensor], optional): Faces of polyhedral cells, see
+            `write_vtu`. Defaults to None.
+        compress (bool | int, optional): zlib compression. Defaults to False.
+        background (bool, optional): Write frames in a background thread.
+            Defaults to True.
+        max_pending (int, optional): Maximum number of frames waiting to be
+            written. `write` blocks when there are more. Defaults to 4.
+
+    Example:
+    ```
+        with VTUSeriesWriter('results/u.pvd', mesh, compress=True) as writer:
+            for n in range(nt):
+                ...
+                writer.write(t, nodedata={'u': uh})
+    ```
+    """
+    def __init__(self, fname: str, mesh=None, *, node=None, cell: Optional[_Cells]=None,
+                 celltype=None, faces: Optional[Tuple[Any, Any]]=None,
+                 compress: Union[bool, int]=False, background: bool=True,
+                 max_pending: int=4):
+        if mesh is not None:
+            node, cell, celltype, _ = mesh.to_vtk()
+        elif (node is None) or (cell is None) or (celltype is None):
+            raise ValueError("node, cell and celltype are required when mesh is None.")
+
+        self.fname = fname
+        self.directory = os.path.dirname(os.path.abspath(fname))
+        self.stem = os.path.splitext(os.path.basename(fname))[0]
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._piece = _Piece(cell, celltype, compress, faces)
+        self._node = _pad_node(node)
+        self.datasets: List[Tuple[float, str]] = []
+        self._error: Optional[BaseException] = None
+        self._queue: Optional[Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        if background:
+            self._queue = Queue(maxsize=max_pending)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def __repr__(self) -> str:
+        return f"VTUSeriesWriter('{self.fname}', frames={len(self.datasets)})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, t: float, nodedata=None, celldata=None, *, node=None) -> str:
+        """Write a frame.
+
+        Parameters:
+            t (float): Time of the frame.
+            nodedata (Dict[str, Tensor], optional): Data on nodes. Defaults to None.
+            celldata (Dict[str, Tensor], optional): Data on cells. Defaults to None.
+            node (Tensor, optional): New coordinates of the nodes, e.g. for
+                moving meshes. Defaults to None.
+
+        Returns:
+            str: The file name of the frame.
+        """
+        self._check()
+        if node is not None:
+            node = _pad_node(node)
+            if self._queue is not None:
+                node = node.copy()
+            if node.shape[0] != self._node.shape[0]:
+                raise ValueError(f"Expected {self._node.shape[0]} nodes, "
+                                 f"but got {node.shape[0]}.")
+            self._node = node
+        name = f"{self.stem}_{len(self.datasets):06d}.vtu"
+        self.datasets.append((float(t), name))
+        copy = self._queue is not None
+        task = (os.path.join(self.directory, name), self._node, _fields(nodedata, copy),
+                _fields(celldata, copy), list(self.datasets))
+
+        if self._queue is None:
+            self._write(*task)
+        else:
+            self._queue.put(task)
+        return os.path.join(self.directory, name)
+
+    def flush(self) -> None:
+        """Wait until all pending frames are written."""
+        if self._queue is not None:
+            self._queue.join()
+        self._check()
+
+    def close(self) -> None:
+        """Write the pending frames and stop the background thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._check()
+
+    def _write(self, fname, node, nodedata, celldata, datasets):
+        self._piece.write(fname, node, nodedata, celldata)
+        write_pvd(self.fname, datasets)
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                if self._error is None:
+                    self._write(*task)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _check(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Failed to write the VTU series.") from error
@@ -163,10 +163,10 @@ class NearFieldDataFEMGenerator2d:
         uh = self.get_nearfield_data(k=k, d=d)
 
         if self.meshtype == 'InterfaceMesh':
-            b = self.mesh.point_to_bc(reciever_points)
-            location = self.mesh.location(reciever_points)
+            location, b = self.mesh.location(reciever_points)
             for i in range(data_length):
-                data[i] = uh(b[i])[location[i]]
+                u = uh(b[i:i+1]).reshape(-1)
+                data[i] = u[location[i]]
         elif self.meshtype == 'QuadrangleMesh':
             for i in range(data_length):
                 location, b = self.points_location_and_bc(reciever_points[i], self.domain, self.nx, self.ny)
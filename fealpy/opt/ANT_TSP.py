@@ -22,6 +22,7 @@ class Ant_TSP:
         self.iter_max = iter_max
 
     def cal(self, n, Tau, Table, Route_best, Length_best):
+        B = bm.bind() # 内层循环直接调用后端函数
         for iter in range(0, self.iter_max):
             # 随机产生各个蚂蚁的起点城市
             start = [random.randint(0, n - 1) for _ in range(self.m)]
@@ -39,7 +40,7 @@ class Ant_TSP:
                     tabu_set = set(tabu[i].tolist())
                     difference_list = list(set(citys_index.tolist()).difference(tabu_set))
                     w.append(difference_list)
-                allow = bm.array(w)
+                allow = B.array(w)
 
                 P = (Tau[tabu[:, -1].reshape(-1, 1), allow] ** self.alpha) * (self.Eta[tabu[:, -1].reshape(-1, 1), allow] ** self.beta)
                 P /= P.sum(axis=1, keepdims=True)
@@ -47,7 +48,7 @@ class Ant_TSP:
                 rand_vals = bm.random.rand(self.m, 1)
 
                 # target_index = bm.argmax(Pc >= rand_vals, axis=1)
-                target_index = bm.array([bm.where(row >= rand_val)[0][0] if bm.any(row >= rand_val) else -1 for row, rand_val in zip(Pc, rand_vals.flatten())])
+                target_index = B.array([B.where(row >= rand_val)[0][0] if B.any(row >= rand_val) else -1 for row, rand_val in zip(Pc, rand_vals.flatten())])
                 Table[:, j] = allow[bm.arange(self.m), target_index]
 
             # 计算各个蚂蚁的路径距离
@@ -1,5 +1,6 @@
 
 from .quadrature import Quadrature
+from .registry import QuadratureRegistry, quadrature_registry
 
 from .gauss_legendre import GaussLegendreQuadrature
 from .gauss_lobatto import GaussLobattoQuadrature
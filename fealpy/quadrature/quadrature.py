@@ -3,6 +3,7 @@ from typing import Tuple, Optional
 
 from ..backend import TensorLike
 from ..backend import backend_manager as bm
+from .registry import quadrature_registry
 
 
 class Quadrature():
@@ -12,6 +13,17 @@ class Quadrature():
         self.device = device
         self.quadpts, self.weights = self.make(index)
 
+    @classmethod
+    def shared(cls, index: int, *, dtype=None, device=None):
+        """Get the shared rule of the index from the quadrature registry.
+
+        The rule is built once for each (backend, class, index, dtype, device)
+        and must not be modified. Its `key` attribute identifies the rule.
+        """
+        dtype = dtype if dtype else bm.float64
+        key = (bm.backend_name, cls, index, dtype, device)
+        return quadrature_registry.get(key, lambda: cls(index, dtype=dtype, device=device))
+
     def __len__(self) -> int:
         return self.number_of_quadrature_points()
 
@@ -0,0 +1,67 @@
+
+from typing import Callable, Dict, Hashable, Optional, Tuple, Any
+from threading import Lock
+
+import numpy as np
+
+
+class QuadratureRegistry():
+    """Process-wide registry of shared quadrature rules.
+
+    A rule is built once for each key, e.g. (backend, class, index, dtype,
+    device), and the same instance is handed out afterwards. NumPy points
+    and weights of registered rules are made read-only, and the rules should
+    not be modified in place on other backends either.
+
+    The registry also identifies the point arrays of registered rules, so
+    caches keyed by quadrature points (e.g. the reference basis tables) can
+    use `points_key` instead of hashing the values.
+    """
+    def __init__(self):
+        self._rules: Dict[Hashable, Any] = {}
+        self._points: Dict[int, Tuple[Any, Hashable]] = {}
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f"QuadratureRegistry(size={len(self._rules)})"
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def get(self, key: Hashable, factory: Callable[[], Any], /):
+        """Get the rule of the key, calling `factory()` to build it on a miss."""
+        quad = self._rules.get(key, None)
+        if quad is not None:
+            return quad
+
+        quad = factory()
+        quad.key = key
+        quadpts = quad.quadpts if isinstance(quad.quadpts, tuple) else (quad.quadpts,)
+        for array in quadpts + (quad.weights,):
+            if isinstance(array, np.ndarray):
+                array.flags.writeable = False
+
+        with self._lock:
+            if key in self._rules: # built by another thread
+                return self._rules[key]
+            self._rules[key] = quad
+            for i, points in enumerate(quadpts):
+                self._points[id(points)] = (points, (key, i))
+        return quad
+
+    def points_key(self, points) -> Optional[Hashable]:
+        """Key of the quadrature points if they belong to a registered rule,
+        otherwise None."""
+        entry = self._points.get(id(points), None)
+        if (entry is None) or (entry[0] is not points):
+            return None
+        return entry[1]
+
+    def clear(self):
+        """Remove all registered rules."""
+        with self._lock:
+            self._rules.clear()
+            self._points.clear()
+
+
+quadrature_registry = QuadratureRegistry()
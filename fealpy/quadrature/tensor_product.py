@@ -1,6 +1,7 @@
 
 from ..backend import backend_manager as bm
 from .quadrature import Quadrature
+from .registry import quadrature_registry
 
 class TensorProductQuadrature(Quadrature):
     """
@@ -35,6 +36,12 @@ class TensorProductQuadrature(Quadrature):
         s = s + '->' + s0[:TD]
         self.weights = bm.einsum(s, *weights).reshape(-1)
 
+    @classmethod
+    def shared(cls, qfs):
+        """Get the shared tensor product of shared rules, see `Quadrature.shared`."""
+        key = (cls, tuple(qf.key for qf in qfs))
+        return quadrature_registry.get(key, lambda: cls(qfs))
+
     def number_of_quadrature_points(self):
         n = self.weights.shape[0]
         return n 
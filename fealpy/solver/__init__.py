@@ -1,5 +1,9 @@
 
 from .conjugate_gradient import cg
+from .preconditioner import (
+    JacobiPreconditioner, BlockJacobiPreconditioner,
+    SSORPreconditioner, IC0Preconditioner
+)
 from .direct_solver import spsolve, spsolve_triangular
 from .gmres_solver import gmres
 from .gamg_solver import GAMGSolver
@@ -1,5 +1,5 @@
 
-from typing import Optional, Protocol
+from typing import Optional, Protocol, Union, Callable, Tuple, Dict, Any
 
 from ..backend import backend_manager as bm
 from ..backend import TensorLike
@@ -14,8 +14,10 @@ class SupportsMatmul(Protocol):
 def cg(A: SupportsMatmul, b: TensorLike, x0: Optional[TensorLike]=None, *,
        batch_first: bool=False,
        atol: float=1e-12, rtol: float=1e-8,
-       maxiter: Optional[int]=10000) -> TensorLike:
-    """Solve a linear system Ax = b using the Conjugate Gradient (CG) method.
+       maxiter: Optional[int]=10000,
+       M: Union[SupportsMatmul, Callable[[TensorLike], TensorLike], None]=None,
+       returninfo: bool=False) -> Union[TensorLike, Tuple[TensorLike, Dict[str, Any]]]:
+    """Solve a linear system Ax = b using the (preconditioned) Conjugate Gradient (CG) method.
 
     Parameters:
         A (SupportsMatmul): The coefficient matrix of the linear system.
@@ -28,9 +30,17 @@ def cg(A: SupportsMatmul, b: TensorLike, x0: Optional[TensorLike]=None, *,
         rtol (float, optional): Relative tolerance for convergence. Default is 1e-8.
         maxiter (int, optional): Maximum number of iterations allowed. Default is 10000.\
         If not provided, the method will continue until convergence based on the given tolerances.
+        M (SupportsMatmul | Callable | None, optional): The preconditioner approximating\
+        the inverse of A, applied as `M @ r` or `M(r)`. See `fealpy.solver.preconditioner`\
+        for the built-in ones. Default is None.
+        returninfo (bool, optional): Whether to return the convergence information. Default is False.
 
     Returns:
         Tensor: The approximate solution to the system Ax = b.
+        dict: The convergence information if `returninfo` is True, containing\
+        `niter` (number of iterations), `residual` (final residual norm) and\
+        `history` (residual norms of all iterations, shaped (niter+1, ...)), all\
+        given per column for batched right-hand sides.
 
     Raises:
         ValueError: If inputs do not meet the specified conditions (e.g., A is not sparse, dimensions mismatch).
@@ -38,6 +48,8 @@ def cg(A: SupportsMatmul, b: TensorLike, x0: Optional[TensorLike]=None, *,
     Note:
         This implementation assumes that A is a symmetric positive-definite matrix,
         which is a common requirement for the Conjugate Gradient method to work correctly.
+        Convergence is checked for each column of b, and converged columns are
+        removed from the iteration.
     """
     assert isinstance(b, TensorLike), "b must be a Tensor"
     if x0 is not None:
@@ -53,59 +65,93 @@ def cg(A: SupportsMatmul, b: TensorLike, x0: Optional[TensorLike]=None, *,
         if x0.shape != b.shape:
             raise ValueError("x0 and b must have the same shape")
 
-    if (not single_vector) and batch_first:
+    if single_vector:
+        b = b[:, None]
+        x0 = x0[:, None]
+    elif batch_first:
         b = bm.swapaxes(b, 0, 1)
         x0 = bm.swapaxes(x0, 0, 1)
 
-    sol = _cg_impl(A, b, x0, atol, rtol, maxiter)
+    sol, info = _cg_impl(A, b, x0, atol, rtol, maxiter, M)
 
-    if (not single_vector) and batch_first:
+    if single_vector:
+        sol = sol[:, 0]
+        info = {k: v[..., 0] for k, v in info.items()}
+    elif batch_first:
         sol = bm.swapaxes(sol, 0, 1)
 
+    if returninfo:
+        return sol, info
     return sol
 
 
-def _cg_impl(A: SupportsMatmul, b: TensorLike, x0: TensorLike, atol, rtol, maxiter):
+def _precondition(M, r: TensorLike) -> TensorLike:
+    if M is None:
+        return r
+    if hasattr(M, '__matmul__'):
+        return M @ r
+    if callable(M):
+        return M(r)
+    raise TypeError(f"M must support matmul or be callable, but got {type(M).__name__}.")
+
+
+def _cg_impl(A: SupportsMatmul, b: TensorLike, x0: TensorLike, atol, rtol, maxiter, M):
     # initialize
-    x = x0              # (dof, batch)
-    r = b - A @ x       # (dof, batch)
-    p = r               # (dof, batch)
-    n_iter = 0
-    b_norm = bm.linalg.norm(b)
     sum_func = bm.sum
     sqrt_func = bm.sqrt
+    x = bm.copy(x0)     # (dof, batch)
+    r = b - A @ x       # (dof, batch)
+    r_norm = sqrt_func(sum_func(r**2, axis=0))  # (batch,)
+    tol = rtol * sqrt_func(sum_func(b**2, axis=0))
+    tol = bm.where(tol > atol, tol, atol)
+    kwargs = {'dtype': bm.int64, 'device': bm.get_device(b)}
+    niter = bm.zeros(r_norm.shape, **kwargs)
+    residual = r_norm
+    history = [residual]
+    n_iter = 0
+
+    # NOTE: Columns still iterating, where r, p, rz are compressed to.
+    active = bm.nonzero(r_norm >= tol)[0]
+    r = r[:, active]
+    z = _precondition(M, r)
+    p = z
+    rz = sum_func(r*z, axis=0)
 
     # iterate
-    while True:
-        Ap = A @ p      # (dof, batch)
-        rTr = sum_func(r**2, axis=0)
-        alpha = rTr / sum_func(p*Ap, axis=0)  # r @ r / (p @ Ap) # (batch,)
-        x = x + alpha[None, ...] * p  # (dof, batch)
-        r_new = r - alpha[None, ...] * Ap
-        rTr_new = sum_func(r_new**2, axis=0)  # (batch,)
-        r_norm_new = sqrt_func(sum_func(rTr_new))
+    while active.shape[0] > 0:
+        if (maxiter is not None) and (n_iter >= maxiter):
+            logger.info(f"CG: failed, stopped by maxiter ({maxiter}), "
+                        f"with {active.shape[0]} column(s) not converged.")
+            break
 
+        Ap = A @ p      # (dof, active)
+        alpha = rz / sum_func(p*Ap, axis=0)  # (active,)
+        x = bm.set_at(x, (slice(None), active), x[:, active] + alpha[None, ...] * p)
+        r = r - alpha[None, ...] * Ap
+        r_norm = sqrt_func(sum_func(r**2, axis=0))
         n_iter += 1
 
-        if r_norm_new < atol:
-            logger.info(f"CG: converged in {n_iter} iterations, "
-                        "stopped by absolute tolerance.")
-            break
+        residual = bm.set_at(bm.copy(residual), active, r_norm)
+        niter = bm.set_at(niter, active, n_iter)
+        history.append(residual)
 
-        if r_norm_new < rtol * b_norm:
-            logger.info(f"CG: converged in {n_iter} iterations, "
-                        "stopped by relative tolerance.")
-            break
+        keep = r_norm >= tol[active]
+        if not bm.all(keep):
+            active, r, p, rz = active[keep], r[:, keep], p[:, keep], rz[keep]
+            if active.shape[0] == 0:
+                break
 
-        if (maxiter is not None) and (n_iter >= maxiter):
-            logger.info(f"CG: failed, stopped by maxiter ({maxiter}).")
-            break
+        z = _precondition(M, r)
+        rz_new = sum_func(r*z, axis=0)
+        beta = rz_new / rz # (active,)
+        p = z + beta[None, ...] * p
+        rz = rz_new
 
-        beta = rTr_new / rTr # (batch,)
-        p = r_new + beta[None, ...] * p
-        r = r_new
+    if active.shape[0] == 0:
+        logger.info(f"CG: converged in {n_iter} iterations.")
 
-    return x
+    info = {'niter': niter, 'residual': residual, 'history': bm.stack(history, axis=0)}
+    return x, info
 
     # @staticmethod
     # def setup_context(ctx, inputs, output):
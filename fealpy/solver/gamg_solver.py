@@ -1,39 +1,334 @@
+from typing import Optional, List, Union
 
+from .. import logger
 from ..backend import backend_manager as bm
-from .conjugate_gradient import cg
-from .direct_solver import spsolve
-from ..mesh.triangle_mesh import TriangleMesh
+from ..backend import TensorLike
 from ..sparse.coo_tensor import COOTensor
 from ..sparse.csr_tensor import CSRTensor
+from .conjugate_gradient import cg
+from .preconditioner import JacobiPreconditioner, _diagonal, _scale_rows
+
+_SparseMatrix = Union[COOTensor, CSRTensor]
+
+_MAX_LEVELS = 25
+_MAX_DENSE_SIZE = 4000
+
 
+def _to_csr(A: _SparseMatrix) -> CSRTensor:
+    if isinstance(A, COOTensor):
+        return A.coalesce().tocsr()
+    if isinstance(A, CSRTensor):
+        return A
+    raise TypeError(f"A must be a COOTensor or CSRTensor, but got {type(A).__name__}.")
+
+
+def _triplets_to_csr(row, col, values, shape) -> CSRTensor:
+    indices = bm.stack([row, col], axis=0)
+    return COOTensor(indices, values, shape).coalesce().tocsr()
+
+
+def _scramble(n: int, device=None):
+    """
+    @brief 由编号生成互不相同的伪随机整数 (Knuth 乘法散列), 用于打破对称性
+    """
+    idx = bm.arange(n, dtype=bm.int64, device=device)
+    return (idx * 2654435761) % (2**32)
+
+
+def _rank_in_row(row, key, n: int):
+    """
+    @brief 把每行的项按 key 从大到小排序, 返回排序后的编号与其在行内的名次
+    """
+    order = bm.argsort(-key, stable=True)
+    order = order[bm.argsort(row[order], stable=True)]
+    count = bm.bincount(row, minlength=n)
+    start = bm.cumsum(count, axis=0) - count
+    rank = bm.arange(order.shape[0], **bm.context(row)) - start[row[order]]
+    return order, rank
+
+
+def strength_of_connection(row, col, values, diag, theta: float, signed: bool=True):
+    """
+    @brief 强连接图: 对角线归一化后 -a_ij/sqrt(a_ii a_jj) > theta 的非对角项
+
+    @param[in] signed 为 False 时用 |a_ij| 代替 -a_ij, 用于非 M 矩阵 (如弹性问题)
+    @return 强连接项的行、列与强度
+    """
+    scale = bm.sqrt(bm.abs(diag[row] * diag[col]))
+    s = -values / scale if signed else bm.abs(values) / scale
+    flag = (row != col) & (s > theta)
+    return row[flag], col[flag], s[flag]
+
+
+def independent_set(row, col, n: int, isolated: TensorLike):
+    """
+    @brief 用 Luby 算法求强连接图的极大独立集, 每一轮同时选出所有局部权重最大的点
+
+    @param[in] isolated 孤立点标记, 孤立点不会被选择
+    @note 权重为点的度加上互不相同的伪随机数, 度大的点优先被选为粗点
+    """
+    deg = bm.astype(bm.bincount(row, minlength=n), bm.int64)
+    weight = deg * (2**32) + _scramble(n, bm.get_device(row))
+    state = bm.zeros((n,), **bm.context(row)) # 0 未定, 1 选中, -1 排除
+    state = bm.set_at(state, isolated, -1)
+
+    while True:
+        undecided = state == 0
+        if not bm.any(undecided):
+            break
+        e = undecided[row] & undecided[col]
+        r, c = row[e], col[e]
+        blocked = bm.zeros((n,), dtype=bm.bool, device=bm.get_device(row))
+        blocked = bm.set_at(blocked, r[weight[r] < weight[c]], True)
+        selected = undecided & bm.logical_not(blocked)
+        state = bm.set_at(state, selected, 1)
+        neighbor = bm.zeros((n,), dtype=bm.bool, device=bm.get_device(row))
+        neighbor = bm.set_at(neighbor, col[selected[row]], True)
+        state = bm.set_at(state, neighbor & (state == 0), -1)
+
+    return state == 1
+
+
+def multicolor(row, col, n: int):
+    """
+    @brief 图的贪婪着色: 每次取未着色点的极大独立集作为一种颜色
+
+    @return 每个点的颜色, 颜色个数
+    """
+    color = bm.full((n,), -1, **bm.context(row))
+    ncolor = 0
+    while bm.any(color < 0):
+        uncolored = color < 0
+        e = uncolored[row] & uncolored[col]
+        selected = independent_set(row[e], col[e], n, bm.logical_not(uncolored))
+        color = bm.set_at(color, selected, ncolor)
+        ncolor += 1
+    return color, ncolor
+
+
+class MulticolorGaussSeidel():
+    """
+    @brief 多色 Gauss-Seidel 磨光子, 同一颜色的未知量互不相连, 可以同时更新,
+           因此一次扫描只需按颜色做几次向量化的稀疏矩阵向量乘
+    """
+    def __init__(self, A: CSRTensor, diag: TensorLike):
+        row, col, values = A.row, A.col, A.values
+        n = A.shape[0]
+        off = row != col
+        color, ncolor = multicolor(row[off], col[off], n)
+        count = A.crow[1:] - A.crow[:-1]
+        zero = bm.zeros((1,), **bm.context(row))
+        self.colors = []
+
+        for k in range(ncolor):
+            rows = bm.nonzero(color == k)[0]
+            flag = color[row] == k
+            crow = bm.concat([zero, bm.cumsum(count[rows], axis=0)])
+            Ak = CSRTensor(crow, col[flag], values[flag], (rows.shape[0], n))
+            self.colors.append((rows, Ak, 1. / diag[rows]))
+
+    def sweep(self, r, e=None, forward=True):
+        """
+        @brief 对 Ae = r 做一次 Gauss-Seidel 扫描, 向前扫描按颜色顺序, 向后扫描按逆序
+        """
+        e = bm.zeros_like(r) if e is None else e
+        colors = self.colors if forward else reversed(self.colors)
+        for rows, Ak, dinv in colors:
+            e = bm.set_at(e, rows, e[rows] + _scale_rows(dinv, r[rows] - Ak @ e))
+        return e
+
+
+def spectral_radius(A: CSRTensor, dinv: TensorLike, steps: int=20):
+    """
+    @brief 用幂法估计 D^{-1} A 的谱半径
+    """
+    n = A.shape[0]
+    x = bm.astype(_scramble(n, bm.get_device(dinv)) % 1024, dinv.dtype) / 1024. - 0.5
+    lam = 1.0
+    for _ in range(steps):
+        y = dinv * (A @ x)
+        lam = bm.linalg.norm(y)
+        if lam == 0:
+            return 1.0
+        x = y / lam
+    return float(lam)
+
+
+def _truncate(row, col, values, n: int, factor: float):
+    """
+    @brief 去掉每行中绝对值小于 factor 倍行最大值的项, 并缩放保持行和不变
+    """
+    kargs = bm.context(values)
+    order, rank = _rank_in_row(row, bm.abs(values), n)
+    rmax = bm.zeros((n,), **kargs)
+    rmax = bm.set_at(rmax, row[order[rank == 0]], bm.abs(values[order[rank == 0]]))
+    keep = bm.abs(values) >= factor * rmax[row]
+    total = bm.index_add(bm.zeros((n,), **kargs), row, values)
+    kept = bm.index_add(bm.zeros((n,), **kargs), row[keep], values[keep])
+    scale = bm.where(kept != 0, total / bm.where(kept != 0, kept, 1.), 1.)
+    return row[keep], col[keep], values[keep] * scale[row[keep]]
+
+
+def ruge_stuben_interpolation(A: CSRTensor, theta: float, itype: str='T'):
+    """
+    @brief Ruge-Stuben 粗化与直接插值
+
+    @param[in] itype 'T' 为每个细点最多用两个最强的粗点插值, 'S' 用所有强连接的粗点
+    @return 延拓矩阵 P, 粗点个数
+    @note 粗点集为强连接图的极大独立集, 因此每个非孤立的细点都至少有一个强连接的粗点.
+          孤立点 (如 Dirichlet 边界条件对应的行) 不参与插值.
+    """
+    row, col, values = A.row, A.col, A.values
+    n = A.shape[0]
+    diag = _diagonal(row, col, values, n)
+    srow, scol, s = strength_of_connection(row, col, values, diag, theta)
+    isolated = bm.bincount(srow, minlength=n) == 0
+    isC = independent_set(srow, scol, n, isolated)
+
+    isF = bm.logical_not(isC | isolated)
+    nc = int(bm.sum(isC))
+    cindex = bm.cumsum(bm.astype(isC, row.dtype), axis=0) - 1
+
+    flag = bm.logical_not(isC)[srow] & isC[scol]
+    r, c, s = srow[flag], scol[flag], s[flag]
+    if itype == 'T':
+        order, rank = _rank_in_row(r, s, n)
+        keep = order[rank < 2]
+        r, c, s = r[keep], c[keep], s[keep]
+    elif itype != 'S':
+        raise ValueError(f"Unknown interpolation type '{itype}'.")
+
+    # w_ij = -(sum_{k != i} a_ik^-) / (sum_{k in C_i} a_ik) * a_ij / (a_ii + sum_{k != i} a_ik^+)
+    kargs = bm.context(values)
+    off = row != col
+    neg = bm.where(off & (values < 0), values, 0.)
+    pos = bm.where(off & (values > 0), values, 0.)
+    num = bm.index_add(bm.zeros((n,), **kargs), row, neg)
+    dia = bm.index_add(diag, row, pos)
+    a = -s * bm.sqrt(diag[r] * diag[c]) # the entries a_ij of the strong connections
+    den = bm.index_add(bm.zeros((n,), **kargs), r, a)
+    w = -(num[r] / den[r]) * a / dia[r]
+
+    C = bm.nonzero(isC)[0]
+    ones = bm.ones(C.shape, **kargs)
+    P = _triplets_to_csr(
+        bm.concat([C, r]),
+        bm.concat([cindex[C], cindex[c]]),
+        bm.concat([ones, w]),
+        (n, nc)
+    )
+
+    # Improve the interpolation of F points by one Jacobi iteration,
+    # P_F = -D_F^{-1} (A - D)_F P, then truncate the small weights.
+    AP = (A @ P).tocoo()
+    ar, ac, av = AP.indices[0], AP.indices[1], AP.values
+    flag = isF[ar]
+    pr, pc = P.row, P.col
+    pflag = isF[pr]
+    ar, ac, av = _truncate(
+        bm.concat([pr[pflag], ar[flag]]),
+        bm.concat([pc[pflag], ac[flag]]),
+        bm.concat([P.values[pflag], -av[flag] / diag[ar[flag]]]),
+        n, 0.2
+    )
+    P = _triplets_to_csr(
+        bm.concat([C, ar]),
+        bm.concat([cindex[C], ac]),
+        bm.concat([ones, av]),
+        (n, nc)
+    )
+    return P, nc
+
+
+def smoothed_aggregation_interpolation(A: CSRTensor, theta: float, block_size: int=1):
+    """
+    @brief 光滑聚集粗化: 以强连接图的极大独立集为聚集中心, 其余点并入连接最强的中心,
+           再用带权 Jacobi 光滑分片常数的试探延拓 P = (I - w D^{-1} A) P_t.
+
+    @param[in] block_size 每个节点的自由度个数 (按节点排列), 节点上的块按 Frobenius
+               范数计算强度, 每个分量单独取常数作为近零空间
+    @return 延拓矩阵 P, 粗空间维数
+    """
+    row, col, values = A.row, A.col, A.values
+    n = A.shape[0]
+    bs = block_size
+    if n % bs != 0:
+        raise ValueError(f"The size of A ({n}) is not divisible by block_size {bs}.")
+    nn = n // bs
+    kargs = bm.context(row)
+
+    if bs > 1:
+        key = (row // bs) * nn + col // bs
+        key, inverse = bm.unique(key, return_inverse=True)
+        norm = bm.index_add(bm.zeros(key.shape, **bm.context(values)), inverse, values**2)
+        nrow, ncol, nval = key // nn, key % nn, bm.sqrt(norm)
+        nrow, ncol = bm.astype(nrow, row.dtype), bm.astype(ncol, row.dtype)
+    else:
+        nrow, ncol, nval = row, col, values
+    ndiag = _diagonal(nrow, ncol, nval, nn)
+    srow, scol, s = strength_of_connection(nrow, ncol, nval, ndiag, theta, signed=False)
+    isolated = bm.bincount(srow, minlength=nn) == 0
+    root = independent_set(srow, scol, nn, isolated)
+    nagg = int(bm.sum(root))
+
+    agg = bm.full((nn,), -1, **kargs)
+    agg = bm.set_at(agg, root, bm.arange(nagg, **kargs))
+    flag = bm.logical_not(root)[srow] & root[scol]
+    r, c, s = srow[flag], scol[flag], s[flag]
+    order, rank = _rank_in_row(r, s, nn)
+    first = order[rank == 0]
+    agg = bm.set_at(agg, r[first], agg[c[first]])
+
+    node = bm.nonzero(agg >= 0)[0]
+    size = bm.bincount(agg[node], minlength=nagg)
+    comp = bm.arange(bs, **kargs)
+    trow = bm.reshape(node[:, None] * bs + comp, (-1,))
+    tcol = bm.reshape(agg[node][:, None] * bs + comp, (-1,))
+    tval = bm.repeat(1. / bm.sqrt(bm.astype(size[agg[node]], values.dtype)), bs)
+    Pt = _triplets_to_csr(trow, tcol, tval, (n, nagg * bs))
+
+    dinv = 1. / _diagonal(row, col, values, n)
+    omega = 4. / (3. * spectral_radius(A, dinv))
+    AP = (A @ Pt).tocoo()
+    arow, acol = AP.indices[0], AP.indices[1]
+    P = _triplets_to_csr(
+        bm.concat([trow, arow]),
+        bm.concat([tcol, acol]),
+        bm.concat([tval, -omega * dinv[arow] * AP.values]),
+        (n, nagg * bs)
+    )
+    return P, nagg * bs
 
 
 class GAMGSolver():
     """
     @brief 几何与代数多重网格的快速解法器
 
-    @note 
-    1. 多重网格方法通常分为几何和代数两种类型 
+    @note
+    1. 多重网格方法通常分为几何和代数两种类型
     2. 多重网格方法用到两种插值算子：延拓（Prolongation）和 限制（Restriction）算子
     3. 延拓是指把粗空间上的解插值到细空间中
     4. 限制是指把细空间上的解插值到粗空间中
     5. 几何多重网格利用网格的几何结构来构造延拓和限制算子
     6. 代数多重网格得用离散矩阵的结构来构造延拓和限制算子
+    7. 建立阶段的所有步骤 (强连接、粗化、插值、Galerkin 粗矩阵) 都是向量化的,
+       磨光子用带权 Jacobi 或多色 Gauss-Seidel, 最粗层的稠密逆矩阵在建立时计算并缓存
     """
     def __init__(self,
             theta: float = 0.025, # 粗化系数
             csize: int = 50, # 最粗问题规模
-            ctype: str = 'C', # 粗化方法
-            itype: str = 'T', # 插值方法
-            ptype: str = 'V', # 预条件类型
+            ctype: str = 'C', # 粗化方法, 'C' 为 Ruge-Stuben 粗化, 'A' 为光滑聚集
+            itype: str = 'T', # 插值方法, 'T' 为两点插值, 'S' 为标准插值
+            ptype: str = 'V', # 预条件类型, 'V', 'W' 或 'F' 循环
             sstep: int = 2, # 默认光滑步数
-            isolver: str = 'CG', # 默认迭代解法器
+            isolver: str = 'CG', # 默认迭代解法器, 'CG' 或 'MG' (多重网格迭代)
             maxit: int = 200,   # 默认迭代最大次数
-            csolver: str = 'direct', # 默认粗网格解法器
+            csolver: str = 'direct', # 默认粗网格解法器, 'direct' 或 'CG'
             rtol: float = 1e-8,      # 相对误差收敛阈值
             atol: float = 1e-8,      # 绝对误差收敛阈值
+            stype: str = 'GS', # 光滑方法, 'GS' 为多色 Gauss-Seidel, 'J' 为带权 Jacobi
             ):
-        self.csize = csize 
+        self.csize = csize
         self.theta = theta
         self.ctype = ctype
         self.itype = itype
@@ -44,43 +339,88 @@ class GAMGSolver():
         self.csolver = csolver
         self.rtol = rtol
         self.atol = atol
+        self.stype = stype
 
-    # def setup(self, A):
-    #     """
-    #     @brief 给定离散矩阵 A, 构造从细空间到粗空间的插值算子
-
-    #     @param[in] A 矩阵
-    #     @param[in] space 离散空间
-    #     @param[in] cdegree 粗空间的次数
-
-    #     @note 注意这里假定第 0 层为最细层，第 1、2、3 ... 层变的越来越粗
-    #     """
-
-    #     # 1. 建立初步的算子存储结构
-    #     self.A = [A]
-    #     self.L = [ ] # 下三角 
-    #     self.U = [ ] # 上三角
-    #     self.D = [ ] # 对角线
-    #     self.P = [ ] # 延拓算子
-    #     self.R = [ ] # 限制矩阵
-
-    def setup(self, A, L=None, U=None, D=None, P=None, R=None):
+    def setup(self, A: _SparseMatrix, *, P: Optional[List[CSRTensor]]=None,
+              R: Optional[List[CSRTensor]]=None, block_size: int=1):
         """
         @brief 给定离散矩阵 A, 构造从细空间到粗空间的插值算子
+
         @param[in] A 矩阵
-        @param[in] L 下三角矩阵，默认值为 None
-        @param[in] U 上三角矩阵，默认值为 None
-        @param[in] D 对角线矩阵，默认值为 None
-        @param[in] P 延拓算子，默认值为 None
-        @param[in] R 限制矩阵，默认值为 None
-        @note 注意这里假定第 0 层为最细层，第 1、2、3 ... 层变的越来越粗
+        @param[in] P 给定的延拓算子列表 (如几何网格或高次元到低次元的延拓), 默认值为 None
+        @param[in] R 给定的限制算子列表，默认值为 None, 即取 P 的转置
+        @param[in] block_size 每个节点的自由度个数, 仅用于光滑聚集粗化
+        @note 注意这里假定第 0 层为最细层，第 1、2、3 ... 层变的越来越粗.
+              先使用给定的延拓算子, 然后继续做代数粗化直到问题规模小于 csize.
+              A 之后的参数只能按关键字传入, 旧的 setup(A, L, U, D, P, R) 调用会报 TypeError,
+              L, U, D 不再需要, 磨光子在建立时由 A 构造.
+        """
+        if self.ctype not in {'C', 'A'}:
+            raise ValueError(f"Unknown coarsening type '{self.ctype}'.")
+        if self.ctype == 'C' and block_size != 1:
+            raise ValueError("block_size is only supported by the aggregation coarsening (ctype='A').")
+
+        self.A = [_to_csr(A)]
+        self.P = [ ] # 延拓算子
+        self.R = [ ] # 限制矩阵
+        P = [] if P is None else P
+        R = [p.T for p in P] if R is None else R
+
+        # 1. 给定的延拓与限制算子
+        for Pl, Rl in zip(P, R):
+            self.P.append(_to_csr(Pl))
+            self.R.append(_to_csr(Rl))
+            self.A.append(self.R[-1] @ (self.A[-1] @ self.P[-1]))
+
+        # 2. 代数粗化
+        while self.A[-1].shape[0] > self.csize and len(self.A) < _MAX_LEVELS:
+            Al = self.A[-1]
+            if self.ctype == 'C':
+                Pl, nc = ruge_stuben_interpolation(Al, self.theta, self.itype)
+            else:
+                Pl, nc = smoothed_aggregation_interpolation(Al, self.theta, block_size)
+            if nc == 0 or nc >= Al.shape[0]:
+                break
+            Rl = Pl.T
+            self.P.append(Pl)
+            self.R.append(Rl)
+            self.A.append(Rl @ (Al @ Pl))
+
+        # 3. 磨光子
+        self.D = [ ] # 对角线
+        self.S = [ ] # Gauss-Seidel 磨光子
+        self.omega = [ ] # Jacobi 磨光的权重
+        for Al in self.A[:-1]:
+            diag = _diagonal(Al.row, Al.col, Al.values, Al.shape[0])
+            self.D.append(diag)
+            if self.stype == 'GS':
+                self.S.append(MulticolorGaussSeidel(Al, diag))
+            elif self.stype == 'J':
+                self.omega.append(4. / (3. * spectral_radius(Al, 1. / diag)))
+            else:
+                raise ValueError(f"Unknown smoother type '{self.stype}'.")
+
+        # 4. 最粗层的稠密 (伪) 逆, 可以处理纯 Neumann 问题的奇异矩阵
+        NC = self.A[-1].shape[0]
+        if self.csolver == 'direct' and NC > _MAX_DENSE_SIZE:
+            logger.warning(f"GAMGSolver: the coarsest level has {NC} unknowns, "
+                           "use CG as the coarse solver.")
+        if self.csolver == 'direct' and NC <= _MAX_DENSE_SIZE:
+            self._coarse_inv = bm.linalg.pinv(self.A[-1].to_dense())
+        elif self.csolver in {'direct', 'CG'}:
+            self._coarse_inv = None
+        else:
+            raise ValueError(f"Unknown coarse solver '{self.csolver}'.")
+        self._ready = True
+
+        logger.info(f"GAMGSolver: {len(self.A)} levels, operator complexity "
+                    f"{self.operator_complexity():.3f}.")
+
+    def operator_complexity(self) -> float:
         """
-        self.A = A
-        self.L = L if L is not None else []  # 如果未传入L，默认使用空列表
-        self.U = U if U is not None else []  # 如果未传入U，默认使用空列表
-        self.D = D if D is not None else []  # 如果未传入D，默认使用空列表
-        self.P = P if P is not None else []  # 如果未传入P，默认使用空列表
-        self.R = R if R is not None else []  # 如果未传入R，默认使用空列表
+        @brief 所有层矩阵非零元个数之和与最细层非零元个数之比
+        """
+        return sum(A.nnz for A in self.A) / self.A[0].nnz
 
     def construct_coarse_equation(self, A, F, level=1):
         """
@@ -93,7 +433,7 @@ class GAMGSolver():
 
         return A, F
 
-    def prolongate(self, uh, level): 
+    def prolongate(self, uh, level):
         """
         @brief 给定一个第 level 层的向量，延拓到最细层
         """
@@ -118,39 +458,92 @@ class GAMGSolver():
         NL = len(self.A)
         for l in range(NL):
             print(l, "-th level:")
-            print("A.shape = ", self.A[l].shape)
+            print("A.shape = ", self.A[l].shape, ", A.nnz = ", self.A[l].nnz)
             if l < NL-1:
-                print("L.shape = ", self.L[l].shape) 
-                print("U.shape = ", self.U[l].shape) 
-                print("D.shape = ", self.D[l].shape)
-                print("P.shape = ", self.P[l].shape) 
-                print("R.shape = ", self.R[l].shape) 
-
-    # @timer
-    # def solve(self, b):
-    #     """
-    #     @brief 用多重网格方法求解 Ax = b
-    #     """
-    #     N = self.A[0].shape[0]
-
-    #     if self.ptype == 'V':
-    #         P = LinearOperator((N, N), matvec=self.vcycle, dtype=self.A[0].dtype)
-    #     elif self.ptype == 'W':
-    #         P = LinearOperator((N, N), matvec=self.wcycle, dtype=self.A[0].dtype)
-    #     elif self.ptype == 'F':
-    #         P = LinearOperator((N, N), matvec=self.fcycle, dtype=self.A[0].dtype)
-
-    #     if self.isolver == 'CG':
-    #         counter = IterationCounter()
-    #         x, info = cg(self.A[0], b, M=P, tol=self.rtol, atol=self.atol, callback=counter)
-    #         print(info)
-
-    #     return x
+                print("P.shape = ", self.P[l].shape)
+                print("R.shape = ", self.R[l].shape)
+        print("operator complexity = ", self.operator_complexity())
+
+    def solve(self, b: TensorLike, x0: Optional[TensorLike]=None):
+        """
+        @brief 用多重网格方法求解 Ax = b
+
+        @note isolver 为 'CG' 时用多重网格循环作为预条件子的共轭梯度法,
+              为 'MG' 时直接做多重网格迭代. 收敛信息保存在 self.info 中.
+        """
+        if not getattr(self, '_ready', False):
+            raise RuntimeError("GAMGSolver.setup must be called before solve.")
+        cycles = {'V': self.vcycle, 'W': self.wcycle, 'F': self.fcycle}
+        if self.ptype not in cycles:
+            raise ValueError(f"Unknown cycle type '{self.ptype}'.")
+        cycle = cycles[self.ptype]
+        A = self.A[0]
+
+        if self.isolver == 'CG':
+            x, self.info = cg(A, b, x0, atol=self.atol, rtol=self.rtol,
+                              maxiter=self.maxit, M=cycle, returninfo=True)
+            return x
+
+        elif self.isolver == 'MG':
+            x = bm.zeros_like(b) if x0 is None else x0
+            r = b - A @ x
+            tol = max(self.rtol * float(bm.linalg.norm(b)), self.atol)
+            history = [bm.linalg.norm(r)]
+            niter = 0
+            while history[-1] > tol and niter < self.maxit:
+                x = x + cycle(r)
+                r = b - A @ x
+                history.append(bm.linalg.norm(r))
+                niter += 1
+            if history[-1] > tol:
+                logger.info(f"GAMGSolver: reached the maximum number of iterations {self.maxit}.")
+            self.info = {'niter': niter, 'residual': history[-1], 'history': bm.stack(history)}
+            return x
+
+        else:
+            raise ValueError(f"Unknown iterative solver '{self.isolver}'.")
+
+    def coarse_solve(self, r):
+        """
+        @brief 最粗层求解, 默认用建立阶段缓存的稠密逆矩阵
+        """
+        if self._coarse_inv is None:
+            A = self.A[-1]
+            return cg(A, r, atol=0., rtol=1e-10, maxiter=10*A.shape[0],
+                      M=JacobiPreconditioner(A))
+        return self._coarse_inv @ r
 
+    def _smooth(self, r, e, level, forward=True):
+        """
+        @brief 在第 level 层做 sstep 次磨光, 前磨光为向前扫描, 后磨光为向后扫描,
+               从而 V 循环是对称的
+        """
+        for _ in range(self.sstep):
+            if self.stype == 'GS':
+                e = self.S[level].sweep(r, e, forward)
+            else:
+                res = r if e is None else r - self.A[level] @ e
+                de = self.omega[level] * _scale_rows(1. / self.D[level], res)
+                e = de if e is None else e + de
+        return e
+
+    def _cycle(self, r, level, ncycle):
+        NL = len(self.A)
+        if level == NL - 1: # 如果是最粗层
+            return self.coarse_solve(r)
+
+        e = self._smooth(r, None, level) # 前磨光
+        rc = self.R[level] @ (r - self.A[level] @ e)
+        ec = self._cycle(rc, level + 1, ncycle)
+        if level + 1 < NL - 1:
+            for _ in range(ncycle - 1):
+                ec = ec + self._cycle(rc - self.A[level+1] @ ec, level + 1, ncycle)
+        e = e + self.P[level] @ ec
+        return self._smooth(r, e, level, forward=False) # 后磨光
 
     def vcycle(self, r, level=0):
         """
-        @brief V-Cycle 方法求解 Ae=r  
+        @brief V-Cycle 方法求解 Ae=r
 
         @note
         1. 先在最细空间上进行几次（通常为1到2次）光滑（即迭代求解）操作，这个步骤称为前磨光, 它可以消除高频误差。
@@ -161,110 +554,29 @@ class GAMGSolver():
         6. 在每个更细的空间中，先进行后磨光（即再次迭代求解），然后再将解延拓到下一个更细的空间中
         7. 重复步骤6，直到达到最细的网格。
         """
-
-        NL = len(self.A)
-        r = [None]*level + [r] # 残量列表
-        e = [None]*level       # 求解列表 
-
-        # 前磨光
-        for l in range(level, NL - 1, 1):
-            el = spsolve(self.L[l],r[l])
-            for i in range(self.sstep):
-                el += spsolve(self.L[l], r[l] - self.A[l] @ el)
-            e.append(el)
-            r.append(self.R[l] @ (r[l] - self.A[l] @ el))
-
-        el = cg(self.A[-1], r[-1])
-        e.append(el)
-
-        # 后磨光
-        for l in range(NL - 2, level - 1, -1):
-            e[l] += self.P[l] @ e[l + 1]
-            e[l] +=spsolve(self.U[l], r[l] - self.A[l] @ e[l])
-            for i in range(self.sstep): # 后磨光
-                e[l] += spsolve(self.U[l], r[l] - self.A[l] @ e[l])
-
-        return e[level]
+        return self._cycle(r, level, 1)
 
     def wcycle(self, r, level=0):
         """
-        @brief W-Cycle 方法求解 Ae=r
+        @brief W-Cycle 方法求解 Ae=r, 每一层的粗网格校正递归地做两次
 
         @param r 第 level 空间层的残量
         @param level 空间层编号
         """
+        return self._cycle(r, level, 2)
 
-        NL = len(self.A)
-        if level == (NL - 1): # 如果是最粗层
-            e = cg(self.A[-1], r)
-            return e
-
-        e = cg(self.A[level], r)
-        for s in range(self.sstep):
-            e += cg(self.A[level], r - self.A[level] @ e) 
-
-        rc = self.R[level] @ ( r - self.A[level] @ e) 
-
-        ec = self.wcycle(rc, level=level+1)
-        ec += self.wcycle( rc - self.A[level+1] @ ec, level=level+1)
-        
-        e += self.P[level] @ ec
-        e += cg(self.A[level], r - self.A[level] @ e)
-        for s in range(self.sstep):
-            e += cg(self.A[level], r - self.A[level] @ e)
-        return e
-
-
-    def fcycle(self, r):
+    def fcycle(self, r, level=0):
         """
-        @brief F-Cycle 方法求解 Ae=r
+        @brief F-Cycle 方法求解 Ae=r, 粗网格校正先做一次 F 循环, 再做一次 V 循环
         """
         NL = len(self.A)
-        r = [r] 
-        e = [ ]
-
-        # 从最细层到次最粗层
-        for l in range(0, NL - 1, 1):
-            el = self.vcycle(r[l], level=l)
-            for s in range(self.sstep):
-                el += self.vcycle(r[l] - self.A[l] @ el, level=l)
-
-            e.append(el)
-            r.append(self.R[l] @ (r[l] - self.A[l] @ e[l]))
-
-        # 最粗层直接求解 
-        ec = cg(self.A[-1], r[-1])
-        e.append(ec)
-
-        # 从次最粗层到最细层
-        for l in range(NL - 2, -1, -1):
-            e[l] += self.P[l] @ e[l+1]
-            e[l] += self.vcycle(r[l] - self.A[l] @ e[l], level=l)
-            for s in range(self.sstep):
-                e[l] += self.vcycle(r[l] - self.A[l] @ e[l], level=l)
-
-        return e[0]
-
-
-    # def bpx(self, r):
-    #     """
-    #     @brief 
-    #     @note
-    #     """
-    #     NL = len(self.A)
-    #     r = [r] 
-    #     e = [ ]
-
-    #     for l in range(0, NL - 1, 1):
-    #         e.append(r[l]/self.D[l])
-    #         r.append(self.R[l] @ r[l])
-
-    #     # 最粗层直接求解 
-    #     # TODO: 最粗层增加迭代求解
-    #     ec = cg(self.A[-1], r[-1])
-    #     e.append(ec)
-
-    #     for l in range(NL - 2, -1, -1):
-    #         e[l] += self.P[l] @ e[l+1]
-
-    #     return e[0]
+        if level == NL - 1:
+            return self.coarse_solve(r)
+
+        e = self._smooth(r, None, level)
+        rc = self.R[level] @ (r - self.A[level] @ e)
+        ec = self.fcycle(rc, level + 1)
+        if level + 1 < NL - 1:
+            ec = ec + self.vcycle(rc - self.A[level+1] @ ec, level + 1)
+        e = e + self.P[level] @ ec
+        return self._smooth(r, e, level, forward=False)
@@ -9,6 +9,8 @@ from .coo_tensor import COOTensor
 from .csr_tensor import CSRTensor
 
 from .ops import spdiags
+from .pattern import SparsityPattern
+from .builder import COOBuilder
 
 
 
@@ -1,5 +1,5 @@
 
-from typing import Tuple
+from typing import Tuple, Optional
 
 from ..backend import backend_manager as bm
 from ..backend import TensorLike as _DT
@@ -27,45 +27,56 @@ def _shape_check(spshape: _Size, xshape: _Size):
                          "sparse-dense multiplication")
 
 
-def spmm_coo(indices: _DT, values: _DT, spshape: _Size, x: _DT) -> _DT:
-    _shape_check(spshape, x.shape)
-    row = indices[0]
-    col = indices[1]
-
+def _spmm_rows(row: _DT, col: _DT, values: _DT, nrow: int, x: _DT) -> _DT:
+    """Sparse-dense product of triplets by a gather and a segment reduction."""
     if x.ndim == 1:
         new_vals = values * x[col]
-        shape = new_vals.shape[:-1] + (spshape[0], )
-        result = bm.zeros(shape, dtype=x.dtype)
+        shape = new_vals.shape[:-1] + (nrow, )
+        result = bm.zeros(shape, **bm.context(x))
         result = bm.index_add(result, row, new_vals, axis=-1)
         return result
 
     else: # x.ndim >= 2
         new_vals = values[..., None] * x[..., col, :] # (*batch, nnz, x_col)
-        shape = new_vals.shape[:-2] + (spshape[0], x.shape[-1])
-        result = bm.zeros(shape, dtype=x.dtype)
+        shape = new_vals.shape[:-2] + (nrow, x.shape[-1])
+        result = bm.zeros(shape, **bm.context(x))
         result = bm.index_add(result, row, new_vals, axis=-2)
         return result
 
 
-def spmm_csr(crow: _DT, col: _DT, values: _DT, spshape: _Size, x: _DT) -> _DT:
-    _shape_check(spshape, x.shape)
-    nrow = spshape[0]
-    unsqueezed = False
+def csr_row(crow: _DT) -> _DT:
+    """Expand the compressed row pointers to the row index of every non-zero
+    element, shaped (nnz,)."""
+    nrow = crow.shape[0] - 1
+    kargs = bm.context(crow)
+    return bm.repeat(bm.arange(nrow, **kargs), crow[1:] - crow[:-1])
 
-    if x.ndim == 1:
-        x = x[:, None]
-        unsqueezed = True
 
-    shape = x.shape[:-2] + (nrow, x.shape[-1])
-    result = bm.zeros(shape, dtype=x.dtype)
-
-    for i in range(nrow):
-        start = crow[i]
-        end = crow[i + 1]
-        r = bm.einsum('...i, ...ij -> ...j', values[..., start:end], x[..., col[start:end], :])
-        result[..., i, :] = r
+def spmm_coo(indices: _DT, values: _DT, spshape: _Size, x: _DT) -> _DT:
+    _shape_check(spshape, x.shape)
+    return _spmm_rows(indices[0], indices[1], values, spshape[0], x)
+
+
+def spmm_csr(crow: _DT, col: _DT, values: _DT, spshape: _Size, x: _DT,
+             row: Optional[_DT]=None) -> _DT:
+    """Sparse-dense matrix multiplication in CSR format.
+
+    Parameters:
+        crow (Tensor): compressed row pointers.
+        col (Tensor): column indices of non-zero elements, shaped (nnz,).
+        values (Tensor): non-zero elements, shaped (*batch, nnz).
+        spshape (Size): shape in the sparse dimensions.
+        x (Tensor): dense tensor shaped (*batch, N) or (*batch, N, K).
+        row (Tensor | None, optional): row indices of non-zero elements
+            made by `csr_row`. Pass it to skip the expansion of `crow` when
+            multiplying the same matrix repeatedly.
+
+    Returns:
+        Tensor: shaped (*batch, M) or (*batch, M, K).
+    """
+    _shape_check(spshape, x.shape)
 
-    if unsqueezed:
-        result = result[..., 0]
+    if row is None:
+        row = csr_row(crow)
 
-    return result
+    return _spmm_rows(row, col, values, spshape[0], x)
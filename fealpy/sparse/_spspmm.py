@@ -17,98 +17,118 @@ def _shape_check(spshape1: _Size, spshape2: _Size):
                         f"got shape {spshape1} and {spshape2}.")
 
 
-def spspmm_coo(indices1: _DT, values1: _DT, spshape1: _Size,
-               indices2: _DT, values2: _DT, spshape2: _Size) -> Tuple[_DT, _DT, _Size]:
-    _shape_check(spshape1, spshape2)
-
+def _structure_check(values1: _DT, values2: _DT):
     structure = values1.shape[:-1]
     if values2.shape[:-1] != structure:
         raise ValueError(f"the dense shape of matrix2 ({values2.shape[:-1]}) "
                          f"must match that of matrix1 {structure}")
 
-    size = spshape1[1]
-    indices_list = []
-    values_list = []
 
-    for i in range(size):
-        left_col_flag = (indices1[1, :] == i)
+def _segment_expand(count: _DT) -> Tuple[_DT, _DT]:
+    """Expand segment lengths into (owner, offset) pairs.
+
+    For `count = [2, 0, 3]` this returns `owner = [0, 0, 2, 2, 2]` and
+    `offset = [0, 1, 0, 1, 2]`.
+    """
+    kargs = bm.context(count)
+    total = int(bm.sum(count))
+    owner = bm.repeat(bm.arange(count.shape[0], **kargs), count)
+    start = bm.cumsum(count, axis=0) - count
+    offset = bm.arange(total, **kargs) - start[owner]
+    return owner, offset
+
+
+def _expand_products(row1: _DT, col1: _DT, crow2: _DT):
+    """Enumerate all (i, k) x (k, j) products in a sparse-sparse multiplication
+    (Gustavson's algorithm expanded into flat arrays).
+
+    Parameters:
+        row1 (Tensor): row indices of the left matrix, shaped (nnz1,).
+        col1 (Tensor): column indices of the left matrix, shaped (nnz1,).
+        crow2 (Tensor): compressed row pointers of the right matrix.
+
+    Returns:
+        Tuple[Tensor, Tensor, Tensor]: row indices of the products, locations
+            of the left factors in nnz1, and locations of the right factors in nnz2.
+    """
+    start2 = crow2[:-1][col1]
+    count = crow2[1:][col1] - start2
+    loc1, offset = _segment_expand(count)
+    loc2 = start2[loc1] + offset
+    return row1[loc1], loc1, loc2
+
+
+def _compress(row: _DT, col: _DT, values: _DT, spshape: _Size):
+    """Sum duplicated entries and build CSR arrays from unsorted triplets."""
+    kargs = bm.context(row)
+    nrow, ncol = spshape
+    key = bm.astype(row, bm.int64) * ncol + bm.astype(col, bm.int64)
+    order = bm.argsort(key, stable=True)
+    key = key[order]
+
+    if key.shape[0] == 0:
+        crow = bm.zeros((nrow + 1,), **kargs)
+        return crow, bm.copy(col), bm.copy(values)
+
+    unique_mask = bm.concat([
+        bm.ones((1,), dtype=bm.bool, device=bm.get_device(key)),
+        key[1:] != key[:-1]
+    ], axis=0)
+    add_index = bm.cumsum(unique_mask, axis=0) - 1
+    sorted_values = values[..., order]
+    new_values = bm.zeros_like(sorted_values[..., unique_mask])
+    new_values = bm.index_add(new_values, add_index, sorted_values, axis=-1)
+
+    new_row = row[order][unique_mask]
+    new_col = col[order][unique_mask]
+    count = bm.bincount(new_row, minlength=nrow)
+    crow = bm.concat([bm.zeros((1,), **kargs), bm.astype(bm.cumsum(count, axis=0), row.dtype)], axis=0)
+
+    return crow, new_col, new_values
 
-        if not bm.any(left_col_flag, axis=0):
-            continue
 
-        right_row_flag = (indices2[0, :] == i)
+def spspmm_coo(indices1: _DT, values1: _DT, spshape1: _Size,
+               indices2: _DT, values2: _DT, spshape2: _Size) -> Tuple[_DT, _DT, _Size]:
+    """Sparse-sparse matrix multiplication in COO format, using only
+    array primitives of the backend.
 
-        if not bm.any(right_row_flag, axis=0):
-            continue
+    The right matrix is sorted by row once, then all products are enumerated
+    in flat arrays. The output is not coalesced.
+    """
+    _shape_check(spshape1, spshape2)
+    _structure_check(values1, values2)
 
-        row = indices1[0, left_col_flag]
-        col = indices2[1, right_row_flag]
-        nnz = col.shape[0] * row.shape[0]
-        idx = bm.meshgrid(row, col, indexing='ij')
-        idx = bm.reshape(bm.stack(idx, axis=0), (2, nnz))
-        val1 = values1[..., left_col_flag]
-        val2 = values2[..., right_row_flag]
+    kargs = bm.context(indices2)
+    order2 = bm.argsort(indices2[0], stable=True)
+    count2 = bm.bincount(indices2[0], minlength=spshape2[0])
+    crow2 = bm.concat([bm.zeros((1,), **kargs), bm.astype(bm.cumsum(count2, axis=0), indices2.dtype)], axis=0)
 
-        val = bm.einsum('...i, ...j -> ...ij', val1, val2).reshape(*structure, nnz)
-        indices_list.append(idx)
-        values_list.append(val)
+    row, loc1, loc2 = _expand_products(indices1[0], indices1[1], crow2)
+    loc2 = order2[loc2]
+    indices = bm.stack([row, indices2[1][loc2]], axis=0)
+    values = values1[..., loc1] * values2[..., loc2]
 
-    indices = bm.concat(indices_list, axis=1)
-    values = bm.concat(values_list, axis=-1)
     return indices, values, (spshape1[0], spshape2[1])
 
 
 def spspmm_csr(crow1: _DT, col1: _DT, values1: _DT, spshape1: _Size,
-               crow2: _DT, col2: _DT, values2: _DT, spshape2: _Size) -> Tuple[_DT, _DT, _Size]:
-    _shape_check(spshape1, spshape2)
+               crow2: _DT, col2: _DT, values2: _DT, spshape2: _Size) -> Tuple[_DT, _DT, _DT, _Size]:
+    """Sparse-sparse matrix multiplication in CSR format, using only
+    array primitives of the backend.
 
-    structure = values1.shape[:-1]
-    if values2.shape[:-1] != structure:
-        raise ValueError(f"the dense shape of matrix2 ({values2.shape[:-1]}) "
-                         f"must match that of matrix1 {structure}")
+    All products are enumerated in flat arrays, then summed with a
+    sort-and-segment reduction. The output is coalesced.
+    """
+    _shape_check(spshape1, spshape2)
+    _structure_check(values1, values2)
 
-    size = spshape1[0]
-    indices_list = []
-    values_list = []
     kargs = bm.context(crow1)
-    new_crow = bm.zeros(size+1, **kargs)
-
-    for i in range(size):
-        row = bm.array([], **kargs)
-        left_col_flag = (col1 == i)
-
-        for x in bm.where(left_col_flag == True)[0]+1:
-            flag = ~(x>crow1[:-1])^(x<=crow1[1:])
-            row = bm.concat((row,(bm.where(flag == True))[0]))
-
-        col = col2[crow2[i]:crow2[i+1]]
-
-        if not bm.any(row, axis=0):
-            continue
-
-        if not bm.any(col, axis=0):
-            continue
-
-        idx = bm.meshgrid(row, col, indexing='ij')
-        nnz = col.shape[0] * row.shape[0]
-        idx = bm.reshape(bm.stack(idx, axis=0), (2, nnz))
-        val1 = values1[..., left_col_flag]
-        val2 = values2[..., crow2[i]:crow2[i+1]]
-        val = bm.einsum('...i, ...j -> ...ij', val1, val2).reshape(*structure, nnz)
-
-        indices_list.append(idx)
-        values_list.append(val)
-
-    indices = bm.concat(indices_list, axis=1)
-    values = bm.concat(values_list, axis=-1)
-
-    unique_indices, inverse_indices = bm.unique(indices, return_inverse=True, axis=1)
-    new_values = bm.zeros(unique_indices.shape[1])
-    new_values = bm.index_add(new_values, inverse_indices, values, axis=-1)
-
-    for x in unique_indices[0,:]:
-        new_crow[x+1]+=1
+    nrow = crow1.shape[0] - 1
+    row1 = bm.repeat(bm.arange(nrow, **kargs), crow1[1:] - crow1[:-1])
 
-    new_crow=bm.cumsum(new_crow, axis =-1)
+    row, loc1, loc2 = _expand_products(row1, col1, crow2)
+    values = values1[..., loc1] * values2[..., loc2]
+    spshape = (spshape1[0], spshape2[1])
+    crow, col, values = _compress(row, col2[loc2], values, spshape)
 
-    return new_crow, unique_indices[1,:], new_values,(spshape1[0], spshape2[1])
+    return crow, col, values, spshape
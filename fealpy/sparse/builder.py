@@ -0,0 +1,135 @@
+
+from typing import List
+
+from ..backend import backend_manager as bm
+from ..backend import TensorLike, Size
+from .coo_tensor import COOTensor
+
+
+class COOBuilder():
+    """Collector of COO entries, producing one COOTensor at the end.
+
+    Appending entries does not copy the previously appended ones, so that
+    collecting k pieces costs O(nnz) instead of O(k nnz) like repeated
+    `COOTensor.add`. Entries are kept in a buffer list and concatenated once
+    when built. When `capacity` is given, entries are written into
+    preallocated arrays with a fill pointer instead, and the arrays grow
+    geometrically if the capacity is exceeded.
+
+    Parameters:
+        spshape (Size): shape in the sparse dimensions.
+        dense_shape (Size, optional): shape of the dense (batch) dimensions of
+            values. Defaults to ().
+        capacity (int, optional): number of entries to preallocate. Use the
+            buffer list if 0. Defaults to 0.
+        itype (dtype | None, optional): scalar type of indices.
+        ftype (dtype | None, optional): scalar type of values.
+        device (str | device | None, optional): device of the tensors.
+
+    Example:
+    ```
+        builder = COOBuilder((M, N), itype=bm.int64, ftype=bm.float64)
+        for indices, values in pieces:
+            builder.append(indices, values)
+        A = builder.build() # the same as adding all pieces together
+    ```
+    """
+    def __init__(self, spshape: Size, dense_shape: Size=(), *,
+                 capacity: int=0, itype=None, ftype=None, device=None):
+        if capacity < 0:
+            raise ValueError(f"capacity must be non-negative, but got {capacity}.")
+        self.spshape = tuple(spshape)
+        self.dense_shape = tuple(dense_shape)
+        self.itype = bm.int64 if itype is None else itype
+        self.ftype = bm.float64 if ftype is None else ftype
+        self.device = device
+
+        self._indices_list: List[TensorLike] = []
+        self._values_list: List[TensorLike] = []
+        self._cursor = 0
+
+        if capacity > 0:
+            self._indices = self._empty_indices(capacity)
+            self._values = self._empty_values(capacity)
+        else:
+            self._indices = None
+            self._values = None
+
+    def __repr__(self) -> str:
+        return f"COOBuilder(size={self.size}, shape={self.dense_shape + self.spshape})"
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def size(self) -> int:
+        """Number of the appended entries, including duplicates."""
+        return self._cursor
+
+    @property
+    def capacity(self) -> int:
+        """Number of entries that the preallocated arrays can hold,
+        or 0 for the buffer list."""
+        return 0 if (self._indices is None) else self._indices.shape[1]
+
+    def _empty_indices(self, size: int):
+        return bm.empty((len(self.spshape), size), dtype=self.itype, device=self.device)
+
+    def _empty_values(self, size: int):
+        return bm.empty(self.dense_shape + (size,), dtype=self.ftype, device=self.device)
+
+    def _reserve(self, size: int):
+        capacity = self.capacity
+        if size <= capacity:
+            return
+        new_capacity = max(2 * capacity, size)
+        extra = new_capacity - capacity
+        self._indices = bm.concat([self._indices, self._empty_indices(extra)], axis=1)
+        self._values = bm.concat([self._values, self._empty_values(extra)], axis=-1)
+
+    def append(self, indices: TensorLike, values: TensorLike, /):
+        """Append COO entries.
+
+        Parameters:
+            indices (Tensor): indices of the entries, shaped (D, n).
+            values (Tensor): values of the entries, shaped (*dense_shape, n).
+
+        Returns:
+            COOBuilder: The builder itself.
+        """
+        if indices.ndim != 2 or indices.shape[0] != len(self.spshape):
+            raise ValueError(f"indices must be shaped ({len(self.spshape)}, n), "
+                             f"but got {tuple(indices.shape)}.")
+        if tuple(values.shape) != self.dense_shape + (indices.shape[1],):
+            raise ValueError(f"values must be shaped {self.dense_shape + (indices.shape[1],)}, "
+                             f"but got {tuple(values.shape)}.")
+        size = indices.shape[1]
+
+        if self._indices is None:
+            self._indices_list.append(indices)
+            self._values_list.append(values)
+        else:
+            start, stop = self._cursor, self._cursor + size
+            self._reserve(stop)
+            self._indices = bm.set_at(self._indices, (slice(None), slice(start, stop)), indices)
+            self._values = bm.set_at(self._values, (..., slice(start, stop)), values)
+
+        self._cursor += size
+        return self
+
+    def build(self) -> COOTensor:
+        """Materialize the appended entries as an uncoalesced COOTensor."""
+        if self._indices is not None:
+            indices = self._indices[:, :self._cursor]
+            values = self._values[..., :self._cursor]
+        elif len(self._indices_list) == 0:
+            indices = self._empty_indices(0)
+            values = self._empty_values(0)
+        else:
+            if len(self._indices_list) > 1:
+                self._indices_list = [bm.concat(self._indices_list, axis=1)]
+                self._values_list = [bm.concat(self._values_list, axis=-1)]
+            indices = self._indices_list[0]
+            values = self._values_list[0]
+
+        return COOTensor(indices, values, self.spshape)
@@ -10,7 +10,7 @@ from .utils import (
     check_shape_match, check_spshape_match
 )
 from ._spspmm import spspmm_csr
-from ._spmm import spmm_csr
+from ._spmm import spmm_csr, csr_row
 from .coo_tensor import COOTensor
 
 class CSRTensor(SparseTensor):
@@ -28,6 +28,7 @@ class CSRTensor(SparseTensor):
         self._crow = crow
         self._col = col
         self._values = values
+        self._row = None
 
         if spshape is None:
             nrow = crow.shape[0] - 1
@@ -89,10 +90,11 @@ class CSRTensor(SparseTensor):
 
     @property
     def row(self):
-        count = self._crow[1:] - self._crow[:-1]
-        nrow = self._crow.shape[0] - 1
-        kargs = bm.context(self._crow)
-        return bm.repeat(bm.arange(nrow, **kargs), count)
+        """Return the row indices of non-zero elements.
+        This is expanded from `crow` once and cached."""
+        if self._row is None:
+            self._row = csr_row(self._crow)
+        return self._row
 
     @property
     def indptr(self): return self._crow # scipy convention
@@ -438,7 +440,8 @@ class CSRTensor(SparseTensor):
             if hasattr(bm, 'csr_spmm'):
                 return bm.csr_spmm(self._crow, self._col, self._values, self._spshape, other)
             else:
-                return spmm_csr(self._crow, self._col,self._values,self.sparse_shape, other)
+                return spmm_csr(self._crow, self._col, self._values, self.sparse_shape,
+                                other, row=self.row)
 
         else:
             raise TypeError(f"Unsupported type {type(other).__name__} in matmul")
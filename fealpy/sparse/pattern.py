@@ -0,0 +1,121 @@
+
+from typing import Optional, Sequence
+
+from ..backend import backend_manager as bm
+from ..backend import TensorLike, Size, ScatterPlan
+from .csr_tensor import CSRTensor
+
+
+class SparsityPattern():
+    """Symbolic structure of a CSR matrix assembled from COO entries that may
+    contain duplicates.
+
+    The pattern is made of the CSR arrays `crow` and `col` of the coalesced
+    matrix, and a scatter map sending every COO entry to its slot in the CSR
+    values. Matrices sharing the pattern are assembled by a single
+    `index_add`, without sorting the indices again.
+
+    Parameters:
+        indices (Tensor): indices of the COO entries, shaped (2, N).
+        spshape (Size): shape in the sparse dimensions.
+        sources (Sequence[Tensor] | None, optional): tensors the indices are
+            generated from, e.g. the cell-to-dof maps. If given, `match` also
+            checks them to detect renumbering keeping the sizes.
+            Defaults to None.
+
+    Example:
+    ```
+        pattern = SparsityPattern(indices, (M, N))
+        A = pattern.tocsr(values) # the same as COOTensor(indices, values).coalesce().tocsr()
+    ```
+    """
+    def __init__(self, indices: TensorLike, spshape: Size, *,
+                 sources: Optional[Sequence[TensorLike]]=None):
+        if indices.ndim != 2 or indices.shape[0] != 2:
+            raise ValueError("indices must be shaped (2, N), "
+                             f"but got {tuple(indices.shape)}.")
+        if len(spshape) != 2:
+            raise ValueError(f"spshape must be a 2-tuple, but got {spshape}.")
+
+        self.spshape = tuple(spshape)
+        self.size = indices.shape[1]
+        self.sources = None if (sources is None) else list(sources)
+        kargs = bm.context(indices)
+        nrow, ncol = self.spshape
+
+        key = bm.astype(indices[0], bm.int64) * ncol + bm.astype(indices[1], bm.int64)
+        order = bm.argsort(key, stable=True)
+        sorted_key = key[order]
+
+        if self.size == 0:
+            unique_mask = bm.zeros((0,), dtype=bm.bool, device=bm.get_device(indices))
+        else:
+            unique_mask = bm.concat([
+                bm.ones((1,), dtype=bm.bool, device=bm.get_device(indices)),
+                sorted_key[1:] != sorted_key[:-1]
+            ], axis=0)
+
+        slot = bm.astype(bm.cumsum(unique_mask, axis=0) - 1, indices.dtype)
+        self.scatter_map = bm.set_at(bm.empty_like(slot), order, slot)
+
+        row = indices[0, order][unique_mask]
+        self.col = bm.copy(indices[1, order][unique_mask])
+        count = bm.bincount(row, minlength=nrow)
+        self.crow = bm.concat([
+            bm.zeros((1,), **kargs),
+            bm.astype(bm.cumsum(count, axis=0), indices.dtype)
+        ], axis=0)
+        self._plan = ScatterPlan(self.scatter_map, self.nnz)
+
+    def __repr__(self) -> str:
+        return f"SparsityPattern(nnz={self.nnz}, size={self.size}, shape={self.spshape})"
+
+    @property
+    def nnz(self) -> int:
+        """Number of non-zero elements in the coalesced matrix."""
+        return self.col.shape[0]
+
+    def match(self, size: int, spshape: Size, sources: Optional[Sequence[TensorLike]]=None) -> bool:
+        """Check whether entries of the given number and sparse shape
+        can be assembled with this pattern.
+
+        If both the pattern and the call have `sources`, they are also
+        compared, first by identity and then by values. Without sources only
+        the sizes are checked, and the caller is responsible for the indices.
+        """
+        if (size != self.size) or (tuple(spshape) != self.spshape):
+            return False
+        if (sources is None) or (self.sources is None):
+            return True
+        sources = list(sources)
+        if len(sources) != len(self.sources):
+            return False
+        for i, (old, new) in enumerate(zip(self.sources, sources)):
+            if old is new:
+                continue
+            if (old.shape != new.shape) or (not bool(bm.all(old == new))):
+                return False
+            self.sources[i] = new # equal values, identity check next time
+        return True
+
+    def scatter(self, values: TensorLike, /, out: Optional[TensorLike]=None) -> TensorLike:
+        """Sum the values of COO entries into the CSR values.
+
+        Parameters:
+            values (Tensor): values of the COO entries, shaped (..., N).
+            out (Tensor | None, optional): CSR values to accumulate into,
+                shaped (..., nnz). A new zero tensor is created if None.
+
+        Returns:
+            Tensor: CSR values shaped (..., nnz).
+        """
+        if values.shape[-1] != self.size:
+            raise ValueError(f"the last dimension of values ({values.shape[-1]}) "
+                             f"must match the size of the pattern ({self.size}).")
+        if out is None:
+            out = bm.zeros(values.shape[:-1] + (self.nnz,), **bm.context(values))
+        return self._plan.index_add(out, values, axis=-1)
+
+    def tocsr(self, values: TensorLike, /) -> CSRTensor:
+        """Assemble a CSR tensor from the values of COO entries."""
+        return CSRTensor(self.crow, self.col, self.scatter(values), self.spshape)
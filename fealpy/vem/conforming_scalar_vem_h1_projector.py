@@ -1,11 +1,48 @@
+from typing import NamedTuple, Optional
+
 import numpy as np
-from numpy.linalg import inv
 
 from ..quadrature import GaussLobattoQuadrature
 from ..quadrature import GaussLegendreQuadrature
 
 from ..functionspace import ConformingScalarVESpace2d
 
+
+class CellGroup(NamedTuple):
+    """
+    @brief 顶点数相同的一组多边形单元及其上的投影矩阵
+
+    B, G, PI 的形状分别为 (NC_k, smldof, ldof_k), (NC_k, smldof, smldof) 和
+    (NC_k, smldof, ldof_k), 其中 NC_k 为组中单元个数, ldof_k 为 k 边形上的
+    局部自由度个数.
+    """
+    nv: int
+    index: np.ndarray
+    B: np.ndarray
+    G: Optional[np.ndarray] = None
+    PI: Optional[np.ndarray] = None
+
+
+def group_cells_by_vertices(NV):
+    """
+    @brief 按顶点数对单元分组
+
+    @return 列表, 元素为 (k, index), index 为顶点数为 k 的单元编号(升序)
+    """
+    order = np.argsort(NV, kind='stable')
+    nv, start = np.unique(NV[order], return_index=True)
+    return list(zip(nv.tolist(), np.split(order, start[1:])))
+
+
+def stack_cell_rows(A, cell2dofLocation, index, ldof):
+    """
+    @brief 把按单元拼接的数组 A (cell2dofLocation[-1], ...) 中 index 单元的行
+    取出, 堆叠为 (len(index), ldof, ...) 的数组
+    """
+    idx = cell2dofLocation[index].reshape(-1, 1) + np.arange(ldof)
+    return A[idx]
+
+
 class ConformingScalarVEMH1Projector2d():
     def __init__(self, D):
         self.D = D
@@ -15,17 +52,19 @@ class ConformingScalarVEMH1Projector2d():
         @bfief 组装 H1 投影矩阵
 
         @return 返回为列表，列表中数组大小为(smldof,ldof)
+
+        @note 所有计算都按单元顶点数分组批量进行, 分组结果保存在 self.groups 中
         """
         p = space.p
-        self.B = self.assembly_cell_right_hand_side(space) 
         if p == 1:
+            self.B = self.assembly_cell_right_hand_side(space)
             self.G = np.array([(1, 0, 0), (0, 1, 0), (0, 0, 1)])
+            self.groups = [g._replace(PI=g.B) for g in self.groups]
             return self.B
         else:
-            self.G = self.assembly_cell_left_hand_side(space) 
-            g = lambda x: inv(x[0])@x[1]
-            return list(map(g, zip(self.G, self.B)))
-
+            self.G = self.assembly_cell_left_hand_side(space) # 同时组装 self.B
+            self.groups = [g._replace(PI=np.linalg.solve(g.G, g.B)) for g in self.groups]
+            return self._split(space, [g.PI for g in self.groups])
 
     def assembly_cell_right_hand_side(self, space: ConformingScalarVESpace2d):
         """
@@ -35,65 +74,88 @@ class ConformingScalarVEMH1Projector2d():
         """
         p = space.p
         mesh = space.mesh
-        NC = mesh.number_of_cells()
         NV = mesh.ds.number_of_vertices_of_cells()
-        h = space.smspace.cellsize
         node = mesh.entity('node')
-        cell = mesh.entity('cell')
+        cell = np.concatenate(mesh.entity('cell'))
+        cellLocation = np.zeros(len(NV)+1, dtype=np.int_)
+        cellLocation[1:] = np.cumsum(NV)
 
         smldof = space.smspace.number_of_local_dofs()
-        ldof = space.number_of_local_dofs()
-
-        cell2dofLocation = space.dof.cell2dofLocation
-        BB = np.zeros((smldof, cell2dofLocation[-1]), dtype=np.float64)
-        B = np.hsplit(BB, cell2dofLocation[1:-1]) 
-
-        for i in range(NC): #TODO：并行加加速
-            if p==1:
-                B[i][0, :] = 1/NV[i]
+        idof = (p-1)*p//2
+
+        qf = GaussLobattoQuadrature(p + 1) # NQ
+        bcs, ws = qf.quadpts, qf.weights
+        w = np.array([(0, -1), (1, 0)])
+        if p > 1:
+            data = space.smspace.diff_index_2()
+            xx = data['xx']
+            yy = data['yy']
+
+        groups = []
+        for k, index in group_cells_by_vertices(NV):
+            NCk = len(index)
+            B = np.zeros((NCk, smldof, k*p + idof), dtype=np.float64)
+            if p == 1:
+                B[:, 0, :] = 1/k
             else:
-                B[i][0, NV[i]*p] = 1 
-                data = space.smspace.diff_index_2()
-                xx = data['xx']
-                yy = data['yy']
-                B[i][xx[0], NV[i]*p+np.arange(xx[0].shape[0])] -= xx[1]
-                B[i][yy[0], NV[i]*p+np.arange(yy[0].shape[0])] -= yy[1]
-
-            cedge = np.zeros((NV[i], 2), dtype=np.int_)
-            cedge[:, 0] = cell[i]
-            cedge[:-1, 1] = cell[i][1:]
-            cedge[-1, -1] = cell[i][0] 
-
-            qf = GaussLobattoQuadrature(p + 1) # NQ
-            bcs, ws = qf.quadpts, qf.weights
-            ps = np.einsum('ij, kjm->ikm', bcs, node[cedge]) # (NQ, NV[i], 2)
-            index = np.array([i]*NV[i]) 
-            gphi = space.smspace.grad_basis(ps, index=index) # 求缩放基函数在每条边上的导函数值
-            v = node[cedge[:, 1]] - node[cedge[:, 0]]
-            w = np.array([(0, -1), (1, 0)])
-            nm = v@w 
-            val = np.einsum('i, ijmk, jk->mji', ws, gphi, nm, optimize=True)
-            idx = np.arange(0, NV[i]*p, p).reshape(-1, 1) + np.arange(p+1)
-            idx[-1, -1] = 0
-            np.add.at(B[i], (np.s_[:], idx), val)
-
-        return B 
-    
+                B[:, 0, k*p] = 1
+                B[:, xx[0], k*p+np.arange(xx[0].shape[0])] -= xx[1]
+                B[:, yy[0], k*p+np.arange(yy[0].shape[0])] -= yy[1]
+
+            # 组中单元的边 (NC_k, k, 2)
+            cedge = cell[cellLocation[index].reshape(-1, 1) + np.arange(k)]
+            cedge = np.stack((cedge, np.roll(cedge, -1, axis=1)), axis=-1)
+            cedge = cedge.reshape(-1, 2)
+
+            ps = np.einsum('ij, kjm->ikm', bcs, node[cedge]) # (NQ, NC_k*k, 2)
+            gphi = space.smspace.grad_basis(ps, index=np.repeat(index, k)) # 求缩放基函数在每条边上的导函数值
+            nm = (node[cedge[:, 1]] - node[cedge[:, 0]])@w
+            val = np.einsum('i, ijmk, jk->jmi', ws, gphi, nm, optimize=True)
+            val = val.reshape(NCk, k, smldof, p+1).transpose(0, 2, 1, 3) # (NC_k, smldof, k, p+1)
+
+            # 第 j 条边上的积分点对应自由度 j*p, ..., j*p+p, 最后一个点为下一条边的起点
+            Bb = val[..., :p].copy()
+            Bb[..., 0] += np.roll(val[..., p], 1, axis=-1)
+            B[:, :, :k*p] += Bb.reshape(NCk, smldof, k*p)
+            groups.append(CellGroup(k, index, B))
+
+        self.groups = groups
+        return self._split(space, [g.B for g in groups])
+
     def assembly_cell_left_hand_side(self, space: ConformingScalarVESpace2d):
         """
         @brief 组装 H1 投影算子的左端矩阵
 
-        @return 列表 G[i] 代表第 i 个单元上 H1
+        @return 数组 G[i] 代表第 i 个单元上 H1
         投影左端矩阵,数组大小为(smldof,smldof)
         """
         p = space.p
         mesh = space.mesh
         NC = mesh.number_of_cells()
-        self.B = self.assembly_cell_right_hand_side(space) 
+        self.B = self.assembly_cell_right_hand_side(space)
 
         if p == 1:
             G = np.array([(1, 0, 0), (0, 1, 0), (0, 0, 1)])
         else:
-            g = lambda x: x[0]@x[1]
-            G = list(map(g, zip(self.B, self.D))) #TODO： 并行加速
+            smldof = space.smspace.number_of_local_dofs()
+            cell2dofLocation = space.dof.cell2dofLocation
+            D = np.concatenate(self.D, axis=0) # (cell2dofLocation[-1], smldof)
+            G = np.zeros((NC, smldof, smldof), dtype=np.float64)
+            for i, g in enumerate(self.groups):
+                Dk = stack_cell_rows(D, cell2dofLocation, g.index, g.B.shape[-1])
+                Gk = g.B@Dk
+                G[g.index] = Gk
+                self.groups[i] = g._replace(G=Gk)
         return G
+
+    def _split(self, space, data):
+        """
+        @brief 把各组的 (NC_k, smldof, ldof_k) 数组拼回按单元编号的列表
+        """
+        cell2dofLocation = space.dof.cell2dofLocation
+        smldof = space.smspace.number_of_local_dofs()
+        AA = np.zeros((smldof, cell2dofLocation[-1]), dtype=np.float64)
+        for g, A in zip(self.groups, data):
+            idx = cell2dofLocation[g.index].reshape(-1, 1) + np.arange(A.shape[-1])
+            AA[:, idx] = A.transpose(1, 0, 2)
+        return np.hsplit(AA, cell2dofLocation[1:-1])
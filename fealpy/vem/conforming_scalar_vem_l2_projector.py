@@ -1,7 +1,7 @@
-import numpy as np 
-from numpy.linalg import inv
+import numpy as np
 
 from ..functionspace import ConformingScalarVESpace2d
+from .conforming_scalar_vem_h1_projector import group_cells_by_vertices, stack_cell_rows
 
 class ConformingScalarVEML2Projector2d():
     def __init__(self, M, PI1):
@@ -10,8 +10,16 @@ class ConformingScalarVEML2Projector2d():
 
     def assembly_cell_matrix(self, space: ConformingScalarVESpace2d):
         self.C = self.assembly_cell_right_hand_side(space)
-        pi0 = lambda x: inv(x[0])@x[1]
-        return list(map(pi0, zip(self.M, self.C))) # TODO：并行加速
+        cell2dofLocation = space.dof.cell2dofLocation
+        C = np.concatenate(self.C, axis=1).T
+        PI0 = np.zeros_like(C)
+        for k, index in self._groups(space):
+            ldof = self._ldof(space, k)
+            Ck = stack_cell_rows(C, cell2dofLocation, index, ldof) # (NC_k, ldof, smldof)
+            PI0k = np.linalg.solve(self.M[index], Ck.transpose(0, 2, 1))
+            idx = cell2dofLocation[index].reshape(-1, 1) + np.arange(ldof)
+            PI0[idx] = PI0k.transpose(0, 2, 1)
+        return np.hsplit(PI0.T, cell2dofLocation[1:-1])
 
     def assembly_cell_right_hand_side(self, space: ConformingScalarVESpace2d):
         """
@@ -20,21 +28,27 @@ class ConformingScalarVEML2Projector2d():
         @retrun C 列表 C[i] 代表第 i 个单元上 L2 投影右端矩阵
         """
         p = space.p
-        mesh = space.mesh
-        NV = mesh.ds.number_of_vertices_of_cells()
-
         idof = (p-1)*p//2
-        smldof = space.smspace.number_of_local_dofs()
-
-        d = lambda x: x[0]@x[1]
-        C = list(map(d, zip(self.M, self.PI1))) #TODO: 并行加速
-        if p == 1:
-            return C
-        else:
-            l = lambda x: np.r_[
-                    '0',
-                    np.r_['1', np.zeros((idof, p*x[0])), x[1]*np.eye(idof)],
-                    x[2][idof:, :]]
-            return list(map(l, zip(NV, space.smspace.cellmeasure, C))) #TODO：并行加速
-
-
+        area = space.smspace.cellmeasure
+        cell2dofLocation = space.dof.cell2dofLocation
+
+        PI1 = np.concatenate(self.PI1, axis=1).T # (cell2dofLocation[-1], smldof)
+        C = np.zeros_like(PI1)
+        for k, index in self._groups(space):
+            ldof = self._ldof(space, k)
+            PI1k = stack_cell_rows(PI1, cell2dofLocation, index, ldof).transpose(0, 2, 1)
+            Ck = self.M[index]@PI1k # (NC_k, smldof, ldof)
+            if p > 1:
+                Ck[:, :idof, :] = 0
+                Ck[:, np.arange(idof), k*p + np.arange(idof)] = area[index].reshape(-1, 1)
+            idx = cell2dofLocation[index].reshape(-1, 1) + np.arange(ldof)
+            C[idx] = Ck.transpose(0, 2, 1)
+        return np.hsplit(C.T, cell2dofLocation[1:-1])
+
+    def _groups(self, space):
+        NV = space.mesh.ds.number_of_vertices_of_cells()
+        return group_cells_by_vertices(NV)
+
+    def _ldof(self, space, k):
+        p = space.p
+        return k*p + (p-1)*p//2
@@ -0,0 +1,45 @@
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from fealpy.backend import backend_manager as bm
+
+
+@pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+def test_dispatch(backend):
+    bm.set_backend(backend)
+    assert bm.backend_name == backend
+    x = bm.tensor([-1.0, 2.0, -3.0])
+    np.testing.assert_array_equal(bm.to_numpy(bm.abs(x)), [1.0, 2.0, 3.0])
+    assert hasattr(bm, 'einsum')
+    assert not hasattr(bm, 'no_such_function')
+    with pytest.raises(AttributeError):
+        bm.no_such_function
+
+
+@pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+def test_bind(backend):
+    bm.set_backend(backend)
+    B = bm.bind()
+    assert B.backend_name == backend
+    x = bm.tensor([-1.0, 2.0])
+    np.testing.assert_array_equal(bm.to_numpy(B.abs(x)), bm.to_numpy(bm.abs(x)))
+
+    # The bound namespace does not follow the later switch of backend.
+    other = 'pytorch' if backend == 'numpy' else 'numpy'
+    bm.set_backend(other)
+    assert bm.backend_name == other
+    assert B.backend_name == backend
+    bm.set_backend(backend)
+
+
+def test_thread_local():
+    bm.set_backend('pytorch')
+    with ThreadPoolExecutor(1) as pool:
+        name = pool.submit(lambda: bm.backend_name).result()
+        bound = pool.submit(lambda: bm.bind().backend_name).result()
+    assert name == bound == 'numpy'
+    assert bm.backend_name == 'pytorch'
+    bm.set_backend('numpy')
@@ -0,0 +1,91 @@
+
+import numpy as np
+import pytest
+
+from fealpy.backend import backend_manager as bm
+from fealpy.backend import EinsumPathCache, einsum_path_cache
+
+ALL_BACKENDS = ['numpy', 'pytorch']
+SUBSCRIPTS = [
+    ('q, c, cqid, cqjd -> cij', [(3,), (5,), (5, 3, 4, 2), (5, 3, 4, 2)]),
+    ('cilm, cl -> cim', [(5, 4, 2, 3), (5, 2)]),
+    ('...i, ij, j... -> ...', [(2, 3), (3, 4), (4, 2)]),
+]
+
+
+@pytest.mark.parametrize("backend", ALL_BACKENDS)
+@pytest.mark.parametrize("subscripts, shapes", SUBSCRIPTS)
+def test_einsum(backend, subscripts, shapes):
+    bm.set_backend(backend)
+    operands = [np.random.rand(*shape) for shape in shapes]
+    expected = np.einsum(subscripts, *operands)
+    tensors = [bm.from_numpy(op) for op in operands]
+
+    einsum_path_cache.clear()
+    for _ in range(3):
+        out = bm.einsum(subscripts, *tensors)
+        np.testing.assert_allclose(bm.to_numpy(out), expected)
+
+    info = einsum_path_cache.info()
+    if info['misses'] > 0:
+        assert info['misses'] == 1
+        assert info['hits'] == 2
+        assert info['hit_rate'] == pytest.approx(2/3)
+
+
+def test_einsum_pytorch_fallback(monkeypatch):
+    bm.set_backend('pytorch')
+    from fealpy.backend.pytorch_backend import PyTorchBackend
+    subscripts, shapes = SUBSCRIPTS[0]
+    operands = [np.random.rand(*shape) for shape in shapes]
+    expected = np.einsum(subscripts, *operands)
+    tensors = [bm.from_numpy(op) for op in operands]
+
+    def kernel(equation, operands): # a kernel without the `path` argument
+        raise AssertionError("should not be called")
+    monkeypatch.setattr(PyTorchBackend, '_einsum_with_path', kernel)
+    np.testing.assert_allclose(bm.to_numpy(bm.einsum(subscripts, *tensors)), expected)
+    assert PyTorchBackend._einsum_with_path is None
+    np.testing.assert_allclose(bm.to_numpy(bm.einsum(subscripts, *tensors)), expected)
+
+
+def test_einsum_shapes():
+    bm.set_backend('numpy')
+    einsum_path_cache.clear()
+    for NC in [4, 4, 7, 4]:
+        a, b = np.random.rand(NC, 3, 2), np.random.rand(NC, 2)
+        np.testing.assert_allclose(bm.einsum('cij, cj -> ci', a, b),
+                                   np.einsum('cij, cj -> ci', a, b))
+    info = einsum_path_cache.info()
+    assert (info['hits'], info['misses'], info['size']) == (2, 2, 2)
+
+
+def test_einsum_numpy_options():
+    bm.set_backend('numpy')
+    a, b = np.random.rand(3, 4), np.random.rand(4, 5)
+    out = np.empty((3, 5))
+    bm.einsum('ij, jk -> ik', a, b, out=out)
+    np.testing.assert_allclose(out, a @ b)
+    np.testing.assert_allclose(bm.einsum('ij, jk -> ik', a, b, optimize=False), a @ b)
+    np.testing.assert_allclose(bm.einsum(a, [0, 1], b, [1, 2], [0, 2]), a @ b)
+
+
+def test_cache_lru():
+    cache = EinsumPathCache(maxsize=2)
+    calls = []
+    search = lambda k: (lambda: calls.append(k) or k)
+    for key in ['a', 'b', 'a', 'c', 'b']:
+        assert cache.get(key, search(key)) == key
+    # 'b' is evicted by 'c' since 'a' is used more recently.
+    assert calls == ['a', 'b', 'c', 'b']
+    info = cache.info()
+    assert (info['hits'], info['misses'], info['size']) == (1, 4, 2)
+    assert info['saved_time'] >= 0.
+
+    cache.maxsize = 1
+    assert cache.info()['size'] == 1
+    cache.clear()
+    assert cache.info()['hits'] == cache.info()['size'] == 0
+    with pytest.raises(ValueError):
+        EinsumPathCache(maxsize=0)
+
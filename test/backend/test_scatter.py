@@ -0,0 +1,81 @@
+
+import numpy as np
+import pytest
+
+from fealpy.backend import backend_manager as bm
+from fealpy.backend import ScatterPlan
+
+ALL_BACKENDS = ['numpy', 'pytorch']
+CASES = [((7,), 0), ((7, 3), 0), ((2, 7), 1), ((2, 7, 3), 1), ((2, 7, 3), -2), ((3, 7), -1)]
+
+
+def reference(a, index, src, axis):
+    indexing = [slice(None)] * a.ndim
+    indexing[axis] = index
+    np.add.at(a, tuple(indexing), src)
+    return a
+
+
+def random_case(shape, axis, n, dtype):
+    axis = axis % len(shape)
+    index = np.random.randint(0, shape[axis], (n, 3))
+    src = np.random.rand(*(shape[:axis] + index.shape + shape[axis+1:])).astype(dtype)
+    a = np.random.rand(*shape).astype(dtype)
+    return a, index, src
+
+
+@pytest.mark.parametrize("backend", ALL_BACKENDS)
+@pytest.mark.parametrize("shape, axis", CASES)
+@pytest.mark.parametrize("n", [0, 1, 20])
+def test_index_add(backend, shape, axis, n):
+    bm.set_backend(backend)
+    a, index, src = random_case(shape, axis, n, np.float64)
+    expected = reference(a.copy(), index, src, axis)
+    out = bm.index_add(bm.from_numpy(a), bm.from_numpy(index), bm.from_numpy(src), axis=axis)
+    np.testing.assert_allclose(bm.to_numpy(out), expected)
+
+
+@pytest.mark.parametrize("shape, axis", CASES)
+@pytest.mark.parametrize("dtype", [np.float32, np.complex128, np.int64])
+def test_index_add_numpy(shape, axis, dtype):
+    bm.set_backend('numpy')
+    a, index, src = random_case(shape, axis, 20, np.float64)
+    a, src = (a * 10).astype(dtype), (src * 10).astype(dtype)
+    index = index - shape[axis % len(shape)] # negative index
+    expected = reference(a.copy(), index, src, axis)
+    out = bm.index_add(np.asfortranarray(a), index, src, axis=axis)
+    np.testing.assert_allclose(out, expected, rtol=1e-6)
+
+    with pytest.raises(IndexError):
+        bm.index_add(a, np.array([shape[axis]]), 1., axis=axis)
+
+
+def test_add_at_numpy():
+    bm.set_backend('numpy')
+    for indices, src in [
+        ((np.array([0, 0, 3, -1]), np.array([1, 1, 2, 0])), np.arange(4.)),
+        ((np.array([[0], [2]]), np.array([1, 1, 2])), 1.),
+        (np.array([1, 1, 3]), np.ones(3)),
+        ((slice(None), np.array([0, 0])), 1.),
+    ]:
+        a = np.random.rand(4, 3)
+        expected = a.copy()
+        np.add.at(expected, indices, src)
+        np.testing.assert_allclose(bm.add_at(a, indices, src), expected)
+
+
+@pytest.mark.parametrize("backend", ALL_BACKENDS)
+@pytest.mark.parametrize("shape, axis", CASES)
+def test_scatter_plan(backend, shape, axis):
+    bm.set_backend(backend)
+    a, index, src = random_case(shape, axis, 20, np.float64)
+    plan = ScatterPlan(bm.from_numpy(index), shape[axis])
+    assert plan.shape == index.shape
+
+    for alpha in [1, 2.]:
+        expected = reference(a.copy(), index, alpha * src, axis)
+        out = plan.index_add(bm.from_numpy(a.copy()), bm.from_numpy(src), axis=axis, alpha=alpha)
+        np.testing.assert_allclose(bm.to_numpy(out), expected)
+
+    with pytest.raises(ValueError):
+        plan.index_add(bm.zeros((shape[axis] + 1,), dtype=bm.float64), bm.from_numpy(src))
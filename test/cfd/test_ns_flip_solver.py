@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from fealpy.backend import backend_manager as bm
+from fealpy.mesh import UniformMesh2d, UniformMesh3d
+from fealpy.cfd.ns_flip_solver import ParticleGridTransfer, NSFlipSolver
+
+
+@pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+def test_transfer_2d(backend):
+    bm.set_backend(backend)
+    mesh = UniformMesh2d((0, 4, 0, 3), h=(0.25, 0.5), origin=(1., -1.))
+    rng = np.random.default_rng(0)
+    x = bm.from_numpy(rng.random((50, 2)) * [1., 1.5] + [1., -1.])
+    transfer = ParticleGridTransfer(mesh, x)
+
+    assert transfer.S.shape == (50, mesh.number_of_nodes())
+    assert transfer.S.nnz == 50 * 4
+    np.testing.assert_allclose(bm.to_numpy(transfer.S.to_dense().sum(axis=-1)), 1.)
+
+    # Bilinear weights reproduce linear functions.
+    node = mesh.node
+    f = 2*node[:, 0] + 3*node[:, 1] + 1
+    np.testing.assert_allclose(bm.to_numpy(transfer.g2p(f)),
+                               bm.to_numpy(2*x[:, 0] + 3*x[:, 1] + 1), atol=1e-12)
+
+    # P2G is the transpose of G2P.
+    v = bm.from_numpy(rng.random((50, 2)))
+    S = bm.to_numpy(transfer.S.to_dense())
+    np.testing.assert_allclose(bm.to_numpy(transfer.p2g(v)), S.T @ bm.to_numpy(v), atol=1e-12)
+
+
+def test_transfer_3d():
+    bm.set_backend('numpy')
+    mesh = UniformMesh3d((0, 2, 0, 3, 0, 4), h=(0.5, 1/3, 0.25), origin=(0., 0., 0.))
+    x = np.random.default_rng(1).random((40, 3))
+    transfer = ParticleGridTransfer(mesh, x)
+
+    assert transfer.S.nnz == 40 * 8
+    f = mesh.node @ np.array([1., 2., 3.])
+    np.testing.assert_allclose(transfer.g2p(f), x @ np.array([1., 2., 3.]), atol=1e-12)
+
+
+@pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+def test_flip_p2g(backend):
+    bm.set_backend(backend)
+    mesh = UniformMesh2d((0, 4, 0, 4), h=(0.25, 0.25), origin=(0., 0.))
+    rng = np.random.default_rng(2)
+    NP = 200
+    particles = {
+        "position": bm.from_numpy(rng.random((NP, 2))),
+        "velocity": bm.from_numpy(np.ones((NP, 2))),
+        "mass": bm.from_numpy(rng.random(NP) + 0.5),
+        "internal_energy": bm.from_numpy(np.ones(NP)),
+    }
+    solver = NSFlipSolver(particles, mesh)
+
+    M_v, U_v = solver.P2G_vertex(particles)
+    np.testing.assert_allclose(float(bm.sum(M_v)), float(bm.sum(particles["mass"])))
+    np.testing.assert_allclose(bm.to_numpy(U_v), 1.)
+    np.testing.assert_allclose(bm.to_numpy(solver.G2P_vertex(U_v)), 1.)
+
+    rho_c, _ = solver.P2G_center(particles)
+    np.testing.assert_allclose(float(bm.sum(rho_c)) * 0.0625, float(bm.sum(particles["mass"])))
+
+
+if __name__ == "__main__":
+    pytest.main(["./test_ns_flip_solver.py"])
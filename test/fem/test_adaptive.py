@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from fealpy.backend import backend_manager as bm
+
+from fealpy.mesh import TriangleMesh
+from fealpy.decorator import cartesian
+from fealpy.functionspace import LagrangeFESpace
+from fealpy.fem import (
+        BilinearForm, ScalarDiffusionIntegrator, ScalarMassIntegrator,
+        AdaptiveBilinearForm, AdaptiveDriver
+    )
+
+
+@cartesian
+def coef(p):
+    return 1 + p[..., 0]**2
+
+
+class TestAdaptiveDriver:
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    @pytest.mark.parametrize("p", [1, 2, 3])
+    def test_refine(self, backend, p):
+        bm.set_backend(backend)
+        mesh = TriangleMesh.from_box(nx=4, ny=4)
+        space = LagrangeFESpace(mesh, p=p)
+        bform = AdaptiveBilinearForm(space)
+        bform.add_integrator(ScalarDiffusionIntegrator(coef, q=p+2))
+        bform.add_integrator(ScalarMassIntegrator(q=p+2))
+        bform.assembly()
+        driver = AdaptiveDriver(mesh, bform)
+
+        rng = np.random.default_rng(0)
+        for _ in range(3):
+            node0 = bm.copy(mesh.node)
+            eta = bm.tensor(rng.random(mesh.number_of_cells()))
+            delta = driver.refine(driver.mark(eta, 0.3))
+            A = bform.assembly()
+
+            ref = BilinearForm(space)
+            ref.add_integrator(ScalarDiffusionIntegrator(coef, q=p+2))
+            ref.add_integrator(ScalarMassIntegrator(q=p+2))
+            B = ref.assembly()
+            assert bform.shape == B.shape
+            np.testing.assert_allclose(bm.to_numpy(A.to_dense()),
+                                       bm.to_numpy(B.to_dense()), atol=1e-12)
+
+            u0 = node0[:, 0] - 3*node0[:, 1]
+            np.testing.assert_allclose(bm.to_numpy(delta.IM @ u0),
+                                       bm.to_numpy(mesh.node[:, 0] - 3*mesh.node[:, 1]))
+
+    def test_integrator_check(self):
+        bm.set_backend('numpy')
+        mesh = TriangleMesh.from_box(nx=2, ny=2)
+        space = LagrangeFESpace(mesh, p=1)
+        bform = AdaptiveBilinearForm(space)
+        with pytest.raises(ValueError):
+            bform.add_integrator(ScalarMassIntegrator(), region=bm.arange(2))
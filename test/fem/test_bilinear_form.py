@@ -3,9 +3,10 @@ import pytest
 from fealpy.backend import backend_manager as bm
 
 from fealpy.mesh import TriangleMesh
+from fealpy.decorator import cartesian
 from fealpy.functionspace import LagrangeFESpace
 from fealpy.fem import (
-        BilinearForm, ScalarDiffusionIntegrator
+        BilinearForm, ScalarDiffusionIntegrator, ScalarMassIntegrator, ScalarConvectionIntegrator
     )
 
 from bilinear_form_data import *
@@ -43,6 +44,111 @@ class TestBilinearFormInterface:
         z = bm.to_numpy(bform @ x)
         assert np.linalg.norm(y-z) < 1e-12 
 
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    @pytest.mark.parametrize("p", range(1, 4))
+    def test_matrix_free(self, backend, p):
+        bm.set_backend(backend)
+        mesh = TriangleMesh.from_box(nx=4, ny=4)
+        space = LagrangeFESpace(mesh, p)
+        gdof = space.number_of_global_dofs()
+        x = bm.astype(bm.random.rand(gdof), mesh.ftype)
+        X = bm.astype(bm.random.rand(gdof, 3), mesh.ftype)
+
+        bform = BilinearForm(space)
+        bform.add_integrator(ScalarDiffusionIntegrator(), splitter=5)
+        A = bm.to_numpy(BilinearForm(space).add_integrator(ScalarDiffusionIntegrator())
+                        .assembly().to_dense())
+
+        np.testing.assert_allclose(bm.to_numpy(bform @ x), A @ bm.to_numpy(x), atol=1e-12)
+        np.testing.assert_allclose(bm.to_numpy(bform @ X), A @ bm.to_numpy(X), atol=1e-12)
+        assert bform._M is None
+        assert bform._local is None
+
+        bform.keep_local(True)
+        y = bform @ x
+        assert len(bform._local) == (mesh.number_of_cells() + 4) // 5
+        np.testing.assert_allclose(bm.to_numpy(bform @ x), bm.to_numpy(y), atol=1e-12)
+        bform.keep_local(False)
+        assert bform._local is None
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    def test_matrix_free_transposed(self, backend):
+        bm.set_backend(backend)
+        mesh = TriangleMesh.from_box(nx=3, ny=3)
+        space = LagrangeFESpace(mesh, 2)
+        x = bm.astype(bm.random.rand(space.number_of_global_dofs()), mesh.ftype)
+
+        @cartesian
+        def coef(p):
+            return bm.stack([p[..., 1], 1 - p[..., 0]], axis=-1)
+
+        A = BilinearForm(space).add_integrator(ScalarConvectionIntegrator(coef))
+        A = bm.to_numpy(A.assembly().to_dense())
+        bform = BilinearForm(space)
+        bform.add_integrator(ScalarConvectionIntegrator(coef))
+        np.testing.assert_allclose(bm.to_numpy(bform.T @ x), A.T @ bm.to_numpy(x), atol=1e-12)
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    @pytest.mark.parametrize("p", range(1, 4))
+    def test_keep_pattern(self, backend, p):
+        bm.set_backend(backend)
+        mesh = TriangleMesh.from_box(nx=4, ny=4)
+        space = LagrangeFESpace(mesh, p)
+
+        bform = BilinearForm(space)
+        bform.add_integrator(ScalarDiffusionIntegrator(coef=1.0), splitter=7)
+        bform.add_integrator(ScalarMassIntegrator(coef=2.0))
+        expected = bm.to_numpy(bform.assembly().to_dense())
+
+        bform.keep_pattern(True)
+        A = bform.assembly()
+        assert bform._pattern is not None
+        np.testing.assert_allclose(bm.to_numpy(A.to_dense()), expected, atol=1e-12)
+
+        pattern = bform._pattern
+        A = bform.assembly()
+        assert bform._pattern is pattern
+        np.testing.assert_allclose(bm.to_numpy(A.to_dense()), expected, atol=1e-12)
+
+        # Renumbering the nodes keeps the sizes but changes the cell to dof map.
+        NN = mesh.number_of_nodes()
+        perm = bm.flip(bm.arange(NN, dtype=mesh.itype), axis=0)
+        iperm = bm.set_at(bm.zeros_like(perm), perm, bm.arange(NN, dtype=mesh.itype))
+        mesh.node = mesh.node[perm]
+        mesh.cell = iperm[mesh.cell]
+        mesh.construct()
+        expected = BilinearForm(LagrangeFESpace(mesh, p))
+        expected.add_integrator(ScalarDiffusionIntegrator(coef=1.0), ScalarMassIntegrator(coef=2.0))
+        expected = bm.to_numpy(expected.assembly().to_dense())
+        for integrator in bform.integrators.values():
+            integrator.clear()
+        A = bform.assembly()
+        assert bform._pattern is not pattern
+        np.testing.assert_allclose(bm.to_numpy(A.to_dense()), expected, atol=1e-12)
+
+        bform.keep_pattern(False)
+        assert bform._pattern is None
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    @pytest.mark.parametrize("num_workers", [2, 4])
+    def test_parallel(self, backend, num_workers):
+        bm.set_backend(backend)
+        mesh = TriangleMesh.from_box(nx=8, ny=8)
+        space = LagrangeFESpace(mesh, 2)
+
+        bform = BilinearForm(space)
+        bform.add_integrator(ScalarDiffusionIntegrator(coef=1.0), splitter=5)
+        bform.add_integrator(ScalarMassIntegrator(coef=2.0))
+        expected = bform.assembly(format='coo')
+
+        bform.parallel(num_workers)
+        A = bform.assembly(format='coo')
+        np.testing.assert_array_equal(bm.to_numpy(A.indices), bm.to_numpy(expected.indices))
+        np.testing.assert_array_equal(bm.to_numpy(A.values), bm.to_numpy(expected.values))
+
+        with pytest.raises(ValueError):
+            bform.parallel(-1)
+
 
 if __name__ == "__main__":
     pytest.main(['./test_bilinear_form.py', '-k', 'test_matmul'])
@@ -1,10 +1,14 @@
 
+import numpy as np
 import pytest
+from scipy.sparse.linalg import spsolve
 
 from fealpy.backend import backend_manager as bm
 from fealpy.mesh import TriangleMesh
 from fealpy.functionspace import LagrangeFESpace
 from fealpy.fem import DirichletBC
+from fealpy.fem import BilinearForm, ScalarDiffusionIntegrator
+from fealpy.fem import LinearForm, ScalarSourceIntegrator
 from fealpy.sparse import coo_matrix, COOTensor, CSRTensor
 
 
@@ -29,3 +33,53 @@ def test_apply_csr_matrix(backend):
     assert isinstance(coo_result, COOTensor)
     assert isinstance(csr_result, CSRTensor)
     assert bm.allclose(A_COO.toarray(), A_CSR.toarray())
+
+
+@pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+@pytest.mark.parametrize("format", ['coo', 'csr'])
+def test_apply_matrix_pattern(backend, format):
+    bm.set_backend(backend)
+    mesh = TriangleMesh.from_box([0, 1, 0, 1], nx=3, ny=3)
+    space = LagrangeFESpace(mesh, p=2)
+    bform = BilinearForm(space)
+    bform.add_integrator(ScalarDiffusionIntegrator())
+    A = bform.assembly(format=format)
+
+    dbc = DirichletBC(space)
+    result = dbc.apply_matrix(A)
+    expected = dbc._apply_matrix_spmm(A)
+
+    assert isinstance(result, type(A))
+    assert result.nnz == A.nnz
+    np.testing.assert_allclose(bm.to_numpy(result.to_dense()),
+                               bm.to_numpy(expected.to_dense()), atol=1e-14)
+    result2 = dbc.apply_matrix(A)
+    np.testing.assert_array_equal(bm.to_numpy(result2.values), bm.to_numpy(result.values))
+
+
+@pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+@pytest.mark.parametrize("format", ['coo', 'csr'])
+def test_apply_reduced(backend, format):
+    bm.set_backend(backend)
+    mesh = TriangleMesh.from_box([0, 1, 0, 1], nx=4, ny=4)
+    space = LagrangeFESpace(mesh, p=2)
+    bform = BilinearForm(space)
+    bform.add_integrator(ScalarDiffusionIntegrator())
+    lform = LinearForm(space)
+    lform.add_integrator(ScalarSourceIntegrator(1.0))
+    A = bform.assembly(format=format)
+    F = lform.assembly()
+
+    gd = lambda p: p[..., 0] + p[..., 1]
+    dbc = DirichletBC(space, gd=gd)
+    A0, F0 = dbc.apply(A, F)
+    expected = spsolve(A0.to_scipy().tocsr(), bm.to_numpy(F0))
+
+    AI, FI, uh = dbc.apply_reduced(A, F)
+    NI = dbc.interior_dof_index.shape[0]
+    assert AI.shape == (NI, NI)
+    assert FI.shape == (NI,)
+    xI = spsolve(AI.to_scipy().tocsr(), bm.to_numpy(FI))
+    x = dbc.lift(bm.tensor(xI, dtype=space.ftype), uh)
+    np.testing.assert_allclose(bm.to_numpy(x), expected, atol=1e-10)
+    np.testing.assert_allclose(bm.to_numpy(dbc.restrict(x)), xI, atol=1e-14)
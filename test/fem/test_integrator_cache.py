@@ -0,0 +1,72 @@
+import gc
+
+import numpy as np
+import pytest
+from fealpy.backend import backend_manager as bm
+
+from fealpy.mesh import TriangleMesh
+from fealpy.functionspace import LagrangeFESpace
+from fealpy.fem import BilinearForm, ScalarDiffusionIntegrator, IntegratorCache
+
+
+class TestIntegratorCache:
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    def test_chunked_assembly(self, backend):
+        bm.set_backend(backend)
+        mesh = TriangleMesh.from_box([0, 1, 0, 1], nx=8, ny=8)
+        space = LagrangeFESpace(mesh, p=2)
+        expected = BilinearForm(space).add_integrator(
+            ScalarDiffusionIntegrator(q=4)).assembly().to_dense()
+
+        integrator = ScalarDiffusionIntegrator(q=4).keep_data(True)
+        bform = BilinearForm(space).add_integrator(integrator, splitter=50)
+        for coef in [1., 2., 3.]:
+            integrator.coef = coef
+            A = bform.assembly().to_dense()
+            np.testing.assert_allclose(bm.to_numpy(A), coef*bm.to_numpy(expected), atol=1e-12)
+
+        info = integrator.cache_info()
+        # quadrature + (cell_to_dof, measure, gphi) for each of the 3 chunks
+        assert info['size'] == info['misses'] == 10
+        assert info['hits'] > 2 * info['misses']
+        assert info['nbytes'] > 0
+
+        integrator.keep_data(False)
+        assert len(integrator._cache) == 0
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    def test_memory_budget(self, backend):
+        bm.set_backend(backend)
+        cache = IntegratorCache(max_bytes=2000)
+        space = LagrangeFESpace(TriangleMesh.from_box(nx=2, ny=2), p=1)
+        a = bm.zeros((100,), dtype=bm.float64) # 800 bytes
+        for i in range(3):
+            key = cache.key('fetch', space, slice(i, i+1, 1))
+            assert cache.get(key, lambda: a) is a
+        assert len(cache) == 2 and cache.nbytes == 1600
+        assert cache.key('fetch', space, slice(0, 1, 1)) not in cache
+        assert cache.key('fetch', space, bm.arange(3)) is None
+
+        cache.max_bytes = 1000
+        assert len(cache) == 1
+        big = bm.zeros((1000,), dtype=bm.float64)
+        assert cache.get(cache.key('big', space), lambda: big) is big
+        assert len(cache) == 1
+
+    def test_keep_data_budget(self):
+        integrator = ScalarDiffusionIntegrator().keep_data(True, max_bytes=1000)
+        integrator.keep_data(True)
+        integrator.keep_data(False)
+        assert integrator.cache_info()['max_bytes'] == 1000
+        integrator.keep_data(True, max_bytes=None)
+        assert integrator.cache_info()['max_bytes'] is None
+
+    def test_space_collected(self):
+        bm.set_backend('numpy')
+        cache = IntegratorCache()
+        space = LagrangeFESpace(TriangleMesh.from_box(nx=2, ny=2), p=1)
+        cache.get(cache.key('fetch', space), lambda: np.ones(3))
+        assert len(cache) == 1
+        del space
+        gc.collect()
+        assert len(cache) == 0 and cache.nbytes == 0
@@ -4,7 +4,8 @@ import pytest
 
 from fealpy.backend import backend_manager as bm
 from fealpy.mesh.triangle_mesh import TriangleMesh
-from fealpy.functionspace import LagrangeFESpace
+from fealpy.functionspace import LagrangeFESpace, BernsteinFESpace
+from fealpy.fem import BilinearForm
 from fealpy.fem.scalar_mass_integrator import ScalarMassIntegrator
 
 from scalar_mass_integrator_data import *
@@ -22,6 +23,21 @@ class TestScalarMassIntegrator:
         assembly_cell_matrix = integrator.assembly(space)
         np.testing.assert_array_almost_equal(assembly_cell_matrix ,data["assembly_cell_matrix"], 
                                      err_msg=f" `assembly_cell_matrix` function is not equal to real result in backend {backend}")
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    def test_bernstein_space(self, backend):
+        # cell_to_dof of the space has no `index` argument
+        bm.set_backend(backend)
+        mesh = TriangleMesh.from_box([0,1,0,1],2,2)
+        space = BernsteinFESpace(mesh, 2)
+        NC = mesh.number_of_cells()
+        for region, area in [(None, 1.0), (bm.arange(NC//2), 0.5)]:
+            bform = BilinearForm(space)
+            bform.add_integrator(ScalarMassIntegrator(region=region))
+            M = bform.assembly().to_dense()
+            assert M.shape == (space.number_of_global_dofs(), )*2
+            np.testing.assert_allclose(float(bm.sum(M)), area, atol=1e-12)
+
 if __name__ == "__main__":
     #pytest.main(['test_lagrange_fe_space.py', "-q", "-k","test_basis", "-s"])
     pytest.main(['test_scalar_diffusion_integrator.py', "-q"])   
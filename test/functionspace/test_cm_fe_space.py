@@ -72,6 +72,30 @@ class TestCmfespace2d:
         print(bm.abs(aa-gF).max())
         #np.testing.assert_allclose(aa, gF, atol=1e-14,rtol=0)
 
+    @pytest.mark.parametrize("p, m", [(5, 1), (9, 2)])
+    def test_coefficient_matrix_blocks(self, p, m):
+        bm.set_backend('numpy')
+        mesh = TriangleMesh.from_box([0,1,0,1],2,2)
+        mesh.node = mesh.node + 0.03*np.sin(7*mesh.node[:, ::-1])
+        space = CmConformingFESpace2d(mesh, p, m)
+        coeff = space.coeff
+
+        bcs = bm.array([[0.2,0.3,0.5],[0.1,0.1,0.8]], dtype=bm.float64)
+        bphi = space.bspace.basis(bcs)
+        np.testing.assert_allclose(space.basis(bcs),
+                                   np.einsum('cil, cql->cqi', coeff, bphi), atol=1e-10)
+        bgphi = space.bspace.grad_m_basis(bcs, 2)
+        np.testing.assert_allclose(space.grad_m_basis(bcs, 2),
+                                   np.einsum('cil, cqlg->cqig', coeff, bgphi), atol=1e-8)
+
+        # 顶点处只有该顶点的函数值自由度对应的基函数为 1
+        ndof = space.number_of_internal_dofs('node')
+        phi = space.basis(bm.eye(3, dtype=bm.float64))
+        for v in range(3):
+            e = np.zeros(phi.shape[-1])
+            e[ndof*v] = 1
+            np.testing.assert_allclose(phi[:, v], np.broadcast_to(e, phi[:, v].shape), atol=1e-10)
+
     def test_isConerNode(self):
         mesh = TriangleMesh.from_box([0,1,0,1],2,2)
         node = mesh.entity('node')
@@ -0,0 +1,134 @@
+import os
+import json
+
+import numpy as np
+import pytest
+
+from fealpy.backend import backend_manager as bm
+from fealpy.mesh import (
+    Mesh, TriangleMesh, TetrahedronMesh, QuadrangleMesh, UniformMesh2d
+)
+from fealpy.functionspace import LagrangeFESpace
+from fealpy.functionspace.function import Function
+
+
+def make_mesh(name):
+    if name == 'tri':
+        return TriangleMesh.from_box(nx=3, ny=3)
+    if name == 'tet':
+        return TetrahedronMesh.from_box(nx=2, ny=2, nz=2)
+    if name == 'quad':
+        return QuadrangleMesh.from_box(nx=3, ny=3)
+    return UniformMesh2d((0, 3, 0, 3), (0.5, 0.5), (0., 0.))
+
+
+class MyTriangleMesh(TriangleMesh):
+    pass
+
+
+class TestCheckpoint:
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    @pytest.mark.parametrize("name", ['tri', 'tet', 'quad', 'uniform'])
+    @pytest.mark.parametrize("suffix, mmap", [('', False), ('', True), ('.npz', False)])
+    def test_mesh(self, backend, name, suffix, mmap, tmp_path):
+        bm.set_backend(backend)
+        mesh = make_mesh(name)
+        mesh.celldata['flag'] = bm.arange(mesh.number_of_cells())
+        path = str(tmp_path / ('mesh' + suffix))
+        mesh.save(path)
+
+        new = Mesh.load(path, mmap=mmap)
+        assert type(new) is type(mesh)
+        for etype in ['node', 'edge', 'cell']:
+            assert new.count(etype) == mesh.count(etype)
+            np.testing.assert_array_equal(bm.to_numpy(new.entity(etype)),
+                                          bm.to_numpy(mesh.entity(etype)))
+        for attr in ['face2cell', 'cell2edge']:
+            np.testing.assert_array_equal(bm.to_numpy(getattr(new, attr)),
+                                          bm.to_numpy(getattr(mesh, attr)))
+        np.testing.assert_array_equal(bm.to_numpy(new.celldata['flag']),
+                                      bm.to_numpy(mesh.celldata['flag']))
+        np.testing.assert_allclose(bm.to_numpy(new.entity_measure('cell')),
+                                   bm.to_numpy(mesh.entity_measure('cell')))
+        assert (new.facedata is new.edgedata) == (mesh.facedata is mesh.edgedata)
+
+        new.uniform_refine()
+        assert new.number_of_cells() > mesh.number_of_cells()
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    def test_data(self, backend, tmp_path):
+        bm.set_backend(backend)
+        mesh = TriangleMesh.from_box(nx=4, ny=4)
+        space = LagrangeFESpace(mesh, p=2)
+        uh = space.function()
+        uh[:] = bm.arange(space.number_of_global_dofs(), dtype=bm.float64)
+        path = str(tmp_path / 'state.npz')
+        mesh.save(path, data={'uh': uh, 't': 0.25, 'step': 10})
+
+        new, data = TriangleMesh.load(path, return_data=True)
+        assert data['t'] == 0.25 and data['step'] == 10
+        new_space = LagrangeFESpace(new, p=2)
+        vh = new_space.function(array=data['uh']['array'])
+        np.testing.assert_allclose(bm.to_numpy(vh.array), bm.to_numpy(uh.array))
+
+        with pytest.raises(TypeError):
+            TetrahedronMesh.load(path)
+
+        path = str(tmp_path / 'uh')
+        uh.save(path)
+        vh = Function.load(new_space, path, mmap=True)
+        assert vh.coordtype == uh.coordtype
+        np.testing.assert_allclose(bm.to_numpy(vh.array), bm.to_numpy(uh.array))
+
+    def test_untrusted_class(self, tmp_path):
+        bm.set_backend('numpy')
+        path = str(tmp_path / 'mesh')
+        TriangleMesh.from_box(nx=2, ny=2).save(path)
+        meta_file = os.path.join(path, 'meta.json')
+        with open(meta_file) as f:
+            meta = json.load(f)
+
+        for cls_path, error in [('fealpy_untrusted_module:Evil', ValueError),
+                                ('os:system', ValueError),
+                                ('fealpy.mesh.checkpoint:StateDecoder', TypeError)]:
+            meta['class'] = cls_path
+            with open(meta_file, 'w') as f:
+                json.dump(meta, f)
+            with pytest.raises(error):
+                Mesh.load(path)
+
+    def test_subclass_outside_fealpy(self, tmp_path):
+        bm.set_backend('numpy')
+        mesh = MyTriangleMesh.from_box(nx=2, ny=2)
+        assert type(mesh) is MyTriangleMesh
+        path = str(tmp_path / 'mesh')
+        mesh.save(path)
+        assert type(Mesh.load(path)) is MyTriangleMesh
+
+    def test_overwrite_directory(self, tmp_path):
+        bm.set_backend('numpy')
+        path = str(tmp_path / 'mesh')
+        mesh = TriangleMesh.from_box(nx=3, ny=3)
+        mesh.celldata['flag'] = bm.arange(mesh.number_of_cells())
+        mesh.save(path, data={'uh': bm.ones(3)})
+        with open(os.path.join(path, 'notes.txt'), 'w') as f:
+            f.write('kept')
+
+        mesh = QuadrangleMesh.from_box(nx=2, ny=2)
+        mesh.save(path)
+        new, data = Mesh.load(path, return_data=True)
+        assert type(new) is QuadrangleMesh and data == {}
+        assert 'flag' not in new.celldata
+        files = [os.path.relpath(os.path.join(r, f), path)
+                 for r, _, fs in os.walk(path) for f in fs]
+        assert not any(f.startswith('data') for f in files)
+        assert 'notes.txt' in files
+
+    def test_hdf5(self, tmp_path):
+        pytest.importorskip('h5py')
+        bm.set_backend('numpy')
+        mesh = TetrahedronMesh.from_box(nx=2, ny=2, nz=2)
+        path = str(tmp_path / 'mesh.h5')
+        mesh.save(path, compress=True)
+        new = Mesh.load(path)
+        np.testing.assert_array_equal(new.cell2edge, mesh.cell2edge)
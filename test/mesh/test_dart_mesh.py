@@ -1 +1,94 @@
-from fealpy.mesh.dart_mesh_3d import DartMesh3d
+import numpy as np
+import pytest
+
+from fealpy.backend import backend_manager as bm
+from fealpy.mesh import TetrahedronMesh
+from fealpy.mesh.dart_mesh_3d import DartMesh3d, pairs_to_csr
+from fealpy.mesh.vtkCellTypes import VTK_POLYHEDRON
+from test_vtu_writer import read_vtu
+
+
+def dart_meshes():
+    bm.set_backend('numpy')
+    tmesh = TetrahedronMesh.from_box(nx=2, ny=2, nz=2)
+    mesh = DartMesh3d.from_mesh(tmesh)
+    return tmesh, mesh, mesh.dual_mesh()
+
+
+def csr_rows(val, loc):
+    return [set(v.tolist()) for v in np.split(val, loc[1:-1])]
+
+
+class TestDartMesh3d:
+    def test_pairs_to_csr(self):
+        row = np.array([2, 0, 2, 0, 2])
+        col = np.array([1, 3, 1, 0, 0])
+        val, loc, index = pairs_to_csr(row, col, 4, 4, return_index=True)
+        np.testing.assert_array_equal(val, [0, 3, 0, 1])
+        np.testing.assert_array_equal(loc, [0, 2, 2, 4, 4])
+        np.testing.assert_array_equal(index, [3, 1, 4, 0])
+
+    def test_topology(self):
+        tmesh, mesh, _ = dart_meshes()
+        NC = tmesh.number_of_cells()
+        assert mesh.number_of_cells() == NC
+        assert mesh.number_of_faces() == tmesh.number_of_faces()
+
+        cell, loc = mesh.ds.cell_to_node()
+        np.testing.assert_array_equal(loc, 4*np.arange(NC+1))
+        np.testing.assert_array_equal(cell.reshape(NC, 4), np.sort(tmesh.entity('cell'), axis=1))
+        np.testing.assert_array_equal(mesh.ds.number_of_vertices_of_faces(), 3)
+
+        c2f, c2fLoc = mesh.ds.cell_to_face()
+        f2c = mesh.ds.face_to_cell()
+        for c, F in enumerate(csr_rows(c2f, c2fLoc)):
+            for f in F:
+                i = 0 if f2c[f, 0] == c else 1
+                assert f2c[f, i] == c
+                assert c2f[c2fLoc[c] + f2c[f, 2+i]] == f
+
+        # node_to_cell 为 cell_to_node 的转置
+        n2c, n2cLoc = mesh.ds.node_to_cell()
+        for n, C in enumerate(csr_rows(n2c, n2cLoc)):
+            assert C == set(np.where(np.any(tmesh.entity('cell') == n, axis=1))[0].tolist())
+
+        n2n, n2nLoc = mesh.ds.node_to_node()
+        edge = mesh.ds.edge_to_node()
+        assert n2nLoc[-1] == 2*len(edge)
+        for n, N in enumerate(csr_rows(n2n, n2nLoc)):
+            assert N == set(edge[edge[:, 0] == n, 1].tolist()) | set(edge[edge[:, 1] == n, 0].tolist())
+
+    @pytest.mark.parametrize("which", [1, 2])
+    def test_polyhedron_faces(self, which):
+        mesh = dart_meshes()[which]
+        faces, faceoffsets = mesh.polyhedron_faces()
+        face, faceLoc = mesh.ds.face_to_node()
+        c2f, c2fLoc = mesh.ds.cell_to_face()
+        expected, offsets = [], []
+        for c in range(mesh.number_of_cells()):
+            F = c2f[c2fLoc[c]:c2fLoc[c+1]]
+            expected.append(len(F))
+            for f in F:
+                expected += [faceLoc[f+1] - faceLoc[f]] + face[faceLoc[f]:faceLoc[f+1]].tolist()
+            offsets.append(len(expected))
+        np.testing.assert_array_equal(faces, expected)
+        np.testing.assert_array_equal(faceoffsets, offsets)
+
+    def test_to_vtk(self, tmp_path):
+        mesh = dart_meshes()[2]
+        NC = mesh.number_of_cells()
+        mesh.celldata['id'] = np.arange(NC)
+        fname = str(tmp_path / 'dual.vtu')
+        mesh.to_vtk(fname)
+
+        root, arrays = read_vtu(fname)
+        piece = next(root.iter('Piece'))
+        assert int(piece.get('NumberOfCells')) == NC
+        cell, cellLoc = mesh.ds.cell_to_node()
+        faces, faceoffsets = mesh.polyhedron_faces()
+        np.testing.assert_array_equal(arrays['connectivity'], cell)
+        np.testing.assert_array_equal(arrays['offsets'], cellLoc[1:])
+        np.testing.assert_array_equal(arrays['types'], VTK_POLYHEDRON)
+        np.testing.assert_array_equal(arrays['faces'], faces)
+        np.testing.assert_array_equal(arrays['faceoffsets'], faceoffsets)
+        np.testing.assert_array_equal(arrays['id'], np.arange(NC))
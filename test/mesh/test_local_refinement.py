@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from fealpy.backend import backend_manager as bm
+from fealpy.mesh import TriangleMesh, TetrahedronMesh
+
+
+def check_topology(mesh, ref):
+    face = bm.to_numpy(mesh.face)
+    rface = bm.to_numpy(ref.face)
+    assert face.shape == rface.shape
+    # 同样的面, 且面的方向和 face2cell 与完全重建的结果一致
+    key = {tuple(f): i for i, f in enumerate(np.sort(rface, axis=1))}
+    perm = np.array([key[tuple(f)] for f in np.sort(face, axis=1)])
+    np.testing.assert_array_equal(face, rface[perm])
+    np.testing.assert_array_equal(bm.to_numpy(mesh.face2cell),
+                                  bm.to_numpy(ref.face2cell)[perm])
+    np.testing.assert_array_equal(perm[bm.to_numpy(mesh.cell2face)],
+                                  bm.to_numpy(ref.cell2face))
+    if mesh.TD == 3:
+        edge = bm.to_numpy(mesh.edge)
+        redge = bm.to_numpy(ref.edge)
+        assert edge.shape == redge.shape
+        np.testing.assert_array_equal(
+            np.sort(edge[bm.to_numpy(mesh.cell2edge)], axis=-1),
+            np.sort(redge[bm.to_numpy(ref.cell2edge)], axis=-1))
+
+
+class TestLocalRefinement:
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    def test_triangle_bisect_construct(self, backend):
+        bm.set_backend(backend)
+        mesh = TriangleMesh.from_box(nx=4, ny=4)
+        rng = np.random.default_rng(0)
+        for _ in range(4):
+            NC = mesh.number_of_cells()
+            isMarkedCell = bm.tensor(rng.random(NC) < 0.2)
+            option = mesh.bisect_options(HB=True, IM=True, disp=False, construct=False)
+            mesh.bisect(isMarkedCell, options=option)
+            isKeptCell = bm.bincount(option['HB'], minlength=NC)[:NC] == 1
+            mesh.construct(isKeptCell)
+            check_topology(mesh, TriangleMesh(mesh.node, mesh.cell))
+
+            NN = option['IM'].shape[1]
+            x = mesh.node[:NN, 0] + 2*mesh.node[:NN, 1]
+            np.testing.assert_allclose(bm.to_numpy(option['IM']@x),
+                                       bm.to_numpy(mesh.node[:, 0] + 2*mesh.node[:, 1]))
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    def test_tetrahedron_construct(self, backend):
+        bm.set_backend(backend)
+        mesh = TetrahedronMesh.from_box([0, 1, 0, 1, 0, 1], nx=2, ny=2, nz=2)
+        rng = np.random.default_rng(0)
+        for _ in range(3):
+            # 把几个单元从重心剖分为 4 个
+            NC = mesh.number_of_cells()
+            NN = mesh.number_of_nodes()
+            idx = np.sort(rng.choice(NC, 3, replace=False))
+            node = bm.to_numpy(mesh.node)
+            cell = bm.to_numpy(mesh.cell)
+            p = NN + np.arange(len(idx))
+            sub = [np.c_[cell[idx][:, lf], p] for lf in
+                   ([0, 1, 2], [0, 1, 3], [0, 3, 2], [1, 2, 3])]
+            node = np.concatenate([node, node[cell[idx]].mean(axis=1)])
+            cell = np.concatenate([cell] + sub[1:])
+            cell[idx] = sub[0]
+            isKeptCell = np.ones(NC, dtype=np.bool_)
+            isKeptCell[idx] = False
+
+            mesh.node = bm.tensor(node)
+            mesh.cell = bm.tensor(cell, dtype=mesh.itype)
+            mesh.construct(bm.tensor(isKeptCell))
+            check_topology(mesh, TetrahedronMesh(mesh.node, mesh.cell))
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    @pytest.mark.parametrize("theta", [0.0, 0.3, 0.9])
+    def test_mark_L2(self, backend, theta):
+        bm.set_backend(backend)
+        rng = np.random.default_rng(1)
+        for n in [1, 10, 5000]:
+            eta = rng.random(n)**3
+            idx = np.argsort(-eta**2)
+            x = np.cumsum(eta[idx]**2)
+            expected = np.zeros(n, dtype=np.bool_)
+            expected[idx[x < theta*x[-1]]] = True
+            expected[idx[0]] = True
+            isMarked = TriangleMesh.mark(bm.tensor(eta), theta)
+            np.testing.assert_array_equal(bm.to_numpy(isMarked), expected)
+
+
+if __name__ == "__main__":
+    pytest.main(["./test_local_refinement.py"])
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from fealpy.backend import backend_manager as bm
+from fealpy.mesh.neighbor_search import cell_list_search, VerletList
+
+
+def brute_force(position, r, query=None, box_size=None, periodic=False, include_self=True):
+    x = np.asarray(position)
+    q = x if query is None else np.asarray(query)
+    d = q[:, None, :] - x[None, :, :]
+    if periodic:
+        L = np.asarray(box_size)
+        d = d - L * np.round(d / L)
+    close = np.sum(d**2, axis=-1) <= r**2
+    if (query is None) and (not include_self):
+        np.fill_diagonal(close, False)
+    return [np.nonzero(row)[0] for row in close]
+
+
+def to_lists(indptr, indices):
+    indptr = bm.to_numpy(indptr)
+    indices = bm.to_numpy(indices)
+    return [np.sort(indices[indptr[i]:indptr[i+1]]) for i in range(len(indptr)-1)]
+
+
+def assert_same(result, expected):
+    assert len(result) == len(expected)
+    for a, b in zip(result, expected):
+        np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+@pytest.mark.parametrize("GD", [2, 3])
+@pytest.mark.parametrize("periodic", [False, True])
+@pytest.mark.parametrize("include_self", [False, True])
+def test_cell_list_search(backend, GD, periodic, include_self):
+    bm.set_backend(backend)
+    rng = np.random.default_rng(GD)
+    box = [1.0, 0.8, 0.6][:GD]
+    x = rng.random((400, GD)) * box
+    r = 0.12
+    indptr, indices = cell_list_search(bm.from_numpy(x), r, box_size=box,
+                                       periodic=periodic, include_self=include_self,
+                                       chunk_size=64)
+    assert indptr.shape == (401, )
+    assert int(indptr[-1]) == indices.shape[0]
+    expected = brute_force(x, r, box_size=box, periodic=periodic, include_self=include_self)
+    assert_same(to_lists(indptr, indices), expected)
+
+
+@pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+@pytest.mark.parametrize("periodic", [False, True])
+def test_cell_list_query(backend, periodic):
+    bm.set_backend(backend)
+    rng = np.random.default_rng(0)
+    x = rng.random((300, 2))
+    q = rng.random((50, 2))
+    indptr, indices = cell_list_search(bm.from_numpy(x), 0.15, query=bm.from_numpy(q),
+                                       box_size=[1., 1.], periodic=periodic)
+    assert indptr.shape == (51, )
+    expected = brute_force(x, 0.15, query=q, box_size=[1., 1.], periodic=periodic)
+    assert_same(to_lists(indptr, indices), expected)
+
+
+@pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+@pytest.mark.parametrize("box", [[1.0, 0.45], [0.45, 0.42], [0.8, 0.41, 0.48]])
+def test_cell_list_small_periodic_box(backend, box):
+    # Less than 5 cells on some axes, where the stencil wraps to itself.
+    bm.set_backend(backend)
+    rng = np.random.default_rng(len(box))
+    x = rng.random((300, len(box))) * box
+    q = rng.random((40, len(box))) * box
+    r = 0.2
+    indptr, indices = cell_list_search(bm.from_numpy(x), r, box_size=box, periodic=True)
+    assert_same(to_lists(indptr, indices), brute_force(x, r, box_size=box, periodic=True))
+    indptr, indices = cell_list_search(bm.from_numpy(x), r, query=bm.from_numpy(q),
+                                       box_size=box, periodic=True)
+    assert_same(to_lists(indptr, indices),
+                brute_force(x, r, query=q, box_size=box, periodic=True))
+
+
+@pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+def test_cell_list_bounding_box(backend):
+    bm.set_backend(backend)
+    rng = np.random.default_rng(1)
+    x = rng.random((200, 3)) * 2 - 1
+    indptr, indices = cell_list_search(bm.from_numpy(x), 0.3)
+    assert_same(to_lists(indptr, indices), brute_force(x, 0.3))
+
+
+@pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+def test_verlet_list(backend):
+    bm.set_backend(backend)
+    rng = np.random.default_rng(2)
+    box = [1., 1., 1.]
+    x = rng.random((300, 3))
+    r, skin = 0.15, 0.05
+    nlist = VerletList(r, skin=skin, box_size=box, periodic=True)
+
+    for _ in range(3):
+        indptr, indices = nlist(bm.from_numpy(x))
+        assert_same(to_lists(indptr, indices), brute_force(x, r, box_size=box, periodic=True))
+        x = np.mod(x + rng.uniform(-1, 1, x.shape) * skin / 20, 1.)
+    assert nlist.num_builds == 1
+
+    x = np.mod(x + skin, 1.)
+    indptr, indices = nlist.update(bm.from_numpy(x))
+    assert nlist.num_builds == 2
+    assert_same(to_lists(indptr, indices), brute_force(x, r, box_size=box, periodic=True))
+
+
+def test_neighbor_search_errors():
+    bm.set_backend('numpy')
+    x = np.random.rand(10, 2)
+    with pytest.raises(ValueError):
+        cell_list_search(x, 0.1, periodic=True)
+    with pytest.raises(ValueError):
+        cell_list_search(x, 0.6, box_size=[1., 1.], periodic=True)
+    with pytest.raises(ValueError):
+        cell_list_search(x, 0.1, box_size=[1., 1.], periodic=[True])
+    with pytest.raises(ValueError):
+        VerletList(0.1, skin=-0.1)
+
+
+if __name__ == "__main__":
+    pytest.main(["./test_neighbor_search.py", "-k", "test_cell_list_search"])
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from fealpy.backend import backend_manager as bm
+from fealpy.mesh import TriangleMesh, TetrahedronMesh, QuadrangleMesh
+from fealpy.mesh.point_location import PointLocator
+
+
+def perturbed_mesh(name):
+    if name == 'TriangleMesh':
+        mesh = TriangleMesh.from_box([0, 1, 0, 1], nx=10, ny=10)
+    elif name == 'TetrahedronMesh':
+        mesh = TetrahedronMesh.from_box([0, 1, 0, 1, 0, 1], nx=4, ny=4, nz=4)
+    else:
+        mesh = QuadrangleMesh.from_box([0, 1, 0, 1], nx=8, ny=8)
+    rng = np.random.default_rng(0)
+    node = bm.to_numpy(mesh.node)
+    isBdNode = bm.to_numpy(mesh.boundary_node_flag())
+    node = node + 0.02*(rng.random(node.shape) - 0.5)*(~isBdNode[:, None])
+    mesh.node = bm.tensor(node, dtype=mesh.ftype)
+    return mesh
+
+
+def to_point(mesh, cell, bc):
+    v = bm.to_numpy(mesh.node)[bm.to_numpy(mesh.cell)[cell]]
+    bc = bm.to_numpy(bc)
+    if bc.ndim == 2:
+        return np.einsum('ci, cid -> cd', bc, v)
+    xi, eta = bc[:, 0, 1:], bc[:, 1, 1:]
+    return (1-xi)*(1-eta)*v[:, 0] + xi*(1-eta)*v[:, 1] + xi*eta*v[:, 2] + (1-xi)*eta*v[:, 3]
+
+
+class TestPointLocator:
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    @pytest.mark.parametrize("name", ['TriangleMesh', 'TetrahedronMesh', 'QuadrangleMesh'])
+    def test_locate(self, backend, name):
+        bm.set_backend(backend)
+        mesh = perturbed_mesh(name)
+        GD = mesh.geo_dimension()
+        rng = np.random.default_rng(1)
+        points = rng.random((2000, GD))*1.2 - 0.1
+        cell, bc = mesh.location(bm.tensor(points, dtype=mesh.ftype))
+        cell = bm.to_numpy(cell)
+
+        inside = np.all((points >= 0) & (points <= 1), axis=-1)
+        np.testing.assert_array_equal(cell >= 0, inside)
+        np.testing.assert_allclose(to_point(mesh, cell[inside], bc[inside]),
+                                   points[inside], atol=1e-12)
+        assert bm.to_numpy(bc)[inside].min() > -1e-10
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    @pytest.mark.parametrize("name", ['TriangleMesh', 'TetrahedronMesh', 'QuadrangleMesh'])
+    def test_walk(self, backend, name):
+        bm.set_backend(backend)
+        mesh = perturbed_mesh(name)
+        GD = mesh.geo_dimension()
+        rng = np.random.default_rng(2)
+        points = rng.random((2000, GD))*0.8 + 0.1
+        locator = PointLocator(mesh)
+        cell, _ = locator.locate(bm.tensor(points, dtype=mesh.ftype))
+
+        # 点移动后从上一步的单元出发查找
+        points = points + 0.05*(rng.random(points.shape) - 0.5)
+        points = bm.tensor(points, dtype=mesh.ftype)
+        wcell, wbc = locator.walk(points, cell)
+        found = bm.to_numpy(wcell) >= 0
+        assert found.mean() > 0.99
+        np.testing.assert_allclose(to_point(mesh, bm.to_numpy(wcell)[found], wbc[found]),
+                                   bm.to_numpy(points)[found], atol=1e-12)
+        lcell, lbc = locator.locate(points, start=cell)
+        assert np.all(bm.to_numpy(lcell) >= 0)
+        np.testing.assert_allclose(to_point(mesh, bm.to_numpy(lcell), lbc),
+                                   bm.to_numpy(points), atol=1e-12)
+
+    def test_cache(self):
+        bm.set_backend('numpy')
+        mesh = TriangleMesh.from_box([0, 1, 0, 1], nx=4, ny=4)
+        point = np.array([[0.3, 0.6]])
+        cell, _ = mesh.location(point)
+        mesh.node = mesh.node + 1.0 # 移动网格后重新建立查找结构
+        assert mesh.location(point)[0][0] == -1
+        assert mesh.location(point + 1.0)[0][0] == cell[0]
+
+
+if __name__ == "__main__":
+    pytest.main(["./test_point_location.py"])
@@ -162,6 +162,30 @@ class TestTetrahedronMeshInterfaces:
         cell2ipoint = mesh.cell_to_ipoint(p=4)
         np.testing.assert_allclose(bm.to_numpy(cell2ipoint), data["cell2ipoint"], atol=1e-14)
 
+    @pytest.mark.parametrize("backend", ["numpy", "pytorch"])
+    def test_ipoint_cache(self, backend):
+        bm.set_backend(backend)
+        mesh = TetrahedronMesh.from_box(box=[0,1,0,1,0,1], nx=2, ny=2, nz=1)
+        c2p = mesh.cell_to_ipoint(3)
+        assert mesh.cell_to_ipoint(3) is c2p
+        assert mesh.face_to_ipoint(3) is mesh.face_to_ipoint(3)
+        np.testing.assert_array_equal(bm.to_numpy(mesh.cell_to_ipoint(3, index=slice(1, 4))),
+                                      bm.to_numpy(c2p[1:4]))
+        index = bm.tensor([0, 5])
+        np.testing.assert_array_equal(bm.to_numpy(mesh.interpolation_points(3, index=index)),
+                                      bm.to_numpy(mesh.interpolation_points(3)[index]))
+
+        mesh.uniform_refine()
+        c2p = mesh.cell_to_ipoint(3)
+        expected = TetrahedronMesh(mesh.node, mesh.cell).cell_to_ipoint(3)
+        assert c2p.shape == (mesh.number_of_cells(), 20)
+        np.testing.assert_array_equal(bm.to_numpy(c2p), bm.to_numpy(expected))
+
+        ip = mesh.interpolation_points(2)
+        mesh.node = mesh.node * 2
+        np.testing.assert_allclose(bm.to_numpy(mesh.interpolation_points(2)),
+                                   2 * bm.to_numpy(ip), atol=1e-14)
+
     @pytest.mark.parametrize("backend", ["numpy", "pytorch"])
     @pytest.mark.parametrize("data", face_unit_normal)
     def test_face_normal(self, data, backend):
@@ -3,7 +3,9 @@ import pytest
 
 import numpy as np
 from fealpy.backend import backend_manager as bm
-from fealpy.mesh.utils import inverse_relation
+from fealpy.mesh.utils import inverse_relation, reference_basis_cache, ReferenceBasisCache
+from fealpy.mesh import TriangleMesh, QuadrangleMesh, HexahedronMesh
+from fealpy.functionspace import LagrangeFESpace
 
 inverse_relation_with_index_data = [
     {
@@ -62,3 +64,107 @@ def test_inverse_relation_with_flag(data, backend):
     assert bm.all(bm.equal(row, bm.from_numpy(data['row'])))
     assert bm.all(bm.equal(col, bm.from_numpy(data['col'])))
     assert spshape == data['spshape']
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'pytorch'])
+@pytest.mark.parametrize('p', [1, 3])
+def test_reference_basis_cache(backend, p):
+    bm.set_backend(backend)
+    reference_basis_cache.clear()
+    mesh = TriangleMesh.from_box([0, 1, 0, 1], nx=2, ny=2)
+    bcs, _ = mesh.quadrature_formula(p+1).get_quadrature_points_and_weights()
+    mi = bm.multi_index_matrix(p, 2)
+
+    phi = mesh.shape_function(bcs, p)
+    gphi = mesh.grad_shape_function(bcs, p, variables='u')
+    assert mesh.shape_function(bcs, p) is phi
+    assert mesh.grad_shape_function(bcs, p, variables='u') is gphi
+    np.testing.assert_allclose(bm.to_numpy(phi), bm.to_numpy(bm.simplex_shape_function(bcs, p, mi)))
+    np.testing.assert_allclose(bm.to_numpy(gphi), bm.to_numpy(bm.simplex_grad_shape_function(bcs, p, mi)))
+    assert reference_basis_cache.info()['misses'] == 2
+    assert reference_basis_cache.info()['hits'] == 2
+
+    if backend == 'numpy':
+        assert not phi.flags.writeable
+
+    # Points out of the quadrature registry are not cached.
+    other = bm.copy(bcs)
+    phi = mesh.shape_function(other, p)
+    np.testing.assert_allclose(bm.to_numpy(phi), bm.to_numpy(mesh.shape_function(bcs, p)))
+    assert reference_basis_cache.info()['misses'] == 2
+    assert reference_basis_cache.info()['size'] == 2
+
+    quad = QuadrangleMesh.from_box([0, 1, 0, 1], nx=2, ny=2)
+    bcs, _ = quad.quadrature_formula(p+1).get_quadrature_points_and_weights()
+    gphi = quad.grad_shape_function(bcs, p, variables='u')
+    assert quad.grad_shape_function(bcs, p, variables='u') is gphi
+    assert quad.grad_shape_function(bcs, p, variables='x').shape == (4, ) + tuple(gphi.shape)
+
+
+def test_reference_basis_cache_lru():
+    bm.set_backend('numpy')
+    cache = ReferenceBasisCache(maxsize=2)
+    mesh = TriangleMesh.from_box([0, 1, 0, 1], nx=1, ny=1)
+    points = [mesh.quadrature_formula(q).get_quadrature_points_and_weights()[0]
+              for q in (1, 2, 3)]
+    for i in [0, 1, 0, 2, 1]:
+        cache.get(('test', ), points[i], lambda: points[i] * 2)
+    assert cache.info() == {'hits': 1, 'misses': 4, 'size': 2, 'maxsize': 2}
+    cache.get(('test', ), np.array([[0.5, 0.5]]), lambda: None)
+    assert cache.info() == {'hits': 1, 'misses': 4, 'size': 2, 'maxsize': 2}
+
+
+IPOINT_MESHES = [
+    (TriangleMesh, dict(box=[0, 1, 0, 1], nx=2, ny=2)),
+    (QuadrangleMesh, dict(box=[0, 1, 0, 1], nx=2, ny=2)),
+    (HexahedronMesh, dict(box=[0, 1, 0, 1, 0, 1], nx=2, ny=1, nz=1)),
+]
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'pytorch'])
+@pytest.mark.parametrize('Mesh, kwargs', IPOINT_MESHES)
+def test_ipoint_cache(backend, Mesh, kwargs):
+    bm.set_backend(backend)
+    mesh = Mesh.from_box(**kwargs)
+    c2p = mesh.cell_to_ipoint(3)
+    assert mesh.cell_to_ipoint(3) is c2p
+    assert mesh.edge_to_ipoint(3) is mesh.edge_to_ipoint(3)
+    np.testing.assert_array_equal(bm.to_numpy(mesh.cell_to_ipoint(3, index=slice(1, 3))),
+                                  bm.to_numpy(c2p[1:3]))
+    index = bm.tensor([0, 5])
+    np.testing.assert_array_equal(bm.to_numpy(mesh.interpolation_points(3, index=index)),
+                                  bm.to_numpy(mesh.interpolation_points(3)[index]))
+
+    if backend == 'numpy': # the cached arrays are read-only
+        c2d = LagrangeFESpace(mesh, p=3).cell_to_dof()
+        with pytest.raises(ValueError):
+            c2d[0, 0] = -1
+        with pytest.raises(ValueError):
+            mesh.interpolation_points(3)[0] += 1.
+        c2d = bm.copy(c2d) # copies are writable
+        c2d[0, 0] = -1
+        assert 'read-only' in Mesh.interpolation_points.__doc__
+        # but not the entities returned for p = 1
+        assert mesh.cell_to_ipoint(1).flags.writeable is False
+        assert mesh.cell.flags.writeable and mesh.node.flags.writeable
+
+    mesh.uniform_refine()
+    c2p = mesh.cell_to_ipoint(3)
+    expected = Mesh(mesh.node, mesh.cell).cell_to_ipoint(3)
+    np.testing.assert_array_equal(bm.to_numpy(c2p), bm.to_numpy(expected))
+
+    ip = mesh.interpolation_points(2)
+    mesh.node = mesh.node * 2
+    np.testing.assert_allclose(bm.to_numpy(mesh.interpolation_points(2)),
+                               2 * bm.to_numpy(ip), atol=1e-14)
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'pytorch'])
+def test_ipoint_cache_threads(backend):
+    from concurrent.futures import ThreadPoolExecutor
+    bm.set_backend(backend)
+    mesh = TriangleMesh.from_box([0, 1, 0, 1], nx=16, ny=16)
+    with ThreadPoolExecutor(8, initializer=bm.set_backend, initargs=(backend,)) as executor:
+        results = list(executor.map(lambda _: mesh.cell_to_ipoint(4), range(16)))
+    assert all(c2p is results[0] for c2p in results)
+    assert mesh.cell_to_ipoint(4) is results[0]
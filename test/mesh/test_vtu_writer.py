@@ -0,0 +1,114 @@
+import zlib
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+from fealpy.backend import backend_manager as bm
+from fealpy.mesh import TriangleMesh, VTUSeriesWriter, write_vtu
+from fealpy.mesh.vtkCellTypes import VTK_TRIANGLE, VTK_QUAD
+
+
+_TYPES = {'Int64': np.int64, 'UInt8': np.uint8, 'Float64': np.float64}
+
+
+def read_vtu(fname):
+    """A minimal reader of the appended raw VTU files."""
+    with open(fname, 'rb') as f:
+        content = f.read()
+    start = content.index(b'<AppendedData encoding="raw">')
+    start = content.index(b'_', start) + 1
+    head = content[:start].decode() + '</AppendedData></VTKFile>'
+    root = ET.fromstring(head)
+    compressed = root.get('compressor') is not None
+
+    arrays = {}
+    for node in root.iter('DataArray'):
+        offset = start + int(node.get('offset'))
+        if compressed:
+            nblocks = int(np.frombuffer(content, '<u8', 1, offset)[0])
+            header = np.frombuffer(content, '<u8', 3 + nblocks, offset)
+            pos = offset + 8 * (3 + nblocks)
+            raw = b''
+            for size in header[3:]:
+                raw += zlib.decompress(content[pos:pos+int(size)])
+                pos += int(size)
+        else:
+            size = int(np.frombuffer(content, '<u8', 1, offset)[0])
+            raw = content[offset+8:offset+8+size]
+        array = np.frombuffer(raw, _TYPES[node.get('type')])
+        ncomp = int(node.get('NumberOfComponents'))
+        arrays[node.get('Name')] = array.reshape(-1, ncomp) if ncomp > 1 else array
+    return root, arrays
+
+
+class TestVTUWriter:
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_write_vtu(self, backend, compress, tmp_path):
+        bm.set_backend(backend)
+        mesh = TriangleMesh.from_box(nx=3, ny=2)
+        NN, NC = mesh.number_of_nodes(), mesh.number_of_cells()
+        u = bm.arange(NN, dtype=bm.float64)
+        grad = bm.ones((NC, 2), dtype=bm.float64)
+        fname = str(tmp_path / 'mesh.vtu')
+        node, cell, celltype, _ = mesh.to_vtk()
+        write_vtu(fname, node, cell, celltype, compress=compress,
+                  nodedata={'u': u, 'flag': mesh.boundary_node_flag()},
+                  celldata={'grad': grad, 'none': None})
+
+        root, arrays = read_vtu(fname)
+        piece = next(root.iter('Piece'))
+        assert int(piece.get('NumberOfPoints')) == NN
+        assert int(piece.get('NumberOfCells')) == NC
+        np.testing.assert_allclose(arrays['Points'][:, :2], bm.to_numpy(mesh.node))
+        np.testing.assert_array_equal(arrays['Points'][:, 2], 0)
+        np.testing.assert_array_equal(arrays['connectivity'].reshape(NC, 3), bm.to_numpy(mesh.cell))
+        np.testing.assert_array_equal(arrays['offsets'], 3 * np.arange(1, NC+1))
+        np.testing.assert_array_equal(arrays['types'], VTK_TRIANGLE)
+        np.testing.assert_allclose(arrays['u'], bm.to_numpy(u))
+        np.testing.assert_array_equal(arrays['flag'], bm.to_numpy(mesh.boundary_node_flag()))
+        np.testing.assert_allclose(arrays['grad'], np.tile([1., 1., 0.], (NC, 1)))
+        assert 'none' not in arrays
+
+    def test_mixed_cells(self, tmp_path):
+        bm.set_backend('numpy')
+        node = np.array([[0, 0], [1, 0], [1, 1], [0, 1], [2, 0]], dtype=np.float64)
+        cell = np.array([4, 0, 1, 2, 3, 3, 1, 4, 2])
+        fname = str(tmp_path / 'mixed.vtu')
+        write_vtu(fname, node, cell, np.array([VTK_QUAD, VTK_TRIANGLE]))
+        _, arrays = read_vtu(fname)
+        np.testing.assert_array_equal(arrays['connectivity'], [0, 1, 2, 3, 1, 4, 2])
+        np.testing.assert_array_equal(arrays['offsets'], [4, 7])
+        np.testing.assert_array_equal(arrays['types'], [VTK_QUAD, VTK_TRIANGLE])
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    @pytest.mark.parametrize("background", [False, True])
+    def test_series(self, backend, background, tmp_path):
+        bm.set_backend(backend)
+        mesh = TriangleMesh.from_box(nx=2, ny=2)
+        u = bm.zeros((mesh.number_of_nodes(), ), dtype=bm.float64)
+        fname = str(tmp_path / 'out' / 'u.pvd')
+
+        with VTUSeriesWriter(fname, mesh, compress=True, background=background) as writer:
+            for n in range(3):
+                u = bm.set_at(u, slice(None), float(n))
+                writer.write(0.5 * n, nodedata={'u': u}, node=mesh.node + n)
+
+        collection = ET.parse(fname).getroot()
+        datasets = list(collection.iter('DataSet'))
+        assert [float(d.get('timestep')) for d in datasets] == [0., 0.5, 1.]
+        for n, dataset in enumerate(datasets):
+            _, arrays = read_vtu(str(tmp_path / 'out' / dataset.get('file')))
+            np.testing.assert_allclose(arrays['u'], n)
+            np.testing.assert_allclose(arrays['Points'][:, :2], bm.to_numpy(mesh.node) + n)
+
+    def test_series_errors(self, tmp_path):
+        bm.set_backend('numpy')
+        mesh = TriangleMesh.from_box(nx=2, ny=2)
+        with pytest.raises(ValueError):
+            VTUSeriesWriter(str(tmp_path / 'u.pvd'))
+        writer = VTUSeriesWriter(str(tmp_path / 'u.pvd'), mesh)
+        writer.write(0., nodedata={'u': np.zeros(3)})
+        with pytest.raises(RuntimeError):
+            writer.close()
@@ -0,0 +1,46 @@
+
+import numpy as np
+import pytest
+
+from fealpy.backend import backend_manager as bm
+from fealpy.quadrature import (
+    TriangleQuadrature, GaussLegendreQuadrature, TensorProductQuadrature,
+    quadrature_registry
+)
+from fealpy.mesh import TriangleMesh, QuadrangleMesh
+
+
+@pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+def test_shared(backend):
+    bm.set_backend(backend)
+    qf = TriangleQuadrature.shared(3)
+    assert TriangleQuadrature.shared(3, dtype=bm.float64) is qf
+    assert TriangleQuadrature.shared(4) is not qf
+    assert TriangleQuadrature.shared(3, dtype=bm.float32) is not qf
+
+    bcs, ws = qf.get_quadrature_points_and_weights()
+    expected = TriangleQuadrature(3)
+    np.testing.assert_array_equal(bm.to_numpy(bcs), bm.to_numpy(expected.quadpts))
+    np.testing.assert_array_equal(bm.to_numpy(ws), bm.to_numpy(expected.weights))
+    assert quadrature_registry.points_key(bcs) == (qf.key, 0)
+    assert quadrature_registry.points_key(bm.copy(bcs)) is None
+    if backend == 'numpy':
+        assert not bcs.flags.writeable
+        assert not ws.flags.writeable
+
+    gl = GaussLegendreQuadrature.shared(2)
+    tp = TensorProductQuadrature.shared((gl, gl))
+    assert TensorProductQuadrature.shared((gl, gl)) is tp
+    assert tp.number_of_quadrature_points() == 4
+    assert quadrature_registry.points_key(tp.quadpts[1]) is not None
+
+
+@pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+def test_mesh_quadrature_formula(backend):
+    bm.set_backend(backend)
+    mesh = TriangleMesh.from_box([0, 1, 0, 1], nx=2, ny=2)
+    assert mesh.quadrature_formula(3) is mesh.quadrature_formula(3, 'cell')
+    assert mesh.quadrature_formula(3, 'edge') is GaussLegendreQuadrature.shared(
+        3, dtype=mesh.ftype, device=mesh.device)
+    mesh = QuadrangleMesh.from_box([0, 1, 0, 1], nx=2, ny=2)
+    assert mesh.quadrature_formula(2) is mesh.quadrature_formula(2)
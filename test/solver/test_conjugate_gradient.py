@@ -0,0 +1,152 @@
+
+import numpy as np
+import pytest
+
+from fealpy.backend import backend_manager as bm
+from fealpy.mesh import TriangleMesh
+from fealpy.functionspace import LagrangeFESpace
+from fealpy.fem import BilinearForm, ScalarDiffusionIntegrator, ScalarMassIntegrator
+from fealpy.solver import (
+    cg, JacobiPreconditioner, BlockJacobiPreconditioner,
+    SSORPreconditioner, IC0Preconditioner
+)
+
+
+def spd_matrix(n=8, p=1):
+    mesh = TriangleMesh.from_box([0, 1, 0, 1], nx=n, ny=n)
+    space = LagrangeFESpace(mesh, p=p)
+    bform = BilinearForm(space)
+    bform.add_integrator(ScalarDiffusionIntegrator(), ScalarMassIntegrator())
+    return bform.assembly()
+
+
+def dense_ic0(A):
+    n = A.shape[0]
+    L = np.tril(A).copy()
+    pattern = L != 0
+    for k in range(n):
+        L[k, k] = np.sqrt(L[k, k])
+        L[k+1:, k] /= L[k, k]
+        for j in range(k+1, n):
+            L[j:, j] -= np.where(pattern[j:, j], L[j:, k] * L[j, k], 0.)
+    return L
+
+
+PRECONDITIONERS = [
+    None,
+    JacobiPreconditioner,
+    lambda A: BlockJacobiPreconditioner(A, 3),
+    SSORPreconditioner,
+    lambda A: SSORPreconditioner(A, omega=1.5),
+    IC0Preconditioner,
+]
+
+
+class TestCG:
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    @pytest.mark.parametrize("precond", PRECONDITIONERS)
+    def test_preconditioned(self, backend, precond):
+        bm.set_backend(backend)
+        A = spd_matrix()
+        n = A.shape[0]
+        x = bm.astype(bm.random.rand(n), bm.float64)
+        b = A @ x
+        M = None if precond is None else precond(A)
+
+        sol, info = cg(A, b, M=M, atol=1e-14, rtol=1e-12, returninfo=True)
+        np.testing.assert_allclose(bm.to_numpy(sol), bm.to_numpy(x), atol=1e-8)
+        assert info['history'].shape[0] == int(info['niter']) + 1
+        assert float(info['residual']) < 1e-10 * float(bm.linalg.norm(b))
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    def test_preconditioner_reduces_iterations(self, backend):
+        bm.set_backend(backend)
+        A = spd_matrix(n=16, p=2)
+        b = bm.ones((A.shape[0],), dtype=bm.float64)
+        _, info0 = cg(A, b, returninfo=True)
+        _, info1 = cg(A, b, M=IC0Preconditioner(A), returninfo=True)
+        _, info2 = cg(A, b, M=SSORPreconditioner(A).__matmul__, returninfo=True)
+        assert int(info1['niter']) < int(info0['niter'])
+        assert int(info2['niter']) < int(info0['niter'])
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    @pytest.mark.parametrize("batch_first", [False, True])
+    def test_batched_columns(self, backend, batch_first):
+        bm.set_backend(backend)
+        A = spd_matrix()
+        n = A.shape[0]
+        X = bm.astype(bm.random.rand(n, 3), bm.float64)
+        X = bm.set_at(X, (slice(None), 1), 0.) # converged at the beginning
+        B = A @ X
+        if batch_first:
+            B = bm.swapaxes(B, 0, 1)
+
+        sol, info = cg(A, B, batch_first=batch_first, M=JacobiPreconditioner(A),
+                       atol=1e-14, rtol=1e-12, returninfo=True)
+        if batch_first:
+            sol = bm.swapaxes(sol, 0, 1)
+        np.testing.assert_allclose(bm.to_numpy(sol), bm.to_numpy(X), atol=1e-8)
+
+        niter = bm.to_numpy(info['niter'])
+        assert niter.shape == (3,)
+        assert niter[1] == 0
+        assert info['history'].shape == (niter.max() + 1, 3)
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    @pytest.mark.parametrize("batch_first", [None, False, True])
+    def test_x0_unchanged(self, backend, batch_first):
+        bm.set_backend(backend)
+        A = spd_matrix()
+        n = A.shape[0]
+        shape = (n,) if batch_first is None else ((2, n) if batch_first else (n, 2))
+        b = bm.ones(shape, dtype=bm.float64)
+        x0 = bm.zeros(shape, dtype=bm.float64)
+        sol = cg(A, b, x0=x0, batch_first=bool(batch_first))
+        assert bm.max(bm.abs(sol)) > 0
+        np.testing.assert_array_equal(bm.to_numpy(x0), 0.)
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    def test_ic0_factor(self, backend):
+        bm.set_backend(backend)
+        A = spd_matrix(n=3, p=2)
+        M = IC0Preconditioner(A, sweeps=50)
+        lrow, lcol, L = M.L
+        L_dense = np.zeros(A.shape)
+        L_dense[bm.to_numpy(lrow), bm.to_numpy(lcol)] = bm.to_numpy(L)
+        expected = dense_ic0(bm.to_numpy(A.to_dense()))
+        np.testing.assert_allclose(L_dense, expected, atol=1e-12)
+
+        r = bm.astype(bm.random.rand(A.shape[0]), bm.float64)
+        z = bm.to_numpy(M @ r)
+        np.testing.assert_allclose(L_dense @ (L_dense.T @ z), bm.to_numpy(r), atol=1e-10)
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    def test_switch_backend(self, backend):
+        bm.set_backend(backend)
+        A = spd_matrix(n=4, p=2)
+        r = bm.astype(bm.random.rand(A.shape[0]), bm.float64)
+        preconds = [SSORPreconditioner(A), IC0Preconditioner(A, sweeps=5)]
+        expected = [bm.to_numpy(M @ r) for M in preconds]
+        assert preconds[1].sweeps == 5
+
+        bm.set_backend('pytorch' if backend == 'numpy' else 'numpy')
+        try:
+            results = [M @ r for M in preconds]
+        finally:
+            bm.set_backend(backend)
+        for z, e in zip(results, expected):
+            np.testing.assert_allclose(bm.to_numpy(z), e, atol=1e-12)
+
+    @pytest.mark.parametrize("backend", ['numpy', 'pytorch'])
+    def test_block_jacobi(self, backend):
+        bm.set_backend(backend)
+        A = spd_matrix(n=2)
+        n = A.shape[0]
+        M = BlockJacobiPreconditioner(A, 4)
+        dense = bm.to_numpy(A.to_dense())
+        expected = np.zeros_like(dense)
+        for s in range(0, n, 4):
+            blk = slice(s, min(s+4, n))
+            expected[blk, blk] = np.linalg.inv(dense[blk, blk])
+        r = bm.astype(bm.random.rand(n, 2), bm.float64)
+        np.testing.assert_allclose(bm.to_numpy(M @ r), expected @ bm.to_numpy(r), atol=1e-12)
@@ -0,0 +1,68 @@
+
+import numpy as np
+import pytest
+
+from fealpy.backend import backend_manager as bm
+from fealpy.sparse import COOTensor, COOBuilder
+
+ALL_BACKENDS = ['numpy', 'pytorch']
+
+
+def random_pieces(num, spshape, dense_shape=()):
+    pieces = []
+    for _ in range(num):
+        n = int(np.random.randint(0, 20))
+        indices = bm.stack([bm.random.randint(0, s, (n,)) for s in spshape], axis=0)
+        values = bm.astype(bm.random.rand(*dense_shape, n), bm.float64)
+        pieces.append((bm.astype(indices, bm.int64), values))
+    return pieces
+
+
+@pytest.mark.parametrize("backend", ALL_BACKENDS)
+@pytest.mark.parametrize("capacity", [0, 1, 16, 1000])
+@pytest.mark.parametrize("dense_shape", [(), (3,)])
+def test_build(backend, capacity, dense_shape):
+    bm.set_backend(backend)
+    spshape = (7, 5)
+    pieces = random_pieces(10, spshape, dense_shape)
+
+    builder = COOBuilder(spshape, dense_shape, capacity=capacity,
+                         itype=bm.int64, ftype=bm.float64)
+    expected = COOTensor(bm.empty((2, 0), dtype=bm.int64),
+                         bm.empty(dense_shape + (0,), dtype=bm.float64), spshape)
+    for indices, values in pieces:
+        builder.append(indices, values)
+        expected = expected.add(COOTensor(indices, values, spshape))
+
+    assert builder.size == expected.nnz
+    M = builder.build()
+    assert M.sparse_shape == spshape
+    np.testing.assert_array_equal(bm.to_numpy(M.indices), bm.to_numpy(expected.indices))
+    np.testing.assert_array_equal(bm.to_numpy(M.values), bm.to_numpy(expected.values))
+
+    M2 = builder.build()
+    np.testing.assert_array_equal(bm.to_numpy(M2.values), bm.to_numpy(M.values))
+
+
+@pytest.mark.parametrize("backend", ALL_BACKENDS)
+@pytest.mark.parametrize("capacity", [0, 8])
+def test_build_empty(backend, capacity):
+    bm.set_backend(backend)
+    builder = COOBuilder((3,), capacity=capacity, itype=bm.int32, ftype=bm.float32)
+    M = builder.build()
+    assert M.nnz == 0
+    assert M.sparse_shape == (3,)
+    assert M.itype == bm.int32
+    assert M.ftype == bm.float32
+
+
+@pytest.mark.parametrize("backend", ALL_BACKENDS)
+def test_append_shape_mismatch(backend):
+    bm.set_backend(backend)
+    builder = COOBuilder((3, 3))
+    with pytest.raises(ValueError):
+        builder.append(bm.tensor([[0, 1]]), bm.tensor([1.0, 2.0]))
+    with pytest.raises(ValueError):
+        builder.append(bm.tensor([[0, 1], [1, 2]]), bm.tensor([1.0, 2.0, 3.0]))
+    with pytest.raises(ValueError):
+        COOBuilder((3, 3), capacity=-1)
@@ -2,7 +2,7 @@
 import pytest
 
 from fealpy.backend import backend_manager as bm
-from fealpy.sparse._spmm import spmm_coo
+from fealpy.sparse._spmm import spmm_coo, spmm_csr, csr_row
 
 ALL_BACKENDS = ['numpy', 'pytorch']
 
@@ -140,3 +140,59 @@ def test_spmm_coo_invalid_spshape(backend):
     # Expect a ValueError to be raised
     with pytest.raises(ValueError):
         spmm_coo(indices, values, spshape, x)
+
+
+@pytest.mark.parametrize("backend", ALL_BACKENDS)
+def test_spmm_csr_1d_vector(backend):
+    bm.set_backend(backend)
+    crow = bm.tensor([0, 3, 4, 6, 8])
+    col = bm.tensor([0, 2, 3, 2, 0, 3, 1, 3])
+    values = bm.tensor([1, 2, 4, -1, 3, -1, 5, -2], dtype=bm.float32)
+    spshape = (4, 4)
+    x = bm.tensor([-3, -1, 1, 2], dtype=bm.float32)
+
+    expected = bm.tensor([7, -1, -11, -9], dtype=bm.float32)
+    output = spmm_csr(crow, col, values, spshape, x)
+    assert bm.allclose(output, expected), f"Expected {expected} but got {output}"
+
+    row = csr_row(crow)
+    assert bm.allclose(row, bm.tensor([0, 0, 0, 1, 2, 2, 3, 3], dtype=row.dtype))
+    output = spmm_csr(crow, col, values, spshape, x, row=row)
+    assert bm.allclose(output, expected), f"Expected {expected} but got {output}"
+
+
+@pytest.mark.parametrize("backend", ALL_BACKENDS)
+def test_spmm_csr_2d_batch_vector(backend):
+    bm.set_backend(backend)
+    crow = bm.tensor([0, 3, 4, 7])
+    col = bm.tensor([0, 2, 3, 2, 0, 1, 3])
+    values = bm.tensor([1, 2, 4, -1, 3, 2, 5], dtype=bm.float32)
+    spshape = (3, 4)
+    x = bm.tensor([[-1, -1, -1, -1, -1],
+                   [6, 9, 1, 2, 7],
+                   [2, 2, 2, 2, 1],
+                   [1, 8, 2, 2, 5]], dtype=bm.float32)
+
+    expected = bm.tensor([[7, 35, 11, 11, 21],
+                          [-2, -2, -2, -2, -1],
+                          [14, 55, 9, 11, 36]], dtype=bm.float32)
+    output = spmm_csr(crow, col, values, spshape, x)
+    assert bm.allclose(output, expected), f"Expected {expected} but got {output}"
+
+    # batched values
+    values = bm.stack([values, 2*values], axis=0)
+    output = spmm_csr(crow, col, values, spshape, x)
+    assert bm.allclose(output, bm.stack([expected, 2*expected], axis=0))
+
+
+@pytest.mark.parametrize("backend", ALL_BACKENDS)
+def test_spmm_csr_empty_rows(backend):
+    bm.set_backend(backend)
+    crow = bm.tensor([0, 0, 2, 2, 3])
+    col = bm.tensor([1, 3, 0])
+    values = bm.tensor([1., 2., 3.], dtype=bm.float64)
+    x = bm.tensor([1., 2., 3., 4.], dtype=bm.float64)
+
+    output = spmm_csr(crow, col, values, (4, 4), x)
+    expected = bm.tensor([0., 10., 0., 3.], dtype=bm.float64)
+    assert bm.allclose(output, expected)
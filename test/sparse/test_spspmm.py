@@ -1,9 +1,11 @@
 
+import numpy as np
+import scipy.sparse as sp
 import pytest
 
 from fealpy.backend import backend_manager as bm
-from fealpy.sparse._spspmm import spspmm_coo
-from fealpy.sparse import COOTensor
+from fealpy.sparse._spspmm import spspmm_coo, spspmm_csr
+from fealpy.sparse import COOTensor, CSRTensor
 
 ALL_BACKENDS = ['numpy', 'pytorch']
 
@@ -49,3 +51,59 @@ def test_spspmm_coo_valid_input(backend):
 
 # Additional tests can be added here to cover more edge cases, different shapes,
 # or to ensure consistency with other matrix multiplication methods under various conditions.
+
+
+@pytest.mark.parametrize("backend", ALL_BACKENDS)
+def test_spspmm_csr_valid_input(backend):
+    bm.set_backend(backend)
+    crow1 = bm.tensor([0, 2, 3, 4])
+    col1 = bm.tensor([0, 1, 1, 2])
+    values1 = bm.tensor([1., 3., 4., 2.], dtype=bm.float64)
+    spshape1 = (3, 3)
+
+    crow2 = bm.tensor([0, 1, 2, 3])
+    col2 = bm.tensor([1, 0, 0])
+    values2 = bm.tensor([2., 9., 3.], dtype=bm.float64)
+    spshape2 = (3, 2)
+
+    crow, col, values, output_shape = spspmm_csr(crow1, col1, values1, spshape1,
+                                                 crow2, col2, values2, spshape2)
+    result = CSRTensor(crow, col, values, output_shape).to_dense()
+
+    expected = bm.tensor([[27., 2.],
+                          [36., 0.],
+                          [6., 0.]], dtype=bm.float64)
+
+    assert output_shape == (3, 2)
+    assert bm.allclose(crow, bm.tensor([0, 2, 3, 4], dtype=crow.dtype))
+    assert bm.allclose(result, expected)
+
+
+@pytest.mark.parametrize("backend", ALL_BACKENDS)
+def test_spspmm_random_matrices(backend):
+    bm.set_backend(backend)
+    rng = np.random.default_rng(0)
+    A = sp.random(40, 30, density=0.1, format='csr', random_state=rng)
+    B = sp.random(30, 50, density=0.1, format='csr', random_state=rng)
+    B[3, :] = 0 # empty rows must be supported
+    B.eliminate_zeros()
+    expected = (A @ B).toarray()
+
+    mat1 = COOTensor.from_scipy(A.tocoo())
+    mat2 = COOTensor.from_scipy(B.tocoo())
+    indices, values, spshape = spspmm_coo(
+        mat1.indices, mat1.values, mat1.sparse_shape,
+        mat2.indices, mat2.values, mat2.sparse_shape
+    )
+    result = COOTensor(indices, values, spshape).to_dense()
+    np.testing.assert_allclose(bm.to_numpy(result), expected)
+
+    mat1 = CSRTensor.from_scipy(A)
+    mat2 = CSRTensor.from_scipy(B)
+    crow, col, values, spshape = spspmm_csr(
+        mat1.crow, mat1.col, mat1.values, mat1.sparse_shape,
+        mat2.crow, mat2.col, mat2.values, mat2.sparse_shape
+    )
+    result = CSRTensor(crow, col, values, spshape)
+    np.testing.assert_allclose(bm.to_numpy(result.to_dense()), expected)
+    np.testing.assert_array_equal(bm.to_numpy(crow), (A @ B).indptr)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from fealpy.old.mesh import PolygonMesh, TriangleMesh
+from fealpy.old.functionspace import ConformingScalarVESpace2d
+from fealpy.vem import ScaledMonomialSpaceMassIntegrator2d
+from fealpy.vem import ConformingVEMDoFIntegrator2d
+from fealpy.vem import ConformingScalarVEMH1Projector2d
+from fealpy.vem import ConformingScalarVEML2Projector2d
+from fealpy.vem.conforming_scalar_vem_h1_projector import group_cells_by_vertices
+
+
+def test_group_cells_by_vertices():
+    NV = np.array([4, 6, 5, 4, 6, 6])
+    groups = group_cells_by_vertices(NV)
+    assert [k for k, _ in groups] == [4, 5, 6]
+    np.testing.assert_array_equal(groups[0][1], [0, 3])
+    np.testing.assert_array_equal(groups[2][1], [1, 4, 5])
+
+
+@pytest.mark.parametrize("p", [1, 2, 3])
+def test_projectors(p):
+    tmesh = TriangleMesh.from_box([0, 1, 0, 1], nx=5, ny=4)
+    mesh = PolygonMesh.from_triangle_mesh_by_dual(tmesh) # 4, 5 和 6 边形
+    space = ConformingScalarVESpace2d(mesh, p=p)
+    NC = mesh.number_of_cells()
+    smldof = space.smspace.number_of_local_dofs()
+    ldof = space.number_of_local_dofs()
+
+    M = ScaledMonomialSpaceMassIntegrator2d().assembly_cell_matrix(space.smspace)
+    D = ConformingVEMDoFIntegrator2d().assembly_cell_matrix(space, M)
+    h1 = ConformingScalarVEMH1Projector2d(D)
+    PI1 = h1.assembly_cell_matrix(space)
+    PI0 = ConformingScalarVEML2Projector2d(M, PI1).assembly_cell_matrix(space)
+
+    assert len(PI1) == NC
+    assert len(PI0) == NC
+    assert sum(len(g.index) for g in h1.groups) == NC
+    I = np.eye(smldof)
+    for i in range(NC):
+        assert PI1[i].shape == (smldof, ldof[i])
+        # 投影算子保持缩放单项式空间不变
+        np.testing.assert_allclose(PI1[i]@D[i], I, atol=1e-10)
+        np.testing.assert_allclose(PI0[i]@D[i], I, atol=1e-10)
+
+    for g in h1.groups:
+        assert g.B.shape == (len(g.index), smldof, ldof[g.index[0]])
+        np.testing.assert_array_equal(mesh.ds.number_of_vertices_of_cells()[g.index], g.nv)
+        np.testing.assert_allclose(g.PI, np.stack([PI1[i] for i in g.index]))
+
+
+if __name__ == "__main__":
+    pytest.main(["./test_conforming_scalar_vem_projector.py"])